@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+
+"""
+Micro-benchmarks of rendering large post bodies.
+
+Run the benchmarks from the repository root::
+
+    python -m benchmarks.compiled_template
+
+The rendering of the compiled templates is compared with
+:meth:`string.Template.safe_substitute()`.
+"""
+
+import timeit
+from string import Template
+from typing import Dict, Tuple
+
+import click
+
+from slow_start_rewatch.compiled_template import compile_template
+
+# Number of the placeholders and the size of the text between them.
+BODY_SIZES = ((100, 100), (1000, 100), (5000, 400))
+NUMBER = 20
+
+
+def create_body(placeholder_count: int, text_size: int) -> Tuple[str, Dict]:
+    """Create the body template and the mapping for the substitution."""
+    text = "Slow Start " * (text_size // 11)
+    parts = ["$navigation_links\n\n"]
+    mapping = {"navigation_links": "[Previous](/id_1) | [Next](/id_2)"}
+
+    for index in range(placeholder_count):
+        name = "e{0:05}".format(index)
+        parts.append("{0} ${1} $${1}\n".format(text, name))
+
+        if index % 2:
+            mapping[name] = "[Episode {0}](/id_{0})".format(index)
+
+    return "".join(parts), mapping
+
+
+def main() -> None:
+    """Run the benchmarks and print the results."""
+    click.echo("{0:>12} {1:>10} {2:>16} {3:>16} {4:>8}".format(
+        "placeholders",
+        "size (kB)",
+        "substitute (ms)",
+        "compiled (ms)",
+        "speedup",
+    ))
+
+    for placeholder_count, text_size in BODY_SIZES:
+        template, mapping = create_body(placeholder_count, text_size)
+
+        if compile_template(template).render(mapping) != (
+            Template(template).safe_substitute(mapping)
+        ):
+            raise RuntimeError("The outputs differ.")
+
+        substitute_time = timeit.timeit(
+            lambda: Template(template).safe_substitute(mapping),  # noqa: B023
+            number=NUMBER,
+        ) / NUMBER
+        compiled_time = timeit.timeit(
+            lambda: compile_template(template).render(mapping),  # noqa: B023
+            number=NUMBER,
+        ) / NUMBER
+
+        click.echo("{0:>12} {1:>10.1f} {2:>16.3f} {3:>16.3f} {4:>7.1f}x".format(
+            placeholder_count,
+            len(template) / 1024,
+            substitute_time * 1000,
+            compiled_time * 1000,
+            substitute_time / compiled_time,
+        ))
+
+
+if __name__ == "__main__":
+    main()
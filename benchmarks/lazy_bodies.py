@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark of loading a large Schedule with eager and lazy post bodies.
+
+Run the benchmark from the repository root::
+
+    python -m benchmarks.lazy_bodies
+
+Each post body is "loaded" by sleeping for the latency of a wiki request.
+In the lazy mode only the bodies of the next post and the posts within the
+body window are loaded.
+"""
+
+import time
+from typing import List
+
+import click
+import structlog
+
+from benchmarks.schedule_parsing import (
+    create_schedule_data,
+    encode_schedule_data,
+)
+from slow_start_rewatch.post import Post
+from slow_start_rewatch.schedule.schedule_storage import ScheduleStorage
+
+POST_COUNTS = (100, 1000)
+LATENCY = 0.01  # seconds
+BODY_WORKERS = 8
+BODY_WINDOW = 1
+
+
+class ScheduleLatencyStorage(ScheduleStorage):
+    """Loads the post bodies with the simulated latency."""
+
+    def __init__(self, schedule_data: str, lazy_bodies: bool) -> None:
+        """Initialize ScheduleLatencyStorage."""
+        super().__init__(body_workers=BODY_WORKERS, lazy_bodies=lazy_bodies)
+        self.schedule_data = schedule_data
+        self.load_count = 0
+
+    def load_schedule_data(self) -> str:
+        """Return the Schedule data."""
+        return self.schedule_data
+
+    def load_post_body(self, body_template_source: str) -> str:
+        """Return a post body after the latency."""
+        time.sleep(LATENCY)
+        self.load_count += 1
+
+        return "Body of {0}".format(body_template_source)
+
+    def save_schedule_data(self, schedule_data: str) -> None:
+        """Ignore the Schedule data."""
+
+
+def load(schedule_storage: ScheduleStorage) -> List[Post]:
+    """Load the Schedule and the bodies of the first post and its window."""
+    schedule = schedule_storage.load()
+    window_posts = schedule.get_surrounding_posts(
+        schedule.posts[:1],
+        BODY_WINDOW,
+    )
+    schedule_storage.load_deferred_bodies(window_posts)
+
+    return window_posts
+
+
+def main() -> None:
+    """Run the benchmark and print the results."""
+    structlog.configure(
+        logger_factory=structlog.stdlib.LoggerFactory(),
+        wrapper_class=structlog.stdlib.BoundLogger,
+    )
+
+    click.echo("{0:>8} {1:>8} {2:>10} {3:>10}".format(
+        "posts",
+        "mode",
+        "load (s)",
+        "bodies",
+    ))
+
+    for post_count in POST_COUNTS:
+        yaml_text, _ = encode_schedule_data(create_schedule_data(post_count))
+
+        for label, lazy_bodies in (("eager", False), ("lazy", True)):
+            schedule_storage = ScheduleLatencyStorage(yaml_text, lazy_bodies)
+
+            start_time = time.perf_counter()
+            window_posts = load(schedule_storage)
+            elapsed = time.perf_counter() - start_time
+
+            if window_posts[0].body_template != "Body of episode_00001.md":
+                raise RuntimeError("The post body is not loaded.")
+
+            click.echo("{0:>8} {1:>8} {2:>10.2f} {3:>10}".format(
+                post_count,
+                label,
+                elapsed,
+                schedule_storage.load_count,
+            ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark of loading the post bodies with the simulated wiki latency.
+
+Run the benchmark from the repository root::
+
+    python -m benchmarks.post_body_loading
+
+Each post body is "loaded" by sleeping for the latency of a wiki request.
+The bodies are loaded sequentially (one worker) and concurrently.
+"""
+
+import time
+from typing import Dict, List
+
+import click
+import structlog
+
+from slow_start_rewatch.schedule.schedule_storage import ScheduleStorage
+
+POST_COUNT = 50
+LATENCY = 0.1  # seconds
+WORKER_COUNTS = (1, 4, 8, 16)
+
+
+class ScheduleLatencyStorage(ScheduleStorage):
+    """Loads the post bodies with the simulated latency."""
+
+    def load_schedule_data(self) -> str:
+        """Return empty Schedule data."""
+        return ""
+
+    def load_post_body(self, body_template_source: str) -> str:
+        """Return a post body after the latency."""
+        time.sleep(LATENCY)
+
+        return "Body of {0}".format(body_template_source)
+
+    def save_schedule_data(self, schedule_data: str) -> None:
+        """Ignore the Schedule data."""
+
+
+def main() -> None:
+    """Run the benchmark and print the results."""
+    structlog.configure(
+        logger_factory=structlog.stdlib.LoggerFactory(),
+        wrapper_class=structlog.stdlib.BoundLogger,
+    )
+    body_sources: List[str] = [
+        "episode_{0:02}.md".format(index) for index in range(POST_COUNT)
+    ]
+
+    click.echo("{0:>8} {1:>8} {2:>12}".format("bodies", "workers", "load (s)"))
+
+    for body_workers in WORKER_COUNTS:
+        schedule_storage = ScheduleLatencyStorage(body_workers=body_workers)
+        post_bodies: Dict[str, str] = {}
+
+        start_time = time.perf_counter()
+        schedule_storage.load_post_bodies(body_sources, post_bodies)
+        elapsed = time.perf_counter() - start_time
+
+        if list(post_bodies) != body_sources:
+            raise RuntimeError("The post bodies are not in order.")
+
+        click.echo("{0:>8} {1:>8} {2:>12.2f}".format(
+            POST_COUNT,
+            body_workers,
+            elapsed,
+        ))
+
+
+if __name__ == "__main__":
+    main()
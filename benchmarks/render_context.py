@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark of rendering all the posts of large Schedules.
+
+Run the benchmark from the repository root::
+
+    python -m benchmarks.render_context
+
+Each cycle builds the render context of the Schedule and renders the body of
+every post. The time per post should stay (roughly) constant as the Schedule
+grows, i.e. the rendering scales linearly with the number of posts.
+"""
+
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+import click
+import structlog
+
+from slow_start_rewatch.config import Config
+from slow_start_rewatch.post import Post
+from slow_start_rewatch.post_helper import PostHelper
+from slow_start_rewatch.schedule.schedule import Schedule
+
+POST_COUNTS = (1000, 2000, 5000, 10000)
+REPEAT = 3
+FIRST_SUBMIT_AT = datetime(2018, 1, 6, 17, 0, 0)
+
+
+def create_schedule(post_count: int) -> Schedule:
+    """Create a Schedule where the first half of the posts is submitted."""
+    posts: List[Post] = []
+
+    for index in range(1, post_count + 1):
+        post = Post(
+            name="e{0:05}".format(index),
+            submit_at=FIRST_SUBMIT_AT + timedelta(days=index),
+            subreddit="anime",
+            title="Slow Start - Episode {0} Discussion".format(index),
+            body_template=(
+                "$navigation_links\n\n" +
+                "Previous: $e{0:05} | Next: $e{1:05}".format(
+                    index - 1,
+                    index + 1,
+                )
+            ),
+            navigation_scheduled="Episode {0}".format(index),
+            navigation_submitted="[Episode {0}]($link)".format(index),
+            navigation_current="**Episode {0}**".format(index),
+        )
+
+        if index <= post_count // 2:
+            post.submission_id = "id_{0}".format(index)
+
+        posts.append(post)
+
+    return Schedule(subreddit="anime", posts=posts)
+
+
+def measure_cycle(post_helper: PostHelper, schedule: Schedule) -> float:
+    """Build the render context, render all posts and return the time."""
+    post_helper.render_context = None
+    start_time = time.perf_counter()
+
+    for post in schedule.posts:
+        post_helper.prepare_post(post, schedule)
+
+    return time.perf_counter() - start_time
+
+
+def main() -> None:
+    """Run the benchmark and print the results."""
+    structlog.configure(
+        logger_factory=structlog.stdlib.LoggerFactory(),
+        wrapper_class=structlog.stdlib.BoundLogger,
+    )
+    post_helper = PostHelper(Config(), reddit=None)  # type: ignore
+
+    click.echo("{0:>8} {1:>12} {2:>14}".format(
+        "posts",
+        "cycle (ms)",
+        "post (us)",
+    ))
+
+    for post_count in POST_COUNTS:
+        schedule = create_schedule(post_count)
+        cycle_time = min(
+            measure_cycle(post_helper, schedule) for _ in range(REPEAT)
+        )
+
+        click.echo("{0:>8} {1:>12.1f} {2:>14.2f}".format(
+            post_count,
+            cycle_time * 1000,
+            cycle_time / post_count * 1000000,
+        ))
+
+
+if __name__ == "__main__":
+    main()
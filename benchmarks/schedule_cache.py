@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark of loading large Schedules with and without the Schedule cache.
+
+Run the benchmark from the repository root::
+
+    python -m benchmarks.schedule_cache
+
+The Schedule and the post bodies are kept in memory so that only the
+parsing and the building of the posts is measured. The Schedule loaded from
+the cache must be identical to the parsed Schedule.
+"""
+
+import tempfile
+import time
+from typing import Dict, Optional, Tuple
+
+import click
+import structlog
+
+from benchmarks.schedule_parsing import (
+    create_schedule_data,
+    encode_schedule_data,
+)
+from slow_start_rewatch.schedule.schedule import Schedule
+from slow_start_rewatch.schedule.schedule_cache import ScheduleCache
+from slow_start_rewatch.schedule.schedule_storage import ScheduleStorage
+
+POST_COUNTS = (100, 1000, 5000)
+REPEAT = 3
+
+
+class ScheduleMemoryStorage(ScheduleStorage):
+    """Stores the Schedule data in memory."""
+
+    def __init__(
+        self,
+        schedule_data: str,
+        schedule_cache: Optional[ScheduleCache],
+    ) -> None:
+        """Initialize ScheduleMemoryStorage."""
+        super().__init__(patch_in_place=True, schedule_cache=schedule_cache)
+        self.schedule_data = schedule_data
+
+    def load_schedule_data(self) -> str:
+        """Return the Schedule data."""
+        return self.schedule_data
+
+    def load_post_body(self, body_template_source: str) -> str:
+        """Return a post body."""
+        return "Body of {0}: $episode_00001".format(body_template_source)
+
+    def save_schedule_data(self, schedule_data: str) -> None:
+        """Keep the Schedule data."""
+        self.schedule_data = schedule_data
+
+
+def measure(schedule_storage: ScheduleStorage) -> Tuple[float, Schedule]:
+    """Load the Schedule and return the best time and the Schedule."""
+    best_time = float("inf")
+    schedule = None
+
+    for _ in range(REPEAT):
+        start_time = time.perf_counter()
+        schedule = schedule_storage.load()
+        best_time = min(best_time, time.perf_counter() - start_time)
+
+    return best_time, schedule
+
+
+def main() -> None:
+    """Run the benchmark and print the results."""
+    structlog.configure(
+        logger_factory=structlog.stdlib.LoggerFactory(),
+        wrapper_class=structlog.stdlib.BoundLogger,
+    )
+
+    click.echo("{0:>8} {1:>12} {2:>12}".format(
+        "posts",
+        "parse (ms)",
+        "cache (ms)",
+    ))
+
+    for post_count in POST_COUNTS:
+        yaml_text, _ = encode_schedule_data(create_schedule_data(post_count))
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            results: Dict[str, Tuple[float, Schedule]] = {}
+
+            for label, schedule_cache in (
+                ("parse", None),
+                ("cache", ScheduleCache(cache_dir, max_entries=1)),
+            ):
+                schedule_storage = ScheduleMemoryStorage(
+                    yaml_text,
+                    schedule_cache,
+                )
+                schedule_storage.load()
+                results[label] = measure(schedule_storage)
+
+        if results["parse"][1].posts != results["cache"][1].posts:
+            raise RuntimeError("The cached Schedule differs.")
+
+        click.echo("{0:>8} {1:>12.1f} {2:>12.1f}".format(
+            post_count,
+            results["parse"][0] * 1000,
+            results["cache"][0] * 1000,
+        ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark of parsing large Schedules with the available codec backends.
+
+Run the benchmark from the repository root::
+
+    python -m benchmarks.schedule_parsing
+
+The YAML Schedule is parsed by each available YAML backend and the same
+Schedule in the JSON format is parsed for comparison. The parsed data must
+be identical (including the `submit_at` datetimes).
+"""
+
+import json
+import time
+from datetime import datetime, timedelta
+from io import StringIO
+from typing import Any, Dict, Optional, Tuple
+
+import click
+from ruamel.yaml import YAML  # type: ignore
+
+from slow_start_rewatch import codec
+
+POST_COUNTS = (1000, 10000)
+REPEAT = 3
+FIRST_SUBMIT_AT = datetime(2018, 1, 6, 17, 0, 0)
+
+
+def create_schedule_data(post_count: int) -> Dict[str, Any]:
+    """Create the Schedule data with the posts scheduled daily."""
+    posts_data = []
+
+    for index in range(1, post_count + 1):
+        posts_data.append({
+            "name": "episode_{0:05}".format(index),
+            "submit_at": FIRST_SUBMIT_AT + timedelta(days=index),
+            "title": "Slow Start - Episode {0} Discussion".format(index),
+            "body_template": "episode_{0:05}.md".format(index),
+            "navigation_scheduled": "-",
+            "navigation_submitted": "[ep {0}]($link)".format(index),
+            "navigation_current": "ep {0}".format(index),
+            "submission_id": "id_{0}".format(index) if index % 2 else None,
+        })
+
+    return {"subreddit": "anime", "posts": posts_data}
+
+
+def encode_schedule_data(schedule_data: Dict[str, Any]) -> Tuple[str, str]:
+    """Return the Schedule data in the YAML and the JSON format."""
+    yaml = YAML(typ="safe")
+    yaml.default_flow_style = False
+    yaml.sort_base_mapping_type_on_output = False
+
+    string_stream = StringIO()
+    yaml.dump(schedule_data, string_stream)
+
+    json_text = json.dumps(schedule_data, default=str)
+
+    return string_stream.getvalue(), json_text
+
+
+def measure(text: str, backend: Optional[str]) -> Tuple[float, Any]:
+    """Parse the Schedule data and return the best time and the data."""
+    best_time = float("inf")
+    parsed_data = None
+
+    for _ in range(REPEAT):
+        start_time = time.perf_counter()
+        parsed_data = codec.parse_schedule(text, backend=backend)
+        best_time = min(best_time, time.perf_counter() - start_time)
+
+    return best_time, parsed_data
+
+
+def main() -> None:
+    """Run the benchmark and print the results."""
+    click.echo("{0:>8} {1:>14} {2:>12}".format(
+        "posts",
+        "backend",
+        "parse (ms)",
+    ))
+
+    for post_count in POST_COUNTS:
+        schedule_data = create_schedule_data(post_count)
+        yaml_text, json_text = encode_schedule_data(schedule_data)
+
+        measurements = [
+            (backend, yaml_text, backend)
+            for backend in codec.yaml_backends()
+        ]
+        measurements.append(("json", json_text, None))
+
+        for label, text, backend in measurements:
+            parse_time, parsed_data = measure(text, backend)
+
+            if parsed_data != schedule_data:
+                raise RuntimeError(
+                    "The data parsed by '{0}' differ.".format(label),
+                )
+
+            click.echo("{0:>8} {1:>14} {2:>12.1f}".format(
+                post_count,
+                label,
+                parse_time * 1000,
+            ))
+
+
+if __name__ == "__main__":
+    main()
@@ -69,21 +69,38 @@ log = structlog.get_logger()
 @click.option("--debug", is_flag=True)
 @click.option("-w", "--schedule_wiki_url")
 @click.option("-f", "--schedule_file")
+@click.option("--no_schedule_cache", is_flag=True)
+@click.option("-d", "--schedule_database")
+@click.option("--import_schedule")
+@click.option("--export_schedule")
+@click.option("--warm_assets", is_flag=True)
 @click.version_option(version=version(), prog_name=distribution_name)
 def main(
     debug: bool,
     schedule_wiki_url: Optional[str],
     schedule_file: Optional[str],
+    no_schedule_cache: bool,
+    schedule_database: Optional[str],
+    import_schedule: Optional[str],
+    export_schedule: Optional[str],
+    warm_assets: bool,
 ) -> None:
     """Main entry point for CLI."""
     if debug:
         logging.getLogger().setLevel(logging.DEBUG)
 
     try:
-        App(
-            schedule_wiki_url=schedule_wiki_url,
-            schedule_file=schedule_file,
-        ).run()
+        run_command(
+            App(
+                schedule_wiki_url=schedule_wiki_url,
+                schedule_file=schedule_file,
+                no_schedule_cache=no_schedule_cache,
+                schedule_database=schedule_database,
+            ),
+            import_schedule=import_schedule,
+            export_schedule=export_schedule,
+            warm_assets=warm_assets,
+        )
     except SlowStartRewatchException as exception:
         click.echo(click.style(str(exception), fg="red"), err=True)
 
@@ -101,5 +118,22 @@ def main(
         sys.exit(1)
 
 
+def run_command(
+    app: App,
+    import_schedule: Optional[str],
+    export_schedule: Optional[str],
+    warm_assets: bool,
+) -> None:
+    """Run the command selected by the options (the rewatch by default)."""
+    if import_schedule:
+        app.import_schedule(import_schedule)
+    elif export_schedule:
+        app.export_schedule(export_schedule)
+    elif warm_assets:
+        app.warm_assets()
+    else:
+        app.run()
+
+
 if __name__ == "__main__":
     main()
@@ -1,13 +1,30 @@
 # -*- coding: utf-8 -*-
 
-from datetime import datetime
+from datetime import datetime, timedelta
+from functools import partial
 from typing import Optional
 
 import click
+from praw.reddit import Submission
 
 from slow_start_rewatch.config import Config
+from slow_start_rewatch.exceptions import MissingSchedule
+from slow_start_rewatch.post import Post
 from slow_start_rewatch.reddit.reddit_cutifier import RedditCutifier
+from slow_start_rewatch.schedule.schedule_sqlite_storage import (
+    ScheduleSqliteStorage,
+)
 from slow_start_rewatch.schedule.scheduler import Scheduler
+from slow_start_rewatch.schedule.submission_journal import (
+    STEP_FINISH,
+    STEP_SAVE,
+    STEP_UPDATE,
+)
+from slow_start_rewatch.task_queue import (
+    PRIORITY_HIGH,
+    PRIORITY_LOW,
+    TaskQueue,
+)
 from slow_start_rewatch.timer import Timer
 
 FG_VALUES = "bright_blue"
@@ -20,6 +37,8 @@ class App(object):
         self,
         schedule_wiki_url: Optional[str] = None,
         schedule_file: Optional[str] = None,
+        no_schedule_cache: bool = False,
+        schedule_database: Optional[str] = None,
     ) -> None:
         """Initialize App."""
         config = Config()
@@ -27,19 +46,84 @@ class App(object):
 
         if schedule_wiki_url:
             config["schedule_wiki_url"] = schedule_wiki_url
+            config["schedule_database"] = None
             config["schedule_file"] = None
+        elif schedule_database:
+            config["schedule_database"] = schedule_database
+            config["schedule_wiki_url"] = None
         elif schedule_file:
             config["schedule_file"] = schedule_file
             config["schedule_wiki_url"] = None
+            config["schedule_database"] = None
+
+        if no_schedule_cache:
+            config["schedule_cache.enabled"] = False
 
         self.reddit_cutifier = RedditCutifier(config)
         self.timer = Timer(config)
         self.scheduler = Scheduler(config, self.reddit_cutifier.reddit)
+        self.task_queue = TaskQueue()
 
     def run(self) -> None:
-        """Runs the application."""
-        self.prepare()
-        self.start()
+        """
+        Runs the application.
+
+        On exit (including the abort by Ctrl+C) the pending save of the
+        schedule is flushed before the task queue is stopped so that the
+        submission IDs are never left behind the queued tasks.
+        """
+        try:
+            self.prepare()
+            self.resume()
+            self.start()
+        finally:
+            self.scheduler.shutdown()
+            self.task_queue.stop()
+
+    def import_schedule(self, schedule_file: str) -> None:
+        """Import the Schedule file into the schedule database."""
+        post_count = self.get_schedule_database().import_schedule(
+            schedule_file,
+        )
+
+        click.echo("Imported {0} post(s) into the schedule database.".format(
+            click.style(str(post_count), fg=FG_VALUES),
+        ))
+
+    def export_schedule(self, schedule_file: str) -> None:
+        """Export the Schedule from the schedule database to the file."""
+        post_count = self.get_schedule_database().export_schedule(
+            schedule_file,
+        )
+
+        click.echo("Exported {0} post(s) to the file: {1}".format(
+            click.style(str(post_count), fg=FG_VALUES),
+            click.style(schedule_file, fg=FG_VALUES),
+        ))
+
+    def warm_assets(self) -> None:
+        """Upload the images of the upcoming posts to the Reddit hosting."""
+        try:
+            self.prepare()
+            warmed_posts = self.scheduler.warm_assets()
+        finally:
+            self.scheduler.shutdown()
+
+        click.echo("Uploaded the images of {0} upcoming post(s).".format(
+            click.style(str(len(warmed_posts)), fg=FG_VALUES),
+        ))
+
+    def get_schedule_database(self) -> ScheduleSqliteStorage:
+        """Return the storage of the schedule database."""
+        schedule_storage = self.scheduler.schedule_storage
+
+        if not isinstance(schedule_storage, ScheduleSqliteStorage):
+            raise MissingSchedule(
+                "The schedule database not defined.",
+                hint="Set the database by the --schedule_database option.",
+            )
+
+        return schedule_storage
 
     def prepare(self) -> None:
         """
@@ -57,13 +141,52 @@ class App(object):
 
         self.scheduler.load()
 
+    def resume(self) -> None:
+        """
+        Resume the post-submission work interrupted by the previous run.
+
+        Only the steps which haven't been completed are repeated (the posts
+        are never submitted again).
+        """
+        for post, completed_steps in self.scheduler.get_interrupted_posts():
+            click.echo("Resuming the interrupted submission: {0}".format(
+                click.style(post.title, fg=FG_VALUES),
+            ))
+
+            if STEP_FINISH not in completed_steps:
+                self.task_queue.add(
+                    "finish_submission",
+                    partial(self.finish_submission, post, None),
+                    priority=PRIORITY_HIGH,
+                )
+
+            if STEP_SAVE not in completed_steps:
+                self.scheduler.save_schedule()
+
+            if STEP_UPDATE not in completed_steps:
+                self.task_queue.add(
+                    "update_posts",
+                    partial(self.update_posts, post),
+                    priority=PRIORITY_LOW,
+                )
+
     def start(self) -> None:
         """
         Start the main run.
 
-        1. Wait until the scheduled time.
+        1. Wait until the prewarm time and prepare the submission.
+
+        2. Wait until the scheduled time.
+
+        3. Submit the Post.
 
-        2. Submit the Post.
+        4. Request saving the schedule in the background and queue the
+           post-submission work (the update of the post body and the update
+           of other posts) so that the countdown for the next post can start
+           right away.
+
+        The queued work, the saving of the schedule, and the background
+        preparations are paused from the prewarm until the submission.
         """
         for post in self.scheduler.get_scheduled_posts():
             click.echo((
@@ -76,17 +199,123 @@ class App(object):
                 subreddit=click.style(post.subreddit, fg=FG_VALUES),
                 title=click.style(post.title, fg=FG_VALUES),
             ))
-            self.timer.wait(post.submit_at)
 
-            click.echo("{0}: Submitting post: {1} - {2}".format(
-                datetime.utcnow(),
-                post.subreddit,
-                post.title,
+            try:
+                self.prewarm(post)
+                self.timer.wait(post.submit_at)
+
+                click.echo("{0}: Submitting post: {1} - {2}".format(
+                    datetime.utcnow(),
+                    post.subreddit,
+                    post.title,
+                ))
+                submission = self.reddit_cutifier.submit_post(post)
+            finally:
+                self.task_queue.resume()
+                self.scheduler.schedule_persister.resume()
+                self.scheduler.resume_preparation()
+
+            click.echo("Release jitter: {0}, submission latency: {1}".format(
+                click.style(
+                    format_milliseconds(self.timer.release_jitter),
+                    fg=FG_VALUES,
+                ),
+                click.style(
+                    format_milliseconds(self.reddit_cutifier.submit_latency),
+                    fg=FG_VALUES,
+                ),
             ))
-            self.reddit_cutifier.submit_post(post)
 
+            post.release_jitter = self.timer.release_jitter
+            self.scheduler.register_submission(post)
             self.scheduler.save_schedule()
+            self.queue_post_submission_tasks(post, submission)
+
+        click.echo("Waiting for the remaining background tasks.")
+        self.task_queue.join()
+
+    def queue_post_submission_tasks(
+        self,
+        post: Post,
+        submission: Submission,
+    ) -> None:
+        """Queue the work to be done after the submission of the Post."""
+        self.task_queue.add(
+            "finish_submission",
+            partial(self.finish_submission, post, submission),
+            priority=PRIORITY_HIGH,
+        )
+        self.task_queue.add(
+            "update_posts",
+            partial(self.update_posts, post),
+            priority=PRIORITY_LOW,
+        )
 
-            self.reddit_cutifier.update_posts(
-                self.scheduler.get_submitted_posts(skip_post=post),
+    def finish_submission(
+        self,
+        post: Post,
+        submission: Optional[Submission],
+    ) -> None:
+        """
+        Finish the submission of the Post and record the completed step.
+
+        Without the `submission` (i.e. when resuming the interrupted
+        submission), the post is updated right away because the thumbnail
+        has been generated in the meantime.
+        """
+        if submission:
+            finished_submission = self.reddit_cutifier.finish_submission(
+                post,
+                submission,
             )
+        elif post.submit_with_thumbnail:
+            finished_submission = self.reddit_cutifier.update_post(post)
+        else:
+            finished_submission = True
+
+        if finished_submission:
+            self.scheduler.record_step(post, STEP_FINISH)
+
+    def update_posts(self, submitted_post: Post) -> None:
+        """
+        Update the posts submitted before the `submitted_post`.
+
+        Record the completed step of the `submitted_post` only if all the
+        posts have been updated (the failed edits are retried on resume).
+        """
+        is_updated = self.reddit_cutifier.update_posts(
+            self.scheduler.get_submitted_posts(skip_post=submitted_post),
+        )
+
+        if is_updated:
+            self.scheduler.record_step(submitted_post, STEP_UPDATE)
+
+    def prewarm(self, post: Post) -> None:
+        """
+        Wait until the prewarm time and prepare the submission of the Post.
+
+        The waiting is skipped when the prewarm time has already passed.
+
+        The task queue, the saving of the schedule, and the background
+        preparations (the running ones are waited for) are paused until the
+        Post is submitted.
+        """
+        prewarm_at = post.submit_at - timedelta(
+            milliseconds=self.reddit_cutifier.prewarm_time,
+        )
+
+        if prewarm_at > datetime.utcnow():
+            self.timer.wait(prewarm_at)
+
+        self.task_queue.pause()
+        self.scheduler.schedule_persister.pause()
+        self.scheduler.pause_preparation()
+        self.reddit_cutifier.prewarm(post)
+
+
+def format_milliseconds(duration: Optional[float]) -> str:
+    """Format the duration in milliseconds (if it has been measured)."""
+    if duration is None:
+        return "n/a"
+
+    return "{0:.3f} ms".format(duration)
@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+
+import json
+from datetime import datetime, timezone
+from functools import partial
+from types import ModuleType
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from ruamel.yaml import YAML, YAMLError  # type: ignore
+from structlog import get_logger
+
+log = get_logger()
+
+# Type alias for the YAML data of a post.
+PostData = Dict[str, Union[str, datetime, bool, None]]
+
+# Type alias for posts YAML data.
+PostsData = List[PostData]
+
+# Type alias for the Schedule document (the parsed YAML or JSON data).
+ScheduleDocument = Dict[str, Union[str, PostsData]]
+
+YAML_BACKEND_PYYAML_C = "pyyaml_c"
+YAML_BACKEND_RUAMEL_C = "ruamel_c"
+YAML_BACKEND_RUAMEL_PURE = "ruamel_pure"
+
+
+def _import_pyyaml() -> Optional[ModuleType]:
+    """Import PyYAML if it's installed (it's an optional dependency)."""
+    try:
+        import yaml  # type: ignore  # noqa: WPS433
+    except ImportError:
+        return None
+
+    return yaml
+
+
+def _load_pyyaml_c(pyyaml: ModuleType, text: str) -> object:
+    """Parse YAML using PyYAML with the libyaml loader."""
+    try:
+        return pyyaml.load(text, Loader=pyyaml.CSafeLoader)  # noqa: S506
+    except pyyaml.YAMLError as yaml_error:
+        raise ValueError(str(yaml_error)) from yaml_error
+
+
+def _load_ruamel_c(text: str) -> object:
+    """Parse YAML using ruamel.yaml with the libyaml parser."""
+    return _load_ruamel(text, pure=False)
+
+
+def _load_ruamel_pure(text: str) -> object:
+    """Parse YAML using the pure Python ruamel.yaml."""
+    return _load_ruamel(text, pure=True)
+
+
+def _load_ruamel(text: str, pure: bool) -> object:
+    """Parse YAML using ruamel.yaml."""
+    try:
+        return YAML(typ="safe", pure=pure).load(text)
+    except YAMLError as yaml_error:
+        raise ValueError(str(yaml_error)) from yaml_error
+
+
+def _find_yaml_backends() -> Dict[str, Callable[[str], object]]:
+    """
+    Return the available YAML backends ordered by the preference.
+
+    The backends using libyaml are available only if the C extensions are
+    installed. PyYAML implements YAML 1.1 (e.g. `yes` is loaded as `True`)
+    so it's never chosen by default.
+    """
+    yaml_backends: Dict[str, Callable[[str], object]] = {}
+
+    if "CParser" in YAML(typ="safe").Parser.__name__:
+        yaml_backends[YAML_BACKEND_RUAMEL_C] = _load_ruamel_c
+
+    yaml_backends[YAML_BACKEND_RUAMEL_PURE] = _load_ruamel_pure
+
+    pyyaml = _import_pyyaml()
+
+    if pyyaml and getattr(pyyaml, "__with_libyaml__", False):
+        yaml_backends[YAML_BACKEND_PYYAML_C] = partial(_load_pyyaml_c, pyyaml)
+
+    return yaml_backends
+
+
+YAML_BACKENDS = _find_yaml_backends()
+DEFAULT_YAML_BACKEND = next(iter(YAML_BACKENDS))
+
+
+def yaml_backends() -> List[str]:
+    """Return the names of the available YAML backends."""
+    return list(YAML_BACKENDS)
+
+
+def parse_yaml(text: str, backend: Optional[str] = None) -> object:
+    """
+    Parse the YAML text.
+
+    The fastest available YAML 1.2 backend is used by default or when the
+    requested backend is not available. Raise `ValueError` if the text is
+    not a valid YAML.
+    """
+    load = YAML_BACKENDS.get(backend or DEFAULT_YAML_BACKEND)
+
+    if load is None:
+        log.warning("yaml_backend_unavailable", backend=backend)
+        load = YAML_BACKENDS[DEFAULT_YAML_BACKEND]
+
+    return load(text)
+
+
+def load_yaml_file(path: str, backend: Optional[str] = None) -> object:
+    """Load and parse the YAML file."""
+    with open(path, encoding="utf-8") as yaml_file:
+        return parse_yaml(yaml_file.read(), backend=backend)
+
+
+def parse_schedule(text: str, backend: Optional[str] = None) -> object:
+    """
+    Parse the Schedule data in the YAML or JSON format.
+
+    See :func:`parse_schedule_format()`.
+    """
+    schedule_data, _ = parse_schedule_format(text, backend=backend)
+
+    return schedule_data
+
+
+def parse_schedule_format(
+    text: str,
+    backend: Optional[str] = None,
+) -> Tuple[object, bool]:
+    """
+    Parse the Schedule data and detect its format.
+
+    Return the data and `True` if it has been parsed as JSON. The JSON format
+    (an object) is detected by the first character (a YAML flow mapping is
+    parsed as YAML). The `submit_at` values of the posts are normalized to
+    naive datetimes in UTC regardless of the format and the backend. Raise
+    `ValueError` if the data cannot be parsed.
+    """
+    schedule_data = _parse_json_object(text)
+    schedule_json = schedule_data is not None
+
+    if not schedule_json:
+        schedule_data = parse_yaml(text, backend=backend)
+
+    _normalize_posts(schedule_data, backend)
+
+    return schedule_data, schedule_json
+
+
+def read_schedule_document(
+    schedule_document: ScheduleDocument,
+) -> Tuple[str, PostsData]:
+    """
+    Return the subreddit and the posts data of the Schedule document.
+
+    Raise `KeyError` or `TypeError` if the document is incomplete.
+    """
+    subreddit = schedule_document["subreddit"]
+    posts_data = schedule_document["posts"]
+
+    if not isinstance(subreddit, str) or not isinstance(posts_data, list):
+        raise TypeError("Invalid structure of the Schedule document.")
+
+    return subreddit, posts_data
+
+
+def is_json(text: str) -> bool:
+    """Return `True` if the text looks like a JSON object."""
+    return text.lstrip().startswith("{")
+
+
+def dump_json(json_data: object) -> str:
+    """
+    Dump the data to JSON.
+
+    The datetimes are dumped in the `YYYY-MM-DD hh:mm:ss` format.
+    """
+    return "{0}\n".format(
+        json.dumps(json_data, indent=2, ensure_ascii=False, default=str),
+    )
+
+
+def _parse_json_object(text: str) -> object:
+    """Parse the text if it's a JSON object (return `None` otherwise)."""
+    if not is_json(text):
+        return None
+
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return None
+
+
+def _normalize_posts(schedule_data: object, backend: Optional[str]) -> None:
+    """Normalize the `submit_at` values of the posts in the Schedule data."""
+    if not isinstance(schedule_data, dict):
+        return
+
+    posts_data = schedule_data.get("posts")
+
+    if not isinstance(posts_data, list):
+        return
+
+    for post_data in posts_data:
+        if isinstance(post_data, dict):
+            _normalize_submit_at(post_data, backend)
+
+
+def _normalize_submit_at(
+    post_data: Dict[str, object],
+    backend: Optional[str],
+) -> None:
+    """
+    Convert the `submit_at` value of the post to a naive datetime in UTC.
+
+    The strings (e.g. from JSON) are parsed as YAML timestamps so that all
+    the formats are handled in the same way. The invalid values are kept.
+    """
+    submit_at = post_data.get("submit_at")
+
+    if isinstance(submit_at, str):
+        try:
+            submit_at = parse_yaml(submit_at, backend=backend)
+        except ValueError:
+            return
+
+    if isinstance(submit_at, datetime):
+        post_data["submit_at"] = _to_naive_utc(submit_at)
+
+
+def _to_naive_utc(timestamp: datetime) -> datetime:
+    """Convert the aware datetime to a naive datetime in UTC."""
+    if not timestamp.tzinfo:
+        return timestamp
+
+    return timestamp.astimezone(timezone.utc).replace(tzinfo=None)
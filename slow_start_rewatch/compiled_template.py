@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+from functools import lru_cache
+from string import Template
+from typing import FrozenSet, List, Mapping, Optional, Tuple
+
+TEMPLATE_CACHE_SIZE = 16384
+
+# Type alias for a template segment: the literal text (or the original text
+# of the placeholder) and the name of the placeholder (`None` for literals).
+Segment = Tuple[str, Optional[str]]
+
+
+class CompiledTemplate(object):
+    """
+    A template parsed into the literal and placeholder segments.
+
+    The template uses the syntax of :class:`string.Template` and rendering
+    gives the same output as :meth:`string.Template.safe_substitute()`
+    without scanning the template text again.
+    """
+
+    def __init__(self, template: str) -> None:
+        """Initialize CompiledTemplate."""
+        self.template = template
+        self.segments: List[Segment] = []
+
+        literal_parts: List[str] = []
+        position = 0
+
+        for match in Template.pattern.finditer(template):
+            literal_parts.append(template[position:match.start()])
+            position = match.end()
+            placeholder = match.group("named") or match.group("braced")
+
+            if placeholder:
+                self._add_literal(literal_parts)
+                literal_parts = []
+                self.segments.append((match.group(), placeholder))
+            elif match.group("escaped") is not None:
+                literal_parts.append(Template.delimiter)
+            else:
+                literal_parts.append(match.group())
+
+        literal_parts.append(template[position:])
+        self._add_literal(literal_parts)
+
+        self.placeholders: FrozenSet[str] = frozenset(
+            placeholder
+            for _, placeholder in self.segments
+            if placeholder
+        )
+
+    def render(self, mapping: Mapping[str, object]) -> str:
+        """
+        Substitute the placeholders using the mapping.
+
+        The placeholders missing in the mapping are kept intact.
+        """
+        parts = []
+
+        for text, placeholder in self.segments:
+            if placeholder is None:
+                parts.append(text)
+                continue
+
+            try:
+                parts.append(str(mapping[placeholder]))
+            except KeyError:
+                parts.append(text)
+
+        return "".join(parts)
+
+    def _add_literal(self, literal_parts: List[str]) -> None:
+        """Add the literal segment joined from the parts (if not empty)."""
+        literal = "".join(literal_parts)
+
+        if literal:
+            self.segments.append((literal, None))
+
+
+@lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def compile_template(template: str) -> CompiledTemplate:
+    """
+    Return the compiled template.
+
+    The compiled templates are cached by the content of the template.
+    """
+    return CompiledTemplate(template)
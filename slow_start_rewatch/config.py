@@ -3,10 +3,10 @@
 import os
 from string import Template
 
-import anyconfig
 from scalpl import Cut
 from structlog import get_logger
 
+from slow_start_rewatch.codec import load_yaml_file
 from slow_start_rewatch.config_storage import ConfigStorage
 from slow_start_rewatch.version import version
 
@@ -27,9 +27,7 @@ class Config(object):
         """Initialize Config."""
         log.debug("default_config_load", filename=filename)
 
-        config_list = [os.path.join(ROOT_DIR, filename)]
-
-        self.config = Cut(anyconfig.load(config_list))
+        self.config = Cut(load_yaml_file(os.path.join(ROOT_DIR, filename)))
 
         self._substitute_placeholders()
 
@@ -4,10 +4,11 @@ import os
 from pathlib import Path
 from typing import Dict, Optional
 
-from ruamel.yaml import YAML, YAMLError  # type: ignore
+from ruamel.yaml import YAML  # type: ignore
 from scalpl import Cut
 from structlog import get_logger
 
+from slow_start_rewatch.codec import parse_yaml
 from slow_start_rewatch.exceptions import (
     ConfigError,
     InvalidLocalConfig,
@@ -57,16 +58,18 @@ class ConfigStorage(object):
             log.debug("local_config_file_missing", path=self.local_config_file)
             raise MissingLocalConfig
 
-        yaml = YAML(typ="safe")
-
         try:
-            stored_data = yaml.load(yaml_content)
-        except (YAMLError, AttributeError) as yaml_error:
+            stored_data = parse_yaml(yaml_content)
+        except (ValueError, AttributeError) as yaml_error:
             log.exception("local_config_file_invalid")
             raise InvalidLocalConfig(
                 "Failed to parse the local config.",
             ) from yaml_error
 
+        if not isinstance(stored_data, dict):
+            log.error("local_config_file_invalid")
+            raise InvalidLocalConfig("The local config must be a mapping.")
+
         return stored_data
 
     def parse_stored_data(
@@ -49,6 +49,10 @@ class MissingPost(SlowStartRewatchException):
     """Indicates that data about post are missing."""
 
 
+class ScheduleConflict(SlowStartRewatchException):
+    """Indicates that the schedule has been modified since it was loaded."""
+
+
 class Abort(SlowStartRewatchException):
     """An internal signal that Ctrl+C has been pressed."""
 
@@ -1,15 +1,46 @@
 # -*- coding: utf-8 -*-
 
+import threading
 from datetime import datetime
-from typing import Optional
+from typing import Callable, Optional, Tuple, Union
 
 from structlog import get_logger
 
-from slow_start_rewatch.reddit.reddit_helper import RichTextJson
+from slow_start_rewatch.reddit.reddit_helper import RichTextJson, SubmitData
 
 log = get_logger()
 
 
+class DeferredBody(object):
+    """
+    A post body template loaded on the first use.
+
+    The posts sharing the same source share the same instance so that the
+    body is loaded only once (the loading is thread-safe).
+    """
+
+    def __init__(self, source: str, load: Callable[[str], str]) -> None:
+        """Initialize DeferredBody."""
+        self.source = source
+        self._load = load
+        self._lock = threading.Lock()
+        self._body: Optional[str] = None
+
+    @property
+    def is_loaded(self) -> bool:
+        """Return `True` if the body has been loaded."""
+        return self._body is not None
+
+    def resolve(self) -> str:
+        """Load the body (if not loaded yet) and return it."""
+        with self._lock:
+            if self._body is None:
+                log.debug("post_body_resolve", source=self.source)
+                self._body = self._load(self.source)
+
+            return self._body
+
+
 class Post(object):  # noqa: WPS230
     """Represents a scheduled Reddit post."""
 
@@ -19,7 +50,7 @@ class Post(object):  # noqa: WPS230
         submit_at: datetime,
         subreddit: str,
         title: str,
-        body_template: str,
+        body_template: Union[str, DeferredBody],
         submit_with_thumbnail=True,
         flair_id=None,
         navigation_submitted=None,
@@ -43,16 +74,20 @@ class Post(object):  # noqa: WPS230
         self.submit_at = submit_at
         self.subreddit = subreddit
         self.title = title
-        self.body_template = body_template
+        self._body_template = body_template
         self.submit_with_thumbnail = submit_with_thumbnail
         self.navigation_submitted: str = navigation_submitted or "$link"
         self.flair_id: Optional[str] = flair_id
         self.navigation_current: str = navigation_current or ""
         self.navigation_scheduled: str = navigation_scheduled or ""
         self.submission_id: Optional[str] = submission_id
+        self.submitted_at: Optional[datetime] = None
+        self.submit_latency: Optional[float] = None
+        self.release_jitter: Optional[float] = None
 
         self.body_md: Optional[str] = None
         self.body_rtjson: Optional[RichTextJson] = None
+        self.submit_data: Optional[SubmitData] = None
 
     def __eq__(self, other: object) -> bool:
         """Compare this instance to other object."""
@@ -80,3 +115,31 @@ class Post(object):  # noqa: WPS230
             datetime=self.submit_at,
             title=self.title,
         )
+
+    @property
+    def body_template(self) -> str:
+        """Return the body template (a deferred body is loaded first)."""
+        if isinstance(self._body_template, DeferredBody):
+            return self._body_template.resolve()
+
+        return self._body_template
+
+    @body_template.setter
+    def body_template(self, body_template: Union[str, DeferredBody]) -> None:
+        """Set the body template."""
+        self._body_template = body_template
+
+    @property
+    def deferred_body(self) -> Optional[DeferredBody]:
+        """Return the deferred body if it hasn't been loaded yet."""
+        if (
+            isinstance(self._body_template, DeferredBody) and
+            not self._body_template.is_loaded
+        ):
+            return self._body_template
+
+        return None
+
+
+# The submitted Post with its newly rendered Markdown body:
+PostUpdate = Tuple[Post, str]
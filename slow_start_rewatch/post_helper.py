@@ -1,13 +1,12 @@
 # -*- coding: utf-8 -*-
 
-import re
-from string import Template
-from typing import List, Optional
+from typing import Dict, Optional, Set
 
 import click
 from praw import Reddit
 from structlog import get_logger
 
+from slow_start_rewatch.compiled_template import compile_template
 from slow_start_rewatch.config import Config
 from slow_start_rewatch.exceptions import (
     ImageNotFound,
@@ -17,6 +16,9 @@ from slow_start_rewatch.exceptions import (
 from slow_start_rewatch.post import Post
 from slow_start_rewatch.reddit.text_post_converter import TextPostConverter
 from slow_start_rewatch.schedule.schedule import Schedule
+from slow_start_rewatch.schedule.schedule_render_context import (
+    ScheduleRenderContext,
+)
 
 log = get_logger()
 
@@ -33,6 +35,7 @@ class PostHelper(object):
         self.reddit = reddit
         self.post_converter = TextPostConverter(config, reddit)
         self.navigation_links = config["navigation_links"]
+        self.render_context: Optional[ScheduleRenderContext] = None
 
     def prepare_post(
         self,
@@ -43,58 +46,91 @@ class PostHelper(object):
         """
         Prepare the post body based on the post body template.
 
-        Substitute placeholders using the attributes of the provided `Schedule`
-        instance.
+        Substitute placeholders using the render context of the provided
+        `Schedule` instance.
 
         Call :meth:`prepare_thumbnail()` if :attr:`Post.submit_with_thumbnail`
         is `True`.
         """
-        mapping = {}
-
-        for schedule_post in schedule.posts:
-            if schedule_post.name == post.name:
-                navigation_text = schedule_post.navigation_current
-            elif schedule_post.submission_id:
-                navigation_text = re.sub(
-                    r"\$link",
-                    "/{0}".format(schedule_post.submission_id),
-                    schedule_post.navigation_submitted,
-                )
-            else:
-                navigation_text = schedule_post.navigation_scheduled
+        post.body_md = self.render_post_body(post, schedule)
+
+        if prepare_thumbnail and post.submit_with_thumbnail:
+            self.prepare_thumbnail(post)
 
-            mapping[schedule_post.name] = navigation_text
+    def render_post_body(self, post: Post, schedule: Schedule) -> str:
+        """
+        Render the post body template without changing the post.
 
-        mapping[
-            self.navigation_links["placeholder"]
-        ] = self.build_navigation_links(post, schedule.posts)
+        Substitute placeholders using the render context of the provided
+        `Schedule` instance.
+        """
+        render_context = self.get_render_context(schedule)
 
-        post.body_md = Template(post.body_template).safe_substitute(
-            mapping,
+        return compile_template(post.body_template).render(
+            render_context.mapping(post),
         )
 
-        if prepare_thumbnail and post.submit_with_thumbnail:
-            self.prepare_thumbnail(post)
+    def build_dependents(self, schedule: Schedule) -> Dict[str, Set[str]]:
+        """
+        Build the dependency graph of the posts in the `Schedule`.
+
+        Return the mapping of each post name to the names of the posts whose
+        body depends on the post, i.e. the posts referencing the post by its
+        placeholder or the adjacent posts when they contain the Navigation
+        Links.
 
-    def build_navigation_links(self, post: Post, posts: List[Post]) -> str:
-        """Build the Navigation Links based on adjacent posts."""
-        last_post: Optional[Post] = None
-        previous_id = None
-        next_id = None
+        The posts whose deferred body hasn't been loaded yet are skipped.
+        """
+        post_names = {post.name for post in schedule.posts}
+        dependents: Dict[str, Set[str]] = {name: set() for name in post_names}
+        navigation_placeholder = self.navigation_links["placeholder"]
 
-        for schedule_post in posts:
-            if not last_post:
-                last_post = schedule_post
+        for index, post in enumerate(schedule.posts):
+            if post.deferred_body:
                 continue
 
-            if schedule_post.name == post.name and last_post.navigation_current:
-                previous_id = last_post.submission_id
-            elif last_post.name == post.name:
-                next_id = schedule_post.submission_id
+            placeholders = self.find_placeholders(post.body_template)
+            dependencies = placeholders & post_names
+
+            if navigation_placeholder in placeholders:
+                adjacent_posts = schedule.posts[max(index - 1, 0):index + 2]
+                dependencies.update(
+                    adjacent_post.name for adjacent_post in adjacent_posts
+                )
+
+            dependencies.discard(post.name)
+
+            for dependency in dependencies:
+                dependents[dependency].add(post.name)
+
+        return dependents
+
+    def find_placeholders(self, template: str) -> Set[str]:
+        """Return the names of the placeholders used in the template."""
+        return set(compile_template(template).placeholders)
+
+    def get_render_context(self, schedule: Schedule) -> ScheduleRenderContext:
+        """
+        Return the render context of the `Schedule`.
+
+        The context is built only once for each `Schedule` instance.
+        """
+        render_context = self.render_context
+
+        if render_context is None or render_context.schedule is not schedule:
+            render_context = ScheduleRenderContext(
+                schedule=schedule,
+                navigation_placeholder=self.navigation_links["placeholder"],
+                substitute_navigation_links=self.substitute_navigation_links,
+            )
+            self.render_context = render_context
 
-            last_post = schedule_post
+        return render_context
 
-        return self.substitute_navigation_links(previous_id, next_id)
+    def update_render_context(self, post: Post) -> None:
+        """Update the render context after the post has been submitted."""
+        if self.render_context:
+            self.render_context.update_post(post)
 
     def substitute_navigation_links(
         self,
@@ -117,7 +153,7 @@ class PostHelper(object):
         else:
             return self.navigation_links["template_empty"]
 
-        return Template(navigation_template).safe_substitute({
+        return compile_template(navigation_template).render({
             "previous_link": "/{0}".format(previous_submission_id),
             "next_link": "/{0}".format(next_submission_id),
         })
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional, Union
+
+from structlog import get_logger
+
+from slow_start_rewatch.config import Config
+from slow_start_rewatch.reddit.image_cache import write_atomically
+
+log = get_logger()
+
+REGISTRY_FILENAME = "reddit_assets.json"
+
+# Type alias for a registered asset: the asset ID and the upload time.
+RegisteredAsset = Dict[str, Union[str, float]]
+
+
+class AssetRegistry(object):
+    """
+    Stores the IDs of the images uploaded to the Reddit hosting.
+
+    The assets are keyed by the hash of the image content so that the same
+    image is uploaded only once within the `validity` window (the time the
+    uploaded asset is expected to be usable in a post). The registry is
+    stored in the local file and the expired assets are removed when it's
+    saved.
+
+    The validity is a deliberate simplification: Reddit doesn't report when
+    an unused asset is removed from its hosting, so the fixed window from
+    the config is used instead. It should be kept well below the lifetime
+    of the unused uploads because the reused asset isn't verified again.
+    """
+
+    def __init__(self, registry_file: str, validity: int) -> None:
+        """Initialize AssetRegistry."""
+        self.registry_file = registry_file
+        self.validity = validity
+        self._assets: Optional[Dict[str, RegisteredAsset]] = None
+        self._lock = threading.Lock()
+
+    def get(self, content_hash: str) -> Optional[str]:
+        """
+        Return the ID of the valid asset with the image content.
+
+        Return `None` if the image hasn't been uploaded or if the asset has
+        expired.
+        """
+        with self._lock:
+            asset = self.load_assets().get(content_hash)
+
+        if not asset or not self.is_valid(asset):
+            return None
+
+        log.debug(
+            "asset_registry_hit",
+            asset_id=asset["asset_id"],
+            age=(time.time() - float(asset["uploaded_at"])) * 1000,
+        )
+
+        return str(asset["asset_id"])
+
+    def put(self, content_hash: str, asset_id: str) -> None:
+        """
+        Register the asset uploaded just now.
+
+        Failure to save the registry is not fatal.
+        """
+        with self._lock:
+            assets = self.load_assets()
+            assets[content_hash] = {
+                "asset_id": asset_id,
+                "uploaded_at": time.time(),
+            }
+
+            for expired_hash in [
+                asset_hash
+                for asset_hash, asset in assets.items()
+                if not self.is_valid(asset)
+            ]:
+                assets.pop(expired_hash)
+
+            try:
+                write_atomically(
+                    self.registry_file,
+                    json.dumps(assets).encode("utf-8"),
+                )
+            except IOError:
+                log.exception("asset_registry_write_error")
+
+        log.debug("asset_registry_put", asset_id=asset_id)
+
+    def is_valid(self, asset: RegisteredAsset) -> bool:
+        """Return `True` if the asset hasn't expired."""
+        asset_age = time.time() - float(asset["uploaded_at"])
+
+        return asset_age < self.validity / 1000
+
+    def load_assets(self) -> Dict[str, RegisteredAsset]:
+        """
+        Return the registered assets (loaded from the file only once).
+
+        The lock must be held by the caller. Failure to read the registry is
+        not fatal (the images are uploaded again).
+        """
+        if self._assets is not None:
+            return self._assets
+
+        try:
+            with open(self.registry_file, encoding="utf-8") as registry:
+                self._assets = dict(json.load(registry))
+        except FileNotFoundError:
+            self._assets = {}
+        except (IOError, ValueError, TypeError):
+            log.warning("asset_registry_invalid", exc_info=True)
+            self._assets = {}
+
+        return self._assets
+
+
+def create_asset_registry(config: Config) -> Optional[AssetRegistry]:
+    """Create the `AssetRegistry` if it's enabled in the config."""
+    if not config["asset_registry.enabled"]:
+        return None
+
+    return AssetRegistry(
+        registry_file=os.path.join(config["data_dir"], REGISTRY_FILENAME),
+        validity=config["asset_registry.validity"],
+    )
@@ -0,0 +1,293 @@
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Optional, Tuple, Union
+
+from structlog import get_logger
+
+from slow_start_rewatch.config import Config
+from slow_start_rewatch.schedule.schedule_cache import hash_text
+
+log = get_logger()
+
+CACHE_DIRECTORY = "image_cache"
+URLS_DIRECTORY = "urls"
+OBJECTS_DIRECTORY = "objects"
+URL_FILE_SUFFIX = ".json"
+TEMP_FILE_SUFFIX = ".tmp"
+
+
+class CachedImage(object):
+    """
+    The image downloaded from the URL stored in the `ImageCache`.
+
+    The image content is stored in the `content_path` (addressed by the
+    `content_hash`). The `etag` and the `last_modified` validators are used
+    for the conditional revalidation of the image.
+    """
+
+    def __init__(  # noqa: WPS211
+        self,
+        url: str,
+        content_hash: str,
+        content_path: str,
+        etag: Optional[str],
+        last_modified: Optional[str],
+        validated_at: float,
+    ) -> None:
+        """Initialize CachedImage."""
+        self.url = url
+        self.content_hash = content_hash
+        self.content_path = content_path
+        self.etag = etag
+        self.last_modified = last_modified
+        self.validated_at = validated_at
+
+    @property
+    def validators(self) -> Dict[str, str]:
+        """Return the headers of the conditional request."""
+        headers = {}
+
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+
+        return headers
+
+    def open(self) -> BinaryIO:
+        """Open the image content for reading."""
+        return open(self.content_path, "rb")  # noqa: WPS515
+
+
+class ImageCache(object):
+    """
+    Stores the downloaded images in the local files.
+
+    The images are content-addressed (stored by the SHA-256 hash of the
+    content) and the URLs are mapped to the images along with the validators
+    (`ETag` and `Last-Modified`) of the response. The images validated
+    within the `max_age` are reused without a request.
+
+    The least recently used images are removed when the total size of the
+    images exceeds `max_size`. The hits, the revalidations (the image has
+    not been modified) and the misses are counted in :attr:`metrics`.
+    """
+
+    def __init__(self, cache_dir: str, max_size: int, max_age: int) -> None:
+        """Initialize ImageCache."""
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.max_age = max_age
+        self.metrics = {"hits": 0, "revalidations": 0, "misses": 0}
+        self._lock = threading.Lock()
+
+    def get(self, url: str) -> Optional[CachedImage]:
+        """
+        Return the cached image of the URL.
+
+        Return `None` if the image doesn't exist or if it cannot be read.
+        """
+        path = self.get_url_path(url)
+
+        try:
+            with open(path, encoding="utf-8") as url_file:
+                url_data = json.load(url_file)
+
+            cached_image = CachedImage(
+                url=url,
+                content_hash=url_data["content_hash"],
+                content_path=self.get_content_path(url_data["content_hash"]),
+                etag=url_data["etag"],
+                last_modified=url_data["last_modified"],
+                validated_at=url_data["validated_at"],
+            )
+        except FileNotFoundError:
+            return None
+        except Exception:
+            log.warning("image_cache_invalid", path=path, exc_info=True)
+            return None
+
+        if not self.touch(cached_image.content_path):
+            log.debug("image_cache_evicted", url=url)
+            return None
+
+        return cached_image
+
+    def is_fresh(self, cached_image: CachedImage) -> bool:
+        """Return `True` if the image can be reused without revalidation."""
+        return time.time() - cached_image.validated_at < self.max_age / 1000
+
+    def put(  # noqa: WPS211
+        self,
+        url: str,
+        image_file: BinaryIO,
+        content_hash: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> None:
+        """
+        Store the image downloaded from the URL.
+
+        The image is copied from the `image_file` (from the current position)
+        with the SHA-256 hash of its content. Failure to store the image is
+        not fatal.
+        """
+        content_path = self.get_content_path(content_hash)
+        log.debug("image_cache_write", url=url, content_hash=content_hash)
+
+        try:
+            if not self.touch(content_path):
+                write_atomically(content_path, image_file)
+        except IOError:
+            log.exception("image_cache_write_error")
+            return
+
+        self.revalidate(
+            CachedImage(
+                url=url,
+                content_hash=content_hash,
+                content_path=content_path,
+                etag=etag,
+                last_modified=last_modified,
+                validated_at=time.time(),
+            ),
+        )
+
+        self.evict()
+
+    def revalidate(self, cached_image: CachedImage) -> None:
+        """
+        Store the mapping of the URL with the current validation time.
+
+        Failure to store the mapping is not fatal.
+        """
+        cached_image.validated_at = time.time()
+
+        try:
+            write_atomically(
+                self.get_url_path(cached_image.url),
+                json.dumps({
+                    "content_hash": cached_image.content_hash,
+                    "etag": cached_image.etag,
+                    "last_modified": cached_image.last_modified,
+                    "validated_at": cached_image.validated_at,
+                }).encode("utf-8"),
+            )
+        except IOError:
+            log.exception("image_cache_write_error")
+
+    def count(self, metric: str, url: str) -> None:
+        """Count the result of the lookup and log the metrics."""
+        with self._lock:
+            self.metrics[metric] += 1
+            metrics = dict(self.metrics)
+
+        log.info("image_cache_{0}".format(metric), url=url, **metrics)
+
+    def evict(self) -> None:
+        """Remove the least recently used images exceeding the size limit."""
+        with self._lock:
+            entries = scan_objects(
+                os.path.join(self.cache_dir, OBJECTS_DIRECTORY),
+            )
+            entries.sort(reverse=True)
+            total_size = 0
+
+            for _, size, path in entries:
+                total_size += size
+
+                if total_size > self.max_size:
+                    remove_object(path)
+
+    def touch(self, path: str) -> bool:
+        """
+        Mark the image as recently used.
+
+        Return `False` if the image doesn't exist.
+        """
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return False
+        except IOError:
+            log.debug("image_cache_touch_error", path=path)
+
+        return True
+
+    def get_url_path(self, url: str) -> str:
+        """Return the path of the mapping of the URL."""
+        return os.path.join(
+            self.cache_dir,
+            URLS_DIRECTORY,
+            "{0}{1}".format(hash_text(url), URL_FILE_SUFFIX),
+        )
+
+    def get_content_path(self, content_hash: str) -> str:
+        """Return the path of the image content."""
+        return os.path.join(self.cache_dir, OBJECTS_DIRECTORY, content_hash)
+
+
+def create_image_cache(config: Config) -> Optional[ImageCache]:
+    """Create the `ImageCache` if it's enabled in the config."""
+    if not config["image_cache.enabled"]:
+        return None
+
+    return ImageCache(
+        cache_dir=os.path.join(config["data_dir"], CACHE_DIRECTORY),
+        max_size=config["image_cache.max_size"],
+        max_age=config["image_cache.max_age"],
+    )
+
+
+def write_atomically(path: str, content: Union[bytes, BinaryIO]) -> None:
+    """
+    Write the content (atomically) and create the directory if needed.
+
+    The content is either the bytes or a file copied in chunks.
+    """
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    temp_path = "{0}.{1}{2}".format(
+        path,
+        threading.get_ident(),
+        TEMP_FILE_SUFFIX,
+    )
+
+    with open(temp_path, "wb") as temp_file:
+        if isinstance(content, bytes):
+            temp_file.write(content)
+        else:
+            shutil.copyfileobj(content, temp_file)
+
+    os.replace(temp_path, path)
+
+
+def scan_objects(objects_dir: str) -> List[Tuple[int, int, str]]:
+    """Return the modification time, the size and the path of the images."""
+    entries = []
+
+    for entry in os.scandir(objects_dir):
+        if entry.name.endswith(TEMP_FILE_SUFFIX):
+            continue
+
+        entry_stat = entry.stat()
+        entries.append(
+            (entry_stat.st_mtime_ns, entry_stat.st_size, entry.path),
+        )
+
+    return entries
+
+
+def remove_object(path: str) -> None:
+    """Remove the image (unless it has been already removed)."""
+    log.debug("image_cache_evict", path=path)
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        log.debug("image_cache_evicted", path=path)
@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+
+import threading
+
+from prawcore import Requestor
+from requests import Response
+
+
+class LockedRequestor(Requestor):
+    """
+    Sends the HTTP requests of `PRAW` one at a time.
+
+    The `Reddit` instance is shared by the main thread and the background
+    workers (the preparation of the posts, the task queue, the loading and
+    the saving of the Schedule), but `PRAW` is not thread-safe. All the
+    requests of the instance (including the refresh of the access token) are
+    funneled through a single lock so that the HTTP session is never used by
+    more threads at once.
+    """
+
+    def __init__(self, *args: object, **kwargs: object) -> None:
+        """Initialize LockedRequestor."""
+        super().__init__(*args, **kwargs)
+        self._lock = threading.Lock()
+
+    def request(self, *args: object, **kwargs: object) -> Response:
+        """Issue the HTTP request once the previous request is finished."""
+        with self._lock:
+            return super().request(*args, **kwargs)
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+
+import os
+import uuid
+from typing import BinaryIO, Dict, List, Optional, Union
+
+MULTIPART_NEWLINE = b"\r\n"
+
+
+class MultipartBody(object):
+    """
+    The body of a `multipart/form-data` request streamed from a file.
+
+    The body is read in chunks (see :meth:`read()`) so that the file is
+    never loaded into memory as a whole. The length of the body is known in
+    advance so that the request is sent with the `Content-Length` header
+    (required by the Reddit hosting) instead of the chunked encoding.
+    """
+
+    def __init__(
+        self,
+        fields: Dict[str, str],
+        file_field: str,
+        filename: str,
+        mime_type: str,
+        file_content: BinaryIO,
+    ) -> None:
+        """Initialize MultipartBody."""
+        self.boundary = uuid.uuid4().hex
+        self.content_type = "multipart/form-data; boundary={0}".format(
+            self.boundary,
+        )
+
+        self._parts: List[Union[bytes, BinaryIO]] = []
+
+        for field_name, field_value in fields.items():
+            self._parts.append(self.encode_part_header(field_name) + (
+                field_value.encode("utf-8") + MULTIPART_NEWLINE
+            ))
+
+        self._parts.append(self.encode_part_header(
+            file_field,
+            filename=filename,
+            mime_type=mime_type,
+        ))
+        self._parts.append(file_content)
+        self._parts.append(
+            MULTIPART_NEWLINE +
+            "--{0}--".format(self.boundary).encode("utf-8") +
+            MULTIPART_NEWLINE,
+        )
+
+        file_content.seek(0)
+        self._length = sum(
+            len(part) if isinstance(part, bytes) else measure_file(part)
+            for part in self._parts
+        )
+
+    def __len__(self) -> int:
+        """Return the length of the body in bytes."""
+        return self._length
+
+    def read(self, size: int = -1) -> bytes:
+        """
+        Read up to `size` bytes of the body.
+
+        Read the rest of the body if the `size` is negative.
+        """
+        chunks = []
+        remaining_size = size
+
+        while self._parts and remaining_size:
+            part = self._parts[0]
+
+            if isinstance(part, bytes):
+                chunk = part if remaining_size < 0 else part[:remaining_size]
+                self._parts[0] = part[len(chunk):]
+            else:
+                chunk = part.read(remaining_size)
+
+            if not chunk:
+                self._parts.pop(0)
+                continue
+
+            chunks.append(chunk)
+
+            if remaining_size > 0:
+                remaining_size -= len(chunk)
+
+        return b"".join(chunks)
+
+    def encode_part_header(
+        self,
+        field_name: str,
+        filename: Optional[str] = None,
+        mime_type: Optional[str] = None,
+    ) -> bytes:
+        """Encode the boundary and the headers of the part."""
+        disposition = 'form-data; name="{0}"'.format(field_name)
+
+        if filename:
+            disposition += '; filename="{0}"'.format(filename)
+
+        headers = [
+            "--{0}".format(self.boundary),
+            "Content-Disposition: {0}".format(disposition),
+        ]
+
+        if mime_type:
+            headers.append("Content-Type: {0}".format(mime_type))
+
+        return "\r\n".join(headers).encode("utf-8") + (
+            MULTIPART_NEWLINE + MULTIPART_NEWLINE
+        )
+
+
+def measure_file(file_content: BinaryIO) -> int:
+    """Return the size of the file from the current position to the end."""
+    position = file_content.tell()
+    size = file_content.seek(0, os.SEEK_END) - position
+    file_content.seek(position)
+
+    return size
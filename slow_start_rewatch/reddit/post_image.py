@@ -1,8 +1,7 @@
 # -*- coding: utf-8 -*-
 
-import io
 import os
-from typing import Optional
+from typing import BinaryIO, Optional
 from urllib.parse import urlparse
 
 from structlog import get_logger
@@ -35,10 +34,28 @@ class PostImage(object):
         self.link_content = link_content
         self.filename = filename
         self.extension = extension
-        self.reddit_asset_id: Optional[str] = None
+        self.content_hash: Optional[str] = None
 
+        self._reddit_asset_id: Optional[str] = None
         self._mime_type: Optional[str] = None
-        self._image_content: Optional[io.BytesIO] = None
+        self._image_content: Optional[BinaryIO] = None
+
+    @property
+    def reddit_asset_id(self) -> Optional[str]:
+        """Get the ID of the image uploaded to the Reddit hosting."""
+        return self._reddit_asset_id
+
+    @reddit_asset_id.setter
+    def reddit_asset_id(self, reddit_asset_id: Optional[str]) -> None:
+        """
+        Set the ID of the image uploaded to the Reddit hosting.
+
+        The Image Content is released because it's no longer needed.
+        """
+        self._reddit_asset_id = reddit_asset_id
+
+        if reddit_asset_id:
+            self.release_content()
 
     @property
     def mime_type(self) -> str:
@@ -54,18 +71,24 @@ class PostImage(object):
         self._mime_type = mime_type
 
     @property
-    def image_content(self) -> io.BytesIO:
+    def image_content(self) -> BinaryIO:
         """Get the Image Content."""
-        if not self._image_content:
+        if self._image_content is None:
             raise AttributeError("This property has not been set yet.")
 
         return self._image_content
 
     @image_content.setter
-    def image_content(self, image_content: io.BytesIO) -> None:
+    def image_content(self, image_content: BinaryIO) -> None:
         """Set the Image Content."""
         self._image_content = image_content
 
+    def release_content(self) -> None:
+        """Close and release the Image Content (if set)."""
+        if self._image_content is not None:
+            self._image_content.close()
+            self._image_content = None
+
     def __eq__(self, other: object) -> bool:
         """
         Compare this instance to other object.
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+
+import threading
+import time
+
+from praw import Reddit
+from structlog import get_logger
+
+from slow_start_rewatch.config import Config
+
+MIN_RESET_TIME = 1  # seconds
+
+log = get_logger()
+
+
+class RateLimiter(object):
+    """
+    Limits the rate of requests using a token bucket.
+
+    The bucket is refilled at the rate allowed by the remaining budget of the
+    Reddit API (the `X-Ratelimit-Remaining` and `X-Ratelimit-Reset` headers
+    tracked by `PRAW`). A part of the budget is kept in reserve for other
+    requests (e.g. the submission of the next post).
+    """
+
+    def __init__(self, config: Config, reddit: Reddit) -> None:
+        """Initialize RateLimiter."""
+        self.reddit = reddit
+        self.max_rate: float = config["rate_limiter.max_rate"]
+        self.burst: int = config["rate_limiter.burst"]
+        self.reserve: int = config["rate_limiter.reserve"]
+
+        self.tokens: float = self.burst
+        self.last_refill = time.monotonic()
+
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Wait until a request can be made."""
+        while True:
+            with self._lock:
+                wait_time = self.take_token()
+
+            if wait_time <= 0:
+                return
+
+            log.debug("rate_limiter_wait", wait_time=wait_time)
+            time.sleep(wait_time)
+
+    def take_token(self) -> float:
+        """
+        Take a token from the bucket.
+
+        Return 0 if the token has been taken. Otherwise return the time
+        (in seconds) until the next token is available.
+        """
+        current_time = time.monotonic()
+        rate = self.current_rate()
+
+        self.tokens = min(
+            self.burst,
+            self.tokens + (current_time - self.last_refill) * rate,
+        )
+        self.last_refill = current_time
+
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+
+        return (1 - self.tokens) / rate
+
+    def current_rate(self) -> float:
+        """
+        Return the allowed rate (requests per second).
+
+        1. Use the maximum rate if the API limits are not known yet.
+
+        2. Spread the remaining budget (minus the reserve) over the time left
+           until the reset of the limits.
+
+        3. Back off until the reset when the budget is depleted.
+        """
+        limits = self.reddit.auth.limits
+        remaining = limits.get("remaining")
+        reset_timestamp = limits.get("reset_timestamp")
+
+        if remaining is None or reset_timestamp is None:
+            return self.max_rate
+
+        reset_time = max(
+            float(reset_timestamp) - time.time(),
+            MIN_RESET_TIME,
+        )
+        budget = float(remaining) - self.reserve
+
+        if budget < 1:
+            log.info(
+                "rate_limiter_backoff",
+                remaining=remaining,
+                reset_time=reset_time,
+            )
+            self.tokens = min(self.tokens, 0)
+            return 1 / reset_time
+
+        return min(self.max_rate, budget / reset_time)
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
 import time
+from datetime import datetime
 from typing import List, Optional
 
 import click
@@ -12,9 +13,15 @@ from structlog import get_logger
 
 from slow_start_rewatch.config import Config
 from slow_start_rewatch.exceptions import RedditError
-from slow_start_rewatch.post import Post
+from slow_start_rewatch.post import Post, PostUpdate
+from slow_start_rewatch.reddit.locked_requestor import LockedRequestor
 from slow_start_rewatch.reddit.oauth_helper import OAuthHelper
+from slow_start_rewatch.reddit.rate_limiter import RateLimiter
 from slow_start_rewatch.reddit.reddit_helper import RedditHelper
+from slow_start_rewatch.reddit.thumbnail_watcher import ThumbnailWatcher
+from slow_start_rewatch.timer import NANOSECONDS_PER_MILLISECOND, monotonic_ns
+
+MIN_ELAPSED_TIME = 0.001  # seconds
 
 log = get_logger()
 
@@ -51,17 +58,22 @@ class RedditCutifier(object):
             client_secret=client_secret,
             redirect_uri=redirect_uri,
             refresh_token=config["refresh_token"],
+            requestor_class=LockedRequestor,
         )
 
         self.oauth_helper = OAuthHelper(config, self.reddit)
         self.reddit_helper = RedditHelper(config, self.reddit)
+        self.rate_limiter = RateLimiter(config, self.reddit)
+        self.thumbnail_watcher = ThumbnailWatcher(config, self.reddit)
 
         self.post_update_delay = config[
             "reddit_cutifier.post_update_delay"
         ]
-        self.previous_post_update_delay = config[
-            "reddit_cutifier.previous_post_update_delay"
+        self.thumbnail_polling: bool = config[
+            "reddit_cutifier.thumbnail_polling"
         ]
+        self.prewarm_time: int = config["reddit_cutifier.prewarm_time"]
+        self.submit_latency: Optional[float] = None
 
     @property
     def username(self) -> str:
@@ -75,17 +87,58 @@ class RedditCutifier(object):
         """Authorize user using the :class:`.OAuthHelper`."""
         self.oauth_helper.authorize()
 
+    def prewarm(self, post: Post) -> None:
+        """
+        Prepare the submission of the post shortly before the scheduled time.
+
+        1. Refresh the access token and open the connection to the API.
+
+        2. Serialize the data of the submit request.
+
+        Failure to open the connection is not fatal, the submission will
+        refresh the token and connect by itself.
+        """
+        log.info("post_prewarm", post=str(post))
+        try:
+            self.reddit_helper.prewarm_connection()
+        except PrawcoreException:
+            log.exception("post_prewarm_error")
+
+        with_rtjson = post.submit_with_thumbnail and post.body_rtjson
+        post.submit_data = self.reddit_helper.prepare_submit_data(
+            subreddit=post.subreddit,
+            title=post.title,
+            flair_id=post.flair_id,
+            body_rtjson=post.body_rtjson if with_rtjson else None,
+            body_md=post.body_md,
+        )
+
     def submit_post(self, post: Post) -> Submission:
         """
         Submit the post to Reddit.
 
+        If the submit request has been prepared by :meth:`prewarm()`, only send
+        the prepared data.
+
         If the post is set to be submitted with thumbnail, submit its body in
         the Rich Text JSON format. Otherwise submit the Markdown content using
         regular method of `PRAW`.
+
+        The time from sending the request to receiving the response is stored
+        in :attr:`submit_latency` (milliseconds) and in the Post together with
+        the submission time.
+
+        The post submitted with thumbnail must be finished by calling
+        :meth:`finish_submission()`.
         """
         log.info("post_submit", post=str(post))
+        submit_start_ns = monotonic_ns()
         try:
-            if post.submit_with_thumbnail and post.body_rtjson:
+            if post.submit_data:
+                submission = self.reddit_helper.submit_prepared_post(
+                    post.submit_data,
+                )
+            elif post.submit_with_thumbnail and post.body_rtjson:
                 submission = self.reddit_helper.submit_post_rtjson(
                     subreddit=post.subreddit,
                     title=post.title,
@@ -106,14 +159,66 @@ class RedditCutifier(object):
                 "Failed to submit the post.",
             ) from exception
 
+        self.submit_latency = (
+            monotonic_ns() - submit_start_ns
+        ) / NANOSECONDS_PER_MILLISECOND
         post.submission_id = submission.id
+        post.submitted_at = datetime.utcnow()
+        post.submit_latency = self.submit_latency
 
-        log.debug("post_submit_result", permalink=submission.permalink)
+        log.debug(
+            "post_submit_result",
+            permalink=submission.permalink,
+            submit_latency=self.submit_latency,
+        )
 
+        return submission
+
+    def finish_submission(
+        self,
+        post: Post,
+        submission: Submission,
+    ) -> Optional[Submission]:
+        """
+        Replace the Rich Text JSON body of the submission with Markdown.
+
+        The update is done after the thumbnail is generated. Posts submitted
+        without thumbnail don't need any update.
+        """
         if not post.submit_with_thumbnail:
             return submission
 
+        self.wait_for_thumbnail(post, submission)
+
+        return self.update_post(post, submission)
+
+    def wait_for_thumbnail(self, post: Post, submission: Submission) -> None:
+        """
+        Wait until Reddit generates the thumbnail of the submission.
+
+        If the thumbnail polling is enabled, poll the submission until the
+        thumbnail is ready (the post update delay is used as the hard cap).
+        Otherwise wait for the whole post update delay.
+        """
         delay = self.post_update_delay
+
+        if self.thumbnail_polling:
+            log.debug("post_update_poll", timeout=delay)
+            click.echo(
+                click.style(
+                    "Waiting for the thumbnail (max {0}s).".format(
+                        delay / 1000,
+                    ),
+                    fg="cyan",
+                ),
+            )
+            self.thumbnail_watcher.wait_until_ready(
+                subreddit=post.subreddit,
+                submission_id=submission.id,
+                timeout=delay,
+            )
+            return
+
         log.debug("post_update_delay", delay=delay)
         click.echo(
             click.style(
@@ -123,19 +228,25 @@ class RedditCutifier(object):
         )
         time.sleep(delay / 1000)
 
-        return self.update_post(post, submission)
-
     def update_post(
         self,
         post: Post,
         submission: Optional[Submission] = None,
-    ) -> Submission:
+        body_md: Optional[str] = None,
+    ) -> Optional[Submission]:
         """
         Replace the content of the Submission with the Post Markdown.
 
         Either `submission` is provided or the `post` must contain the
         `submission_id` attribute.
+
+        The new `body_md` (if provided) is stored in the post only after the
+        edit succeeds. The failure of the edit is reported and `None` is
+        returned.
         """
+        if body_md is None:
+            body_md = post.body_md
+
         if not submission and not post.submission_id:
             raise RuntimeError(
                 "Trying to update post '{0}' without 'submission_id'".format(
@@ -148,7 +259,7 @@ class RedditCutifier(object):
 
         log.info("post_update", post=str(post), submission=submission.id)
         try:
-            return submission.edit(post.body_md)
+            edited_submission = submission.edit(body_md)
         except (PrawcoreException, RedditAPIException) as error:
             log.exception("post_update_error")
             click.echo(
@@ -164,21 +275,68 @@ class RedditCutifier(object):
                 ),
                 err=True,
             )
+            return None
 
-    def update_posts(self, posts: List[Post]) -> None:
-        """Update the content of multiple Submissions."""
-        log.info("posts_update", post_count=len(posts))
+        post.body_md = body_md
 
-        for post in posts:
-            click.echo(
-                click.style(
-                    "Updating post: {0}".format(post.title),
-                    fg="cyan",
+        return edited_submission
+
+    def update_posts(self, post_updates: List[PostUpdate]) -> bool:
+        """
+        Update the content of multiple Submissions.
+
+        The edits are paced by the :class:`.RateLimiter`. They are issued one
+        by one because the `Reddit` instance of `PRAW` is not thread-safe.
+        Return `True` if all the Submissions have been updated.
+        """
+        log.info("posts_update", post_count=len(post_updates))
+
+        if not post_updates:
+            return True
+
+        start_time = time.monotonic()
+        failed_posts = [
+            post.name
+            for post, body_md in post_updates
+            if not self.update_post_rate_limited(post, body_md)
+        ]
+
+        elapsed = max(time.monotonic() - start_time, MIN_ELAPSED_TIME)
+        throughput = len(post_updates) / elapsed * 60
+
+        log.info(
+            "posts_update_result",
+            post_count=len(post_updates),
+            failed_posts=failed_posts,
+            elapsed=elapsed,
+            throughput=throughput,
+        )
+        click.echo(
+            click.style(
+                "Updated {0} posts in {1:.1f}s ({2:.1f} edits/min).".format(
+                    len(post_updates) - len(failed_posts),
+                    elapsed,
+                    throughput,
                 ),
-            )
+                fg="cyan",
+            ),
+        )
+
+        return not failed_posts
 
-            delay = self.previous_post_update_delay
-            log.debug("previous_post_update_delay", delay=delay)
-            time.sleep(delay / 1000)
+    def update_post_rate_limited(
+        self,
+        post: Post,
+        body_md: str,
+    ) -> Optional[Submission]:
+        """Update the post when allowed by the :class:`.RateLimiter`."""
+        self.rate_limiter.acquire()
+
+        click.echo(
+            click.style(
+                "Updating post: {0}".format(post.title),
+                fg="cyan",
+            ),
+        )
 
-            self.update_post(post)
+        return self.update_post(post, body_md=body_md)
@@ -1,9 +1,7 @@
 # -*- coding: utf-8 -*-
 
-import io
 import json
-from functools import partial
-from typing import Dict, List, Optional, Tuple
+from typing import BinaryIO, Dict, List, Optional, Tuple, Union
 
 import requests
 from praw import Reddit, endpoints
@@ -14,6 +12,7 @@ from structlog import get_logger
 
 from slow_start_rewatch.config import Config
 from slow_start_rewatch.exceptions import RedditError
+from slow_start_rewatch.reddit.multipart_body import MultipartBody
 
 API_PATH_CONVERT = "api/convert_rte_body_format"
 
@@ -26,6 +25,9 @@ RichTextJson = List[
     ]]
 ]
 
+# Type alias for the data of the submit request.
+SubmitData = Dict[str, Union[str, bool, None]]
+
 
 class RedditHelper(object):
     """Provides access to Reddit's API methods unsupported by `PRAW`."""
@@ -33,9 +35,8 @@ class RedditHelper(object):
     def __init__(self, config: Config, reddit: Reddit) -> None:
         """Initialize RedditHelper."""
         self.reddit = reddit
-        self._http_post = partial(requests.post, headers={
-            "User-Agent": config["reddit.user_agent"],
-        })
+        self.user_agent = config["reddit.user_agent"]
+        self._http_post = requests.post
 
     def convert_to_rtjson(self, markdown_text: str) -> RichTextJson:
         """Convert Markdown to Reddit Rich Text."""
@@ -77,12 +78,13 @@ class RedditHelper(object):
         self,
         filename: str,
         mime_type: str,
-        image_content: io.BytesIO,
+        image_content: BinaryIO,
     ) -> str:
         """
         Upload image to the Reddit hosting.
 
-        Inspired by :meth:`Subreddit._upload_media` from `PRAW`.
+        Inspired by :meth:`Subreddit._upload_media` from `PRAW`. The image
+        content is streamed from the file (see :class:`MultipartBody`).
         """
         log.info("image_upload", filename=filename)
         try:
@@ -96,11 +98,19 @@ class RedditHelper(object):
                 "Error when preparing the image upload to the Reddit hosting.",
             ) from upload_lease_error
 
+        upload_body = MultipartBody(
+            fields=upload_data,
+            file_field="file",
+            filename=filename,
+            mime_type=mime_type,
+            file_content=image_content,
+        )
         upload_response = self._http_post(
             "https:{0}".format(upload_url),
-            data=upload_data,
-            files={
-                "file": (filename, image_content),
+            data=upload_body,
+            headers={
+                "User-Agent": self.user_agent,
+                "Content-Type": upload_body.content_type,
             },
         )
         try:
@@ -127,21 +137,71 @@ class RedditHelper(object):
         post is submitted as Rich Text JSON instead of Markdown (imitating the
         submission via New Reddit).
         """
+        return self.submit_prepared_post(self.prepare_submit_data(
+            subreddit=subreddit,
+            title=title,
+            flair_id=flair_id,
+            body_rtjson=body_rtjson,
+        ))
+
+    def prepare_submit_data(
+        self,
+        subreddit: str,
+        title: str,
+        flair_id: Optional[str],
+        body_rtjson: Optional[RichTextJson] = None,
+        body_md: Optional[str] = None,
+    ) -> SubmitData:
+        """
+        Prepare the data of the submit request.
+
+        The body is submitted as Rich Text JSON if `body_rtjson` is provided.
+        Otherwise the Markdown `body_md` is submitted.
+        """
+        submit_data: SubmitData = {
+            "sr": subreddit,
+            "kind": "self",
+            "sendreplies": True,
+            "title": title,
+            "flair_id": flair_id,
+            "nsfw": False,
+            "spoiler": False,
+            "validate_on_submit": True,
+        }
+
+        if body_rtjson:
+            submit_data["richtext_json"] = json.dumps({"document": body_rtjson})
+        else:
+            submit_data["text"] = body_md
+
+        return submit_data
+
+    def submit_prepared_post(self, submit_data: SubmitData) -> Submission:
+        """Submit the post using the prepared data of the submit request."""
         return self.reddit.post(
             endpoints.API_PATH["submit"],
-            data={
-                "sr": subreddit,
-                "kind": "self",
-                "richtext_json": json.dumps({"document": body_rtjson}),
-                "sendreplies": True,
-                "title": title,
-                "flair_id": flair_id,
-                "nsfw": False,
-                "spoiler": False,
-                "validate_on_submit": True,
-            },
+            data=submit_data,
         )
 
+    def prewarm_connection(self) -> None:
+        """
+        Refresh the access token and open the connection to the Reddit API.
+
+        The connection is kept alive by the HTTP session of `PRAW` so that
+        the next request doesn't have to wait for the TLS handshake.
+
+        `PRAW` has no public API for refreshing the token ahead of its
+        expiration, so the authorizer is refreshed only if it's available.
+        Otherwise, the token is refreshed by the request if it has expired.
+        """
+        log.info("reddit_prewarm")
+        try:
+            self.reddit._core._authorizer.refresh()  # noqa: WPS437
+        except AttributeError:
+            log.debug("reddit_prewarm_refresh_unavailable")
+
+        self.reddit.user.me(use_cache=False)
+
     def _request_upload_lease(
         self,
         filename,
@@ -1,8 +1,10 @@
 # -*- coding: utf-8 -*-
 
-import io
+import hashlib
 import re
-from typing import Tuple
+import tempfile
+from http import HTTPStatus
+from typing import BinaryIO, Tuple
 
 import requests
 from praw import Reddit
@@ -11,6 +13,9 @@ from structlog import get_logger
 
 from slow_start_rewatch.config import Config
 from slow_start_rewatch.exceptions import ImageNotFound, PostConversionError
+from slow_start_rewatch.reddit.asset_registry import create_asset_registry
+from slow_start_rewatch.reddit.image_cache import create_image_cache
+from slow_start_rewatch.reddit.multipart_body import measure_file
 from slow_start_rewatch.reddit.post_image import PostImage
 from slow_start_rewatch.reddit.reddit_helper import RedditHelper, RichTextJson
 
@@ -24,6 +29,11 @@ class TextPostConverter(object):
         """Initialize TextPostConverter."""
         self.reddit_helper = RedditHelper(config, reddit)
         self.mime_types = config["post_image_mime_types"]
+        self.max_image_size: int = config["image_download.max_size"]
+        self.spool_size: int = config["image_download.spool_size"]
+        self.chunk_size: int = config["image_download.chunk_size"]
+        self.image_cache = create_image_cache(config)
+        self.asset_registry = create_asset_registry(config)
 
     def convert_to_rtjson(self, markdown) -> RichTextJson:
         """
@@ -40,7 +50,8 @@ class TextPostConverter(object):
 
         3. Download the source image.
 
-        4. Store the image to the Reddit hosting.
+        4. Store the image to the Reddit hosting (unless the same image has
+           been uploaded recently) and release the downloaded image.
 
         5. Replace the source image with the image hosted by Reddit.
         """
@@ -50,11 +61,10 @@ class TextPostConverter(object):
 
         self.download_image(post_image)
 
-        post_image.reddit_asset_id = self.reddit_helper.upload_image(
-            filename=post_image.filename,
-            mime_type=post_image.mime_type,
-            image_content=post_image.image_content,
-        )
+        try:
+            post_image.reddit_asset_id = self.upload_image(post_image)
+        finally:
+            post_image.release_content()
 
         return self.replace_image(rtjson, post_image)
 
@@ -93,7 +103,78 @@ class TextPostConverter(object):
     def download_image(self, post_image: PostImage) -> None:
         """Download the source image."""
         log.info("post_image_download", url=post_image.source_url)
-        response = requests.get(post_image.source_url)
+        image_file, content_hash = self.fetch_image(post_image.source_url)
+
+        post_image.image_content = image_file
+        post_image.content_hash = content_hash
+        post_image.mime_type = self.mime_types[post_image.extension]
+        log.debug(
+            "post_image_download_result",
+            file_size=measure_file(image_file),
+        )
+
+    def fetch_image(self, url: str) -> Tuple[BinaryIO, str]:
+        """
+        Return the file with the image from the URL and its content hash.
+
+        When the image cache is enabled:
+
+        1. Reuse the cached image validated within the maximum age.
+
+        2. Revalidate the older cached image by a conditional request and
+           reuse it if the image hasn't been modified.
+
+        3. Store the downloaded image in the cache.
+        """
+        image_cache = self.image_cache
+        cached_image = image_cache.get(url) if image_cache else None
+
+        if image_cache and cached_image and image_cache.is_fresh(cached_image):
+            image_cache.count("hits", url)
+            return cached_image.open(), cached_image.content_hash
+
+        response = requests.get(
+            url,
+            headers=cached_image.validators if cached_image else None,
+            stream=True,
+        )
+
+        try:
+            is_not_modified = response.status_code == HTTPStatus.NOT_MODIFIED
+
+            if image_cache and cached_image and is_not_modified:
+                image_cache.count("revalidations", url)
+                image_cache.revalidate(cached_image)
+                return cached_image.open(), cached_image.content_hash
+
+            image_file, content_hash = self.spool_image(response)
+        finally:
+            response.close()
+
+        if image_cache:
+            image_cache.count("misses", url)
+            image_cache.put(
+                url,
+                image_file,
+                content_hash,
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+            )
+            image_file.seek(0)
+
+        return image_file, content_hash
+
+    def spool_image(
+        self,
+        response: requests.Response,
+    ) -> Tuple[BinaryIO, str]:
+        """
+        Download the image in chunks to a spooled temporary file.
+
+        The image is kept in memory up to the spool size (the larger image is
+        written to the disk). Raise `PostConversionError` if the download
+        fails or if the image exceeds the maximum size.
+        """
         try:
             response.raise_for_status()
         except HTTPError as exception:
@@ -102,13 +183,58 @@ class TextPostConverter(object):
                 "Failed to download the image in the post.",
             ) from exception
 
-        post_image.image_content = io.BytesIO(response.content)
-        post_image.mime_type = self.mime_types[post_image.extension]
-        log.debug(
-            "post_image_download_result",
-            file_size=len(response.content),
+        image_file = tempfile.SpooledTemporaryFile(  # noqa: WPS515
+            max_size=self.spool_size,
+        )
+        image_hash = hashlib.sha256()
+        image_size = 0
+
+        for chunk in response.iter_content(chunk_size=self.chunk_size):
+            image_size += len(chunk)
+
+            if image_size > self.max_image_size:
+                image_file.close()
+                log.error("post_image_too_large", max_size=self.max_image_size)
+                raise PostConversionError(
+                    "The image in the post exceeds the size limit " +
+                    "({0} bytes).".format(self.max_image_size),
+                )
+
+            image_hash.update(chunk)
+            image_file.write(chunk)
+
+        image_file.seek(0)
+
+        return image_file, image_hash.hexdigest()  # type: ignore
+
+    def upload_image(self, post_image: PostImage) -> str:
+        """
+        Upload the downloaded image to the Reddit hosting.
+
+        The asset with the same image content is reused (without requesting
+        the upload lease) while it's valid. Return the asset ID.
+        """
+        asset_registry = self.asset_registry
+        content_hash = post_image.content_hash
+
+        if asset_registry and content_hash:
+            asset_id = asset_registry.get(content_hash)
+
+            if asset_id:
+                log.info("post_image_asset_reuse", asset_id=asset_id)
+                return asset_id
+
+        asset_id = self.reddit_helper.upload_image(
+            filename=post_image.filename,
+            mime_type=post_image.mime_type,
+            image_content=post_image.image_content,
         )
 
+        if asset_registry and content_hash:
+            asset_registry.put(content_hash, asset_id)
+
+        return asset_id
+
     def replace_image(
         self,
         rtjson: RichTextJson,
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+
+import os
+import statistics
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from praw import Reddit
+from prawcore.exceptions import PrawcoreException
+from ruamel.yaml import YAML  # type: ignore
+from structlog import get_logger
+
+from slow_start_rewatch.codec import parse_yaml
+from slow_start_rewatch.config import Config
+
+HISTORY_FILENAME = "thumbnail_readiness.yml"
+
+log = get_logger()
+
+# Type alias for the readiness history: subreddit -> readiness times (ms).
+ReadinessHistory = Dict[str, List[float]]
+
+
+class ThumbnailWatcher(object):
+    """
+    Waits until Reddit generates the thumbnail of a submission.
+
+    The submission is polled with exponential backoff. The first poll is
+    delayed by a fraction (`early_fraction`) of the typical readiness time
+    learned from previous submissions to the same subreddit. Polling before
+    the typical time lets the learned readiness decrease as well.
+    """
+
+    def __init__(self, config: Config, reddit: Reddit) -> None:
+        """Initialize ThumbnailWatcher."""
+        self.reddit = reddit
+        self.initial_interval: int = config[
+            "thumbnail_watcher.initial_interval"
+        ]
+        self.max_interval: int = config["thumbnail_watcher.max_interval"]
+        self.backoff_factor: float = config["thumbnail_watcher.backoff_factor"]
+        self.early_fraction: float = config["thumbnail_watcher.early_fraction"]
+        self.history_size: int = config["thumbnail_watcher.history_size"]
+        self.history_file = os.path.join(config["data_dir"], HISTORY_FILENAME)
+
+        self._history: Optional[ReadinessHistory] = None
+
+    def wait_until_ready(
+        self,
+        subreddit: str,
+        submission_id: str,
+        timeout: int,
+    ) -> bool:
+        """
+        Wait until the thumbnail is ready or until the timeout (ms) expires.
+
+        Return `True` if the thumbnail is ready.
+        """
+        start_time = time.monotonic()
+        delay = self.first_delay(subreddit)
+        next_delay: float = self.initial_interval
+
+        while True:
+            elapsed = (time.monotonic() - start_time) * 1000
+            remaining = timeout - elapsed
+
+            if remaining <= 0:
+                log.warning(
+                    "thumbnail_timeout",
+                    submission_id=submission_id,
+                    timeout=timeout,
+                )
+                return False
+
+            time.sleep(min(delay, remaining) / 1000)
+
+            if self.is_ready(submission_id):
+                readiness = (time.monotonic() - start_time) * 1000
+                log.info(
+                    "thumbnail_ready",
+                    submission_id=submission_id,
+                    readiness=readiness,
+                )
+                self.record_readiness(subreddit, readiness)
+                return True
+
+            delay = next_delay
+            next_delay = min(
+                next_delay * self.backoff_factor,
+                self.max_interval,
+            )
+
+    def first_delay(self, subreddit: str) -> float:
+        """
+        Return the delay (ms) before the first poll.
+
+        The delay is never shorter than the initial interval.
+        """
+        typical_readiness = self.typical_readiness(subreddit)
+
+        if not typical_readiness:
+            return self.initial_interval
+
+        return max(
+            typical_readiness * self.early_fraction,
+            self.initial_interval,
+        )
+
+    def is_ready(self, submission_id: str) -> bool:
+        """Check whether the thumbnail or the preview of a submission exists."""
+        submission = self.reddit.submission(submission_id)
+        try:
+            thumbnail = str(submission.thumbnail)
+            preview = getattr(submission, "preview", None)
+        except PrawcoreException:
+            log.exception("thumbnail_check_error")
+            return False
+
+        log.debug(
+            "thumbnail_check",
+            submission_id=submission_id,
+            thumbnail=thumbnail,
+            preview=bool(preview),
+        )
+
+        return thumbnail.startswith("http") or bool(preview)
+
+    def typical_readiness(self, subreddit: str) -> Optional[float]:
+        """Return the median readiness time (ms) for the subreddit."""
+        readiness_times = self.history.get(subreddit)
+
+        if not readiness_times:
+            return None
+
+        return statistics.median(readiness_times)
+
+    def record_readiness(self, subreddit: str, readiness: float) -> None:
+        """Record the readiness time (ms) and save the history."""
+        readiness_times = self.history.setdefault(subreddit, [])
+        readiness_times.append(round(readiness))
+        del readiness_times[:-self.history_size]  # noqa: WPS420
+
+        self.save_history()
+
+    @property
+    def history(self) -> ReadinessHistory:
+        """Get the readiness history (loaded from the file on first use)."""
+        if self._history is None:
+            self._history = self.load_history()
+
+        return self._history
+
+    def load_history(self) -> ReadinessHistory:
+        """Load the readiness history from the file."""
+        log.debug("thumbnail_history_read", path=self.history_file)
+        try:
+            with open(self.history_file) as history_file:
+                history = parse_yaml(history_file.read())
+        except (IOError, ValueError, AttributeError):
+            log.debug("thumbnail_history_missing", path=self.history_file)
+            return {}
+
+        if not isinstance(history, dict):
+            return {}
+
+        return history
+
+    def save_history(self) -> None:
+        """
+        Save the readiness history to the file.
+
+        Failure to save the history is not fatal.
+        """
+        log.debug("thumbnail_history_save", path=self.history_file)
+
+        yaml = YAML(typ="safe")
+        yaml.default_flow_style = False
+
+        try:
+            Path(os.path.dirname(self.history_file)).mkdir(
+                parents=True,
+                exist_ok=True,
+            )
+            with open(self.history_file, "w") as history_file:
+                yaml.dump(self.history, history_file)
+        except IOError:
+            log.exception("thumbnail_history_save_error")
@@ -1,6 +1,9 @@
 # -*- coding: utf-8 -*-
 
-from typing import List, Optional
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from operator import attrgetter
+from typing import Dict, Iterable, List, Optional, Set
 
 from structlog import get_logger
 
@@ -10,7 +13,13 @@ log = get_logger()
 
 
 class Schedule(object):
-    """Represents scheduled Reddit posts."""
+    """
+    Represents scheduled Reddit posts.
+
+    The posts are sorted by the submission time (the order of the posts with
+    the same time is preserved). The indexes of the posts allow looking up
+    the posts by the name or by the time without scanning all the posts.
+    """
 
     def __init__(  # noqa: WPS211
         self,
@@ -27,7 +36,19 @@ class Schedule(object):
             raise AttributeError("'subreddit' field must be set.")
 
         self.subreddit = subreddit
-        self.posts = posts or []
+        self.posts = sorted(posts or [], key=attrgetter("submit_at"))
+
+        self.submit_times: List[datetime] = [
+            post.submit_at for post in self.posts
+        ]
+        self.post_positions: Dict[str, int] = {
+            post.name: position for position, post in enumerate(self.posts)
+        }
+        self.pending_positions: List[int] = [
+            position
+            for position, post in enumerate(self.posts)
+            if not post.submission_id
+        ]
 
     def __eq__(self, other: object) -> bool:
         """Compare this instance to other object."""
@@ -45,3 +66,88 @@ class Schedule(object):
                 return False
 
         return True
+
+    def get_post(self, name: str) -> Optional[Post]:
+        """Return the post with the name or `None` if it doesn't exist."""
+        position = self.post_positions.get(name)
+
+        if position is None:
+            return None
+
+        return self.posts[position]
+
+    def get_posts(self, names: Iterable[str]) -> List[Post]:
+        """Return the posts with the names in the order of the Schedule."""
+        positions = sorted(
+            self.post_positions[name]
+            for name in names
+            if name in self.post_positions
+        )
+
+        return [self.posts[position] for position in positions]
+
+    def get_surrounding_posts(
+        self,
+        posts: Iterable[Post],
+        radius: int,
+    ) -> List[Post]:
+        """
+        Return the posts and the posts up to `radius` positions around them.
+
+        The posts are returned in the order of the Schedule.
+        """
+        positions: Set[int] = set()
+
+        for post in posts:
+            position = self.post_positions.get(post.name)
+
+            if position is not None:
+                positions.update(range(
+                    max(position - radius, 0),
+                    min(position + radius + 1, len(self.posts)),
+                ))
+
+        return [self.posts[position] for position in sorted(positions)]
+
+    def get_pending_posts(
+        self,
+        after_time: datetime,
+        limit: Optional[int] = None,
+    ) -> List[Post]:
+        """
+        Return the posts without a submission scheduled after `after_time`.
+
+        Return at most `limit` posts if provided.
+        """
+        first_position = bisect_right(self.submit_times, after_time)
+        pending_positions = self.pending_positions[
+            bisect_left(self.pending_positions, first_position):
+        ]
+
+        posts: List[Post] = []
+
+        for position in pending_positions:
+            if limit is not None and len(posts) >= limit:
+                break
+
+            post = self.posts[position]
+
+            if not post.submission_id:
+                posts.append(post)
+
+        return posts
+
+    def mark_submitted(self, post: Post) -> None:
+        """Remove the submitted post from the index of the pending posts."""
+        position = self.post_positions.get(post.name)
+
+        if position is None:
+            return
+
+        index = bisect_left(self.pending_positions, position)
+
+        if (
+            index < len(self.pending_positions) and
+            self.pending_positions[index] == position
+        ):
+            self.pending_positions.pop(index)
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+
+import hashlib
+import os
+import pickle  # noqa: S403
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from structlog import get_logger
+
+from slow_start_rewatch.codec import ScheduleDocument
+from slow_start_rewatch.config import Config
+from slow_start_rewatch.post import Post
+from slow_start_rewatch.schedule.schedule_source import ScheduleSource
+
+log = get_logger()
+
+CACHE_DIRECTORY = "schedule_cache"
+CACHE_FILE_SUFFIX = ".bin"
+CACHE_FORMAT_VERSION = 2
+
+
+class CachedSchedule(object):
+    """
+    The parsed Schedule data stored in the `ScheduleCache`.
+
+    The entry is valid only if the post bodies loaded from the
+    `body_sources` match the `body_digest`.
+    """
+
+    def __init__(  # noqa: WPS211
+        self,
+        subreddit: str,
+        posts: List[Post],
+        body_sources: List[str],
+        body_digest: str,
+        schedule_document: ScheduleDocument,
+        schedule_source: Optional[ScheduleSource],
+        schedule_json: bool,
+    ) -> None:
+        """Initialize CachedSchedule."""
+        self.subreddit = subreddit
+        self.posts = posts
+        self.body_sources = body_sources
+        self.body_digest = body_digest
+        self.schedule_document = schedule_document
+        self.schedule_source = schedule_source
+        self.schedule_json = schedule_json
+
+
+class ScheduleCache(object):
+    """
+    Stores the parsed Schedule data in the local files.
+
+    The entries are keyed by the hash of the Schedule data and they are
+    stored as compressed pickles. The least recently used entries are
+    removed when the number of the entries exceeds `max_entries`.
+    """
+
+    def __init__(self, cache_dir: str, max_entries: int) -> None:
+        """Initialize ScheduleCache."""
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+
+    def get(self, schedule_data: str) -> Optional[CachedSchedule]:
+        """
+        Return the cached entry for the Schedule data.
+
+        Return `None` if the entry doesn't exist or if it cannot be read.
+        """
+        path = self.get_path(schedule_data)
+
+        try:
+            with open(path, "rb") as cache_file:
+                cache_version, cached_schedule = pickle.loads(  # noqa: S301
+                    zlib.decompress(cache_file.read()),
+                )
+        except FileNotFoundError:
+            log.debug("schedule_cache_miss", path=path)
+            return None
+        except Exception:
+            log.warning("schedule_cache_invalid", path=path, exc_info=True)
+            return None
+
+        if cache_version != CACHE_FORMAT_VERSION:
+            log.debug("schedule_cache_outdated", path=path)
+            return None
+
+        log.debug("schedule_cache_hit", path=path)
+        self.touch(path)
+
+        return cached_schedule
+
+    def put(self, schedule_data: str, cached_schedule: CachedSchedule) -> None:
+        """
+        Store the entry for the Schedule data.
+
+        Failure to store the entry is not fatal.
+        """
+        path = self.get_path(schedule_data)
+        temp_path = "{0}.tmp".format(path)
+        log.debug("schedule_cache_write", path=path)
+
+        try:
+            Path(self.cache_dir).mkdir(parents=True, exist_ok=True)
+            with open(temp_path, "wb") as cache_file:
+                cache_file.write(zlib.compress(pickle.dumps(
+                    (CACHE_FORMAT_VERSION, cached_schedule),
+                    protocol=pickle.HIGHEST_PROTOCOL,
+                )))
+            os.replace(temp_path, path)
+        except (IOError, pickle.PicklingError):
+            log.exception("schedule_cache_write_error")
+            return
+
+        self.evict()
+
+    def evict(self) -> None:
+        """Remove the least recently used entries exceeding the limit."""
+        entries = []
+
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(CACHE_FILE_SUFFIX):
+                entries.append((entry.stat().st_mtime_ns, entry.path))
+
+        entries.sort(reverse=True)
+
+        for _, path in entries[self.max_entries:]:
+            log.debug("schedule_cache_evict", path=path)
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                log.debug("schedule_cache_evicted", path=path)
+
+    def touch(self, path: str) -> None:
+        """Mark the entry as recently used."""
+        try:
+            os.utime(path)
+        except IOError:
+            log.debug("schedule_cache_touch_error", path=path)
+
+    def get_path(self, schedule_data: str) -> str:
+        """Return the path of the entry for the Schedule data."""
+        return os.path.join(
+            self.cache_dir,
+            "{0}{1}".format(hash_text(schedule_data), CACHE_FILE_SUFFIX),
+        )
+
+
+def create_schedule_cache(config: Config) -> Optional[ScheduleCache]:
+    """Create the `ScheduleCache` if it's enabled in the config."""
+    if not config["schedule_cache.enabled"]:
+        return None
+
+    return ScheduleCache(
+        cache_dir=os.path.join(config["data_dir"], CACHE_DIRECTORY),
+        max_entries=config["schedule_cache.max_entries"],
+    )
+
+
+def hash_text(text: str) -> str:
+    """Return the SHA-256 hash of the text."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def hash_post_bodies(post_bodies: Dict[str, str]) -> str:
+    """Return the SHA-256 hash of the post bodies and their sources."""
+    body_hash = hashlib.sha256()
+
+    for body_source in sorted(post_bodies):
+        for text in (body_source, post_bodies[body_source]):
+            encoded_text = text.encode("utf-8")
+            body_hash.update(len(encoded_text).to_bytes(8, "big"))
+            body_hash.update(encoded_text)
+
+    return body_hash.hexdigest()
@@ -1,22 +1,42 @@
 # -*- coding: utf-8 -*-
 
 import os
+from typing import Optional
 
 from structlog import get_logger
 
 from slow_start_rewatch.config import Config
-from slow_start_rewatch.exceptions import MissingPost, MissingSchedule
+from slow_start_rewatch.exceptions import (
+    MissingPost,
+    MissingSchedule,
+    ScheduleConflict,
+)
+from slow_start_rewatch.schedule.schedule_cache import create_schedule_cache
 from slow_start_rewatch.schedule.schedule_storage import ScheduleStorage
 
 log = get_logger()
 
+STATE_FILE_SUFFIX = ".state.json"
+
 
 class ScheduleFileStorage(ScheduleStorage):
-    """Stores data about scheduled posts in local files."""
+    """
+    Stores data about scheduled posts in local files.
+
+    The submission state is stored in the sidecar file next to the Schedule
+    file (e.g. `schedule.state.json` for `schedule.yml`).
+    """
 
     def __init__(self, config: Config) -> None:
         """Initialize ScheduleFileStorage."""
-        super().__init__()
+        super().__init__(
+            patch_in_place=config["schedule_storage.patch_in_place"],
+            yaml_backend=config["schedule_storage.yaml_backend"],
+            schedule_cache=create_schedule_cache(config),
+            body_workers=config["schedule_storage.body_workers"],
+            lazy_bodies=config["schedule_storage.lazy_bodies"],
+            submission_state=config["schedule_storage.submission_state"],
+        )
 
         schedule_file: str = config["schedule_file"]
 
@@ -27,10 +47,16 @@ class ScheduleFileStorage(ScheduleStorage):
 
         self.schedule_file = schedule_file
         self.schedule_directory = os.path.dirname(schedule_file)
+        self.state_file = "{0}{1}".format(
+            os.path.splitext(schedule_file)[0],
+            STATE_FILE_SUFFIX,
+        )
 
     def load_schedule_data(self) -> str:
         """Load Schedule data from the file."""
         log.info("schedule_file_read", path=self.schedule_file)
+        self.schedule_revision = self.get_file_revision()
+
         try:
             with open(self.schedule_file, encoding="utf-8") as schedule_file:
                 schedule_data = schedule_file.read()
@@ -62,8 +88,57 @@ class ScheduleFileStorage(ScheduleStorage):
         return post_body
 
     def save_schedule_data(self, schedule_data: str) -> None:
-        """Save the Schedule data to the file."""
+        """
+        Save the Schedule data to the file.
+
+        The file must not be modified since the Schedule data were loaded.
+        """
         log.info("schedule_file_update", path=self.schedule_file)
 
+        file_revision = self.get_file_revision()
+
+        if self.schedule_revision and file_revision != self.schedule_revision:
+            raise ScheduleConflict(
+                "The schedule file has been modified: {0}".format(
+                    self.schedule_file,
+                ),
+            )
+
         with open(self.schedule_file, "w") as schedule_file:
             schedule_file.write(schedule_data)
+
+        self.schedule_revision = self.get_file_revision()
+
+    def load_state_data(self) -> Optional[str]:
+        """Load the submission state from the sidecar file."""
+        log.info("submission_state_file_read", path=self.state_file)
+
+        try:
+            with open(self.state_file, encoding="utf-8") as state_file:
+                return state_file.read()
+        except FileNotFoundError:
+            return None
+
+    def save_state_data(self, state_data: str) -> None:
+        """Save the submission state to the sidecar file (atomically)."""
+        log.info("submission_state_file_update", path=self.state_file)
+        temp_path = "{0}.tmp".format(self.state_file)
+
+        with open(temp_path, "w", encoding="utf-8") as state_file:
+            state_file.write(state_data)
+
+        os.replace(temp_path, self.state_file)
+
+    def get_file_revision(self) -> Optional[str]:
+        """
+        Return the revision of the Schedule file.
+
+        The revision is based on the modification time and the size of the
+        file. Return `None` if the file doesn't exist.
+        """
+        try:
+            file_stat = os.stat(self.schedule_file)
+        except FileNotFoundError:
+            return None
+
+        return "{0}:{1}".format(file_stat.st_mtime_ns, file_stat.st_size)
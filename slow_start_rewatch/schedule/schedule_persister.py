@@ -0,0 +1,429 @@
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import click
+from structlog import get_logger
+
+from slow_start_rewatch.config import Config
+from slow_start_rewatch.exceptions import RedditError
+from slow_start_rewatch.post import Post
+from slow_start_rewatch.schedule.schedule import Schedule
+from slow_start_rewatch.schedule.schedule_cache import hash_text
+from slow_start_rewatch.schedule.schedule_storage import ScheduleStorage
+
+log = get_logger()
+
+JOURNAL_DIRECTORY = "schedule_journal"
+JOURNAL_FILE_SUFFIX = ".jsonl"
+
+# Type alias for a journal record: the post name and the submission ID.
+JournalRecord = Dict[str, str]
+
+
+class SchedulePersister(object):
+    """
+    Saves the Schedule to the storage in the background (write-behind).
+
+    The submissions are appended to the local journal file first (synced to
+    the disk) so that they are not lost if the program exits before the
+    Schedule is saved. The journaled submissions which haven't been saved
+    are recovered by :meth:`recover()` when the Schedule is loaded.
+
+    The saves requested within the `coalesce_window` are combined into a
+    single save. The failed saves are retried with an exponential backoff
+    starting with the `retry_delay`. The names of the saved posts are passed
+    to the `on_save` callback (if provided).
+    """
+
+    def __init__(  # noqa: WPS211
+        self,
+        schedule_storage: ScheduleStorage,
+        journal_file: str,
+        coalesce_window: int,
+        retry_delay: int,
+        max_retries: int,
+        flush_timeout: int,
+        on_save: Optional[Callable[[List[str]], None]] = None,
+    ) -> None:
+        """Initialize SchedulePersister."""
+        self.schedule_storage = schedule_storage
+        self.journal_file = journal_file
+        self.coalesce_window = coalesce_window
+        self.retry_delay = retry_delay
+        self.max_retries = max_retries
+        self.flush_timeout = flush_timeout
+        self.on_save = on_save
+
+        self._condition = threading.Condition()
+        self._pending_schedule: Optional[Schedule] = None
+        self._requested_at = 0.0
+        self._records: List[JournalRecord] = []
+        self._is_saving = False
+        self._is_save_failed = False
+        self._is_flushing = False
+        self._is_stopping = False
+        self._resumed = threading.Event()
+        self._resumed.set()
+        self._worker: Optional[threading.Thread] = None
+
+    def record_submission(self, post: Post) -> None:
+        """
+        Append the submission of the Post to the journal.
+
+        Failure to write the journal is not fatal (the Schedule is still
+        saved in the background).
+        """
+        record = {
+            "name": str(post.name),
+            "submission_id": str(post.submission_id),
+        }
+
+        with self._condition:
+            self._records.append(record)
+
+            try:
+                Path(self.journal_file).parent.mkdir(
+                    parents=True,
+                    exist_ok=True,
+                )
+                append_record(self.journal_file, record)
+            except IOError:
+                log.exception("schedule_journal_write_error")
+                return
+
+        log.debug("schedule_journal_append", post=post.name)
+
+    def request_save(self, schedule: Schedule) -> None:
+        """
+        Request saving the Schedule and return immediately.
+
+        The Schedule is saved once the coalesce window since the first
+        pending request passes.
+        """
+        with self._condition:
+            if self._pending_schedule is None:
+                self._requested_at = time.monotonic()
+
+            self._pending_schedule = schedule
+            self._condition.notify_all()
+
+        log.debug("schedule_save_request")
+        self.start()
+
+    def recover(self, schedule: Schedule) -> List[Post]:
+        """
+        Apply the journaled submissions missing in the loaded Schedule.
+
+        The recovered posts are marked as submitted and the save of the
+        Schedule is requested. The journal is removed when all the journaled
+        submissions are already saved. Return the recovered posts.
+        """
+        try:
+            records = read_records(self.journal_file)
+        except FileNotFoundError:
+            return []
+        except (IOError, ValueError):
+            log.exception("schedule_journal_read_error")
+            return []
+
+        recovered_posts = apply_records(schedule, records)
+
+        log.info(
+            "schedule_journal_recover",
+            records=len(records),
+            recovered_posts=len(recovered_posts),
+        )
+
+        with self._condition:
+            # The journal contains all the records appended before the load.
+            self._records = records
+            if not recovered_posts:
+                self.truncate_journal(len(records))
+
+        if recovered_posts:
+            click.echo(
+                click.style(
+                    "Recovered {0} submission(s) missing in the schedule."
+                    .format(len(recovered_posts)),
+                    fg="yellow",
+                ),
+            )
+            self.request_save(schedule)
+
+        return recovered_posts
+
+    def pause(self) -> None:
+        """Don't start new saves until :meth:`resume()` is called."""
+        log.debug("schedule_persister_pause")
+        self._resumed.clear()
+
+    def resume(self) -> None:
+        """Resume the saving of the Schedule."""
+        log.debug("schedule_persister_resume")
+        self._resumed.set()
+
+    def flush(self) -> bool:
+        """
+        Save the pending Schedule without waiting for the coalesce window.
+
+        The active pause is honored (the save starts only after
+        :meth:`resume()`). Wait for the save until the flush timeout. Return
+        `False` if the pending Schedule hasn't been saved in time or if the
+        last save has failed.
+        """
+        with self._condition:
+            self._is_flushing = True
+            self._condition.notify_all()
+            is_flushed = self._condition.wait_for(
+                lambda: not self._pending_schedule and not self._is_saving,
+                timeout=self.flush_timeout / 1000,
+            )
+            self._is_flushing = False
+            is_save_failed = self._is_save_failed
+
+        if not is_flushed:
+            log.warning("schedule_flush_timeout", timeout=self.flush_timeout)
+            click.echo(
+                click.style(
+                    "The schedule hasn't been saved in time. The submissions " +
+                    "are kept in the journal: {0}".format(self.journal_file),
+                    fg="yellow",
+                ),
+                err=True,
+            )
+
+        return is_flushed and not is_save_failed
+
+    def stop(self) -> bool:
+        """Flush the pending Schedule and stop the worker."""
+        is_flushed = self.flush()
+
+        with self._condition:
+            self._is_stopping = True
+            self._condition.notify_all()
+
+        return is_flushed
+
+    def start(self) -> None:
+        """Start the worker thread if it's not running."""
+        if self._worker and self._worker.is_alive():
+            return
+
+        with self._condition:
+            self._is_stopping = False
+
+        self._worker = threading.Thread(
+            target=self.run,
+            name="schedule_persister",
+            daemon=True,
+        )
+        self._worker.start()
+
+    def run(self) -> None:
+        """Save the requested Schedules (run by the worker thread)."""
+        while True:
+            with self._condition:
+                self._condition.wait_for(
+                    lambda: self._pending_schedule or self._is_stopping,
+                )
+
+                if not self._pending_schedule:
+                    return
+
+                self.wait_for_coalesce_window()
+
+                schedule = self._pending_schedule
+                self._pending_schedule = None
+                saved_record_count = len(self._records)
+                self._is_saving = True
+
+            is_saved = False
+            try:
+                self._resumed.wait()
+                is_saved = self.save_schedule(schedule)
+            finally:
+                with self._condition:
+                    if is_saved:
+                        self.report_saved(saved_record_count)
+                        self.truncate_journal(saved_record_count)
+
+                    self._is_save_failed = not is_saved
+                    self._is_saving = False
+                    self._condition.notify_all()
+
+    def wait_for_coalesce_window(self) -> None:
+        """
+        Wait until the coalesce window passes or the flush is requested.
+
+        The lock must be held by the caller.
+        """
+        save_at = self._requested_at + self.coalesce_window / 1000
+
+        self._condition.wait_for(
+            lambda: self._is_flushing or time.monotonic() >= save_at,
+            timeout=max(save_at - time.monotonic(), 0),
+        )
+
+    def save_schedule(self, schedule: Schedule) -> bool:
+        """
+        Save the Schedule and retry the failed saves.
+
+        Only the errors of Reddit and of the file system are retried (e.g.
+        the conflicting modification of the Schedule is not). Return `False`
+        if the Schedule hasn't been saved.
+        """
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                delay = self.retry_delay * 2 ** (attempt - 1)
+                log.info("schedule_save_retry", attempt=attempt, delay=delay)
+                time.sleep(delay / 1000)
+
+            try:
+                self.schedule_storage.save(schedule)
+            except (RedditError, IOError):
+                log.warning("schedule_save_error", exc_info=True)
+                continue
+            except Exception as error:
+                self.report_failure(error)
+                return False
+
+            log.info("schedule_save", attempt=attempt)
+            return True
+
+        self.report_failure(RuntimeError("Too many failed attempts."))
+
+        return False
+
+    def report_saved(self, record_count: int) -> None:
+        """
+        Pass the names of the saved posts to the `on_save` callback.
+
+        The lock must be held by the caller.
+        """
+        if self.on_save:
+            self.on_save([
+                record["name"] for record in self._records[:record_count]
+            ])
+
+    def report_failure(self, error: Exception) -> None:
+        """Report the Schedule which couldn't be saved."""
+        log.error("schedule_save_failed", error=str(error))
+        click.echo(
+            click.style(
+                "Failed to save the schedule: {0} ".format(str(error)) +
+                "The submissions are kept in the journal: {0}".format(
+                    self.journal_file,
+                ),
+                fg="red",
+            ),
+            err=True,
+        )
+
+    def truncate_journal(self, record_count: int) -> None:
+        """
+        Remove the first records (already saved) from the journal.
+
+        The lock must be held by the caller. Failure to update the journal is
+        not fatal (the saved records are ignored during the recovery).
+        """
+        self._records = self._records[record_count:]
+
+        try:
+            if self._records:
+                write_records(self.journal_file, self._records)
+            elif os.path.exists(self.journal_file):
+                os.remove(self.journal_file)
+        except IOError:
+            log.exception("schedule_journal_write_error")
+
+
+def create_schedule_persister(
+    config: Config,
+    schedule_storage: ScheduleStorage,
+    on_save: Optional[Callable[[List[str]], None]] = None,
+) -> SchedulePersister:
+    """
+    Create the `SchedulePersister` of the Schedule storage.
+
+    Each Schedule (a wiki page, a database, or a file) has its own journal.
+    """
+    schedule_location = (
+        config["schedule_wiki_url"] or
+        config["schedule_database"] or
+        config["schedule_file"]
+    )
+
+    return SchedulePersister(
+        schedule_storage=schedule_storage,
+        journal_file=os.path.join(
+            config["data_dir"],
+            JOURNAL_DIRECTORY,
+            "{0}{1}".format(hash_text(schedule_location), JOURNAL_FILE_SUFFIX),
+        ),
+        coalesce_window=config["schedule_persister.coalesce_window"],
+        retry_delay=config["schedule_persister.retry_delay"],
+        max_retries=config["schedule_persister.max_retries"],
+        flush_timeout=config["schedule_persister.flush_timeout"],
+        on_save=on_save,
+    )
+
+
+def append_record(path: str, record: JournalRecord) -> None:
+    """Append the record to the journal and sync it to the disk."""
+    with open(path, "a", encoding="utf-8") as journal:
+        journal.write("{0}\n".format(json.dumps(record)))
+        journal.flush()
+        os.fsync(journal.fileno())
+
+
+def apply_records(
+    schedule: Schedule,
+    records: List[JournalRecord],
+) -> List[Post]:
+    """
+    Mark the posts of the records as submitted (unless they already are).
+
+    Return the updated posts.
+    """
+    updated_posts = []
+
+    for record in records:
+        post = schedule.get_post(record["name"])
+
+        if post and not post.submission_id:
+            post.submission_id = record["submission_id"]
+            schedule.mark_submitted(post)
+            updated_posts.append(post)
+
+    return updated_posts
+
+
+def read_records(path: str) -> List[JournalRecord]:
+    """
+    Read the records of the journal.
+
+    The incomplete last record (e.g. after a crash) is ignored.
+    """
+    with open(path, encoding="utf-8") as journal:
+        lines = journal.read().split("\n")
+
+    return [json.loads(line) for line in lines[:-1] if line]
+
+
+def write_records(path: str, records: List[JournalRecord]) -> None:
+    """Replace the journal with the records (atomically)."""
+    temp_path = "{0}.tmp".format(path)
+
+    with open(temp_path, "w", encoding="utf-8") as journal:
+        for record in records:
+            journal.write("{0}\n".format(json.dumps(record)))
+        journal.flush()
+        os.fsync(journal.fileno())
+
+    os.replace(temp_path, path)
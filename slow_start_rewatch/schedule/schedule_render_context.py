@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+
+from collections import ChainMap
+from typing import Callable, Dict, Mapping, Optional, Tuple
+
+from structlog import get_logger
+
+from slow_start_rewatch.post import Post
+from slow_start_rewatch.schedule.schedule import Schedule
+
+log = get_logger()
+
+# Type alias for the function substituting the Navigation Links template
+# with the IDs of the previous and the next submission.
+NavigationLinksSubstitution = Callable[[Optional[str], Optional[str]], str]
+
+
+class ScheduleRenderContext(object):
+    """
+    Provides the data for rendering the posts of a `Schedule`.
+
+    The context is built once for the whole `Schedule` and it's updated
+    incrementally when a post is submitted:
+
+    - The navigation texts used for substituting the post placeholders.
+
+    - The previous and the next post of each post.
+
+    - The Navigation Links of each post.
+    """
+
+    def __init__(
+        self,
+        schedule: Schedule,
+        navigation_placeholder: str,
+        substitute_navigation_links: NavigationLinksSubstitution,
+    ) -> None:
+        """Initialize ScheduleRenderContext."""
+        log.debug("render_context_build", post_count=len(schedule.posts))
+
+        self.schedule = schedule
+        self.navigation_placeholder = navigation_placeholder
+        self.substitute_navigation_links = substitute_navigation_links
+
+        self.navigation_texts: Dict[str, str] = {}
+        self.adjacent_posts: Dict[
+            str,
+            Tuple[Optional[Post], Optional[Post]],
+        ] = {}
+        self.navigation_links: Dict[str, str] = {}
+
+        previous_post: Optional[Post] = None
+        for post in schedule.posts:
+            self.navigation_texts[post.name] = self.build_navigation_text(post)
+            self.adjacent_posts[post.name] = (previous_post, None)
+
+            if previous_post:
+                self.adjacent_posts[previous_post.name] = (
+                    self.adjacent_posts[previous_post.name][0],
+                    post,
+                )
+
+            previous_post = post
+
+        for schedule_post in schedule.posts:
+            self.navigation_links[schedule_post.name] = (
+                self.build_navigation_links(schedule_post)
+            )
+
+    def mapping(self, post: Post) -> Mapping[str, str]:
+        """Return the mapping for substituting the placeholders of the post."""
+        return ChainMap(
+            {
+                post.name: post.navigation_current,
+                self.navigation_placeholder: self.navigation_links[post.name],
+            },
+            self.navigation_texts,
+        )
+
+    def update_post(self, post: Post) -> None:
+        """
+        Update the context after the post has been submitted.
+
+        Only the navigation text of the post and the Navigation Links of the
+        adjacent posts are affected.
+        """
+        log.debug("render_context_update", post=str(post))
+        self.navigation_texts[post.name] = self.build_navigation_text(post)
+
+        for adjacent_post in self.adjacent_posts[post.name]:
+            if adjacent_post:
+                self.navigation_links[adjacent_post.name] = (
+                    self.build_navigation_links(adjacent_post)
+                )
+
+    def build_navigation_text(self, post: Post) -> str:
+        """Build the text substituting the placeholder of the post."""
+        if post.submission_id:
+            return post.navigation_submitted.replace(
+                "$link",
+                "/{0}".format(post.submission_id),
+            )
+
+        return post.navigation_scheduled
+
+    def build_navigation_links(self, post: Post) -> str:
+        """Build the Navigation Links based on adjacent posts."""
+        previous_post, next_post = self.adjacent_posts[post.name]
+        previous_id = None
+        next_id = None
+
+        if previous_post and previous_post.navigation_current:
+            previous_id = previous_post.submission_id
+
+        if next_post:
+            next_id = next_post.submission_id
+
+        return self.substitute_navigation_links(previous_id, next_id)
@@ -0,0 +1,261 @@
+# -*- coding: utf-8 -*-
+
+from typing import Dict, List, Optional, Tuple
+
+from ruamel.yaml import YAML, YAMLError  # type: ignore
+from ruamel.yaml.nodes import (  # type: ignore
+    MappingNode,
+    Node,
+    ScalarNode,
+    SequenceNode,
+)
+
+SUBMISSION_ID_KEY = "submission_id"
+NULL_TAG = "tag:yaml.org,2002:null"
+
+
+class PostSource(object):
+    """
+    The source lines of a scheduled post in the Schedule data.
+
+    The positions are relative to the first line of the post.
+    """
+
+    def __init__(
+        self,
+        lines: List[str],
+        indent: int,
+        insert_line: int,
+        submission_id: Optional[str] = None,
+        submission_id_position: Optional[Tuple[int, int, int]] = None,
+        newline: str = "\n",
+    ) -> None:
+        """Initialize PostSource."""
+        self.lines = lines
+        self.indent = indent
+        self.insert_line = insert_line
+        self.newline = newline
+        self.submission_id = submission_id
+        self.submission_id_position = submission_id_position
+
+    def set_submission_id(self, submission_id: str) -> None:
+        """
+        Set the submission ID of the post.
+
+        Replace the value of the existing `submission_id` item or insert the
+        item after the last item of the post (with the line ending of the
+        Schedule data).
+        """
+        if self.submission_id == submission_id:
+            return
+
+        scalar = format_scalar(submission_id)
+
+        if self.submission_id_position:
+            line, start_column, end_column = self.submission_id_position
+            text = self.lines[line]
+
+            if text[start_column - 1:start_column] == ":":
+                scalar = " {0}".format(scalar)
+
+            self.lines[line] = "".join([
+                text[:start_column],
+                scalar,
+                text[end_column:],
+            ])
+        else:
+            line = self.insert_line
+            prefix = "{0}{1}: ".format(" " * self.indent, SUBMISSION_ID_KEY)
+            self.lines.insert(line, "{0}{1}{2}".format(
+                prefix,
+                scalar,
+                self.newline,
+            ))
+            start_column = len(prefix)
+
+        self.submission_id_position = (
+            line,
+            start_column,
+            start_column + len(scalar),
+        )
+        self.submission_id = submission_id
+
+
+class ScheduleSource(object):
+    """
+    The Schedule data split into the source lines of the posts.
+
+    Allows patching the `submission_id` items of the posts without dumping
+    the whole Schedule data (the comments and the formatting are kept). Only
+    the lines of the patched posts are modified.
+    """
+
+    def __init__(self, schedule_data: str, post_names: List[str]) -> None:
+        """
+        Initialize ScheduleSource.
+
+        Raise `ValueError` if the structure of the data is not supported
+        (e.g. the posts use the flow style).
+        """
+        self.newline = detect_newline(schedule_data)
+
+        if schedule_data and not schedule_data.endswith("\n"):
+            schedule_data = "{0}{1}".format(schedule_data, self.newline)
+
+        lines = schedule_data.splitlines(keepends=True)
+        post_nodes = self.find_post_nodes(schedule_data)
+
+        if len(post_nodes) != len(post_names):
+            raise ValueError("The number of the posts doesn't match.")
+
+        self.post_sources: Dict[str, PostSource] = {}
+        self.segments: List[List[str]] = []
+
+        end_line = 0
+        for post_name, post_node in zip(post_names, post_nodes):
+            start_line = post_node.start_mark.line
+            self.segments.append(lines[end_line:start_line])
+            end_line = line_after(post_node, lines)
+
+            post_source = self.create_post_source(post_node, lines, end_line)
+            self.post_sources[post_name] = post_source
+            self.segments.append(post_source.lines)
+
+        self.segments.append(lines[end_line:])
+
+    def __str__(self) -> str:
+        """Return the Schedule data."""
+        return "".join(
+            "".join(segment) for segment in self.segments
+        )
+
+    def set_submission_id(self, post_name: str, submission_id: str) -> None:
+        """Set the submission ID of the post (if the post exists)."""
+        post_source = self.post_sources.get(post_name)
+
+        if post_source:
+            post_source.set_submission_id(submission_id)
+
+    def find_post_nodes(self, schedule_data: str) -> List[MappingNode]:
+        """Compose the Schedule data and return the nodes of the posts."""
+        posts_node = find_mapping_value(compose_mapping(schedule_data), "posts")
+
+        if posts_node is None:
+            raise ValueError("The schedule data must contain the posts.")
+
+        if not isinstance(posts_node, SequenceNode):
+            raise ValueError("The posts must be a sequence.")
+
+        for post_node in posts_node.value:
+            if not isinstance(post_node, MappingNode) or post_node.flow_style:
+                raise ValueError("The posts must be block mappings.")
+
+        return posts_node.value
+
+    def create_post_source(
+        self,
+        post_node: MappingNode,
+        lines: List[str],
+        end_line: int,
+    ) -> PostSource:
+        """
+        Create the source of the post from its node.
+
+        A block mapping always contains at least one item.
+        """
+        first_line = post_node.start_mark.line
+        last_value_node = post_node.value[-1][1]
+        post_source = PostSource(
+            lines=lines[first_line:end_line],
+            indent=post_node.start_mark.column,
+            insert_line=line_after(last_value_node, lines) - first_line,
+            newline=self.newline,
+        )
+
+        for key_node, value_node in post_node.value:
+            if key_node.value != SUBMISSION_ID_KEY:
+                continue
+
+            if (
+                not isinstance(value_node, ScalarNode) or
+                value_node.start_mark.line != value_node.end_mark.line
+            ):
+                raise ValueError("The submission ID must be a plain scalar.")
+
+            if value_node.tag != NULL_TAG:
+                post_source.submission_id = value_node.value
+
+            post_source.submission_id_position = (
+                value_node.start_mark.line - first_line,
+                value_node.start_mark.column,
+                value_node.end_mark.column,
+            )
+
+        return post_source
+
+
+def detect_newline(text: str) -> str:
+    """Return the line ending of the first line of the text (LF by default)."""
+    line_end = text.find("\n")
+
+    if line_end > 0 and text[line_end - 1] == "\r":
+        return "\r\n"
+
+    return "\n"
+
+
+def compose_mapping(yaml_data: str) -> MappingNode:
+    """Compose the YAML data and return the node of the root mapping."""
+    try:
+        root_node = YAML(typ="safe").compose(yaml_data)
+    except YAMLError as yaml_error:
+        raise ValueError("The schedule data are invalid.") from yaml_error
+
+    if not isinstance(root_node, MappingNode):
+        raise ValueError("The schedule data must be a mapping.")
+
+    return root_node
+
+
+def find_mapping_value(mapping_node: MappingNode, key: str) -> Optional[Node]:
+    """Return the node of the value of the key (or `None` if it's missing)."""
+    for key_node, value_node in mapping_node.value:
+        if key_node.value == key:
+            return value_node
+
+    return None
+
+
+def line_after(node, lines: List[str]) -> int:
+    """
+    Return the number of the first line after the node.
+
+    The node ends on the line before its end mark if there is only the
+    indentation before the end mark.
+    """
+    end_line = node.end_mark.line
+
+    if end_line >= len(lines):
+        return end_line
+
+    if lines[end_line][:node.end_mark.column].strip():
+        return end_line + 1
+
+    return end_line
+
+
+def format_scalar(scalar_value: str) -> str:
+    """
+    Format the string as a YAML scalar.
+
+    The string is quoted when it wouldn't be loaded as the same string.
+    """
+    try:
+        loaded_value = YAML(typ="safe").load(scalar_value)
+    except YAMLError:
+        loaded_value = None
+
+    if loaded_value == scalar_value:
+        return scalar_value
+
+    return "'{0}'".format(scalar_value.replace("'", "''"))
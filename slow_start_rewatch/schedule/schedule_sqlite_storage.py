@@ -0,0 +1,445 @@
+# -*- coding: utf-8 -*-
+
+import json
+import sqlite3
+from contextlib import closing, contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, Optional
+
+from structlog import get_logger
+
+from slow_start_rewatch.codec import (
+    PostData,
+    ScheduleDocument,
+    read_schedule_document,
+)
+from slow_start_rewatch.config import Config
+from slow_start_rewatch.exceptions import (
+    InvalidSchedule,
+    MissingPost,
+    MissingSchedule,
+)
+from slow_start_rewatch.schedule.schedule import Schedule
+from slow_start_rewatch.schedule.schedule_storage import (
+    STATE_DATETIME_FORMAT,
+    STATE_FORMAT_VERSION,
+    ScheduleStorage,
+)
+
+log = get_logger()
+
+# The datetimes are stored as text in the format of the submission state
+# (sorted chronologically as strings):
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS schedule (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS post_templates (
+    source TEXT PRIMARY KEY,
+    body TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS posts (
+    position INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    submit_at TEXT NOT NULL,
+    title TEXT NOT NULL,
+    body_template TEXT NOT NULL,
+    submit_with_thumbnail INTEGER NOT NULL DEFAULT 1,
+    flair_id TEXT,
+    navigation_submitted TEXT,
+    navigation_current TEXT,
+    navigation_scheduled TEXT,
+    submission_id TEXT,
+    submitted_at TEXT,
+    submit_latency REAL,
+    release_jitter REAL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS posts_name ON posts (name);
+CREATE INDEX IF NOT EXISTS posts_submit_at ON posts (submit_at);
+"""
+
+# The columns of the posts table stored in the Schedule document (in the
+# order of the document).
+DOCUMENT_COLUMNS = (
+    "name",
+    "submit_at",
+    "title",
+    "body_template",
+    "submit_with_thumbnail",
+    "flair_id",
+    "navigation_submitted",
+    "navigation_current",
+    "navigation_scheduled",
+    "submission_id",
+)
+
+# The columns of the posts table stored in the submission state (in the
+# order of the update statement).
+STATE_COLUMNS = (
+    "submission_id",
+    "submitted_at",
+    "submit_latency",
+    "release_jitter",
+)
+
+# The default values omitted when exporting the Schedule document.
+DOCUMENT_DEFAULTS = {"submit_with_thumbnail": True}
+
+
+class ScheduleSqliteStorage(ScheduleStorage):
+    """
+    Stores data about scheduled posts in a local SQLite database.
+
+    Each post is a row of the `posts` table indexed by the name and by the
+    submission time. The post templates (bodies) are stored by their source
+    in the `post_templates` table. Saving the Schedule updates only the
+    submission state of the posts which have changed.
+
+    The Schedule is imported from (and exported to) the YAML format of the
+    file storage by :meth:`import_schedule()` and :meth:`export_schedule()`.
+    """
+
+    def __init__(self, config: Config) -> None:
+        """Initialize ScheduleSqliteStorage."""
+        super().__init__(
+            yaml_backend=config["schedule_storage.yaml_backend"],
+            body_workers=config["schedule_storage.body_workers"],
+            lazy_bodies=config["schedule_storage.lazy_bodies"],
+        )
+
+        schedule_database: str = config["schedule_database"]
+
+        if not schedule_database:
+            raise RuntimeError(
+                "The config must contain 'schedule_database' item.",
+            )
+
+        self.schedule_database = schedule_database
+
+        self.create_schema()
+
+    def load_schedule(self) -> Schedule:
+        """Load the Schedule from the database."""
+        log.info("schedule_database_read", path=self.schedule_database)
+
+        with self.connect() as connection:
+            subreddit = self.get_subreddit(connection)
+            rows = connection.execute(
+                "SELECT * FROM posts ORDER BY submit_at, position",
+            ).fetchall()
+
+        posts = self.load_posts(
+            [self.create_post_data(row) for row in rows],
+            subreddit,
+        )
+
+        for post, row in zip(posts, rows):
+            self.merge_post_state(post, dict(row))
+
+        return Schedule(subreddit=subreddit, posts=posts)
+
+    def load_schedule_data(self) -> str:
+        """Export the Schedule data from the database to YAML."""
+        with self.connect() as connection:
+            yaml_data: ScheduleDocument = {
+                "subreddit": self.get_subreddit(connection),
+                "posts": [
+                    self.create_document_post(row)
+                    for row in connection.execute(
+                        "SELECT * FROM posts ORDER BY position",
+                    )
+                ],
+            }
+
+        return self.dump_schedule_document(yaml_data)
+
+    def load_post_body(self, body_template_source: str) -> str:
+        """Load a post template from the database."""
+        with self.connect() as connection:
+            row = connection.execute(
+                "SELECT body FROM post_templates WHERE source = ?",
+                (body_template_source,),
+            ).fetchone()
+
+        if not row:
+            raise MissingPost(
+                "The post template not found in the database: {0}".format(
+                    body_template_source,
+                ),
+            )
+
+        return row["body"]
+
+    def save(self, schedule: Schedule) -> None:
+        """
+        Save the submission state of the submitted posts.
+
+        Only the rows whose submission state has changed are updated.
+        """
+        self.save_state_data(self.dump_submission_state(schedule))
+
+    def load_state_data(self) -> Optional[str]:
+        """Dump the submission state stored in the rows of the posts."""
+        with self.connect() as connection:
+            rows = connection.execute(
+                "SELECT name, submission_id, submitted_at, submit_latency, " +
+                "release_jitter FROM posts WHERE submission_id IS NOT NULL",
+            ).fetchall()
+
+        return json.dumps({
+            "version": STATE_FORMAT_VERSION,
+            "posts": {
+                row["name"]: {
+                    state_key: row[state_key] for state_key in STATE_COLUMNS
+                }
+                for row in rows
+            },
+        })
+
+    def save_state_data(self, state_data: str) -> None:
+        """Store the submission state in the rows of the posts."""
+        state_rows = [
+            tuple(
+                post_state[state_key] for state_key in STATE_COLUMNS
+            ) + (post_name,)
+            for post_name, post_state in json.loads(state_data)["posts"].items()
+        ]
+
+        with self.connect() as connection:
+            updated_rows = connection.executemany(
+                "UPDATE posts SET submission_id = ?1, submitted_at = ?2, " +
+                "submit_latency = ?3, release_jitter = ?4 " +
+                "WHERE name = ?5 AND (submission_id IS NOT ?1 OR " +
+                "submitted_at IS NOT ?2)",
+                state_rows,
+            ).rowcount
+
+        log.info("schedule_database_update", updated_rows=updated_rows)
+
+    def save_schedule_data(self, schedule_data: str) -> None:
+        """
+        Import the Schedule data (YAML or JSON) into the database.
+
+        The posts are replaced by the posts of the Schedule data. The post
+        templates must be stored in the database already.
+        """
+        yaml_data = self.parse_schedule_document(schedule_data)
+
+        try:
+            self.store_schedule_document(yaml_data)
+        except (KeyError, TypeError, sqlite3.IntegrityError) as data_error:
+            log.exception("schedule_incomplete")
+            raise InvalidSchedule(
+                "Incomplete schedule data.",
+                hint="Make sure all the fields are filled in and the post " +
+                "names are unique.",
+            ) from data_error
+
+    def import_schedule(self, schedule_file: str) -> int:
+        """
+        Import the Schedule file and the post bodies into the database.
+
+        The post bodies are read from the files relative to the Schedule file
+        (the same way as by the file storage). Return the number of the
+        imported posts.
+        """
+        log.info("schedule_database_import", path=schedule_file)
+
+        try:
+            with open(schedule_file, encoding="utf-8") as schedule_input:
+                schedule_data = schedule_input.read()
+        except FileNotFoundError as error:
+            raise MissingSchedule(
+                "The schedule file not found: {0}".format(schedule_file),
+            ) from error
+
+        try:
+            _, posts_data = read_schedule_document(
+                self.parse_schedule_document(schedule_data),
+            )
+        except (KeyError, TypeError) as data_error:
+            log.exception("schedule_incomplete")
+            raise InvalidSchedule(
+                "Incomplete schedule data.",
+                hint="Make sure all the fields are filled in.",
+            ) from data_error
+
+        schedule_directory = Path(schedule_file).parent
+        post_templates = {}
+
+        for post_data in posts_data:
+            body_source = str(post_data.get("body_template"))
+            post_templates[body_source] = read_post_body(
+                str(schedule_directory / body_source),
+            )
+
+        with self.connect() as connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO post_templates (source, body) " +
+                "VALUES (?, ?)",
+                post_templates.items(),
+            )
+
+        self.save_schedule_data(schedule_data)
+
+        return len(posts_data)
+
+    def export_schedule(self, schedule_file: str) -> int:
+        """
+        Export the Schedule and the post templates to files.
+
+        The post templates are written to the files relative to the Schedule
+        file so that the Schedule can be loaded by the file storage. Return
+        the number of the exported posts.
+        """
+        log.info("schedule_database_export", path=schedule_file)
+        schedule_directory = Path(schedule_file).parent
+
+        with self.connect() as connection:
+            post_count = connection.execute(
+                "SELECT COUNT(*) FROM posts",
+            ).fetchone()[0]
+            post_templates = connection.execute(
+                "SELECT source, body FROM post_templates",
+            ).fetchall()
+
+        for template_row in post_templates:
+            path = schedule_directory / template_row["source"]
+            path.parent.mkdir(parents=True, exist_ok=True)
+
+            with open(path, "w", encoding="utf-8") as post_body_file:
+                post_body_file.write(template_row["body"])
+
+        schedule_data = self.load_schedule_data()
+
+        with open(schedule_file, "w", encoding="utf-8") as schedule_output:
+            schedule_output.write(schedule_data)
+
+        return post_count
+
+    def store_schedule_document(self, yaml_data: ScheduleDocument) -> None:
+        """Replace the Schedule in the database with the document."""
+        subreddit, posts_data = read_schedule_document(yaml_data)
+        post_rows = []
+
+        for position, post_data in enumerate(posts_data):
+            submit_at = post_data["submit_at"]
+
+            if not isinstance(submit_at, datetime):
+                raise TypeError(
+                    "Invalid 'submit_at' of the post: {0}".format(
+                        post_data["name"],
+                    ),
+                )
+
+            post_rows.append((
+                position,
+                str(post_data["name"]),
+                submit_at.strftime(STATE_DATETIME_FORMAT),
+                str(post_data["title"]),
+                str(post_data["body_template"]),
+                bool(post_data.get("submit_with_thumbnail", True)),
+                post_data.get("flair_id"),
+                post_data.get("navigation_submitted"),
+                post_data.get("navigation_current"),
+                post_data.get("navigation_scheduled"),
+                post_data.get("submission_id"),
+            ))
+
+        with self.connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO schedule (key, value) " +
+                "VALUES ('subreddit', ?)",
+                (subreddit,),
+            )
+            connection.execute("DELETE FROM posts")
+            connection.executemany(
+                "INSERT INTO posts ({0}) VALUES ({1})".format(
+                    ", ".join(("position",) + DOCUMENT_COLUMNS),
+                    ", ".join("?" * (len(DOCUMENT_COLUMNS) + 1)),
+                ),
+                post_rows,
+            )
+
+        log.info("schedule_database_store", post_count=len(post_rows))
+
+    def get_subreddit(self, connection: sqlite3.Connection) -> str:
+        """Return the subreddit of the Schedule stored in the database."""
+        row = connection.execute(
+            "SELECT value FROM schedule WHERE key = 'subreddit'",
+        ).fetchone()
+
+        if not row:
+            raise MissingSchedule(
+                "The schedule database is empty: {0}".format(
+                    self.schedule_database,
+                ),
+                hint="Import the schedule by the --import_schedule option.",
+            )
+
+        return row["value"]
+
+    def create_post_data(self, row: sqlite3.Row) -> PostData:
+        """Return the post data (as in the Schedule document) of the row."""
+        post_data: PostData = {
+            column: row[column] for column in DOCUMENT_COLUMNS
+        }
+        post_data["submit_at"] = datetime.strptime(
+            row["submit_at"],
+            STATE_DATETIME_FORMAT,
+        )
+        post_data["submit_with_thumbnail"] = bool(
+            row["submit_with_thumbnail"],
+        )
+
+        return post_data
+
+    def create_document_post(self, row: sqlite3.Row) -> PostData:
+        """
+        Return the post of the Schedule document stored in the row.
+
+        The empty columns and the default values are omitted.
+        """
+        post_data = self.create_post_data(row)
+
+        return {
+            column: post_data[column]
+            for column in DOCUMENT_COLUMNS
+            if post_data[column] is not None and (
+                DOCUMENT_DEFAULTS.get(column) != post_data[column]
+            )
+        }
+
+    def create_schema(self) -> None:
+        """Create the database and its schema if needed."""
+        Path(self.schedule_database).parent.mkdir(parents=True, exist_ok=True)
+
+        with closing(sqlite3.connect(self.schedule_database)) as connection:
+            connection.executescript(SCHEMA)
+
+    @contextmanager
+    def connect(self) -> Iterator[sqlite3.Connection]:
+        """
+        Open the database and run a transaction.
+
+        The transaction is committed when the block finishes (or rolled back
+        on an error) and the connection is closed.
+        """
+        with closing(sqlite3.connect(self.schedule_database)) as connection:
+            connection.row_factory = sqlite3.Row
+
+            with connection:
+                yield connection
+
+
+def read_post_body(path: str) -> str:
+    """Read the post body to be imported."""
+    try:
+        with open(path, encoding="utf-8") as post_body_file:
+            return post_body_file.read()
+    except FileNotFoundError as error:
+        raise MissingPost(
+            "The post file not found: {0}".format(path),
+        ) from error
@@ -1,59 +1,386 @@
 # -*- coding: utf-8 -*-
 
+import json
+import time
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from io import StringIO
-from typing import Dict, List, Union
-
-from ruamel.yaml import YAML, YAMLError  # type: ignore
+from typing import (
+    Callable,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Type,
+    TypeVar,
+    Union,
+)
+
+from ruamel.yaml import YAML  # type: ignore
 from structlog import get_logger
 
-from slow_start_rewatch.exceptions import InvalidSchedule
-from slow_start_rewatch.post import Post
+from slow_start_rewatch.codec import (
+    PostData,
+    PostsData,
+    ScheduleDocument,
+    dump_json,
+    parse_schedule_format,
+    read_schedule_document,
+)
+from slow_start_rewatch.exceptions import InvalidSchedule, ScheduleConflict
+from slow_start_rewatch.post import DeferredBody, Post
 from slow_start_rewatch.schedule.schedule import Schedule
+from slow_start_rewatch.schedule.schedule_cache import (
+    CachedSchedule,
+    ScheduleCache,
+    hash_post_bodies,
+)
+from slow_start_rewatch.schedule.schedule_source import ScheduleSource
 
 log = get_logger()
 
-# Type alias for posts YAML data.
-PostsData = List[
-    Dict[str, Union[str, datetime, bool, None]]
-]
+STATE_FORMAT_VERSION = 1
+
+ItemType = TypeVar("ItemType")
+StateValueType = TypeVar("StateValueType")
+
+# The format of the datetimes in the submission state (the microseconds are
+# always included so that the values are parsed by the same format):
+STATE_DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%S.%f"
 
 
 class ScheduleStorage(ABC):
-    """Stores data about scheduled posts."""
+    """
+    Stores data about scheduled posts.
+
+    The parsed schedule document and its revision in the storage are kept
+    after loading so that saving doesn't need to load and parse the schedule
+    again. The storage should refuse to save the data (by raising
+    `ScheduleConflict`) when the revision has changed in the meantime.
+
+    When `patch_in_place` is enabled, the submission IDs are patched into the
+    source of the Schedule data instead of dumping the whole document.
+
+    The Schedule data can be stored in the YAML or JSON format. The YAML
+    data are parsed by the `yaml_backend` (see :mod:`codec`).
+
+    The parsed Schedule is stored in the `schedule_cache` (if provided) and
+    reused until the Schedule data or the post bodies change.
+
+    The post bodies are loaded concurrently by up to `body_workers` threads.
+    When `lazy_bodies` is enabled, the posts are created with deferred bodies
+    which are loaded on the first use or by :meth:`load_deferred_bodies()`
+    (the `schedule_cache` is not used because it requires all the bodies).
+
+    When `submission_state` is enabled, the submission IDs and the timings
+    of the submitted posts are saved as the compact submission state (e.g. a
+    sidecar file) instead of updating the Schedule data. The submission state
+    is merged into the Schedule when it's loaded.
+    """
+
+    def __init__(
+        self,
+        patch_in_place: bool = False,
+        yaml_backend: Optional[str] = None,
+        schedule_cache: Optional[ScheduleCache] = None,
+        body_workers: int = 1,
+        lazy_bodies: bool = False,
+        submission_state: bool = False,
+    ) -> None:
+        """Initialize ScheduleStorage."""
+        self.patch_in_place = patch_in_place
+        self.yaml_backend = yaml_backend
+        self.schedule_cache = schedule_cache
+        self.body_workers = body_workers
+        self.lazy_bodies = lazy_bodies
+        self.submission_state = submission_state
+        self.schedule_document: Optional[ScheduleDocument] = None
+        self.schedule_source: Optional[ScheduleSource] = None
+        self.schedule_json = False
+        self.schedule_revision: Optional[str] = None
 
     def load(self) -> Schedule:
-        """Parse and load the schedule."""
-        yaml = YAML(typ="safe")
+        """
+        Load the schedule and merge the submission state (if enabled).
+
+        The submission IDs in the Schedule data take precedence over the
+        submission state.
+        """
+        schedule = self.load_schedule()
+
+        if self.submission_state:
+            self.merge_submission_state(schedule)
+
+        return schedule
+
+    def load_schedule(self) -> Schedule:
+        """
+        Parse and load the schedule.
+
+        The parsed Schedule is taken from the `schedule_cache` (if enabled)
+        when neither the Schedule data nor the post bodies have changed.
+        """
         schedule_data = self.load_schedule_data()
+        post_bodies: Dict[str, str] = {}
+        use_cache = self.schedule_cache and not self.lazy_bodies
 
-        try:
-            yaml_data = yaml.load(schedule_data)
-        except (YAMLError, AttributeError) as yaml_error:
-            log.exception("schedule_invalid")
-            raise InvalidSchedule(
-                "Failed to parse the data about the schedule.",
-                hint="Repair the structure of the schedule file.",
-            ) from yaml_error
+        if use_cache:
+            cached_schedule = self.load_cached_schedule(
+                schedule_data,
+                post_bodies,
+            )
+
+            if cached_schedule:
+                return cached_schedule
+
+        yaml_data = self.parse_schedule_document(schedule_data)
 
         try:
+            subreddit, posts_data = read_schedule_document(yaml_data)
             schedule = Schedule(
-                subreddit=yaml_data["subreddit"],
-                posts=self.load_posts(
-                    yaml_data["posts"],
-                    yaml_data["subreddit"],
-                ),
+                subreddit=subreddit,
+                posts=self.load_posts(posts_data, subreddit, post_bodies),
             )
-        except (AttributeError, KeyError) as missing_data_error:
+        except (AttributeError, KeyError, TypeError) as missing_data_error:
             log.exception("schedule_incomplete")
             raise InvalidSchedule(
                 "Incomplete schedule data.",
                 hint="Make sure all the fields are filled in.",
             ) from missing_data_error
 
+        if use_cache:
+            self.cache_schedule(schedule_data, schedule, post_bodies)
+
         return schedule
 
+    def merge_submission_state(self, schedule: Schedule) -> None:
+        """Merge the stored submission state into the Schedule."""
+        state_data = self.load_state_data()
+
+        if not state_data:
+            return
+
+        try:
+            posts_state = json.loads(state_data)["posts"]
+            merged_posts = [
+                self.merge_post_state(post, posts_state[post.name])
+                for post in schedule.posts
+                if post.name in posts_state
+            ]
+        except (ValueError, KeyError, TypeError) as state_error:
+            log.exception("submission_state_invalid")
+            raise InvalidSchedule(
+                "Failed to parse the submission state.",
+                hint="Repair the structure of the submission state.",
+            ) from state_error
+
+        for post in merged_posts:
+            schedule.mark_submitted(post)
+
+        log.info(
+            "submission_state_merge",
+            state_size=len(state_data),
+            merged_posts=len(merged_posts),
+        )
+
+    def merge_post_state(
+        self,
+        post: Post,
+        post_state: Mapping[str, object],
+    ) -> Post:
+        """
+        Merge the submission state of the Post.
+
+        Raise `TypeError` if a value of the submission state is invalid.
+        """
+        submitted_at = read_state_value(post_state, "submitted_at", str)
+
+        post.submission_id = post.submission_id or read_state_value(
+            post_state,
+            "submission_id",
+            str,
+        )
+        post.submitted_at = (
+            datetime.strptime(submitted_at, STATE_DATETIME_FORMAT) if (
+                submitted_at
+            ) else None
+        )
+        post.submit_latency = read_state_value(
+            post_state,
+            "submit_latency",
+            float,
+        )
+        post.release_jitter = read_state_value(
+            post_state,
+            "release_jitter",
+            float,
+        )
+
+        return post
+
+    def dump_submission_state(self, schedule: Schedule) -> str:
+        """Dump the submission state of the submitted posts to JSON."""
+        posts_state = {}
+
+        for post in schedule.posts:
+            if not post.submission_id:
+                continue
+
+            posts_state[post.name] = {
+                "submission_id": post.submission_id,
+                "submitted_at": (
+                    post.submitted_at.strftime(STATE_DATETIME_FORMAT) if (
+                        post.submitted_at
+                    ) else None
+                ),
+                "submit_latency": post.submit_latency,
+                "release_jitter": post.release_jitter,
+            }
+
+        return json.dumps(
+            {"version": STATE_FORMAT_VERSION, "posts": posts_state},
+            separators=(",", ":"),
+        )
+
+    @abstractmethod
+    def load_state_data(self) -> Optional[str]:
+        """
+        Load the submission state from the storage.
+
+        Return `None` if the submission state hasn't been saved yet.
+        """
+
+    @abstractmethod
+    def save_state_data(self, state_data: str) -> None:
+        """Save the submission state to the storage."""
+
+    def shutdown(self) -> None:
+        """Release the resources of the storage (e.g. the worker threads)."""
+
+    def load_cached_schedule(
+        self,
+        schedule_data: str,
+        post_bodies: Dict[str, str],
+    ) -> Optional[Schedule]:
+        """
+        Load the Schedule from the cache.
+
+        The post bodies are loaded into (the empty) `post_bodies` so that
+        they can be reused when the cached entry is stale. Return `None` if
+        the entry doesn't exist or if it's stale.
+        """
+        if not self.schedule_cache:
+            return None
+
+        cached_schedule = self.schedule_cache.get(schedule_data)
+
+        if not cached_schedule:
+            return None
+
+        self.load_post_bodies(cached_schedule.body_sources, post_bodies)
+
+        if hash_post_bodies(post_bodies) != cached_schedule.body_digest:
+            log.info("schedule_cache_stale")
+            return None
+
+        log.info("schedule_cache_load", post_count=len(cached_schedule.posts))
+        self.schedule_document = cached_schedule.schedule_document
+        self.schedule_source = cached_schedule.schedule_source
+        self.schedule_json = cached_schedule.schedule_json
+
+        return Schedule(
+            subreddit=cached_schedule.subreddit,
+            posts=cached_schedule.posts,
+        )
+
+    def cache_schedule(
+        self,
+        schedule_data: str,
+        schedule: Schedule,
+        post_bodies: Dict[str, str],
+    ) -> None:
+        """Store the loaded Schedule in the cache."""
+        if not self.schedule_cache or self.schedule_document is None:
+            return
+
+        self.schedule_cache.put(
+            schedule_data,
+            CachedSchedule(
+                subreddit=schedule.subreddit,
+                posts=schedule.posts,
+                body_sources=list(post_bodies),
+                body_digest=hash_post_bodies(post_bodies),
+                schedule_document=self.schedule_document,
+                schedule_source=self.schedule_source,
+                schedule_json=self.schedule_json,
+            ),
+        )
+
+    def load_schedule_document(self) -> ScheduleDocument:
+        """
+        Load and parse the schedule data.
+
+        The storage should set :attr:`schedule_revision` when loading the
+        data.
+        """
+        return self.parse_schedule_document(self.load_schedule_data())
+
+    def parse_schedule_document(self, schedule_data: str) -> ScheduleDocument:
+        """Parse the schedule data and keep the parsed document."""
+        try:
+            yaml_data, schedule_json = parse_schedule_format(
+                schedule_data,
+                backend=self.yaml_backend,
+            )
+        except (ValueError, AttributeError) as yaml_error:
+            log.exception("schedule_invalid")
+            raise InvalidSchedule(
+                "Failed to parse the data about the schedule.",
+                hint="Repair the structure of the schedule file.",
+            ) from yaml_error
+
+        if not isinstance(yaml_data, dict):
+            log.error("schedule_invalid")
+            raise InvalidSchedule(
+                "The schedule data must be a mapping.",
+                hint="Repair the structure of the schedule file.",
+            )
+
+        self.schedule_document = yaml_data
+        self.schedule_json = schedule_json
+        self.schedule_source = None
+
+        if self.patch_in_place and not self.schedule_json:
+            self.schedule_source = self.create_schedule_source(
+                schedule_data,
+                yaml_data,
+            )
+
+        return yaml_data
+
+    def create_schedule_source(
+        self,
+        schedule_data: str,
+        yaml_data: ScheduleDocument,
+    ) -> Optional[ScheduleSource]:
+        """
+        Create the source of the Schedule data for patching.
+
+        Return `None` when the structure of the data is not supported so
+        that the whole document is dumped when saving.
+        """
+        try:
+            _, posts_data = read_schedule_document(yaml_data)
+            return ScheduleSource(
+                schedule_data,
+                [str(post_data["name"]) for post_data in posts_data],
+            )
+        except (ValueError, AttributeError, KeyError, TypeError):
+            log.warning("schedule_source_unsupported", exc_info=True)
+
+        return None
+
     @abstractmethod
     def load_schedule_data(self) -> str:
         """Load schedule data from the storage."""
@@ -62,33 +389,33 @@ class ScheduleStorage(ABC):
         self,
         posts_data: PostsData,
         subreddit: str,
+        post_bodies: Optional[Dict[str, str]] = None,
     ) -> List[Post]:
-        """Parse and load scheduled posts."""
-        posts = []
-
-        for post_data in posts_data:
-            if not isinstance(post_data["submit_at"], datetime):
-                log.exception("schedule_incomplete")
-                raise InvalidSchedule(
-                    (
-                        "The 'submit_at' field of the scheduled post '{0}' " +
-                        "contains an invalid value."
-                    ).format(
-                        post_data["name"],
-                    ),
-                    hint="All dates must be in 'YYYY-MM-DD hh:mm:ss' format.",
-                )
+        """
+        Parse and load scheduled posts.
 
-            post_body = self.load_post_body(
-                str(post_data["body_template"]),
-            )
+        The data of all the posts are validated before loading the post
+        bodies. The loaded post bodies are kept in `post_bodies` (by the
+        source). The bodies are not loaded when `lazy_bodies` is enabled.
+        """
+        submit_times = [
+            self.read_submit_at(post_data) for post_data in posts_data
+        ]
+        body_sources = [
+            str(post_data["body_template"]) for post_data in posts_data
+        ]
+        body_templates = self.create_body_templates(
+            body_sources,
+            {} if post_bodies is None else post_bodies,
+        )
 
-            post = Post(
+        return [
+            Post(
                 name=str(post_data["name"]),
-                submit_at=post_data["submit_at"],
+                submit_at=submit_at,
                 subreddit=subreddit,
                 title=str(post_data["title"]),
-                body_template=post_body,
+                body_template=body_templates[body_source],
                 submit_with_thumbnail=post_data.get(
                     "submit_with_thumbnail",
                     True,
@@ -99,10 +426,151 @@ class ScheduleStorage(ABC):
                 navigation_scheduled=post_data.get("navigation_scheduled"),
                 submission_id=post_data.get("submission_id"),
             )
+            for post_data, submit_at, body_source in zip(
+                posts_data,
+                submit_times,
+                body_sources,
+            )
+        ]
+
+    def read_submit_at(
+        self,
+        post_data: PostData,
+    ) -> datetime:
+        """Read and validate the release time of the scheduled post."""
+        submit_at = post_data["submit_at"]
+
+        if not isinstance(submit_at, datetime):
+            log.exception("schedule_incomplete")
+            raise InvalidSchedule(
+                (
+                    "The 'submit_at' field of the scheduled post '{0}' " +
+                    "contains an invalid value."
+                ).format(
+                    post_data["name"],
+                ),
+                hint="All dates must be in 'YYYY-MM-DD hh:mm:ss' format.",
+            )
+
+        return submit_at
+
+    def create_body_templates(
+        self,
+        body_sources: List[str],
+        post_bodies: Dict[str, str],
+    ) -> Dict[str, Union[str, DeferredBody]]:
+        """
+        Create the body templates of the posts (by the source).
+
+        The bodies are deferred when `lazy_bodies` is enabled. Otherwise, they
+        are loaded and kept in `post_bodies`.
+        """
+        body_templates: Dict[str, Union[str, DeferredBody]] = {}
+
+        if self.lazy_bodies:
+            for body_source in body_sources:
+                body_templates.setdefault(
+                    body_source,
+                    DeferredBody(body_source, self.load_post_body_timed),
+                )
+        else:
+            self.load_post_bodies(body_sources, post_bodies)
+            body_templates.update(post_bodies)
+
+        return body_templates
+
+    def load_post_bodies(
+        self,
+        body_sources: List[str],
+        post_bodies: Dict[str, str],
+    ) -> None:
+        """
+        Load the post bodies missing in `post_bodies`.
+
+        Each source is loaded only once. The bodies are loaded concurrently
+        by up to `body_workers` threads. If loading of any body fails, the
+        error of the first failing source (in the order of the sources) is
+        raised.
+        """
+        missing_sources = [
+            body_source
+            for body_source in dict.fromkeys(body_sources)
+            if body_source not in post_bodies
+        ]
+
+        if not missing_sources:
+            return
+
+        post_bodies.update(zip(
+            missing_sources,
+            self.map_concurrently(self.load_post_body_timed, missing_sources),
+        ))
+
+    def load_deferred_bodies(self, posts: List[Post]) -> int:
+        """
+        Load the deferred bodies of the posts concurrently.
+
+        Return the number of the loaded bodies.
+        """
+        deferred_bodies: Dict[str, DeferredBody] = {}
+
+        for post in posts:
+            deferred_body = post.deferred_body
+
+            if deferred_body:
+                deferred_bodies.setdefault(deferred_body.source, deferred_body)
+
+        if deferred_bodies:
+            self.map_concurrently(
+                DeferredBody.resolve,
+                list(deferred_bodies.values()),
+            )
+
+        return len(deferred_bodies)
+
+    def map_concurrently(
+        self,
+        function: Callable[[ItemType], str],
+        items: List[ItemType],
+    ) -> List[str]:
+        """
+        Map the items using up to `body_workers` threads.
+
+        The results are in the order of the items and the first raised error
+        (in the order of the items) is re-raised.
+        """
+        start_time = time.monotonic()
+
+        if self.body_workers > 1 and len(items) > 1:
+            with ThreadPoolExecutor(
+                max_workers=self.body_workers,
+                thread_name_prefix="post_body_load",
+            ) as executor:
+                results = list(executor.map(function, items))
+        else:
+            results = [function(item) for item in items]
+
+        log.info(
+            "post_bodies_load_result",
+            body_count=len(items),
+            workers=self.body_workers,
+            elapsed=(time.monotonic() - start_time) * 1000,
+        )
+
+        return results
 
-            posts.append(post)
+    def load_post_body_timed(self, body_template_source: str) -> str:
+        """Load a post body and log the latency."""
+        start_time = time.monotonic()
+        post_body = self.load_post_body(body_template_source)
 
-        return posts
+        log.debug(
+            "post_body_load",
+            body_template_source=body_template_source,
+            latency=(time.monotonic() - start_time) * 1000,
+        )
+
+        return post_body
 
     @abstractmethod
     def load_post_body(self, body_template_source: str) -> str:
@@ -112,25 +580,82 @@ class ScheduleStorage(ABC):
         """
         Save the Schedule.
 
-        1. Load the Schedule data.
+        When the submission state is enabled, only the submission state is
+        saved. Otherwise:
+
+        1. Save the Schedule document loaded previously.
+
+        2. Load the document again and retry the saving if the Schedule data
+           have been modified in the storage in the meantime.
+        """
+        if self.submission_state:
+            state_data = self.dump_submission_state(schedule)
+            log.info("submission_state_save", state_size=len(state_data))
+            self.save_state_data(state_data)
+            return
+
+        try:
+            self.save_schedule_document(schedule)
+        except ScheduleConflict:
+            log.warning("schedule_conflict", revision=self.schedule_revision)
+            self.load_schedule_document()
+            self.save_schedule_document(schedule)
+
+    def save_schedule_document(self, schedule: Schedule) -> None:
+        """
+        Save the Schedule document.
 
-        2. Populate the Schedule Data with the post IDs of submitted posts.
+        1. Load the Schedule document if it hasn't been loaded yet.
 
-        3. Save the Schedule data.
+        2. Populate the document with the post IDs of submitted posts.
+
+        3. Patch the source of the Schedule data (if available) or dump the
+           document.
+
+        4. Save the Schedule data.
         """
-        yaml_content = self.load_schedule_data()
+        yaml_data = self.schedule_document
+
+        if yaml_data is None:
+            yaml_data = self.load_schedule_document()
+
+        _, posts_data = read_schedule_document(yaml_data)
+        yaml_data["posts"] = self.update_submitted_posts(posts_data, schedule)
+
+        if self.schedule_source:
+            schedule_data = self.patch_schedule_source(
+                self.schedule_source,
+                schedule,
+            )
+        else:
+            schedule_data = self.dump_schedule_document(yaml_data)
+
+        self.save_schedule_data(schedule_data)
+
+    def patch_schedule_source(
+        self,
+        schedule_source: ScheduleSource,
+        schedule: Schedule,
+    ) -> str:
+        """Patch the submission IDs into the source of the Schedule data."""
+        for post in schedule.posts:
+            if post.submission_id:
+                schedule_source.set_submission_id(
+                    post.name,
+                    post.submission_id,
+                )
+
+        return str(schedule_source)
+
+    def dump_schedule_document(self, yaml_data: ScheduleDocument) -> str:
+        """Dump the Schedule document to YAML (or JSON if loaded as JSON)."""
+        if self.schedule_json:
+            return dump_json(yaml_data)
 
         yaml = YAML(typ="safe")
         yaml.default_flow_style = False
         yaml.sort_base_mapping_type_on_output = False
 
-        yaml_data = yaml.load(yaml_content)
-
-        yaml_data["posts"] = self.update_submitted_posts(
-            yaml_data["posts"],
-            schedule,
-        )
-
         string_stream = StringIO()
 
         yaml.dump(yaml_data, string_stream)
@@ -138,7 +663,7 @@ class ScheduleStorage(ABC):
         schedule_data = string_stream.getvalue()
         string_stream.close()
 
-        self.save_schedule_data(schedule_data)
+        return schedule_data
 
     def update_submitted_posts(
         self,
@@ -146,20 +671,39 @@ class ScheduleStorage(ABC):
         schedule: Schedule,
     ) -> PostsData:
         """Populate the data with IDs of submitted posts."""
-        submission_ids = {
-            post.name: post.submission_id
-            for post in schedule.posts
-        }
-
         for index, post_data in enumerate(posts_data):
-            post_name = str(post_data.get("name"))
-            submission_id = submission_ids.get(post_name)
+            post = schedule.get_post(str(post_data.get("name")))
 
-            if submission_id:
-                posts_data[index]["submission_id"] = submission_id
+            if post and post.submission_id:
+                posts_data[index]["submission_id"] = post.submission_id
 
         return posts_data
 
     @abstractmethod
     def save_schedule_data(self, schedule_data: str) -> None:
-        """Save schedule data to the storage."""
+        """
+        Save schedule data to the storage.
+
+        Raise `ScheduleConflict` if the revision in the storage doesn't match
+        :attr:`schedule_revision` and update the revision after saving.
+        """
+
+
+def read_state_value(
+    post_state: Mapping[str, object],
+    key: str,
+    value_type: Type[StateValueType],
+) -> Optional[StateValueType]:
+    """
+    Return the value of the submission state (or `None` if it's not set).
+
+    Raise `TypeError` if the value is not of the expected type.
+    """
+    state_value = post_state[key]
+
+    if state_value is None or isinstance(state_value, value_type):
+        return state_value
+
+    raise TypeError(
+        "Invalid value of '{0}' in the submission state.".format(key),
+    )
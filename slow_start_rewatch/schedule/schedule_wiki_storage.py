@@ -2,10 +2,18 @@
 
 import re
 import textwrap
+from concurrent import futures
+from typing import Callable, Optional, Tuple, TypeVar
 
 import click
 from praw import Reddit
-from prawcore.exceptions import Forbidden, NotFound, PrawcoreException
+from praw.models import WikiPage
+from prawcore.exceptions import (
+    Conflict,
+    Forbidden,
+    NotFound,
+    PrawcoreException,
+)
 from structlog import get_logger
 
 from slow_start_rewatch.config import Config
@@ -14,14 +22,38 @@ from slow_start_rewatch.exceptions import (
     MissingPost,
     MissingSchedule,
     RedditError,
+    ScheduleConflict,
 )
+from slow_start_rewatch.schedule.schedule_cache import create_schedule_cache
 from slow_start_rewatch.schedule.schedule_storage import ScheduleStorage
+from slow_start_rewatch.schedule.wiki_mirror import (
+    PageSnapshot,
+    create_wiki_mirror,
+)
 
 log = get_logger()
 
+STATE_PAGE_SUFFIX = "_submission_state"
+
+ArgumentType = TypeVar("ArgumentType")
+ResultType = TypeVar("ResultType")
+
 
 class ScheduleWikiStorage(ScheduleStorage):
-    """Stores data about scheduled posts in Reddit wiki."""
+    """
+    Stores data about scheduled posts in Reddit wiki.
+
+    The wiki pages are read from the local mirror (if enabled) unless they
+    have been modified since they were mirrored.
+
+    When `offline_fallback` is enabled and Reddit doesn't respond within the
+    `fetch_deadline` or returns an error, the last mirrored snapshot of the
+    page is used. The request continues in the background and the mirror
+    is updated once it finishes.
+
+    The submission state is stored in a separate wiki page (the schedule wiki
+    page path with the `_submission_state` suffix).
+    """
 
     def __init__(
         self,
@@ -29,7 +61,14 @@ class ScheduleWikiStorage(ScheduleStorage):
         reddit: Reddit,
     ) -> None:
         """Initialize ScheduleWikiStorage."""
-        super().__init__()
+        super().__init__(
+            patch_in_place=config["schedule_storage.patch_in_place"],
+            yaml_backend=config["schedule_storage.yaml_backend"],
+            schedule_cache=create_schedule_cache(config),
+            body_workers=config["schedule_storage.body_workers"],
+            lazy_bodies=config["schedule_storage.lazy_bodies"],
+            submission_state=config["schedule_storage.submission_state"],
+        )
 
         self.reddit = reddit
 
@@ -54,8 +93,25 @@ class ScheduleWikiStorage(ScheduleStorage):
 
         self.wiki_path = match.group("path")
         self.wiki_subreddit = match.group("subreddit")
+        self.state_wiki_path = "{0}{1}".format(
+            self.wiki_path,
+            STATE_PAGE_SUFFIX,
+        )
 
         self.wiki = self.reddit.subreddit(self.wiki_subreddit).wiki
+        self.wiki_mirror = create_wiki_mirror(config, self.wiki_subreddit)
+        self.offline_fallback: bool = bool(
+            self.wiki_mirror and config["wiki_mirror.offline_fallback"],
+        )
+        self.fetch_deadline: int = 0
+        self.fetch_executor: Optional[futures.ThreadPoolExecutor] = None
+
+        if self.offline_fallback:
+            self.fetch_deadline = config["wiki_mirror.fetch_deadline"]
+            self.fetch_executor = futures.ThreadPoolExecutor(
+                max_workers=self.body_workers + 1,
+                thread_name_prefix="wiki_fetch",
+            )
 
     def load_schedule_data(self) -> str:
         """Load schedule data from the wiki."""
@@ -74,8 +130,12 @@ class ScheduleWikiStorage(ScheduleStorage):
             ),
         )
 
+        self.sync_wiki_mirror()
+
         try:
-            schedule_data = self.wiki[self.wiki_path].content_md
+            schedule_data, self.schedule_revision = self.read_wiki_page(
+                self.wiki_path,
+            )
         except NotFound as error:
             log.exception("schedule_wiki_missing")
             raise MissingSchedule(
@@ -94,7 +154,8 @@ class ScheduleWikiStorage(ScheduleStorage):
                 ),
             ) from error
 
-        return schedule_data
+        # Remove the indentation added by :meth:`save_schedule_data()`.
+        return textwrap.dedent(schedule_data)
 
     def load_post_body(self, body_template_source: str) -> str:
         """Load a post body from the wiki."""
@@ -118,7 +179,7 @@ class ScheduleWikiStorage(ScheduleStorage):
         )
 
         try:
-            post_body = self.wiki[wiki_path].content_md
+            post_body, _ = self.read_wiki_page(wiki_path)
         except NotFound as error:
             log.exception("post_wiki_missing")
             raise MissingPost(
@@ -139,24 +200,231 @@ class ScheduleWikiStorage(ScheduleStorage):
 
         return post_body
 
+    def load_state_data(self) -> Optional[str]:
+        """
+        Load the submission state from the wiki.
+
+        Return `None` if the wiki page doesn't exist yet.
+        """
+        log.info(
+            "submission_state_wiki_read",
+            subreddit=self.wiki_subreddit,
+            wiki_path=self.state_wiki_path,
+        )
+
+        try:
+            state_data, _ = self.read_wiki_page(self.state_wiki_path)
+        except NotFound:
+            return None
+        except Forbidden as error:
+            log.exception("submission_state_wiki_access_denied")
+            raise MissingSchedule(
+                "Missing permissions to access the submission state wiki " +
+                "page: /r/{0}/wiki/{1}".format(
+                    self.wiki_subreddit,
+                    self.state_wiki_path,
+                ),
+            ) from error
+
+        return textwrap.dedent(state_data)
+
+    def save_state_data(self, state_data: str) -> None:
+        """
+        Save the submission state to the wiki.
+
+        The content is indented by 4 spaces for better formatting on Reddit.
+        """
+        log.info(
+            "submission_state_wiki_update",
+            subreddit=self.wiki_subreddit,
+            wiki_path=self.state_wiki_path,
+        )
+
+        try:
+            self.wiki[self.state_wiki_path].edit(
+                content=textwrap.indent(text=state_data, prefix="    "),
+                reason="Rewatch Update",
+            )
+        except PrawcoreException as error:
+            log.exception("submission_state_wiki_update_failed")
+            raise RedditError(
+                "Failed to update the submission state wiki page: " +
+                "/r/{0}/wiki/{1} Error: {2}".format(
+                    self.wiki_subreddit,
+                    self.state_wiki_path,
+                    str(error),
+                ),
+            ) from error
+
+        if self.wiki_mirror:
+            self.wiki_mirror.mark_stale(self.state_wiki_path)
+
+    def sync_wiki_mirror(self) -> None:
+        """
+        Synchronize the wiki mirror with the recent wiki revisions.
+
+        With the offline fallback, the synchronization is waited for only
+        until the fetch deadline (it continues in the background).
+        """
+        if not self.wiki_mirror:
+            return
+
+        try:
+            self.run_with_deadline(self.wiki_mirror.sync, self.wiki)
+        except futures.TimeoutError:
+            log.warning(
+                "wiki_mirror_sync_timeout",
+                deadline=self.fetch_deadline,
+            )
+
+    def read_wiki_page(self, wiki_path: str) -> Tuple[str, Optional[str]]:
+        """
+        Return the content and the revision ID of the wiki page.
+
+        The page is read from the mirror if it's current. Otherwise, the page
+        is fetched and stored in the mirror.
+
+        With the offline fallback, the snapshot of the page is returned when
+        the fetch fails or exceeds the deadline (the missing pages and the
+        missing permissions are not considered failures). The fetch is
+        waited for if there's no snapshot.
+        """
+        mirrored_page = self.wiki_mirror and self.wiki_mirror.get_page(
+            wiki_path,
+        )
+
+        if mirrored_page:
+            return mirrored_page
+
+        if not self.wiki_mirror or not self.fetch_executor:
+            return self.fetch_wiki_page(wiki_path)
+
+        future = self.fetch_executor.submit(self.fetch_wiki_page, wiki_path)
+
+        try:
+            return future.result(timeout=self.fetch_deadline / 1000)
+        except (NotFound, Forbidden):
+            raise
+        except (PrawcoreException, futures.TimeoutError):
+            log.warning("wiki_fetch_failed", wiki_path=wiki_path, exc_info=True)
+
+        return self.use_wiki_snapshot(
+            wiki_path,
+            self.wiki_mirror.get_snapshot(wiki_path),
+            future,
+        )
+
+    def use_wiki_snapshot(
+        self,
+        wiki_path: str,
+        snapshot: Optional[PageSnapshot],
+        future: "futures.Future[Tuple[str, Optional[str]]]",
+    ) -> Tuple[str, Optional[str]]:
+        """
+        Return the snapshot of the wiki page which failed to fetch.
+
+        The pending fetch is waited for if there's no snapshot.
+        """
+        if not snapshot:
+            log.warning("wiki_snapshot_missing", wiki_path=wiki_path)
+            return future.result()
+
+        content_md, revision_id, snapshot_age = snapshot
+        log.warning(
+            "wiki_snapshot_use",
+            wiki_path=wiki_path,
+            snapshot_age=snapshot_age,
+        )
+        click.echo(
+            click.style(
+                "Reddit is not responding, using the local copy of " +
+                "/r/{0}/wiki/{1} ({2:.0f} minutes old).".format(
+                    self.wiki_subreddit,
+                    wiki_path,
+                    snapshot_age / 60,
+                ),
+                fg="yellow",
+            ),
+        )
+
+        return content_md, revision_id
+
+    def fetch_wiki_page(self, wiki_path: str) -> Tuple[str, Optional[str]]:
+        """Fetch the wiki page and store it in the mirror."""
+        wiki_page = self.wiki[wiki_path]
+        content_md = wiki_page.content_md
+        revision_id = wiki_page.revision_id
+
+        if self.wiki_mirror:
+            self.wiki_mirror.put_page(wiki_path, content_md, revision_id)
+
+        return content_md, revision_id
+
+    def run_with_deadline(
+        self,
+        function: Callable[[ArgumentType], ResultType],
+        argument: ArgumentType,
+    ) -> ResultType:
+        """
+        Run the function and wait for the result until the fetch deadline.
+
+        Raise `concurrent.futures.TimeoutError` when the deadline is exceeded
+        (the function continues in the background). The function is called
+        directly without the offline fallback.
+        """
+        if not self.fetch_executor:
+            return function(argument)
+
+        return self.fetch_executor.submit(function, argument).result(
+            timeout=self.fetch_deadline / 1000,
+        )
+
+    def shutdown(self) -> None:
+        """
+        Shut down the fetch executor.
+
+        The fetches exceeding the deadline are not waited for.
+        """
+        if self.fetch_executor:
+            self.fetch_executor.shutdown(wait=False)
+
     def save_schedule_data(self, schedule_data: str) -> None:
         """
         Save the schedule data to the wiki.
 
         The content is indented by 4 spaces for better formatting on Reddit.
+
+        The edit is based on the loaded revision so that Reddit rejects the
+        edit if the wiki page has been modified in the meantime.
         """
         log.info(
             "schedule_wiki_update",
             subreddit=self.wiki_subreddit,
             wiki_path=self.wiki_path,
+            revision=self.schedule_revision,
         )
         schedule_data = textwrap.indent(text=schedule_data, prefix="    ")
+        edit_settings = {}
+
+        if self.schedule_revision:
+            edit_settings["previous"] = self.schedule_revision
 
         try:
-            self.wiki[self.wiki_path].edit(
+            wiki_page = self.wiki[self.wiki_path]
+            wiki_page.edit(
                 content=schedule_data,
                 reason="Rewatch Update",
+                **edit_settings,
             )
+        except Conflict as conflict:
+            log.warning("schedule_wiki_conflict")
+            raise ScheduleConflict(
+                "The schedule wiki page has been modified: " +
+                "/r/{0}/wiki/{1}".format(
+                    self.wiki_subreddit,
+                    self.wiki_path,
+                ),
+            ) from conflict
         except (PrawcoreException, KeyError) as error:
             log.exception("schedule_wiki_update_failed")
             raise RedditError(
@@ -167,3 +435,31 @@ class ScheduleWikiStorage(ScheduleStorage):
                     str(error),
                 ),
             ) from error
+
+        self.schedule_revision = self.load_latest_revision(wiki_page)
+
+        if self.wiki_mirror:
+            # Keep the saved data as the snapshot (the page is fetched again
+            # next time because Reddit might have modified the content).
+            self.wiki_mirror.mark_stale(self.wiki_path)
+            self.wiki_mirror.put_page(
+                self.wiki_path,
+                schedule_data,
+                self.schedule_revision,
+                is_current=False,
+            )
+
+    def load_latest_revision(self, wiki_page: WikiPage) -> Optional[str]:
+        """
+        Return the ID of the latest revision of the wiki page.
+
+        Only the revision list is requested (not the content of the page).
+        Return `None` if the revision is not available.
+        """
+        try:
+            for revision in wiki_page.revisions(limit=1):
+                return revision["id"]
+        except PrawcoreException:
+            log.exception("schedule_wiki_revision_error")
+
+        return None
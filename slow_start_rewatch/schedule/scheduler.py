@@ -1,26 +1,45 @@
 # -*- coding: utf-8 -*-
 
-from datetime import datetime
-from typing import Iterator, List, Optional
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Set, Tuple
 
 from praw import Reddit
 from structlog import get_logger
 
 from slow_start_rewatch.config import Config
-from slow_start_rewatch.exceptions import MissingSchedule
-from slow_start_rewatch.post import Post
+from slow_start_rewatch.exceptions import ConfigError, MissingSchedule
+from slow_start_rewatch.post import Post, PostUpdate
 from slow_start_rewatch.post_helper import PostHelper
 from slow_start_rewatch.schedule.schedule import Schedule
 from slow_start_rewatch.schedule.schedule_file_storage import (
     ScheduleFileStorage,
 )
+from slow_start_rewatch.schedule.schedule_persister import (
+    create_schedule_persister,
+)
+from slow_start_rewatch.schedule.schedule_sqlite_storage import (
+    ScheduleSqliteStorage,
+)
 from slow_start_rewatch.schedule.schedule_storage import ScheduleStorage
 from slow_start_rewatch.schedule.schedule_wiki_storage import (
     ScheduleWikiStorage,
 )
+from slow_start_rewatch.schedule.submission_journal import (
+    STEP_SAVE,
+    STEP_SUBMIT,
+    create_submission_journal,
+    hash_post,
+)
 
 log = get_logger()
 
+# Type alias for the result of the background preparation: the Markdown body
+# used for the conversion and the monotonic time of the preparation.
+PreparedPost = Tuple[Optional[str], float]
+
 
 class Scheduler(object):
     """Manages data about scheduled posts."""
@@ -35,20 +54,56 @@ class Scheduler(object):
         self.reddit = reddit
         self.post_helper = PostHelper(config, reddit)
 
+        self.prepare_lookahead: int = config["scheduler.prepare_lookahead"]
+        self.prepare_max_age: int = config["scheduler.prepare_max_age"]
+        self.body_window: int = config["scheduler.body_window"]
+        self.prepare_executor = ThreadPoolExecutor(
+            max_workers=config["scheduler.prepare_workers"],
+            thread_name_prefix="post_prepare",
+        )
+        self.prepared_posts: Dict[str, "Future[PreparedPost]"] = {}
+        self._preparation_condition = threading.Condition()
+        self._is_preparation_paused = False
+        self._active_preparations = 0
+        self.dependents: Dict[str, Set[str]] = {}
+
         self.schedule_storage: ScheduleStorage
         if config["schedule_wiki_url"]:
             self.schedule_storage = ScheduleWikiStorage(config, reddit)
+        elif config["schedule_database"]:
+            self.schedule_storage = ScheduleSqliteStorage(config)
         elif config["schedule_file"]:
             self.schedule_storage = ScheduleFileStorage(config)
         else:
             raise MissingSchedule(
                 "Schedule storage not defined.",
-                hint="The Schedule must be stored in a file or Reddit's wiki.",
+                hint="The Schedule must be stored in a file, a database, or " +
+                "Reddit's wiki.",
             )
 
+        self.submission_journal = create_submission_journal(config)
+        self.schedule_persister = create_schedule_persister(
+            config,
+            self.schedule_storage,
+            on_save=self.record_saved_posts,
+        )
+
     def load(self) -> None:
-        """Load the schedule from the storage."""
+        """
+        Load the schedule from the storage.
+
+        Recover the journaled submissions which haven't been saved. Load the
+        deferred bodies of the upcoming posts and build the dependency graph
+        of the posts and the render context.
+        """
         self.schedule = self.schedule_storage.load()
+        self.schedule_persister.recover(self.schedule)
+        self.load_body_window(self.schedule.get_pending_posts(
+            after_time=datetime.utcnow(),
+            limit=self.prepare_lookahead + 1,
+        ))
+        self.dependents = self.post_helper.build_dependents(self.schedule)
+        self.post_helper.get_render_context(self.schedule)
 
     def get_scheduled_posts(self) -> Iterator[Post]:
         """Provide a generator of the scheduled posts."""
@@ -61,7 +116,13 @@ class Scheduler(object):
             yield post
 
     def get_next_post(self) -> Optional[Post]:
-        """Find, prepare, and return the next scheduled posts."""
+        """
+        Find, prepare, and return the next scheduled posts.
+
+        The posts scheduled after the next post (up to the prepare lookahead)
+        are prepared in the background. The dependency graph is rebuilt when
+        deferred post bodies are loaded.
+        """
         if not self.schedule:
             raise RuntimeError(
                 "The Schedule must be loaded before calling this method.",
@@ -70,47 +131,374 @@ class Scheduler(object):
         current_time = datetime.utcnow()
         log.debug("get_next_post", after_time=current_time)
 
-        for post in self.schedule.posts:
-            if not post.submission_id and post.submit_at > current_time:
-                next_post = post
-                break
-        else:
+        upcoming_posts = self.schedule.get_pending_posts(
+            after_time=current_time,
+            limit=self.prepare_lookahead + 1,
+        )
+
+        if not upcoming_posts:
             return None
 
+        if self.load_body_window(upcoming_posts):
+            self.dependents = self.post_helper.build_dependents(self.schedule)
+
+        next_post = upcoming_posts[0]
+
+        for upcoming_post in upcoming_posts[1:]:
+            self.schedule_preparation(upcoming_post)
+
+        self.finish_preparation(next_post)
+
+        return next_post
+
+    def load_body_window(self, posts: List[Post]) -> int:
+        """
+        Load the deferred bodies of the posts and the posts around them.
+
+        The posts up to the body window around the provided posts are
+        included so that their dependencies (e.g. the Navigation Links) are
+        known. Return the number of the loaded bodies.
+        """
+        if not self.schedule:
+            raise RuntimeError(
+                "The schedule must be loaded before calling this method.",
+            )
+
+        return self.schedule_storage.load_deferred_bodies(
+            self.schedule.get_surrounding_posts(posts, self.body_window),
+        )
+
+    def load_submitted_bodies(self) -> None:
+        """
+        Load the deferred bodies of the submitted posts.
+
+        The dependency graph is rebuilt when any body is loaded because the
+        posts with a deferred body are missing in the graph.
+        """
+        if not self.schedule:
+            raise RuntimeError(
+                "The schedule must be loaded before calling this method.",
+            )
+
+        submitted_posts = [
+            post for post in self.schedule.posts if post.submission_id
+        ]
+
+        if self.schedule_storage.load_deferred_bodies(submitted_posts):
+            self.dependents = self.post_helper.build_dependents(self.schedule)
+
+    def schedule_preparation(self, post: Post) -> None:
+        """Start the preparation of the post in the background."""
+        if post.name in self.prepared_posts:
+            return
+
+        log.debug("post_prepare_schedule", post=str(post))
+        self.prepared_posts[post.name] = self.prepare_executor.submit(
+            self.prepare_in_background,
+            post,
+        )
+
+    def prepare_in_background(self, post: Post) -> PreparedPost:
+        """
+        Prepare the post including the thumbnail (run by a worker).
+
+        The preparation doesn't start while the preparations are paused.
+        """
+        if not self.schedule:
+            raise RuntimeError(
+                "The schedule must be loaded before calling this method.",
+            )
+
+        with self._preparation_condition:
+            self._preparation_condition.wait_for(
+                lambda: not self._is_preparation_paused,
+            )
+            self._active_preparations += 1
+
+        try:
+            self.post_helper.prepare_post(
+                post=post,
+                schedule=self.schedule,
+                prepare_thumbnail=True,
+            )
+        finally:
+            with self._preparation_condition:
+                self._active_preparations -= 1
+                self._preparation_condition.notify_all()
+
+        return post.body_md, time.monotonic()
+
+    def pause_preparation(self) -> None:
+        """
+        Don't start new background preparations until resumed.
+
+        Wait for the running preparations to finish so that they don't send
+        requests to Reddit during the submission.
+        """
+        log.debug("post_prepare_pause")
+        with self._preparation_condition:
+            self._is_preparation_paused = True
+            self._preparation_condition.wait_for(
+                lambda: not self._active_preparations,
+            )
+
+    def resume_preparation(self) -> None:
+        """Resume the background preparations."""
+        log.debug("post_prepare_resume")
+        with self._preparation_condition:
+            self._is_preparation_paused = False
+            self._preparation_condition.notify_all()
+
+    def finish_preparation(self, post: Post) -> None:
+        """
+        Finish the preparation of the post.
+
+        1. Collect the result of the background preparation if it exists.
+
+        2. Render the post body again because the Schedule might have changed
+           since the background preparation.
+
+        3. Prepare the post from scratch if the background preparation failed
+           or if the prepared artifacts are stale (the body has changed or
+           the prepared data are older than the maximum age).
+        """
+        if not self.schedule:
+            raise RuntimeError(
+                "The schedule must be loaded before calling this method.",
+            )
+
+        prepared_post = self.collect_prepared_post(post)
+
+        if prepared_post and self.reuse_prepared_post(
+            post,
+            prepared_post,
+            self.schedule,
+        ):
+            return
+
         self.post_helper.prepare_post(
-            post=next_post,
+            post=post,
             schedule=self.schedule,
             prepare_thumbnail=True,
         )
 
-        return next_post
+    def collect_prepared_post(self, post: Post) -> Optional[PreparedPost]:
+        """Collect the result of the background preparation of the post."""
+        future = self.prepared_posts.pop(post.name, None)
+
+        if not future:
+            return None
+
+        try:
+            return future.result()
+        except Exception:
+            log.exception("post_prepare_background_error")
+
+        return None
+
+    def reuse_prepared_post(
+        self,
+        post: Post,
+        prepared_post: PreparedPost,
+        schedule: Schedule,
+    ) -> bool:
+        """
+        Render the post body again and check the prepared artifacts.
+
+        Return `True` if the body hasn't changed since the background
+        preparation and the prepared data are not older than the maximum age.
+        """
+        prepared_body_md, prepared_at = prepared_post
+        self.post_helper.prepare_post(post, schedule)
+        prepared_age = (time.monotonic() - prepared_at) * 1000
+
+        if (
+            post.body_md == prepared_body_md and
+            prepared_age <= self.prepare_max_age
+        ):
+            log.debug("post_prepare_reuse", post=str(post))
+            return True
+
+        log.info(
+            "post_prepare_stale",
+            post=str(post),
+            body_changed=post.body_md != prepared_body_md,
+            prepared_age=prepared_age,
+        )
+
+        return False
+
+    def warm_assets(self) -> List[Post]:
+        """
+        Prepare the upcoming posts including the upload of their images.
+
+        Only the posts scheduled within the validity of the uploaded images
+        are prepared so that the images are reused when the posts are
+        submitted. Return the prepared posts.
+        """
+        if not self.schedule:
+            raise RuntimeError(
+                "The schedule must be loaded before calling this method.",
+            )
+
+        asset_registry = self.post_helper.post_converter.asset_registry
+
+        if not asset_registry:
+            raise ConfigError(
+                "The registry of the uploaded images is disabled.",
+                hint="Enable the 'asset_registry.enabled' option.",
+            )
+
+        current_time = datetime.utcnow()
+        valid_until = current_time + timedelta(
+            milliseconds=asset_registry.validity,
+        )
+        upcoming_posts = [
+            post
+            for post in self.schedule.get_pending_posts(after_time=current_time)
+            if post.submit_with_thumbnail and post.submit_at < valid_until
+        ]
+
+        self.load_body_window(upcoming_posts)
+
+        for post in upcoming_posts:
+            log.info("post_assets_warm", post=str(post))
+            self.post_helper.prepare_post(
+                post=post,
+                schedule=self.schedule,
+                prepare_thumbnail=True,
+            )
+
+        return upcoming_posts
+
+    def shutdown(self) -> None:
+        """
+        Cancel the pending background preparations.
+
+        Wait for the pending save of the Schedule (up to the flush timeout)
+        and then shut down the schedule storage.
+        """
+        for future in self.prepared_posts.values():
+            future.cancel()
+
+        self.prepared_posts.clear()
+        self.resume_preparation()
+        self.prepare_executor.shutdown(wait=False)
+        self.schedule_persister.stop()
+        self.schedule_storage.shutdown()
+
+    def register_submission(self, post: Post) -> None:
+        """
+        Update the state derived from the Schedule after the submission.
+
+        The submission is appended to the local journals (the submission
+        journal and the journal of the submissions which haven't been saved).
+        """
+        if not self.schedule:
+            raise RuntimeError(
+                "The schedule must be loaded before calling this method.",
+            )
+
+        log.debug("scheduler_register_submission", post=str(post))
+        self.submission_journal.record_step(post, STEP_SUBMIT)
+        self.schedule_persister.record_submission(post)
+        self.schedule.mark_submitted(post)
+        self.post_helper.update_render_context(post)
 
     def get_submitted_posts(
         self,
         skip_post: Optional[Post] = None,
-    ) -> List[Post]:
-        """Return a list of previously submitted posts."""
+    ) -> List[PostUpdate]:
+        """
+        Return a list of previously submitted posts with a changed body.
+
+        If `skip_post` (the just submitted post) is provided, only the posts
+        depending on it are rendered (the deferred bodies of the submitted
+        posts are loaded first so that their dependencies are known). Only
+        the posts whose body has changed since their previous rendering are
+        returned together with the new body. The body of the post is replaced
+        only after the Submission is edited so that a failed edit is retried.
+        """
         if not self.schedule:
             raise RuntimeError(
                 "The schedule must be loaded before calling this method.",
             )
 
-        posts = []
-        for post in self.schedule.posts:
-            if skip_post and post.name == skip_post.name:
+        candidate_posts = self.schedule.posts
+        if skip_post:
+            self.load_submitted_bodies()
+            candidate_posts = self.schedule.get_posts(
+                self.dependents.get(skip_post.name, set()),
+            )
+
+        post_updates = []
+        for post in candidate_posts:
+            if not post.submission_id:
                 continue
 
-            if post.submission_id:
-                self.post_helper.prepare_post(post, self.schedule)
-                posts.append(post)
+            body_md = self.post_helper.render_post_body(post, self.schedule)
+
+            if body_md != post.body_md:
+                post_updates.append((post, body_md))
 
-        return posts
+        log.debug("submitted_posts_changed", post_count=len(post_updates))
+
+        return post_updates
 
     def save_schedule(self) -> None:
-        """Save the schedule to the storage."""
+        """
+        Request saving the schedule to the storage.
+
+        The schedule is saved in the background (the saves requested in a
+        short time are combined).
+        """
         if not self.schedule:
             raise RuntimeError(
                 "The schedule must be loaded before calling this method.",
             )
 
-        self.schedule_storage.save(self.schedule)
+        self.schedule_persister.request_save(self.schedule)
+
+    def record_step(self, post: Post, step: str) -> None:
+        """Record the completed step of the pipeline of the submitted Post."""
+        self.submission_journal.record_step(post, step)
+
+    def record_saved_posts(self, post_names: List[str]) -> None:
+        """Record the save of the Schedule for the submitted posts."""
+        if not self.schedule:
+            return
+
+        for post in self.schedule.get_posts(post_names):
+            self.submission_journal.record_step(post, STEP_SAVE)
+
+    def get_interrupted_posts(self) -> List[Tuple[Post, Set[str]]]:
+        """
+        Return the posts whose pipeline has been interrupted.
+
+        Each post is returned with the completed steps of its pipeline. The
+        posts modified since the submission are skipped. The submission is
+        registered if it's missing in the Schedule and the post is prepared
+        (rendered) for the remaining steps.
+        """
+        if not self.schedule:
+            raise RuntimeError(
+                "The schedule must be loaded before calling this method.",
+            )
+
+        interrupted_posts = []
+
+        for entry in self.submission_journal.load_interrupted():
+            post = self.schedule.get_post(entry.name)
+
+            if not post or hash_post(post) != entry.post_hash:
+                log.warning("submission_journal_mismatch", post=entry.name)
+                continue
+
+            if not post.submission_id:
+                post.submission_id = entry.submission_id
+                self.register_submission(post)
+
+            self.post_helper.prepare_post(post, self.schedule)
+            interrupted_posts.append((post, entry.steps))
+
+        return interrupted_posts
@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Set, Tuple
+
+from structlog import get_logger
+
+from slow_start_rewatch.config import Config
+from slow_start_rewatch.post import Post
+from slow_start_rewatch.schedule.schedule_cache import hash_text
+from slow_start_rewatch.schedule.schedule_persister import (
+    JOURNAL_FILE_SUFFIX,
+    JournalRecord,
+    append_record,
+    read_records,
+    write_records,
+)
+
+log = get_logger()
+
+JOURNAL_DIRECTORY = "submission_journal"
+
+STEP_SUBMIT = "submit"
+STEP_FINISH = "finish"
+STEP_SAVE = "save"
+STEP_UPDATE = "update"
+
+# The steps of the pipeline of each submitted post.
+PIPELINE_STEPS = frozenset((STEP_SUBMIT, STEP_FINISH, STEP_SAVE, STEP_UPDATE))
+
+
+class JournalEntry(object):
+    """The completed steps of the pipeline of a submitted post."""
+
+    def __init__(self, name: str, post_hash: str, submission_id: str) -> None:
+        """Initialize JournalEntry."""
+        self.name = name
+        self.post_hash = post_hash
+        self.submission_id = submission_id
+        self.steps: Set[str] = set()
+        self.records: List[JournalRecord] = []
+
+    @property
+    def is_complete(self) -> bool:
+        """Return `True` if all the steps of the pipeline are completed."""
+        return self.steps >= PIPELINE_STEPS
+
+
+class SubmissionJournal(object):
+    """
+    Records the completed steps of the pipeline of the submitted posts.
+
+    The pipeline of each post consists of the submission, the finishing of
+    the submission (e.g. the update after the thumbnail is ready), the save
+    of the Schedule, and the update of the other posts. Each completed step
+    is appended to the journal file (synced to the disk) with the post name
+    and the hash of the post content so that the interrupted pipelines can
+    be resumed by the next run.
+    """
+
+    def __init__(self, journal_file: str) -> None:
+        """Initialize SubmissionJournal."""
+        self.journal_file = journal_file
+        self._lock = threading.Lock()
+
+    def record_step(self, post: Post, step: str) -> None:
+        """
+        Append the completed step of the pipeline of the Post.
+
+        Failure to write the journal is not fatal.
+        """
+        record = {
+            "post": str(post.name),
+            "hash": hash_post(post),
+            "step": step,
+            "submission_id": str(post.submission_id),
+        }
+
+        with self._lock:
+            try:
+                Path(self.journal_file).parent.mkdir(
+                    parents=True,
+                    exist_ok=True,
+                )
+                append_record(self.journal_file, record)
+            except IOError:
+                log.exception("submission_journal_write_error")
+                return
+
+        log.debug("submission_journal_append", post=post.name, step=step)
+
+    def load_interrupted(self) -> List[JournalEntry]:
+        """
+        Return the entries of the posts with the interrupted pipeline.
+
+        The records of the completed pipelines are removed from the journal.
+        The entries are in the order of the submissions.
+        """
+        with self._lock:
+            try:
+                records = read_records(self.journal_file)
+            except FileNotFoundError:
+                return []
+            except (IOError, ValueError):
+                log.exception("submission_journal_read_error")
+                return []
+
+            entries: Dict[Tuple[str, str], JournalEntry] = {}
+
+            for record in records:
+                entry = entries.setdefault(
+                    (record["post"], record["hash"]),
+                    JournalEntry(
+                        name=record["post"],
+                        post_hash=record["hash"],
+                        submission_id=record["submission_id"],
+                    ),
+                )
+                entry.steps.add(record["step"])
+                entry.records.append(record)
+
+            interrupted_entries = [
+                entry for entry in entries.values() if not entry.is_complete
+            ]
+
+            self.compact([
+                record
+                for entry in interrupted_entries
+                for record in entry.records
+            ])
+
+        log.info(
+            "submission_journal_load",
+            records=len(records),
+            interrupted_posts=len(interrupted_entries),
+        )
+
+        return interrupted_entries
+
+    def compact(self, records: List[JournalRecord]) -> None:
+        """
+        Replace the journal with the records (the lock must be held).
+
+        Failure to update the journal is not fatal.
+        """
+        try:
+            if records:
+                write_records(self.journal_file, records)
+            else:
+                os.remove(self.journal_file)
+        except IOError:
+            log.exception("submission_journal_write_error")
+
+
+def create_submission_journal(config: Config) -> SubmissionJournal:
+    """
+    Create the `SubmissionJournal`.
+
+    Each Schedule (a wiki page, a database, or a file) has its own journal.
+    """
+    schedule_location = (
+        config["schedule_wiki_url"] or
+        config["schedule_database"] or
+        config["schedule_file"]
+    )
+
+    return SubmissionJournal(
+        journal_file=os.path.join(
+            config["data_dir"],
+            JOURNAL_DIRECTORY,
+            "{0}{1}".format(hash_text(schedule_location), JOURNAL_FILE_SUFFIX),
+        ),
+    )
+
+
+def hash_post(post: Post) -> str:
+    """
+    Return the hash of the content identifying the Post.
+
+    The hash changes when the Post is rescheduled or replaced by a different
+    post with the same name.
+    """
+    return hash_text("\n".join((
+        post.subreddit,
+        post.title,
+        post.submit_at.isoformat(),
+    )))
@@ -0,0 +1,346 @@
+# -*- coding: utf-8 -*-
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+from praw.models.reddit.subreddit import SubredditWiki
+from prawcore.exceptions import PrawcoreException
+from structlog import get_logger
+
+from slow_start_rewatch.config import Config
+
+log = get_logger()
+
+MIRROR_DIRECTORY = "wiki_mirror"
+INDEX_FILENAME = "index.json"
+
+# Type alias for a mirrored wiki page: the content and the revision ID.
+MirroredPage = Tuple[str, str]
+
+# Type alias for a snapshot of a wiki page: the content, the revision ID, and
+# the age of the snapshot (seconds).
+PageSnapshot = Tuple[str, str, float]
+
+# Type alias for the info about a mirrored page stored in the index.
+PageInfoData = Dict[str, Union[str, float, bool]]
+
+
+class PageInfo(object):
+    """The revision ID and the state of a mirrored page."""
+
+    def __init__(
+        self,
+        revision_id: str,
+        mirrored_at: float,
+        stale: bool = False,
+    ) -> None:
+        """Initialize PageInfo."""
+        self.revision_id = revision_id
+        self.mirrored_at = mirrored_at
+        self.stale = stale
+
+    @classmethod
+    def from_data(cls, page_data: PageInfoData) -> "PageInfo":
+        """Create the page info from its data in the index."""
+        return cls(
+            revision_id=str(page_data["revision_id"]),
+            mirrored_at=float(page_data["mirrored_at"]),
+            stale=bool(page_data["stale"]),
+        )
+
+    def to_data(self) -> PageInfoData:
+        """Return the data of the page info stored in the index."""
+        return {
+            "revision_id": self.revision_id,
+            "mirrored_at": self.mirrored_at,
+            "stale": self.stale,
+        }
+
+
+class WikiMirror(object):
+    """
+    Mirrors the wiki pages of a subreddit in the local files.
+
+    Each page is stored with the ID of its revision. The index contains the
+    revision IDs of the mirrored pages and the ID of the latest revision of
+    the wiki seen by :meth:`sync()`.
+
+    The mirrored pages are used only after :meth:`sync()` has checked the
+    recent revisions of the wiki (a single listing request) and marked the
+    pages which have been modified since they were mirrored as stale. The
+    stale pages are kept as the snapshots used when the wiki is unavailable.
+    """
+
+    def __init__(self, mirror_dir: str, revision_limit: int) -> None:
+        """Initialize WikiMirror."""
+        self.mirror_dir = mirror_dir
+        self.revision_limit = revision_limit
+        self.is_synced = False
+        self._lock = threading.Lock()
+        self._latest_revision_id: Optional[str] = None
+        self._pages: Dict[str, PageInfo] = {}
+
+        self.load_index()
+
+    def sync(self, wiki: SubredditWiki) -> None:
+        """
+        Mark the mirrored pages modified since the last sync as stale.
+
+        The revisions newer than the latest known revision are listed. When
+        the latest known revision is not within the `revision_limit` (e.g.
+        there were too many edits), only the pages whose latest revision is
+        listed and unchanged are kept current.
+
+        Reddit lists the revisions of all the wiki pages of the subreddit
+        from the newest.
+        """
+        self.is_synced = False
+
+        try:
+            newest_revisions, is_complete = self.fetch_newest_revisions(wiki)
+        except PrawcoreException:
+            log.warning("wiki_mirror_sync_error", exc_info=True)
+            return
+
+        with self._lock:
+            self.mark_modified_pages(newest_revisions, is_complete)
+
+            if newest_revisions:
+                self._latest_revision_id = next(
+                    iter(newest_revisions.values()),
+                )
+
+            self.save_index()
+
+        log.info(
+            "wiki_mirror_sync",
+            changed_pages=len(newest_revisions),
+            complete=is_complete,
+            mirrored_pages=len(self._pages),
+        )
+        self.is_synced = True
+
+    def fetch_newest_revisions(
+        self,
+        wiki: SubredditWiki,
+    ) -> Tuple[Dict[str, str], bool]:
+        """
+        Fetch the newest revision IDs of the pages modified since the sync.
+
+        Return the revision IDs (by the page path) and whether all the
+        revisions newer than the latest known revision have been listed.
+        """
+        newest_revisions: Dict[str, str] = {}
+        revision_count = 0
+
+        for revision in wiki.revisions(limit=self.revision_limit):
+            if revision["id"] == self._latest_revision_id:
+                return newest_revisions, True
+
+            revision_count += 1
+            newest_revisions.setdefault(
+                revision["page"].name.lower(),
+                revision["id"],
+            )
+
+        # The whole history of the wiki has been listed.
+        return newest_revisions, revision_count < self.revision_limit
+
+    def mark_modified_pages(
+        self,
+        newest_revisions: Dict[str, str],
+        is_complete: bool,
+    ) -> None:
+        """
+        Mark the pages with a newer revision as stale.
+
+        When the listing is not complete, the pages missing in it are marked
+        as well. The lock must be held by the caller.
+        """
+        for page_path, page_info in self._pages.items():
+            newest_revision_id = newest_revisions.get(page_path)
+
+            if is_complete and newest_revision_id is None:
+                continue
+
+            if newest_revision_id != page_info.revision_id:
+                log.debug("wiki_mirror_stale", page_path=page_path)
+                page_info.stale = True
+
+    def get_page(self, page_path: str) -> Optional[MirroredPage]:
+        """
+        Return the content and the revision ID of the mirrored page.
+
+        Return `None` if the page is not mirrored, if it's stale, or if the
+        mirror hasn't been synchronized.
+        """
+        if not self.is_synced:
+            return None
+
+        snapshot = self.get_snapshot(page_path)
+
+        if not snapshot or self._pages[page_path.lower()].stale:
+            return None
+
+        log.debug("wiki_mirror_hit", page_path=page_path)
+        content_md, revision_id, _ = snapshot
+
+        return content_md, revision_id
+
+    def get_snapshot(self, page_path: str) -> Optional[PageSnapshot]:
+        """
+        Return the last mirrored content of the page (even if it's stale).
+
+        Return `None` if the page is not mirrored.
+        """
+        page_path = page_path.lower()
+
+        with self._lock:
+            page_info = self._pages.get(page_path)
+
+        if page_info is None:
+            return None
+
+        try:
+            content_md = read_file(self.get_page_file(page_path))
+        except IOError:
+            log.warning("wiki_mirror_page_missing", page_path=page_path)
+            return None
+
+        return (
+            content_md,
+            page_info.revision_id,
+            time.time() - page_info.mirrored_at,
+        )
+
+    def put_page(
+        self,
+        page_path: str,
+        content_md: str,
+        revision_id: Optional[str],
+        is_current: bool = True,
+    ) -> None:
+        """
+        Store the page and its revision ID.
+
+        The page which is not current is used only as a snapshot. Failure to
+        store the page is not fatal.
+        """
+        if not revision_id:
+            return
+
+        page_path = page_path.lower()
+        page_file = self.get_page_file(page_path)
+
+        with self._lock:
+            try:
+                Path(self.mirror_dir).mkdir(parents=True, exist_ok=True)
+                write_file(page_file, content_md)
+            except IOError:
+                log.exception("wiki_mirror_write_error")
+                return
+
+            self._pages[page_path] = PageInfo(
+                revision_id=revision_id,
+                mirrored_at=time.time(),
+                stale=not is_current,
+            )
+            self.save_index()
+
+    def mark_stale(self, page_path: str) -> None:
+        """Mark the page as stale (it's kept only as a snapshot)."""
+        with self._lock:
+            page_info = self._pages.get(page_path.lower())
+
+            if page_info:
+                page_info.stale = True
+                self.save_index()
+
+    def load_index(self) -> None:
+        """Load the index of the mirror."""
+        index_file = os.path.join(self.mirror_dir, INDEX_FILENAME)
+
+        try:
+            with open(index_file, encoding="utf-8") as index:
+                index_data = json.load(index)
+
+            pages = {
+                page_path: PageInfo.from_data(page_data)
+                for page_path, page_data in index_data["pages"].items()
+            }
+        except (IOError, ValueError, KeyError, TypeError):
+            log.debug("wiki_mirror_index_missing", path=index_file)
+            index_data = {}
+            pages = {}
+
+        with self._lock:
+            self._latest_revision_id = index_data.get("latest_revision_id")
+            self._pages = pages
+
+    def save_index(self) -> None:
+        """
+        Save the index of the mirror (the lock must be held by the caller).
+
+        Failure to save the index is not fatal.
+        """
+        index_data = {
+            "latest_revision_id": self._latest_revision_id,
+            "pages": {
+                page_path: page_info.to_data()
+                for page_path, page_info in self._pages.items()
+            },
+        }
+
+        try:
+            Path(self.mirror_dir).mkdir(parents=True, exist_ok=True)
+            write_file(
+                os.path.join(self.mirror_dir, INDEX_FILENAME),
+                json.dumps(index_data, indent=2),
+            )
+        except IOError:
+            log.exception("wiki_mirror_index_write_error")
+
+    def get_page_file(self, page_path: str) -> str:
+        """Return the path of the file storing the page."""
+        page_hash = hashlib.sha1(page_path.encode("utf-8"))  # noqa: S303
+
+        return os.path.join(
+            self.mirror_dir,
+            "{0}.md".format(page_hash.hexdigest()),
+        )
+
+
+def create_wiki_mirror(config: Config, subreddit: str) -> Optional[WikiMirror]:
+    """Create the `WikiMirror` of the subreddit if it's enabled."""
+    if not config["wiki_mirror.enabled"]:
+        return None
+
+    return WikiMirror(
+        mirror_dir=os.path.join(
+            config["data_dir"],
+            MIRROR_DIRECTORY,
+            subreddit.lower(),
+        ),
+        revision_limit=config["wiki_mirror.revision_limit"],
+    )
+
+
+def read_file(path: str) -> str:
+    """Read the file (the line endings are kept)."""
+    with open(path, encoding="utf-8", newline="") as text_file:
+        return text_file.read()
+
+
+def write_file(path: str, content: str) -> None:
+    """Write the file atomically (replace the file once it's written)."""
+    temp_path = "{0}.tmp".format(path)
+
+    with open(temp_path, "w", encoding="utf-8", newline="") as temp_file:
+        temp_file.write(content)
+
+    os.replace(temp_path, path)
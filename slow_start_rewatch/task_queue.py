@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+
+import itertools
+import threading
+from queue import PriorityQueue
+from typing import Callable, List, Optional, Tuple
+
+import click
+from structlog import get_logger
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+PRIORITY_STOP = 99
+
+log = get_logger()
+
+# Type alias for a queued task.
+Task = Callable[[], object]
+
+# Type alias for the queue item: priority, sequence number, name, task.
+QueueItem = Tuple[int, int, str, Optional[Task]]
+
+
+class TaskQueue(object):
+    """
+    Runs tasks in a background thread.
+
+    The tasks are executed one by one ordered by the priority (and by the
+    order of addition for the same priority). The queue can be paused so that
+    the time-critical work in the main thread (e.g. the submission of a post)
+    doesn't compete with the queued tasks.
+    """
+
+    def __init__(self) -> None:
+        """Initialize TaskQueue."""
+        self.queue: "PriorityQueue[QueueItem]" = PriorityQueue()
+        self.failed_tasks: List[str] = []
+
+        self._sequence = itertools.count()
+        self._resumed = threading.Event()
+        self._resumed.set()
+        self._worker: Optional[threading.Thread] = None
+
+    def add(self, name: str, task: Task, priority=PRIORITY_NORMAL) -> None:
+        """Add the task to the queue and start the worker if needed."""
+        log.debug("task_add", task=name, priority=priority)
+        self.queue.put((priority, next(self._sequence), name, task))
+        self.start()
+
+    def start(self) -> None:
+        """Start the worker thread if it's not running."""
+        if self._worker and self._worker.is_alive():
+            return
+
+        self._worker = threading.Thread(
+            target=self.run,
+            name="task_queue",
+            daemon=True,
+        )
+        self._worker.start()
+
+    def pause(self) -> None:
+        """Don't start new tasks until :meth:`resume()` is called."""
+        log.debug("task_queue_pause")
+        self._resumed.clear()
+
+    def resume(self) -> None:
+        """Resume the execution of the tasks."""
+        log.debug("task_queue_resume")
+        self._resumed.set()
+
+    def join(self) -> None:
+        """Resume the queue and wait until all the tasks are finished."""
+        self.resume()
+        self.queue.join()
+
+    def stop(self) -> None:
+        """Stop the worker after the queued tasks are finished."""
+        if self._worker and self._worker.is_alive():
+            self.queue.put((PRIORITY_STOP, next(self._sequence), "stop", None))
+
+    def run(self) -> None:
+        """Execute the queued tasks (run by the worker thread)."""
+        while True:
+            queue_item = self.queue.get()
+
+            if not self._resumed.is_set():
+                self.queue.put(queue_item)
+                self.queue.task_done()
+                self._resumed.wait()
+                continue
+
+            _, _, name, task = queue_item
+
+            try:
+                if task is None:
+                    return
+
+                self.run_task(name, task)
+            finally:
+                self.queue.task_done()
+
+    def run_task(self, name: str, task: Task) -> None:
+        """
+        Execute the task.
+
+        Errors are reported and the worker continues with other tasks.
+        """
+        log.info("task_start", task=name)
+        try:
+            task()
+        except Exception as error:
+            log.exception("task_error", task=name)
+            self.failed_tasks.append(name)
+            click.echo(
+                click.style(
+                    "The background task '{0}' failed: {1}".format(
+                        name,
+                        str(error),
+                    ),
+                    fg="red",
+                ),
+                err=True,
+            )
+            return
+
+        log.info("task_end", task=name)
@@ -3,7 +3,7 @@
 import math
 import time
 from datetime import datetime
-from typing import Iterator, Optional
+from typing import Iterator, Optional, Tuple
 
 import click
 from structlog import get_logger
@@ -11,6 +11,9 @@ from structlog import get_logger
 from slow_start_rewatch.config import Config
 from slow_start_rewatch.exceptions import Abort
 
+NANOSECONDS_PER_MILLISECOND = 1000000
+NANOSECONDS_PER_SECOND = 1000000000
+
 log = get_logger()
 
 
@@ -25,8 +28,14 @@ class Timer(object):
     ) -> None:
         """Initialize Timer."""
         self.refresh_interval: int = config["timer.refresh_interval"]
+        self.precision_mode: bool = config["timer.precision_mode"]
+        self.spin_threshold: int = config["timer.spin_threshold"]
+        self.resync_threshold: int = config["timer.resync_threshold"]
         self.start_time = start_time
         self.target_time = target_time
+        self.release_jitter: Optional[float] = None
+
+        self._clock_anchor: Optional[Tuple[float, int]] = None
 
     def wait(self, target_time: datetime) -> None:
         """
@@ -38,6 +47,8 @@ class Timer(object):
         """
         self.start_time = datetime.utcnow()
         self.target_time = target_time
+        self.release_jitter = None
+        self._clock_anchor = None
 
         if self.start_time > self.target_time:
             log.warning(
@@ -56,7 +67,13 @@ class Timer(object):
             raise Abort from exception
 
     def countdown(self) -> None:
-        """Render the countdown progressbar."""
+        """
+        Render the countdown progressbar.
+
+        In the precision mode the progressbar stops one refresh interval
+        before the target time and the rest of the waiting is handled by
+        :meth:`final_approach()`.
+        """
         log.debug("timer_countdown_start")
         with click.progressbar(
             self.ticks(),
@@ -67,14 +84,107 @@ class Timer(object):
             show_percent=False,
         ) as progressbar:
             for tick in progressbar:
-                current_timestamp = datetime.utcnow().timestamp() * 1000
+                self.sleep_until(tick)
 
-                if current_timestamp < tick:
-                    time.sleep((tick - current_timestamp) / 1000)
+        if self.precision_mode:
+            self.final_approach()
 
         log.debug("timer_countdown_end")
+        self.report_release()
         self.target_time = None
 
+    def sleep_until(self, tick: int) -> None:
+        """Sleep until the tick (a timestamp in milliseconds)."""
+        if not self.precision_mode:
+            current_timestamp = datetime.utcnow().timestamp() * 1000
+
+            if current_timestamp < tick:
+                time.sleep((tick - current_timestamp) / 1000)
+
+            return
+
+        final_approach_timestamp = (
+            self._target_timestamp() - self.refresh_interval
+        )
+        remaining_ns = self.remaining_ns(min(tick, final_approach_timestamp))
+
+        if remaining_ns > 0:
+            time.sleep(remaining_ns / NANOSECONDS_PER_SECOND)
+
+    def final_approach(self) -> None:
+        """
+        Wait for the target time as precisely as possible.
+
+        1. Sleep for half of the remaining time until the remaining time drops
+           below the spin threshold.
+
+        2. Spin on the monotonic clock until the target time.
+        """
+        target_timestamp = self._target_timestamp()
+        spin_threshold_ns = self.spin_threshold * NANOSECONDS_PER_MILLISECOND
+
+        remaining_ns = self.remaining_ns(target_timestamp)
+        while remaining_ns > spin_threshold_ns:
+            time.sleep(remaining_ns / 2 / NANOSECONDS_PER_SECOND)
+            remaining_ns = self.remaining_ns(target_timestamp)
+
+        log.debug("timer_final_approach_spin", remaining_ns=remaining_ns)
+        deadline_ns = monotonic_ns() + remaining_ns
+        while monotonic_ns() < deadline_ns:  # noqa: WPS328
+            pass  # noqa: WPS420
+
+    def remaining_ns(self, timestamp: float) -> int:
+        """
+        Return the nanoseconds remaining until the timestamp (milliseconds).
+
+        The remaining time is measured by the monotonic clock anchored to the
+        wall clock. The anchor is reset when the wall clock drifts away from
+        the monotonic clock by more than the resync threshold (e.g. after an
+        NTP time step or a suspend/resume).
+        """
+        wall_timestamp = datetime.utcnow().timestamp() * 1000
+        current_ns = monotonic_ns()
+
+        if self._clock_anchor:
+            anchor_timestamp, anchor_monotonic_ns = self._clock_anchor
+            drift = wall_timestamp - (
+                anchor_timestamp +
+                (current_ns - anchor_monotonic_ns) /
+                NANOSECONDS_PER_MILLISECOND
+            )
+
+            if abs(drift) > self.resync_threshold:
+                log.warning("timer_clock_resync", drift=drift)
+                self._clock_anchor = None
+
+        if not self._clock_anchor:
+            self._clock_anchor = (wall_timestamp, current_ns)
+
+        anchor_timestamp, anchor_monotonic_ns = self._clock_anchor
+
+        return round(
+            (timestamp - anchor_timestamp) * NANOSECONDS_PER_MILLISECOND,
+        ) - (current_ns - anchor_monotonic_ns)
+
+    def report_release(self) -> None:
+        """Measure the difference between the release and the target time."""
+        if self.target_time is None:
+            raise AttributeError(
+                "'target_time' must be set to measure the release jitter.",
+            )
+
+        release_time = datetime.utcnow()
+        self.release_jitter = (
+            release_time - self.target_time
+        ).total_seconds() * 1000
+
+        log.info(
+            "timer_release",
+            target_time=str(self.target_time),
+            release_time=str(release_time),
+            release_jitter=self.release_jitter,
+        )
+
     def ticks(self) -> Iterator[int]:
         """
         Generate ticks for the countdown.
@@ -109,3 +219,22 @@ class Timer(object):
         current_timestamp = datetime.fromtimestamp(math.floor(tick / 1000))
 
         return str(self.target_time - current_timestamp)
+
+    def _target_timestamp(self) -> int:
+        """Return the target time as a timestamp in milliseconds."""
+        if self.target_time is None:
+            raise AttributeError(
+                "'target_time' must be set before starting countdown.",
+            )
+
+        return round(self.target_time.timestamp() * 1000)
+
+
+def monotonic_ns() -> int:
+    """
+    Return the time of the monotonic clock in nanoseconds.
+
+    The performance counter (the monotonic clock with the highest resolution)
+    is converted because `time.monotonic_ns()` requires Python 3.7.
+    """
+    return round(time.perf_counter() * NANOSECONDS_PER_SECOND)
@@ -1,17 +1,31 @@
 # -*- coding: utf-8 -*-
 
-from unittest.mock import patch
+from datetime import datetime
+from unittest.mock import Mock, call, patch
 
 import pytest
 
-from slow_start_rewatch.app import App
+from slow_start_rewatch.app import App, format_milliseconds
+from slow_start_rewatch.exceptions import Abort, MissingSchedule
+from slow_start_rewatch.schedule.schedule_sqlite_storage import (
+    ScheduleSqliteStorage,
+)
+from slow_start_rewatch.schedule.submission_journal import (
+    STEP_FINISH,
+    STEP_SAVE,
+    STEP_SUBMIT,
+    STEP_UPDATE,
+)
 from tests.conftest import MockConfig
 
 
 @patch("slow_start_rewatch.app.Scheduler")
 @patch("slow_start_rewatch.app.Timer")
 @patch("slow_start_rewatch.app.RedditCutifier")
-@patch("slow_start_rewatch.app.Config", return_value=MockConfig())
+@patch(
+    "slow_start_rewatch.app.Config",
+    return_value=MockConfig({"schedule_cache": {"enabled": True}}),
+)
 def test_init(
     mock_config,
     mock_reddit_cutifier,
@@ -28,14 +42,25 @@ def test_init(
     App(schedule_wiki_url="/r/anime/wiki/slow-start-rewatch")
     assert config["schedule_wiki_url"] == "/r/anime/wiki/slow-start-rewatch"
 
+    App(schedule_database="schedule.sqlite")
+    assert config["schedule_database"] == "schedule.sqlite"
+    assert config["schedule_wiki_url"] is None
+
     App(schedule_file="schedule.yml")
     assert config["schedule_file"] == "schedule.yml"
+    assert config["schedule_database"] is None
+    assert config["schedule_cache.enabled"]
+
+    App(no_schedule_cache=True)
+    assert not config["schedule_cache.enabled"]
 
 
 @patch("slow_start_rewatch.app.App.start")
+@patch("slow_start_rewatch.app.App.resume")
 @patch("slow_start_rewatch.app.App.prepare")
 def test_run(
     mock_prepare,
+    mock_resume,
     mock_start,
     app,
 ):
@@ -43,7 +68,85 @@ def test_run(
     app.run()
 
     assert mock_prepare.call_count == 1
+    assert mock_resume.call_count == 1
     assert mock_start.call_count == 1
+    assert app.scheduler.shutdown.call_count == 1
+
+
+@patch("slow_start_rewatch.app.App.start", side_effect=Abort)
+@patch("slow_start_rewatch.app.App.resume")
+@patch("slow_start_rewatch.app.App.prepare")
+def test_run_abort(
+    mock_prepare,
+    mock_resume,
+    mock_start,
+    app,
+):
+    """
+    Test the abort of the run (e.g. after a submission).
+
+    The pending save of the schedule is flushed before the task queue is
+    stopped.
+    """
+    manager = Mock()
+    app.scheduler.shutdown = manager.shutdown
+    app.task_queue.stop = manager.stop
+
+    with pytest.raises(Abort):
+        app.run()
+
+    assert manager.mock_calls == [call.shutdown(), call.stop()]
+
+
+def test_update_posts(app):
+    """Test that the update is recorded only if all the posts are updated."""
+    post = Mock()
+    app.reddit_cutifier.update_posts.return_value = False
+
+    app.update_posts(post)
+
+    assert not app.scheduler.record_step.called
+
+    app.reddit_cutifier.update_posts.return_value = True
+
+    app.update_posts(post)
+
+    assert app.scheduler.record_step.call_args == call(post, STEP_UPDATE)
+
+
+def test_import_export_schedule(app, capsys):
+    """Test importing and exporting the Schedule of the database."""
+    schedule_storage = Mock(spec=ScheduleSqliteStorage)
+    schedule_storage.import_schedule.return_value = 3
+    schedule_storage.export_schedule.return_value = 2
+    app.scheduler.schedule_storage = schedule_storage
+
+    app.import_schedule("schedule.yml")
+    app.export_schedule("export.yml")
+    captured = capsys.readouterr()
+
+    assert schedule_storage.import_schedule.call_args == call("schedule.yml")
+    assert schedule_storage.export_schedule.call_args == call("export.yml")
+    assert "Imported 3 post(s)" in captured.out
+    assert "Exported 2 post(s)" in captured.out
+
+    app.scheduler.schedule_storage = Mock()
+
+    with pytest.raises(MissingSchedule):
+        app.import_schedule("schedule.yml")
+
+
+@patch("slow_start_rewatch.app.App.prepare")
+def test_warm_assets(mock_prepare, app, capsys):
+    """Test uploading the images of the upcoming posts."""
+    app.scheduler.warm_assets.return_value = [Mock(), Mock()]
+
+    app.warm_assets()
+    captured = capsys.readouterr()
+
+    assert mock_prepare.call_count == 1
+    assert app.scheduler.shutdown.call_count == 1
+    assert "Uploaded the images of 2 upcoming post(s)." in captured.out
 
 
 @patch("slow_start_rewatch.app.Scheduler")
@@ -85,6 +188,9 @@ def test_start(
 ):
     """Test that the :meth:`App.start()` runs properly."""
     mock_scheduler.return_value.get_scheduled_posts.return_value = [post]
+    mock_timer.return_value.release_jitter = 0.25
+    mock_reddit_cutifier.return_value.prewarm_time = 30000
+    mock_reddit_cutifier.return_value.submit_latency = 120.5
 
     app = App()
     app.start()
@@ -94,9 +200,140 @@ def test_start(
     assert mock_reddit_cutifier.return_value.submit_post.call_count == 1
 
     assert "Slow Start" in captured.out
+    assert "Release jitter: 0.250 ms" in captured.out
+    assert "submission latency: 120.500 ms" in captured.out
+    assert mock_reddit_cutifier.return_value.prewarm.call_args == call(post)
+    assert mock_scheduler.return_value.register_submission.call_args == (
+        call(post)
+    )
 
     assert mock_scheduler.return_value.save_schedule.call_count == 1
+    schedule_persister = mock_scheduler.return_value.schedule_persister
+    assert schedule_persister.pause.call_count == 1
+    assert schedule_persister.resume.call_count == 1
+    assert mock_scheduler.return_value.pause_preparation.call_count == 1
+    assert mock_scheduler.return_value.resume_preparation.call_count == 1
     assert mock_reddit_cutifier.return_value.update_posts.call_count == 1
+    assert mock_reddit_cutifier.return_value.finish_submission.call_args == (
+        call(post, mock_reddit_cutifier.return_value.submit_post.return_value)
+    )
+    assert mock_scheduler.return_value.get_submitted_posts.call_args == call(
+        skip_post=post,
+    )
+
+
+@patch("slow_start_rewatch.app.datetime")
+@patch("slow_start_rewatch.app.Scheduler")
+@patch("slow_start_rewatch.app.Timer")
+@patch("slow_start_rewatch.app.RedditCutifier")
+@patch("slow_start_rewatch.app.Config", return_value=MockConfig())
+def test_prewarm(
+    mock_config,
+    mock_reddit_cutifier,
+    mock_timer,
+    mock_scheduler,
+    mock_datetime,
+    post,
+):
+    """
+    Test waiting for the prewarm time.
+
+    1. The prewarm time is in the future.
+
+    2. The prewarm time has already passed and the waiting is skipped.
+    """
+    mock_reddit_cutifier.return_value.prewarm_time = 30000
+    mock_datetime.utcnow.side_effect = [
+        datetime(2018, 1, 6, 16, 50, 0),
+        datetime(2018, 1, 6, 16, 59, 50),
+    ]
+
+    app = App()
+    app.prewarm(post)
+
+    assert mock_timer.return_value.wait.call_args == call(
+        datetime(2018, 1, 6, 16, 59, 30),
+    )
+
+    app.prewarm(post)
+
+    assert mock_timer.return_value.wait.call_count == 1
+    assert mock_reddit_cutifier.return_value.prewarm.call_count == 2
+
+
+def test_resume(app, post, capsys):
+    """
+    Test resuming the interrupted post-submission work.
+
+    Only the steps which haven't been completed are repeated.
+    """
+    other_post = Mock(title="Slow Start - Episode 2 Discussion")
+    updated_post = Mock(
+        title="Slow Start - Episode 3 Discussion",
+        submit_with_thumbnail=False,
+    )
+    app.scheduler.get_interrupted_posts.return_value = [
+        (post, {STEP_SUBMIT}),
+        (other_post, {STEP_SUBMIT, STEP_FINISH, STEP_SAVE}),
+        (updated_post, {STEP_SUBMIT, STEP_SAVE, STEP_UPDATE}),
+    ]
+
+    app.resume()
+    app.task_queue.join()
+    captured = capsys.readouterr()
+
+    assert "Resuming the interrupted submission" in captured.out
+    assert app.reddit_cutifier.update_post.call_args == call(post)
+    assert app.scheduler.save_schedule.call_count == 1
+    assert app.scheduler.get_submitted_posts.call_args_list == [
+        call(skip_post=post),
+        call(skip_post=other_post),
+    ]
+    assert app.scheduler.record_step.call_args_list == [
+        call(post, STEP_FINISH),
+        call(updated_post, STEP_FINISH),
+        call(post, STEP_UPDATE),
+        call(other_post, STEP_UPDATE),
+    ]
+
+
+def test_finish_submission(app, post):
+    """
+    Test recording the finished submission.
+
+    1. The submission is finished after the thumbnail is ready.
+
+    2. The resumed submission without thumbnail doesn't need any update.
+
+    3. The failed update is not recorded.
+    """
+    submission = Mock()
+
+    app.finish_submission(post, submission)
+
+    assert app.reddit_cutifier.finish_submission.call_args == call(
+        post,
+        submission,
+    )
+    assert app.scheduler.record_step.call_count == 1
+
+    post.submit_with_thumbnail = False
+    app.finish_submission(post, None)
+
+    assert not app.reddit_cutifier.update_post.called
+    assert app.scheduler.record_step.call_count == 2
+
+    post.submit_with_thumbnail = True
+    app.reddit_cutifier.update_post.return_value = None
+    app.finish_submission(post, None)
+
+    assert app.scheduler.record_step.call_count == 2
+
+
+def test_format_milliseconds():
+    """Test formatting the measured durations."""
+    assert format_milliseconds(0.25) == "0.250 ms"
+    assert format_milliseconds(None) == "n/a"
 
 
 @pytest.fixture()
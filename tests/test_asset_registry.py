@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+
+import json
+import os
+from unittest.mock import patch
+
+import pytest
+
+from slow_start_rewatch.reddit.asset_registry import (
+    REGISTRY_FILENAME,
+    AssetRegistry,
+    create_asset_registry,
+)
+from tests.conftest import MockConfig
+
+
+def test_put_and_get(asset_registry):
+    """Test registering the uploaded asset and reusing it."""
+    assert not asset_registry.get("cute_hash")
+
+    asset_registry.put("cute_hash", "cute_id")
+
+    assert asset_registry.get("cute_hash") == "cute_id"
+
+    reloaded_registry = AssetRegistry(
+        registry_file=asset_registry.registry_file,
+        validity=asset_registry.validity,
+    )
+
+    assert reloaded_registry.get("cute_hash") == "cute_id"
+
+
+def test_expired_assets(asset_registry):
+    """Test that the expired assets are not reused and are removed."""
+    with open(asset_registry.registry_file, "w") as registry:
+        json.dump(
+            {"cute_hash": {"asset_id": "cute_id", "uploaded_at": 0}},
+            registry,
+        )
+
+    assert not asset_registry.get("cute_hash")
+
+    asset_registry.put("moe_hash", "moe_id")
+
+    with open(asset_registry.registry_file) as registry:
+        assert list(json.load(registry)) == ["moe_hash"]
+
+    asset_registry.validity = 0
+
+    assert not asset_registry.get("moe_hash")
+
+
+def test_registry_errors(asset_registry):
+    """Test that failing to read or write the registry is not fatal."""
+    with open(asset_registry.registry_file, "w") as registry:
+        registry.write("Not a registry")
+
+    assert not asset_registry.get("cute_hash")
+
+    with patch(
+        "slow_start_rewatch.reddit.asset_registry.write_atomically",
+        side_effect=IOError,
+    ):
+        asset_registry.put("cute_hash", "cute_id")
+
+    assert asset_registry.get("cute_hash") == "cute_id"
+
+
+def test_create_asset_registry(tmpdir):
+    """Test creating the registry only when it's enabled."""
+    config = MockConfig({
+        "data_dir": str(tmpdir),
+        "asset_registry": {
+            "enabled": True,
+            "validity": 3600000,
+        },
+    })
+
+    asset_registry = create_asset_registry(config)
+
+    assert asset_registry
+    assert asset_registry.registry_file == os.path.join(
+        str(tmpdir),
+        REGISTRY_FILENAME,
+    )
+    assert asset_registry.validity == 3600000
+
+    config["asset_registry"]["enabled"] = False
+
+    assert not create_asset_registry(config)
+
+
+@pytest.fixture()
+def asset_registry(tmpdir):
+    """Return `AssetRegistry` stored in a temporary directory."""
+    return AssetRegistry(
+        registry_file=str(tmpdir.join(REGISTRY_FILENAME)),
+        validity=3600000,
+    )
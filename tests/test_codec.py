@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+
+import json
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+
+from slow_start_rewatch import codec
+from tests.conftest import TEST_ROOT_DIR
+
+SCHEDULE_YAML = """subreddit: anime
+posts:
+- name: episode_01
+  submit_at: 2018-01-06 12:00:00
+- name: episode_02
+  submit_at: 2018-01-13 13:00:00+01:00
+- name: episode_03
+  submit_at: 2018-01-20T12:00:00Z
+"""
+
+SCHEDULE_JSON = """{
+  "subreddit": "anime",
+  "posts": [
+    {"name": "episode_01", "submit_at": "2018-01-06 12:00:00"},
+    {"name": "episode_02", "submit_at": "2018-01-13 13:00:00+01:00"},
+    {"name": "episode_03", "submit_at": "2018-01-20T12:00:00Z"}
+  ]
+}"""
+
+SCHEDULE_DATA = {
+    "subreddit": "anime",
+    "posts": [
+        {"name": "episode_01", "submit_at": datetime(2018, 1, 6, 12, 0, 0)},
+        {"name": "episode_02", "submit_at": datetime(2018, 1, 13, 12, 0, 0)},
+        {"name": "episode_03", "submit_at": datetime(2018, 1, 20, 12, 0, 0)},
+    ],
+}
+
+
+@pytest.mark.parametrize("backend", codec.yaml_backends())
+def test_parse_yaml(backend):
+    """Test parsing YAML by all the available backends."""
+    assert codec.parse_yaml("cute: [1, 2]", backend=backend) == {
+        "cute": [1, 2],
+    }
+
+    with pytest.raises(ValueError):
+        codec.parse_yaml("cute: [1, 2", backend=backend)
+
+
+def test_parse_yaml_unavailable_backend():
+    """Test that the default backend is used if the backend is missing."""
+    assert codec.parse_yaml("cute: yes", backend="missing") == {
+        "cute": "yes",
+    }
+
+
+def test_load_yaml_file():
+    """Test loading a YAML file."""
+    config_data = codec.load_yaml_file(
+        "{0}/test_config/config_example.yml".format(TEST_ROOT_DIR),
+    )
+
+    assert isinstance(config_data, dict)
+
+
+@pytest.mark.parametrize("backend", codec.yaml_backends())
+def test_parse_schedule(backend):
+    """
+    Test parsing the Schedule data.
+
+    The `submit_at` values are the same for all the formats and backends.
+    """
+    assert codec.parse_schedule(SCHEDULE_YAML, backend=backend) == (
+        SCHEDULE_DATA
+    )
+    assert codec.parse_schedule(SCHEDULE_JSON, backend=backend) == (
+        SCHEDULE_DATA
+    )
+
+
+@pytest.mark.parametrize(("schedule_text", "expected_json"), [
+    (SCHEDULE_YAML, False),
+    (SCHEDULE_JSON, True),
+    ("{subreddit: anime}", False),
+])
+def test_parse_schedule_format(schedule_text, expected_json):
+    """Test that only the data parsed as JSON is detected as JSON."""
+    _, schedule_json = codec.parse_schedule_format(schedule_text)
+
+    assert schedule_json == expected_json
+
+
+@pytest.mark.parametrize(("schedule_text", "expected_data"), [
+    ("{subreddit: anime}", {"subreddit": "anime"}),
+    ("- anime", ["anime"]),
+    ("posts: anime", {"posts": "anime"}),
+    ("posts: [anime]", {"posts": ["anime"]}),
+    ("posts: [{submit_at: 1}]", {"posts": [{"submit_at": 1}]}),
+    ('{"posts": [{"submit_at": "["}]}', {"posts": [{"submit_at": "["}]}),
+    (
+        '{"posts": [{"submit_at": "Jan 6"}]}',
+        {"posts": [{"submit_at": "Jan 6"}]},
+    ),
+])
+def test_parse_schedule_other_data(schedule_text, expected_data):
+    """Test that the unexpected structures are parsed without changes."""
+    assert codec.parse_schedule(schedule_text) == expected_data
+
+
+def test_read_schedule_document():
+    """Test reading the subreddit and the posts of the Schedule document."""
+    assert codec.read_schedule_document(
+        {"subreddit": "anime", "posts": []},
+    ) == ("anime", [])
+
+    with pytest.raises(TypeError):
+        codec.read_schedule_document({"subreddit": "anime", "posts": "cute"})
+
+    with pytest.raises(KeyError):
+        codec.read_schedule_document({"subreddit": "anime"})
+
+
+def test_dump_json():
+    """Test that the dumped JSON is parsed as the same data."""
+    json_text = codec.dump_json(SCHEDULE_DATA)
+
+    assert json.loads(json_text)["posts"][0]["submit_at"] == (
+        "2018-01-06 12:00:00"
+    )
+    assert codec.parse_schedule(json_text) == SCHEDULE_DATA
+
+
+@patch.dict("sys.modules", {"yaml": None})
+@patch("slow_start_rewatch.codec.YAML")
+def test_find_yaml_backends(mock_yaml):
+    """Test that only the pure backend is available without libyaml."""
+    mock_yaml.return_value.Parser.__name__ = "Parser"
+
+    assert list(codec._find_yaml_backends()) == [  # noqa: WPS437
+        codec.YAML_BACKEND_RUAMEL_PURE,
+    ]
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+
+from string import Template
+
+import pytest
+
+from slow_start_rewatch.compiled_template import (
+    CompiledTemplate,
+    compile_template,
+)
+
+MAPPING = {
+    "e01": "[Episode 1](/cute_id)",
+    "navigation_links": "/previous | /next",
+    "number": 1,
+}
+
+
+@pytest.mark.parametrize("template", [
+    "",
+    "Slow Start",
+    "$e01",
+    "${e01}",
+    "$e01$e01${e01}text",
+    "$navigation_links\n\n|1:$e01|2:$e02|3:${e03}|",
+    "$$e01 $$ $ $1 ${ ${e01 $e01_ $number",
+    "Trailing dollar $",
+    "Ｕｎｉｃｏｄｅ $e01 ☆",
+])
+def test_render(template):
+    """Test that the output is the same as the `safe_substitute()` output."""
+    compiled_template = CompiledTemplate(template)
+
+    assert compiled_template.render(MAPPING) == (
+        Template(template).safe_substitute(MAPPING)
+    )
+
+
+def test_segments():
+    """Test parsing of the template into segments."""
+    compiled_template = CompiledTemplate("1:$e01|$$2:${e02}")
+
+    assert compiled_template.segments == [
+        ("1:", None),
+        ("$e01", "e01"),
+        ("|$2:", None),
+        ("${e02}", "e02"),
+    ]
+    assert compiled_template.placeholders == {"e01", "e02"}
+
+
+def test_compile_template():
+    """Test that the compiled templates are cached by the content."""
+    template = "Slow Start $e01"
+
+    compiled_template = compile_template(template)
+
+    assert compile_template("".join(["Slow Start ", "$e01"])) is (
+        compiled_template
+    )
+    assert compile_template("Slow Start $e02") is not compiled_template
@@ -108,6 +108,19 @@ def test_loading_incomplete_file(tmpdir):
         config_storage.load()
 
 
+def test_loading_invalid_structure(tmpdir):
+    """Test error handling of loading a config file which is not a mapping."""
+    config_path = tmpdir.join("config_local.yml")
+
+    with open(config_path, "w") as config_file:
+        config_file.write("- moe_moe_kyun")
+
+    config_storage = ConfigStorage(config_path)
+
+    with pytest.raises(InvalidLocalConfig):
+        config_storage.load()
+
+
 @pytest.fixture()
 def config_data():
     """Return mock Config data."""
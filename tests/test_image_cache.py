@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+
+import hashlib
+import io
+import json
+import os
+import time
+from typing import Optional
+from unittest.mock import patch
+
+import pytest
+
+from slow_start_rewatch.reddit.image_cache import (
+    CACHE_DIRECTORY,
+    ImageCache,
+    create_image_cache,
+)
+from tests.conftest import TEST_IMAGE_URL, MockConfig
+
+
+def test_put_and_get(image_cache):
+    """
+    Test storing and loading the cached image.
+
+    The images with the same content are stored only once.
+    """
+    assert not image_cache.get(TEST_IMAGE_URL)
+
+    put_image(
+        image_cache,
+        TEST_IMAGE_URL,
+        b"GIF89a",
+        etag='"cute_etag"',
+        last_modified="Sat, 06 Jan 2018 12:00:00 GMT",
+    )
+    put_image(image_cache, "https://i.imgur.com/moe.gif", b"GIF89a")
+
+    cached_image = image_cache.get(TEST_IMAGE_URL)
+
+    with cached_image.open() as image_file:
+        assert image_file.read() == b"GIF89a"
+    assert cached_image.validators == {
+        "If-None-Match": '"cute_etag"',
+        "If-Modified-Since": "Sat, 06 Jan 2018 12:00:00 GMT",
+    }
+    assert image_cache.is_fresh(cached_image)
+    assert image_cache.get("https://i.imgur.com/moe.gif").content_path == (
+        cached_image.content_path
+    )
+    assert len(os.listdir(os.path.dirname(cached_image.content_path))) == 1
+
+
+def test_revalidate(image_cache):
+    """Test that the revalidated image is fresh again."""
+    put_image(image_cache, TEST_IMAGE_URL, b"GIF89a")
+    cached_image = image_cache.get(TEST_IMAGE_URL)
+    cached_image.validated_at = time.time() - 3600
+
+    assert not cached_image.validators
+    assert not image_cache.is_fresh(cached_image)
+
+    image_cache.revalidate(cached_image)
+
+    assert image_cache.is_fresh(image_cache.get(TEST_IMAGE_URL))
+
+
+def test_evict(image_cache):
+    """Test removing the least recently used images exceeding the size."""
+    image_cache.max_size = 10
+    put_image(image_cache, "https://i.imgur.com/cute.gif", b"cute")
+    put_image(image_cache, "https://i.imgur.com/moe.gif", b"moe")
+    cute_image = image_cache.get("https://i.imgur.com/cute.gif")
+    os.utime(cute_image.content_path, (0, 0))
+
+    with open("{0}.tmp".format(cute_image.content_path), "wb") as temp_file:
+        temp_file.write(b"Unfinished write")
+
+    put_image(image_cache, "https://i.imgur.com/fluffy.gif", b"fluffy")
+
+    assert not image_cache.get("https://i.imgur.com/cute.gif")
+    assert image_cache.get("https://i.imgur.com/moe.gif")
+    assert image_cache.get("https://i.imgur.com/fluffy.gif")
+
+
+def test_count(image_cache):
+    """Test counting the results of the lookups."""
+    image_cache.count("hits", TEST_IMAGE_URL)
+    image_cache.count("hits", TEST_IMAGE_URL)
+    image_cache.count("misses", TEST_IMAGE_URL)
+
+    assert image_cache.metrics == {"hits": 2, "revalidations": 0, "misses": 1}
+
+
+def test_cache_errors(image_cache, tmpdir):
+    """Test that failing to read or write the cache is not fatal."""
+    put_image(image_cache, TEST_IMAGE_URL, b"GIF89a")
+
+    with open(image_cache.get_url_path(TEST_IMAGE_URL), "w") as url_file:
+        json.dump({"content_hash": "cute_hash"}, url_file)
+
+    assert not image_cache.get(TEST_IMAGE_URL)
+
+    with patch(
+        "slow_start_rewatch.reddit.image_cache.write_atomically",
+        side_effect=IOError,
+    ):
+        put_image(image_cache, TEST_IMAGE_URL, b"Fluffy")
+        put_image(image_cache, TEST_IMAGE_URL, b"GIF89a")
+
+    with patch(
+        "slow_start_rewatch.reddit.image_cache.os.remove",
+        side_effect=FileNotFoundError,
+    ):
+        image_cache.max_size = 0
+        image_cache.evict()
+
+    with patch(
+        "slow_start_rewatch.reddit.image_cache.os.utime",
+        side_effect=PermissionError,
+    ):
+        assert image_cache.touch(str(tmpdir))
+
+
+def test_create_image_cache(tmpdir):
+    """Test creating the cache only when it's enabled."""
+    config = MockConfig({
+        "data_dir": str(tmpdir),
+        "image_cache": {
+            "enabled": True,
+            "max_size": 1024,
+            "max_age": 600000,
+        },
+    })
+
+    image_cache = create_image_cache(config)
+
+    assert image_cache
+    assert image_cache.cache_dir == str(tmpdir.join(CACHE_DIRECTORY))
+    assert image_cache.max_size == 1024
+    assert image_cache.max_age == 600000
+
+    config["image_cache"]["enabled"] = False
+
+    assert not create_image_cache(config)
+
+
+def put_image(
+    image_cache: ImageCache,
+    url: str,
+    content: bytes,
+    **validators: Optional[str],
+) -> None:
+    """Store the image content in the cache."""
+    image_cache.put(
+        url,
+        io.BytesIO(content),
+        hashlib.sha256(content).hexdigest(),
+        **validators,
+    )
+
+
+@pytest.fixture()
+def image_cache(tmpdir):
+    """Return `ImageCache` stored in a temporary directory."""
+    return ImageCache(
+        cache_dir=str(tmpdir.join(CACHE_DIRECTORY)),
+        max_size=1024,
+        max_age=600000,
+    )
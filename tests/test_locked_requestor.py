@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+
+import threading
+import time
+from unittest.mock import Mock
+
+from slow_start_rewatch.reddit.locked_requestor import LockedRequestor
+
+
+def test_request():
+    """Test that the concurrent requests are sent one at a time."""
+    active_requests = []
+    concurrent_requests = []
+    response = Mock()
+
+    def request(*args, **kwargs):
+        active_requests.append(args)
+        concurrent_requests.append(len(active_requests))
+        time.sleep(0.01)
+        active_requests.remove(args)
+
+        return response
+
+    session = Mock()
+    session.headers = {}
+    session.request.side_effect = request
+    requestor = LockedRequestor("slow_start_rewatch", session=session)
+
+    request_threads = [
+        threading.Thread(
+            target=requestor.request,
+            args=("GET", "https://oauth.reddit.com/{0}".format(index)),
+        )
+        for index in range(4)
+    ]
+
+    for request_thread in request_threads:
+        request_thread.start()
+
+    for request_thread in request_threads:
+        request_thread.join()
+
+    assert concurrent_requests == [1, 1, 1, 1]
+    assert requestor.request("GET", "api/v1/me") == response
+    assert "slow_start_rewatch" in session.headers["User-Agent"]
@@ -53,6 +53,50 @@ def test_debug(mock_app, request):
     assert cli_result.exit_code == 0
 
 
+@patch("slow_start_rewatch.__main__.App")
+def test_no_schedule_cache(mock_app):
+    """Test the launch with the ``--no_schedule_cache`` option."""
+    runner = CliRunner()
+
+    cli_result = runner.invoke(main, ["--no_schedule_cache"])
+    assert cli_result.exit_code == 0
+    assert mock_app.call_args[1]["no_schedule_cache"] is True
+
+
+@patch("slow_start_rewatch.__main__.App")
+def test_import_export_schedule(mock_app):
+    """Test the launch with the ``--import_schedule`` and the export."""
+    runner = CliRunner()
+
+    cli_result = runner.invoke(
+        main,
+        ["-d", "schedule.sqlite", "--import_schedule", "schedule.yml"],
+    )
+    assert cli_result.exit_code == 0
+    assert mock_app.call_args[1]["schedule_database"] == "schedule.sqlite"
+    assert mock_app.return_value.import_schedule.call_args[0] == (
+        "schedule.yml",
+    )
+
+    cli_result = runner.invoke(main, ["--export_schedule", "export.yml"])
+    assert cli_result.exit_code == 0
+    assert mock_app.return_value.export_schedule.call_args[0] == (
+        "export.yml",
+    )
+    assert mock_app.return_value.run.call_count == 0
+
+
+@patch("slow_start_rewatch.__main__.App")
+def test_warm_assets(mock_app):
+    """Test the launch with the ``--warm_assets`` option."""
+    runner = CliRunner()
+
+    cli_result = runner.invoke(main, ["--warm_assets"])
+    assert cli_result.exit_code == 0
+    assert mock_app.return_value.warm_assets.call_count == 1
+    assert mock_app.return_value.run.call_count == 0
+
+
 @patch("slow_start_rewatch.__main__.App")
 def test_handled_exception_with_hint(mock_app):
     """Test the output of a handled exception (with a hint)."""
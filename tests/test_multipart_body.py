@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+
+import io
+
+from slow_start_rewatch.reddit.multipart_body import (
+    MultipartBody,
+    measure_file,
+)
+
+
+def test_read():
+    """Test reading the body in chunks of various sizes."""
+    image_content = io.BytesIO(b"GIF89a")
+    multipart_body = MultipartBody(
+        fields={"Hana": "4/6", "Tama": "5/23"},
+        file_field="file",
+        filename="flowery_hug.gif",
+        mime_type="image/gif",
+        file_content=image_content,
+    )
+    boundary = multipart_body.boundary.encode("utf-8")
+    expected_body = b"".join((
+        b"--", boundary, b"\r\n",
+        b'Content-Disposition: form-data; name="Hana"\r\n\r\n4/6\r\n',
+        b"--", boundary, b"\r\n",
+        b'Content-Disposition: form-data; name="Tama"\r\n\r\n5/23\r\n',
+        b"--", boundary, b"\r\n",
+        b'Content-Disposition: form-data; name="file"; ',
+        b'filename="flowery_hug.gif"\r\n',
+        b"Content-Type: image/gif\r\n\r\n",
+        b"GIF89a\r\n",
+        b"--", boundary, b"--\r\n",
+    ))
+
+    assert multipart_body.content_type == (
+        "multipart/form-data; boundary={0}".format(multipart_body.boundary)
+    )
+    assert len(multipart_body) == len(expected_body)
+
+    chunks = []
+
+    while True:
+        chunk = multipart_body.read(5)
+
+        if not chunk:
+            break
+
+        assert len(chunk) <= 5
+        chunks.append(chunk)
+
+    assert b"".join(chunks) == expected_body
+
+    image_content.seek(0)
+    multipart_body = MultipartBody(
+        fields={},
+        file_field="file",
+        filename="flowery_hug.gif",
+        mime_type="image/gif",
+        file_content=image_content,
+    )
+
+    whole_body = multipart_body.read()
+
+    assert len(whole_body) == len(multipart_body)
+    assert whole_body.replace(
+        multipart_body.boundary.encode("utf-8"),
+        boundary,
+    ) == expected_body[-len(whole_body):]
+    assert not multipart_body.read()
+
+
+def test_measure_file():
+    """Test measuring the file from the current position."""
+    image_content = io.BytesIO(b"GIF89a")
+    image_content.seek(2)
+
+    assert measure_file(image_content) == 4
+    assert image_content.tell() == 2
@@ -1,10 +1,11 @@
 # -*- coding: utf-8 -*-
 
 from datetime import datetime
+from unittest.mock import Mock, call
 
 import pytest
 
-from slow_start_rewatch.post import Post
+from slow_start_rewatch.post import DeferredBody, Post
 
 
 def test_create():
@@ -43,6 +44,38 @@ def test_create():
     )
 
 
+def test_deferred_body():
+    """
+    Test the `Post` with a deferred body.
+
+    The body is loaded only once on the first use.
+    """
+    load_post_body = Mock(return_value="*Slow Start*, Episode 1")
+    deferred_body = DeferredBody("episode_01.md", load_post_body)
+    post = Post(
+        name="episode_01",
+        submit_at=datetime(2018, 1, 6, 17, 0, 0),
+        subreddit="anime",
+        title="Slow Start - Episode 1 Discussion",
+        body_template=deferred_body,
+    )
+    pending_body = post.deferred_body
+
+    assert pending_body is deferred_body
+    assert not load_post_body.called
+
+    assert post.body_template == "*Slow Start*, Episode 1"
+    assert post.body_template == "*Slow Start*, Episode 1"
+    assert post.deferred_body is None
+    assert load_post_body.call_args == call("episode_01.md")
+    assert load_post_body.call_count == 1
+
+    post.body_template = "*Slow Start*, Episode 2"
+
+    assert post.body_template == "*Slow Start*, Episode 2"
+    assert post.deferred_body is None
+
+
 def test_create_with_empty_field():
     """Test that the `Post` cannot be instantiated with empty attributes."""
     with pytest.raises(AttributeError):
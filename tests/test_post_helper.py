@@ -1,23 +1,23 @@
 # -*- coding: utf-8 -*-
 
 from datetime import datetime
-from unittest.mock import call, patch
+from unittest.mock import Mock, patch
 
 import pytest
 
 from slow_start_rewatch.exceptions import ImageNotFound, PostConversionError
-from slow_start_rewatch.post import Post
+from slow_start_rewatch.post import DeferredBody, Post
 from slow_start_rewatch.post_helper import PostHelper
 from slow_start_rewatch.reddit.text_post_converter import TextPostConverter
 from slow_start_rewatch.schedule.schedule import Schedule
 from tests.conftest import MockConfig
 
 
-@patch.object(PostHelper, "build_navigation_links")
+@patch.object(PostHelper, "substitute_navigation_links")
 @patch.object(PostHelper, "prepare_thumbnail")
 def test_prepare_post(
     mock_prepare_thumbnail,
-    mock_build_navigation_links,
+    mock_substitute_navigation_links,
     post_helper_config,
     reddit,
 ):
@@ -27,8 +27,12 @@ def test_prepare_post(
     1. Prepare post without thumbnail.
 
     2. Prepare post with thumbnail.
+
+    3. Prepare post after the submission of another post.
+
+    The render context is built only once for the Schedule.
     """
-    mock_build_navigation_links.return_value = "links"
+    mock_substitute_navigation_links.return_value = "links"
     posts = [
         Post(
             name="e{0:02}".format(post),
@@ -45,6 +49,9 @@ def test_prepare_post(
     schedule = Schedule(subreddit="anime", posts=posts)
 
     post_helper = PostHelper(post_helper_config, reddit)
+    post_helper.update_render_context(posts[0])
+
+    assert post_helper.render_context is None
 
     post_helper.prepare_post(posts[1], schedule)
 
@@ -56,42 +63,60 @@ def test_prepare_post(
     assert posts[0].body_md == "links|1:*|2:-|3:-"
     assert mock_prepare_thumbnail.call_count == 1
 
+    render_context = post_helper.render_context
+    posts[1].submission_id = "cute_id_2"
+    post_helper.update_render_context(posts[1])
 
-@patch.object(PostHelper, "substitute_navigation_links")
-def test_build_navigation_links(
-    mock_substitute_navigation_links,
-    post_helper_config,
-    reddit,
-):
-    """Test the preparation of the Navigation Links."""
+    post_helper.prepare_post(posts[2], schedule)
+    assert posts[2].body_md == "links|1:/cute_id|2:/cute_id_2|3:*"
+    assert post_helper.render_context is render_context
+    assert mock_substitute_navigation_links.call_count == 5
+
+
+def test_build_dependents(post_helper_config, reddit):
+    """
+    Test building the dependency graph of the posts.
+
+    1. The first post references the second post by its placeholder.
+
+    2. The second and the third post contain the Navigation Links.
+
+    3. The fourth post doesn't depend on any post.
+    """
+    body_templates = [
+        "$e01 $e02 $missing",
+        "${navigation_links}",
+        "$navigation_links $$e01",
+        "$e04",
+    ]
     posts = [
         Post(
-            name="e{0:02}".format(post),
+            name="e{0:02}".format(index + 1),
             submit_at=datetime(2018, 1, 6, 17, 0, 0),
             subreddit="anime",
-            title="Slow Start - Episode {0} Discussion".format(post),
-            body_template="1:$e01|2:$e02|3:$e03",
-            navigation_scheduled="-",
-            navigation_submitted="$link",
-            navigation_current="*",
-        ) for post in range(1, 4)
+            title="Slow Start - Episode {0} Discussion".format(index + 1),
+            body_template=body_template,
+        ) for index, body_template in enumerate(body_templates)
     ]
-    post_helper = PostHelper(post_helper_config, reddit)
+    schedule = Schedule(subreddit="anime", posts=posts)
 
-    post_helper.build_navigation_links(posts[0], posts)
-    assert mock_substitute_navigation_links.call_args == call(None, None)
+    post_helper = PostHelper(post_helper_config, reddit)
 
-    posts[0].submission_id = "id_1"
-    post_helper.build_navigation_links(posts[1], posts)
-    assert mock_substitute_navigation_links.call_args == call("id_1", None)
+    assert post_helper.build_dependents(schedule) == {
+        "e01": {"e02"},
+        "e02": {"e01", "e03"},
+        "e03": {"e02"},
+        "e04": {"e03"},
+    }
 
-    posts[1].submission_id = "id_2"
-    post_helper.build_navigation_links(posts[0], posts)
-    assert mock_substitute_navigation_links.call_args == call(None, "id_2")
+    posts[2].body_template = DeferredBody("e03.md", Mock())
 
-    posts[2].submission_id = "id_3"
-    post_helper.build_navigation_links(posts[1], posts)
-    assert mock_substitute_navigation_links.call_args == call("id_1", "id_3")
+    assert post_helper.build_dependents(schedule) == {
+        "e01": {"e02"},
+        "e02": {"e01"},
+        "e03": {"e02"},
+        "e04": set(),
+    }
 
 
 @pytest.mark.parametrize(("previous_id", "next_id", "expected_output"), [
@@ -168,4 +193,18 @@ def post_helper_config():
             "template_both": "$previous_link$next_link",
         },
         "post_image_mime_types": "",
+        "image_cache": {
+            "enabled": False,
+            "max_size": 1024,
+            "max_age": 600000,
+        },
+        "asset_registry": {
+            "enabled": False,
+            "validity": 3600000,
+        },
+        "image_download": {
+            "max_size": 1024,
+            "spool_size": 16,
+            "chunk_size": 4,
+        },
     })
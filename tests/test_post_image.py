@@ -50,10 +50,22 @@ def test_properties():
     with pytest.raises(AttributeError):
         assert post_image.image_content
 
-    post_image.image_content = io.BytesIO(b"GIF89a")
+    image_content = io.BytesIO(b"GIF89a")
+    post_image.image_content = image_content
 
     assert post_image.image_content.getvalue() == b"GIF89a"
 
+    post_image.reddit_asset_id = None
+
+    assert image_content.read() == b"GIF89a"
+
+    post_image.reddit_asset_id = "adorable_id"
+
+    assert image_content.closed
+
+    with pytest.raises(AttributeError):
+        assert post_image.image_content
+
 
 def test_comparison():
     """Test the comparison of `PostImage` objects."""
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+
+from unittest.mock import call, patch
+
+import pytest
+
+from slow_start_rewatch.reddit.rate_limiter import RateLimiter
+from tests.conftest import MockConfig
+
+CURRENT_TIMESTAMP = 1515258000
+
+
+@patch("slow_start_rewatch.reddit.rate_limiter.time")
+def test_acquire(mock_time, rate_limiter_config, reddit):
+    """
+    Test acquiring tokens when the API limits are unknown.
+
+    The burst tokens are available right away, then the requests are limited
+    by the maximum rate.
+    """
+    current_time = [100.0]
+    mock_time.monotonic.side_effect = lambda: current_time[0]
+
+    def sleep(seconds):
+        current_time[0] += seconds
+
+    mock_time.sleep.side_effect = sleep
+    reddit.auth.limits = {"remaining": None, "reset_timestamp": None}
+
+    rate_limiter = RateLimiter(rate_limiter_config, reddit)
+
+    for _ in range(4):
+        rate_limiter.acquire()
+
+    assert mock_time.sleep.call_args_list == [call(0.5), call(0.5)]
+    assert current_time[0] == 101
+
+
+@patch("slow_start_rewatch.reddit.rate_limiter.time")
+def test_current_rate(mock_time, rate_limiter_config, reddit):
+    """
+    Test the rate computed from the API limits.
+
+    1. The remaining budget is spread over the time left until the reset.
+
+    2. The rate is capped by the maximum rate.
+
+    3. The rate backs off when the budget is depleted.
+    """
+    mock_time.time.return_value = CURRENT_TIMESTAMP
+    mock_time.monotonic.return_value = 100
+    rate_limiter = RateLimiter(rate_limiter_config, reddit)
+
+    reddit.auth.limits = {
+        "remaining": 110.0,
+        "reset_timestamp": CURRENT_TIMESTAMP + 200,
+    }
+
+    assert rate_limiter.current_rate() == pytest.approx(0.5)
+
+    reddit.auth.limits = {
+        "remaining": 600.0,
+        "reset_timestamp": CURRENT_TIMESTAMP + 200,
+    }
+
+    assert rate_limiter.current_rate() == 2
+
+    reddit.auth.limits = {
+        "remaining": 10.0,
+        "reset_timestamp": CURRENT_TIMESTAMP + 200,
+    }
+
+    assert rate_limiter.current_rate() == pytest.approx(1 / 200)
+    assert rate_limiter.take_token() == pytest.approx(200)
+
+
+@pytest.fixture()
+def rate_limiter_config():
+    """Return mock Config for testing the `RateLimiter`."""
+    return MockConfig({
+        "rate_limiter": {
+            "max_rate": 2,
+            "burst": 2,
+            "reserve": 10,
+        },
+    })
@@ -2,13 +2,14 @@
 
 from datetime import datetime
 from typing import Optional
-from unittest.mock import call, patch
+from unittest.mock import Mock, call, patch
 
 import pytest
 from prawcore.exceptions import PrawcoreException
 
 from slow_start_rewatch.exceptions import RedditError
 from slow_start_rewatch.post import Post
+from slow_start_rewatch.reddit.locked_requestor import LockedRequestor
 from slow_start_rewatch.reddit.reddit_cutifier import RedditCutifier
 from tests.conftest import (
     HTTP_SERVER_HOSTNAME,
@@ -51,6 +52,7 @@ def test_authorize(
         client_secret=REDDIT_CLIENT_SECRET,
         redirect_uri=redirect_uri,
         refresh_token=REFRESH_TOKEN,
+        requestor_class=LockedRequestor,
     )
 
     reddit_cutifier.authorize()
@@ -100,7 +102,9 @@ def test_submit_post_with_thumbnail(
     Check that :meth:`Reddit.subreddit()` is not called (used only for posts
     without thumbnail).
 
-    Check the delay before updating the post.
+    Check that the post is not updated during the submission.
+
+    Check the delay before updating the post when finishing the submission.
 
     Check that :meth:`RedditCutifier.update_post()` is called.
     """
@@ -110,7 +114,16 @@ def test_submit_post_with_thumbnail(
     submit_post_rtjson = mock_reddit_helper.return_value.submit_post_rtjson
     mock_update_post.return_value.permalink = "slow_start_link"
 
-    assert reddit_cutifier.submit_post(post).permalink == "slow_start_link"
+    submission = reddit_cutifier.submit_post(post)
+
+    assert submission == submit_post_rtjson.return_value
+    assert not mock_sleep.called
+    assert not mock_update_post.called
+
+    submission = reddit_cutifier.finish_submission(post, submission)
+
+    assert submission
+    assert submission.permalink == "slow_start_link"
     assert submit_post_rtjson.call_args == call(
         subreddit=post.subreddit,
         title=post.title,
@@ -122,6 +135,46 @@ def test_submit_post_with_thumbnail(
     assert mock_update_post.called
 
 
+@patch.object(RedditCutifier, "update_post")
+@patch("time.sleep")
+@patch("slow_start_rewatch.reddit.reddit_cutifier.ThumbnailWatcher")
+@patch("slow_start_rewatch.reddit.reddit_cutifier.RedditHelper")
+@patch("slow_start_rewatch.reddit.reddit_cutifier.Reddit")
+def test_submit_post_thumbnail_polling(
+    mock_reddit,
+    mock_reddit_helper,
+    mock_thumbnail_watcher,
+    mock_sleep,
+    mock_update_post,
+    reddit_cutifier_config,
+    post: Post,
+):
+    """
+    Test submitting a post with the thumbnail polling enabled.
+
+    Check that the post is updated after the thumbnail is ready instead of
+    waiting for the fixed delay.
+    """
+    reddit_cutifier_config["reddit_cutifier.thumbnail_polling"] = True
+    post.body_rtjson = [{"c": [{"t": "Slow Start"}]}]
+    reddit_cutifier = RedditCutifier(reddit_cutifier_config)
+
+    submit_post_rtjson = mock_reddit_helper.return_value.submit_post_rtjson
+    submit_post_rtjson.return_value.id = "cute_id"
+
+    reddit_cutifier.finish_submission(post, reddit_cutifier.submit_post(post))
+
+    wait_until_ready = mock_thumbnail_watcher.return_value.wait_until_ready
+
+    assert wait_until_ready.call_args == call(
+        subreddit=post.subreddit,
+        submission_id="cute_id",
+        timeout=2000,
+    )
+    assert not mock_sleep.called
+    assert mock_update_post.called
+
+
 @patch.object(RedditCutifier, "update_post")
 @patch("slow_start_rewatch.reddit.reddit_cutifier.RedditHelper")
 @patch("slow_start_rewatch.reddit.reddit_cutifier.Reddit")
@@ -154,7 +207,10 @@ def test_submit_post_without_thumbnail(
     subreddit = mock_reddit.return_value.subreddit.return_value
     subreddit.submit.return_value.permalink = "slow_start_link"
 
-    assert reddit_cutifier.submit_post(post).permalink == "slow_start_link"
+    submission = reddit_cutifier.submit_post(post)
+
+    assert submission.permalink == "slow_start_link"
+    assert reddit_cutifier.finish_submission(post, submission) == submission
     assert subreddit.submit.call_args == call(
         title=post.title,
         selftext=post.body_md,
@@ -169,6 +225,77 @@ def test_submit_post_without_thumbnail(
     assert not mock_update_post.called
 
 
+@patch("slow_start_rewatch.reddit.reddit_cutifier.RedditHelper")
+@patch("slow_start_rewatch.reddit.reddit_cutifier.Reddit")
+def test_prewarm(
+    mock_reddit,
+    mock_reddit_helper,
+    reddit_cutifier_config,
+    post: Post,
+):
+    """
+    Test prewarming the submission.
+
+    1. The post with thumbnail is prepared with Rich Text JSON body. An error
+       during opening the connection is ignored.
+
+    2. The post without thumbnail is prepared with Markdown body.
+    """
+    post.body_md = "Slow Start"
+    post.body_rtjson = [{"c": [{"t": "Slow Start"}]}]
+    reddit_cutifier = RedditCutifier(reddit_cutifier_config)
+    reddit_helper = mock_reddit_helper.return_value
+    reddit_helper.prewarm_connection.side_effect = [PrawcoreException, None]
+
+    reddit_cutifier.prewarm(post)
+
+    assert post.submit_data == reddit_helper.prepare_submit_data.return_value
+    assert reddit_helper.prepare_submit_data.call_args == call(
+        subreddit=post.subreddit,
+        title=post.title,
+        flair_id=post.flair_id,
+        body_rtjson=post.body_rtjson,
+        body_md="Slow Start",
+    )
+
+    post.submit_with_thumbnail = False
+    reddit_cutifier.prewarm(post)
+
+    assert reddit_helper.prewarm_connection.call_count == 2
+    assert reddit_helper.prepare_submit_data.call_args[1]["body_rtjson"] is None
+
+
+@patch("slow_start_rewatch.reddit.reddit_cutifier.RedditHelper")
+@patch("slow_start_rewatch.reddit.reddit_cutifier.Reddit")
+def test_submit_prepared_post(
+    mock_reddit,
+    mock_reddit_helper,
+    reddit_cutifier_config,
+    post: Post,
+):
+    """
+    Test submitting a prewarmed post.
+
+    Check that only the prepared data are submitted and the latency is
+    measured.
+    """
+    post.submit_with_thumbnail = False
+    post.submit_data = {"title": post.title}
+    reddit_cutifier = RedditCutifier(reddit_cutifier_config)
+    submit_prepared_post = mock_reddit_helper.return_value.submit_prepared_post
+    submit_prepared_post.return_value.id = "cute_id"
+
+    reddit_cutifier.submit_post(post)
+
+    assert submit_prepared_post.call_args == call({"title": post.title})
+    assert not mock_reddit.return_value.subreddit.called
+    assert post.submission_id == "cute_id"
+    assert reddit_cutifier.submit_latency is not None
+    assert reddit_cutifier.submit_latency >= 0
+    assert post.submit_latency == reddit_cutifier.submit_latency
+    assert post.submitted_at
+
+
 @patch("slow_start_rewatch.reddit.reddit_cutifier.Reddit")
 def test_update_post(
     mock_reddit,
@@ -187,7 +314,10 @@ def test_update_post(
 
     3. Previous test with the `submission_id` provided.
 
-    4. Test handling of an exception raised by `PRAW`.
+    4. Test that the new body is stored in the post after the edit.
+
+    5. Test handling of an exception raised by `PRAW` (the new body is not
+       stored in the post).
     """
     reddit_cutifier = RedditCutifier(reddit_cutifier_config)
 
@@ -203,11 +333,22 @@ def test_update_post(
 
     assert mock_reddit.return_value.submission.call_args == call("cute_id")
 
+    reddit_cutifier.update_post(post, submission, body_md="Cute body")
+
+    assert submission.edit.call_args == call("Cute body")
+    assert post.body_md == "Cute body"
+
     submission.edit.side_effect = PrawcoreException
-    reddit_cutifier.update_post(post, submission)
+
+    assert not reddit_cutifier.update_post(
+        post,
+        submission,
+        body_md="Cuter body",
+    )
 
     captured = capsys.readouterr()
     assert "Failed to update the post" in captured.err
+    assert post.body_md == "Cute body"
 
 
 @patch.object(RedditCutifier, "update_post")
@@ -216,8 +357,14 @@ def test_update_posts(
     mock_reddit,
     mock_update_post,
     reddit_cutifier_config,
+    capsys,
 ):
-    """Test updating multiple posts."""
+    """
+    Test updating multiple posts.
+
+    Check that each edit waits for the rate limiter and that the throughput is
+    reported. Check that a failed edit is reported by the result.
+    """
     posts = [
         Post(
             name="episode_{0}".format(post_id),
@@ -229,12 +376,32 @@ def test_update_posts(
     ]
 
     reddit_cutifier = RedditCutifier(reddit_cutifier_config)
+    reddit_cutifier.rate_limiter = Mock()
 
-    reddit_cutifier.update_posts(posts)
+    post_updates = [(post, "{0} v2".format(post.name)) for post in posts]
 
-    expected_calls = [call(post) for post in posts]
+    assert reddit_cutifier.update_posts([])
+    assert not mock_update_post.called
+
+    assert reddit_cutifier.update_posts(post_updates)
+    captured = capsys.readouterr()
+
+    assert mock_update_post.call_count == len(posts)
+    assert reddit_cutifier.rate_limiter.acquire.call_count == len(posts)
+
+    assert mock_update_post.call_args_list == [
+        call(post, body_md=body_md) for post, body_md in post_updates
+    ]
 
-    assert list(mock_update_post.call_args_list) == expected_calls
+    assert "Updated 3 posts" in captured.out
+    assert "edits/min" in captured.out
+
+    mock_update_post.side_effect = [Mock(), None, Mock()]
+
+    assert not reddit_cutifier.update_posts(post_updates)
+
+    captured = capsys.readouterr()
+    assert "Updated 2 posts" in captured.out
 
 
 @pytest.fixture()
@@ -252,7 +419,21 @@ def reddit_cutifier_config():
         },
         "reddit_cutifier": {
             "post_update_delay": 2000,
-            "previous_post_update_delay": 2000,
+            "thumbnail_polling": False,
+            "prewarm_time": 30000,
+        },
+        "rate_limiter": {
+            "max_rate": 1,
+            "burst": 5,
+            "reserve": 10,
+        },
+        "thumbnail_watcher": {
+            "initial_interval": 2000,
+            "max_interval": 20000,
+            "backoff_factor": 2,
+            "early_fraction": 0.5,
+            "history_size": 10,
         },
+        "data_dir": "slow_start_rewatch",
         "refresh_token": REFRESH_TOKEN,
     })
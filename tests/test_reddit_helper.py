@@ -1,13 +1,14 @@
 # -*- coding: utf-8 -*-
 
 import io
-from unittest.mock import DEFAULT, call, patch
+from unittest.mock import DEFAULT, Mock, call, patch
 
 import pytest
 from praw.exceptions import PRAWException
 from requests.exceptions import HTTPError
 
 from slow_start_rewatch.exceptions import RedditError
+from slow_start_rewatch.reddit.multipart_body import MultipartBody
 from slow_start_rewatch.reddit.reddit_helper import (
     API_PATH_CONVERT,
     RedditHelper,
@@ -118,18 +119,21 @@ def test_upload_image(
         image_bytes,
     )
 
+    upload_body = mock_post.call_args[1]["data"]
+
     assert asset_id == "adorable_id"
     assert mock_post.call_args == call(
         "https://slow-start.com/",
-        data={
-            "Hana": "4/6",
-            "Tama": "5/23",
-            "Eiko": "6/20",
-            "Kamuri": "10/30",
+        data=upload_body,
+        headers={
+            "User-Agent": "Slow Start Rewatch Client",
+            "Content-Type": "multipart/form-data; boundary={0}".format(
+                upload_body.boundary,
+            ),
         },
-        files={"file": ("flowery_hug.gif", image_bytes)},
-        headers={"User-Agent": "Slow Start Rewatch Client"},
     )
+    assert isinstance(upload_body, MultipartBody)
+    assert b'name="Kamuri"\r\n\r\n10/30\r\n' in upload_body.read()
 
 
 def test_submit_post_rtjson(
@@ -149,6 +153,71 @@ def test_submit_post_rtjson(
     assert reddit.post.called
 
 
+def test_prepare_submit_data(
+    reddit_helper_config,
+    reddit,
+):
+    """
+    Test preparing the data of the submit request.
+
+    1. The body is submitted as Rich Text JSON.
+
+    2. The body is submitted as Markdown.
+    """
+    reddit_helper = RedditHelper(reddit_helper_config, reddit)
+
+    submit_data = reddit_helper.prepare_submit_data(
+        subreddit="anime",
+        title="Slow Start Rewatch - Episode 1 Discussion",
+        flair_id="cute_flair",
+        body_rtjson=[{"c": [{"t": "Awesome Content"}]}],
+        body_md="Awesome Content",
+    )
+
+    assert submit_data["richtext_json"] == (
+        '{"document": [{"c": [{"t": "Awesome Content"}]}]}'
+    )
+    assert "text" not in submit_data
+    assert submit_data["flair_id"] == "cute_flair"
+
+    submit_data = reddit_helper.prepare_submit_data(
+        subreddit="anime",
+        title="Slow Start Rewatch - Episode 1 Discussion",
+        flair_id=None,
+        body_md="Awesome Content",
+    )
+
+    assert submit_data["text"] == "Awesome Content"
+    assert "richtext_json" not in submit_data
+
+    reddit_helper.submit_prepared_post(submit_data)
+
+    assert reddit.post.call_args == call(
+        "api/submit/",
+        data=submit_data,
+    )
+
+
+def test_prewarm_connection(
+    reddit_helper_config,
+    reddit,
+):
+    """Test refreshing the access token and opening the connection."""
+    reddit_helper = RedditHelper(reddit_helper_config, reddit)
+
+    reddit_helper.prewarm_connection()
+
+    assert reddit._core._authorizer.refresh.called  # noqa: WPS437
+    assert reddit.user.me.call_args == call(use_cache=False)
+
+    reddit._core._authorizer = Mock(spec=[])  # noqa: WPS437
+    reddit.user.me.reset_mock()
+
+    reddit_helper.prewarm_connection()
+
+    assert reddit.user.me.call_args == call(use_cache=False)
+
+
 @pytest.fixture()
 def reddit_helper_config():
     """Return mock Config for testing the `RedditHelper`."""
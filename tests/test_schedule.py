@@ -2,6 +2,8 @@
 
 from datetime import datetime
 
+from unittest.mock import Mock
+
 import pytest
 
 from slow_start_rewatch.post import Post
@@ -27,6 +29,95 @@ def test_create():
     assert schedule.posts[2].submit_with_thumbnail  # Set to True by default
 
 
+def test_sorting():
+    """Test that the posts are sorted by the submission time."""
+    submit_days = [3, 1, 2, 1]
+    posts = [
+        Post(
+            name="post_{0}".format(index),
+            submit_at=datetime(2018, 1, submit_day, 17, 0, 0),
+            subreddit="anime",
+            title="Slow Start",
+            body_template="*Slow Start*",
+        ) for index, submit_day in enumerate(submit_days)
+    ]
+    schedule = Schedule(subreddit="anime", posts=posts)
+
+    assert [post.name for post in schedule.posts] == [
+        "post_1",
+        "post_3",
+        "post_2",
+        "post_0",
+    ]
+    assert schedule.post_positions["post_0"] == 3
+
+
+def test_lookup(schedule):
+    """Test looking up the posts by the name."""
+    assert schedule.get_post("episode_2") is schedule.posts[1]
+    assert schedule.get_post("episode_4") is None
+
+    assert schedule.get_posts(["episode_3", "episode_1", "episode_4"]) == [
+        schedule.posts[0],
+        schedule.posts[2],
+    ]
+
+
+def test_get_surrounding_posts(schedule, post):
+    """Test getting the posts around the provided posts."""
+    assert schedule.get_surrounding_posts([schedule.posts[0]], 1) == [
+        schedule.posts[0],
+        schedule.posts[1],
+    ]
+    assert schedule.get_surrounding_posts([schedule.posts[2]], 5) == (
+        schedule.posts
+    )
+    assert schedule.get_surrounding_posts(
+        [schedule.posts[2], schedule.posts[0]],
+        0,
+    ) == [schedule.posts[0], schedule.posts[2]]
+
+    post.name = "episode_x"
+
+    assert not schedule.get_surrounding_posts([post], 1)
+
+
+def test_get_pending_posts(schedule):
+    """
+    Test getting the posts without a submission.
+
+    1. All the posts after the time are pending.
+
+    2. The submitted post is skipped before and after it's marked.
+
+    3. The number of the returned posts is limited.
+    """
+    after_time = datetime(2018, 1, 1)
+
+    assert schedule.get_pending_posts(after_time) == schedule.posts
+
+    schedule.posts[0].submission_id = "cute_id"
+
+    assert schedule.get_pending_posts(after_time) == schedule.posts[1:]
+
+    schedule.mark_submitted(schedule.posts[0])
+    schedule.mark_submitted(schedule.posts[0])
+
+    assert schedule.pending_positions == [1, 2]
+    assert schedule.get_pending_posts(after_time, limit=1) == [
+        schedule.posts[1],
+    ]
+    assert not schedule.get_pending_posts(datetime(2018, 1, 20, 17, 0, 0))
+
+    schedule.mark_submitted(schedule.posts[2])
+    schedule.mark_submitted(schedule.posts[2])
+    missing_post = Mock()
+    missing_post.name = "episode_4"
+    schedule.mark_submitted(missing_post)
+
+    assert schedule.pending_positions == [1]
+
+
 def test_create_with_empty_field():
     """Test that the `Schedule` requires `subreddit` field when created."""
     with pytest.raises(AttributeError):
@@ -91,3 +182,18 @@ def test_comparison(other_subreddit, other_post_ids, identical):
         assert schedule != other_schedule
 
     assert schedule.__eq__("schedule") is NotImplemented  # noqa: WPS609
+
+
+@pytest.fixture()
+def schedule():
+    """Return the `Schedule` with 3 posts scheduled weekly."""
+    posts = [
+        Post(
+            name="episode_{0}".format(index + 1),
+            submit_at=datetime(2018, 1, 6 + index * 7, 17, 0, 0),
+            subreddit="anime",
+            title="Slow Start - Episode {0} Discussion".format(index + 1),
+            body_template="*Slow Start*, Episode {0}".format(index + 1),
+        ) for index in range(0, 3)
+    ]
+    return Schedule(subreddit="anime", posts=posts)
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+
+import os
+from unittest.mock import patch
+
+import pytest
+
+from slow_start_rewatch.schedule.schedule_cache import (
+    CACHE_DIRECTORY,
+    CachedSchedule,
+    ScheduleCache,
+    create_schedule_cache,
+    hash_post_bodies,
+)
+from tests.conftest import MockConfig
+
+
+def test_get_and_put(tmpdir, cached_schedule):
+    """Test storing and loading the cached Schedule."""
+    schedule_cache = ScheduleCache(str(tmpdir.join("cache")), max_entries=2)
+
+    assert schedule_cache.get("cute_schedule") is None
+
+    schedule_cache.put("cute_schedule", cached_schedule)
+    loaded_schedule = schedule_cache.get("cute_schedule")
+
+    assert loaded_schedule
+    assert loaded_schedule.subreddit == "anime"
+    assert loaded_schedule.posts == cached_schedule.posts
+    assert loaded_schedule.body_digest == cached_schedule.body_digest
+    assert schedule_cache.get("other_schedule") is None
+
+
+def test_get_invalid(tmpdir, cached_schedule):
+    """Test that invalid or outdated entries are ignored."""
+    schedule_cache = ScheduleCache(str(tmpdir), max_entries=2)
+    tmpdir.join(os.path.basename(schedule_cache.get_path("broken"))).write(
+        "Not a cache",
+    )
+
+    assert schedule_cache.get("broken") is None
+
+    with patch(
+        "slow_start_rewatch.schedule.schedule_cache.CACHE_FORMAT_VERSION",
+        0,
+    ):
+        schedule_cache.put("cute_schedule", cached_schedule)
+
+    assert schedule_cache.get("cute_schedule") is None
+
+
+def test_put_error(tmpdir, cached_schedule):
+    """Test that failing to store the entry is not fatal."""
+    cache_dir = tmpdir.join("cache")
+    cache_dir.write("Not a directory")
+    schedule_cache = ScheduleCache(str(cache_dir), max_entries=2)
+
+    schedule_cache.put("cute_schedule", cached_schedule)
+
+    assert schedule_cache.get("cute_schedule") is None
+
+
+def test_evict(tmpdir, cached_schedule):
+    """Test that the least recently used entries are removed."""
+    schedule_cache = ScheduleCache(str(tmpdir), max_entries=2)
+    tmpdir.join("cute_notes.txt").write("Not a cache entry")
+
+    for schedule_index in range(3):
+        schedule_data = "schedule_{0}".format(schedule_index)
+        schedule_cache.put(schedule_data, cached_schedule)
+        os.utime(
+            schedule_cache.get_path(schedule_data),
+            ns=(schedule_index, schedule_index),
+        )
+
+        if schedule_index == 1:
+            schedule_cache.get("schedule_0")
+
+    assert schedule_cache.get("schedule_0")
+    assert schedule_cache.get("schedule_1") is None
+    assert schedule_cache.get("schedule_2")
+    assert tmpdir.join("cute_notes.txt").exists()
+
+    with patch("os.remove", side_effect=FileNotFoundError):
+        schedule_cache.put("schedule_3", cached_schedule)
+
+    with patch("os.utime", side_effect=IOError):
+        assert schedule_cache.get("schedule_3")
+
+
+def test_create_schedule_cache(tmpdir):
+    """Test creating the cache from the config."""
+    config = MockConfig({
+        "data_dir": str(tmpdir),
+        "schedule_cache": {"enabled": True, "max_entries": 4},
+    })
+
+    schedule_cache = create_schedule_cache(config)
+
+    assert schedule_cache
+    assert schedule_cache.cache_dir == str(tmpdir.join(CACHE_DIRECTORY))
+    assert schedule_cache.max_entries == 4
+
+    config["schedule_cache.enabled"] = False
+
+    assert create_schedule_cache(config) is None
+
+
+def test_hash_post_bodies():
+    """Test that the hash depends on both the sources and the bodies."""
+    body_digest = hash_post_bodies({"ep_1.md": "Cute", "ep_2.md": "Moe"})
+
+    assert body_digest == hash_post_bodies({
+        "ep_2.md": "Moe",
+        "ep_1.md": "Cute",
+    })
+    assert body_digest != hash_post_bodies({"ep_1.md": "Cute"})
+    assert body_digest != hash_post_bodies({
+        "ep_1.md": "Cute",
+        "ep_2.md": "Kyun",
+    })
+    assert hash_post_bodies({"a": "bc"}) != hash_post_bodies({"ab": "c"})
+
+
+@pytest.fixture()
+def cached_schedule(post):
+    """Return an example `CachedSchedule`."""
+    return CachedSchedule(
+        subreddit="anime",
+        posts=[post],
+        body_sources=["episode_01.md"],
+        body_digest=hash_post_bodies({"episode_01.md": post.body_template}),
+        schedule_document={"subreddit": "anime", "posts": []},
+        schedule_source=None,
+        schedule_json=False,
+    )
@@ -5,7 +5,11 @@ from pathlib import Path
 
 import pytest
 
-from slow_start_rewatch.exceptions import MissingPost, MissingSchedule
+from slow_start_rewatch.exceptions import (
+    MissingPost,
+    MissingSchedule,
+    ScheduleConflict,
+)
 from slow_start_rewatch.schedule.schedule_file_storage import (
     ScheduleFileStorage,
 )
@@ -24,12 +28,28 @@ def test_load_schedule_data(schedule_file_storage_config):
     schedule_data = schedule_file_storage.load_schedule_data()
 
     assert schedule_data == SCHEDULE_DATA
+    assert schedule_file_storage.schedule_revision == (
+        schedule_file_storage.get_file_revision()
+    )
 
 
 def test_load_schedule_data_error(tmpdir):
     """Test loading of the Schedule data from a nonexistent file."""
     schedule_path = tmpdir.join(SCHEDULE_FILENAME)
-    config = MockConfig({"schedule_file": str(schedule_path)})
+    config = MockConfig({
+        "schedule_file": str(schedule_path),
+        "schedule_storage": {
+            "patch_in_place": True,
+            "yaml_backend": "ruamel_c",
+            "body_workers": 4,
+            "lazy_bodies": False,
+            "submission_state": False,
+        },
+        "schedule_cache": {
+            "enabled": False,
+            "max_entries": 8,
+        },
+    })
 
     schedule_file_storage = ScheduleFileStorage(config)
 
@@ -52,7 +72,20 @@ def test_load_post_body_error(tmpdir):
     """Test loading of the Post body from a file."""
     schedule_path = tmpdir.join(SCHEDULE_FILENAME)
     post_body_path = tmpdir.join(POST_BODY_FILENAME)
-    config = MockConfig({"schedule_file": str(schedule_path)})
+    config = MockConfig({
+        "schedule_file": str(schedule_path),
+        "schedule_storage": {
+            "patch_in_place": True,
+            "yaml_backend": "ruamel_c",
+            "body_workers": 4,
+            "lazy_bodies": False,
+            "submission_state": False,
+        },
+        "schedule_cache": {
+            "enabled": False,
+            "max_entries": 8,
+        },
+    })
 
     schedule_file_storage = ScheduleFileStorage(config)
 
@@ -68,7 +101,20 @@ def test_load_post_body_error(tmpdir):
 def test_save_schedule_data(tmpdir):
     """Test saving of the Schedule data to a file."""
     schedule_path = tmpdir.join(SCHEDULE_FILENAME)
-    config = MockConfig({"schedule_file": str(schedule_path)})
+    config = MockConfig({
+        "schedule_file": str(schedule_path),
+        "schedule_storage": {
+            "patch_in_place": True,
+            "yaml_backend": "ruamel_c",
+            "body_workers": 4,
+            "lazy_bodies": False,
+            "submission_state": False,
+        },
+        "schedule_cache": {
+            "enabled": False,
+            "max_entries": 8,
+        },
+    })
 
     schedule_file_storage = ScheduleFileStorage(config)
 
@@ -80,11 +126,55 @@ def test_save_schedule_data(tmpdir):
         schedule_data = schedule_file.read()
 
     assert schedule_data == SCHEDULE_DATA
+    assert schedule_file_storage.schedule_revision == (
+        schedule_file_storage.get_file_revision()
+    )
+
+
+def test_save_schedule_data_conflict(schedule_file_storage_config):
+    """Test saving of the Schedule data to the modified file."""
+    schedule_file_storage = ScheduleFileStorage(schedule_file_storage_config)
+    schedule_file_storage.load_schedule_data()
+
+    with open(schedule_file_storage.schedule_file, "a") as schedule_file:
+        schedule_file.write("# Modified\n")
+
+    with pytest.raises(ScheduleConflict):
+        schedule_file_storage.save_schedule_data(SCHEDULE_DATA)
+
+
+def test_submission_state(schedule_file_storage_config, tmpdir):
+    """Test loading and saving the submission state in the sidecar file."""
+    schedule_file_storage = ScheduleFileStorage(schedule_file_storage_config)
+
+    assert schedule_file_storage.state_file == str(
+        tmpdir.join("schedule.state.json"),
+    )
+    assert schedule_file_storage.load_state_data() is None
+
+    schedule_file_storage.save_state_data('{"version":1,"posts":{}}')
+
+    assert schedule_file_storage.load_state_data() == (
+        '{"version":1,"posts":{}}'
+    )
 
 
 def test_invalid_config():
     """Test initializing `ScheduleFileStorage` with invalid config."""
-    config = MockConfig({"schedule_file": None})
+    config = MockConfig({
+        "schedule_file": None,
+        "schedule_storage": {
+            "patch_in_place": True,
+            "yaml_backend": "ruamel_c",
+            "body_workers": 4,
+            "lazy_bodies": False,
+            "submission_state": False,
+        },
+        "schedule_cache": {
+            "enabled": False,
+            "max_entries": 8,
+        },
+    })
 
     with pytest.raises(RuntimeError):
         ScheduleFileStorage(config)
@@ -101,4 +191,17 @@ def schedule_file_storage_config(tmpdir):
     with open(post_body_path, "w", encoding="utf-8") as post_body_file:
         post_body_file.write(POST_BODY)
 
-    return MockConfig({"schedule_file": str(schedule_path)})
+    return MockConfig({
+        "schedule_file": str(schedule_path),
+        "schedule_storage": {
+            "patch_in_place": True,
+            "yaml_backend": "ruamel_c",
+            "body_workers": 4,
+            "lazy_bodies": False,
+            "submission_state": False,
+        },
+        "schedule_cache": {
+            "enabled": False,
+            "max_entries": 8,
+        },
+    })
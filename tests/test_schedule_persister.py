@@ -0,0 +1,330 @@
+# -*- coding: utf-8 -*-
+
+import os
+import threading
+from datetime import datetime
+from unittest.mock import Mock, call, patch
+
+import pytest
+
+from slow_start_rewatch.exceptions import RedditError, ScheduleConflict
+from slow_start_rewatch.post import Post
+from slow_start_rewatch.schedule.schedule import Schedule
+from slow_start_rewatch.schedule.schedule_persister import (
+    JOURNAL_DIRECTORY,
+    SchedulePersister,
+    create_schedule_persister,
+    read_records,
+)
+from tests.conftest import MockConfig
+
+
+def test_coalesce_saves(schedule_persister, schedule):
+    """
+    Test combining the saves requested within the coalesce window.
+
+    The journal is removed once the submissions are saved.
+    """
+    schedule_persister.coalesce_window = 60000
+    schedule.posts[0].submission_id = "cute_id"
+    schedule.posts[1].submission_id = "moe_id"
+
+    schedule_persister.record_submission(schedule.posts[0])
+    schedule_persister.request_save(schedule)
+    schedule_persister.record_submission(schedule.posts[1])
+    schedule_persister.request_save(schedule)
+
+    assert read_records(schedule_persister.journal_file) == [
+        {"name": "episode_1", "submission_id": "cute_id"},
+        {"name": "episode_2", "submission_id": "moe_id"},
+    ]
+
+    assert schedule_persister.stop()
+
+    assert schedule_persister.schedule_storage.save.call_args_list == [
+        call(schedule),
+    ]
+    assert not os.path.exists(schedule_persister.journal_file)
+
+
+def test_on_save(schedule_persister, schedule):
+    """Test passing the names of the saved posts to the callback."""
+    schedule_persister.on_save = Mock()
+    schedule.posts[0].submission_id = "cute_id"
+
+    schedule_persister.record_submission(schedule.posts[0])
+    schedule_persister.request_save(schedule)
+    schedule_persister.flush()
+
+    assert schedule_persister.on_save.call_args == call(["episode_1"])
+
+
+def test_keep_new_records(schedule_persister, schedule):
+    """Test that the records journaled during the save are kept."""
+    saving = threading.Event()
+    saved = threading.Event()
+
+    def save(_):
+        saving.set()
+        saved.wait(5)
+
+    schedule_persister.schedule_storage.save.side_effect = save
+    schedule.posts[0].submission_id = "cute_id"
+    schedule.posts[1].submission_id = "moe_id"
+    schedule_persister.record_submission(schedule.posts[0])
+    schedule_persister.request_save(schedule)
+    saving.wait(5)
+    schedule_persister.record_submission(schedule.posts[1])
+    saved.set()
+    schedule_persister.flush()
+
+    assert read_records(schedule_persister.journal_file) == [
+        {"name": "episode_2", "submission_id": "moe_id"},
+    ]
+
+
+def test_retry(schedule_persister, schedule):
+    """Test retrying the failed saves with the backoff."""
+    schedule_persister.max_retries = 2
+    schedule_persister.schedule_storage.save.side_effect = [
+        RedditError("Reddit is sleepy."),
+        IOError,
+        None,
+    ]
+
+    with patch(
+        "slow_start_rewatch.schedule.schedule_persister.time.sleep",
+    ) as mock_sleep:
+        schedule_persister.request_save(schedule)
+        schedule_persister.stop()
+
+    assert schedule_persister.schedule_storage.save.call_count == 3
+    assert mock_sleep.call_args_list == [call(0.01), call(0.02)]
+
+
+def test_save_failed(schedule_persister, schedule, capsys):
+    """
+    Test the failed saves.
+
+    1. The retries are exhausted.
+
+    2. The error is not retried.
+
+    The journal is kept and the flush reports the failure in both cases. The
+    next successful save clears the failure.
+    """
+    schedule_persister.record_submission(schedule.posts[0])
+    schedule_persister.schedule_storage.save.side_effect = RedditError(
+        "Reddit is sleepy.",
+    )
+
+    schedule_persister.request_save(schedule)
+    is_flushed = schedule_persister.flush()
+    captured = capsys.readouterr()
+
+    assert not is_flushed
+    assert schedule_persister.schedule_storage.save.call_count == 2
+    assert "Too many failed attempts." in captured.err
+
+    schedule_persister.schedule_storage.save.side_effect = ScheduleConflict(
+        "The schedule has been modified.",
+    )
+
+    schedule_persister.request_save(schedule)
+    is_flushed = schedule_persister.flush()
+    captured = capsys.readouterr()
+
+    assert not is_flushed
+    assert schedule_persister.schedule_storage.save.call_count == 3
+    assert "The schedule has been modified." in captured.err
+    assert os.path.exists(schedule_persister.journal_file)
+
+    schedule_persister.schedule_storage.save.side_effect = None
+    schedule_persister.request_save(schedule)
+
+    assert schedule_persister.flush()
+
+
+def test_flush_timeout(schedule_persister, schedule, capsys):
+    """Test that the flush waits only until the flush timeout."""
+    saved = threading.Event()
+    schedule_persister.flush_timeout = 10
+    schedule_persister.schedule_storage.save.side_effect = (
+        lambda _: saved.wait(5)
+    )
+
+    schedule_persister.request_save(schedule)
+
+    assert not schedule_persister.stop()
+
+    saved.set()
+    captured = capsys.readouterr()
+
+    assert "The schedule hasn't been saved in time." in captured.err
+
+
+def test_pause(schedule_persister, schedule):
+    """Test that the paused persister saves only after the resume."""
+    schedule_persister.pause()
+    schedule_persister.request_save(schedule)
+    schedule_persister.flush_timeout = 10
+
+    assert not schedule_persister.flush()
+
+    schedule_persister.pause()
+    schedule_persister.resume()
+
+    schedule_persister.flush_timeout = 5000
+
+    assert schedule_persister.flush()
+    assert schedule_persister.schedule_storage.save.call_count == 1
+
+
+def test_recover(schedule_persister, schedule, capsys):
+    """
+    Test recovering the journaled submissions.
+
+    1. The missing submission is recovered and saved.
+
+    2. The journal with the saved submissions is removed.
+    """
+    schedule_persister.pause()
+    post = schedule.posts[0]
+    post.submission_id = "cute_id"
+    schedule_persister.record_submission(post)
+    missing_post = Mock(submission_id="moe_id")
+    missing_post.name = "missing"
+    schedule_persister.record_submission(missing_post)
+    post.submission_id = None
+    recovered_schedule = Schedule(subreddit="anime", posts=schedule.posts)
+
+    assert schedule_persister.recover(recovered_schedule) == [post]
+
+    captured = capsys.readouterr()
+
+    assert post.submission_id == "cute_id"
+    assert recovered_schedule.pending_positions == [1, 2]
+    assert "Recovered 1 submission(s)" in captured.out
+
+    schedule_persister.schedule_storage.save.side_effect = ScheduleConflict(
+        "The schedule has been modified.",
+    )
+    schedule_persister.resume()
+    schedule_persister.flush()
+
+    assert not schedule_persister.recover(recovered_schedule)
+    assert not os.path.exists(schedule_persister.journal_file)
+
+
+def test_recover_errors(schedule_persister, schedule):
+    """
+    Test the recovery with the missing or the invalid journal.
+
+    The incomplete last record is ignored.
+    """
+    schedule_persister.pause()
+
+    assert not schedule_persister.recover(schedule)
+
+    os.makedirs(os.path.dirname(schedule_persister.journal_file))
+    with open(schedule_persister.journal_file, "w") as journal:
+        journal.write('{"name": "episode_1", "submission_id": "cute_id"}\n{')
+
+    assert schedule_persister.recover(schedule) == [schedule.posts[0]]
+
+    with open(schedule_persister.journal_file, "w") as journal:
+        journal.write("Not a journal\n")
+
+    assert not schedule_persister.recover(schedule)
+
+
+def test_journal_write_errors(tmpdir, schedule):
+    """Test that failing to write the journal is not fatal."""
+    tmpdir.join("journal").write("Not a directory")
+    schedule_storage = Mock()
+    schedule_persister = SchedulePersister(
+        schedule_storage=schedule_storage,
+        journal_file=str(tmpdir.join("journal").join("journal.jsonl")),
+        coalesce_window=0,
+        retry_delay=10,
+        max_retries=1,
+        flush_timeout=5000,
+    )
+
+    schedule_persister.record_submission(schedule.posts[0])
+    schedule_persister.request_save(schedule)
+
+    assert schedule_persister.stop()
+    assert schedule_storage.save.call_count == 1
+
+    with patch(
+        "slow_start_rewatch.schedule.schedule_persister.os.remove",
+        side_effect=IOError,
+    ):
+        schedule_persister.journal_file = str(tmpdir.join("journal.jsonl"))
+        schedule_persister.record_submission(schedule.posts[0])
+        schedule_persister.request_save(schedule)
+
+        assert schedule_persister.stop()
+
+
+def test_create_schedule_persister(tmpdir):
+    """Test creating the persister with a journal for each schedule."""
+    config = MockConfig({
+        "data_dir": str(tmpdir),
+        "schedule_wiki_url": "/r/anime/wiki/slow-start-rewatch",
+        "schedule_database": None,
+        "schedule_file": None,
+        "schedule_persister": {
+            "coalesce_window": 10000,
+            "retry_delay": 2000,
+            "max_retries": 5,
+            "flush_timeout": 60000,
+        },
+    })
+    schedule_storage = Mock()
+
+    wiki_persister = create_schedule_persister(config, schedule_storage)
+
+    config["schedule_wiki_url"] = None
+    config["schedule_file"] = "schedule.yml"
+
+    file_persister = create_schedule_persister(config, schedule_storage)
+
+    assert wiki_persister.schedule_storage == schedule_storage
+    assert wiki_persister.coalesce_window == 10000
+    assert wiki_persister.retry_delay == 2000
+    assert wiki_persister.max_retries == 5
+    assert wiki_persister.flush_timeout == 60000
+    assert os.path.dirname(wiki_persister.journal_file) == str(
+        tmpdir.join(JOURNAL_DIRECTORY),
+    )
+    assert wiki_persister.journal_file != file_persister.journal_file
+
+
+@pytest.fixture()
+def schedule_persister(tmpdir):
+    """Return `SchedulePersister` with the journal in a temporary directory."""
+    return SchedulePersister(
+        schedule_storage=Mock(),
+        journal_file=str(tmpdir.join(JOURNAL_DIRECTORY).join("journal.jsonl")),
+        coalesce_window=0,
+        retry_delay=10,
+        max_retries=1,
+        flush_timeout=5000,
+    )
+
+
+@pytest.fixture()
+def schedule():
+    """Return the `Schedule` with 3 posts."""
+    posts = [
+        Post(
+            name="episode_{0}".format(index + 1),
+            submit_at=datetime(2018, 1, 6 + index * 7, 17, 0, 0),
+            subreddit="anime",
+            title="Slow Start - Episode {0} Discussion".format(index + 1),
+            body_template="*Slow Start*, Episode {0}".format(index + 1),
+        ) for index in range(0, 3)
+    ]
+    return Schedule(subreddit="anime", posts=posts)
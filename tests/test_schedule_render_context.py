@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+
+from datetime import datetime
+from unittest.mock import Mock, call
+
+from slow_start_rewatch.post import Post
+from slow_start_rewatch.schedule.schedule import Schedule
+from slow_start_rewatch.schedule.schedule_render_context import (
+    ScheduleRenderContext,
+)
+
+
+def test_mapping():
+    """Test the mapping for substituting the placeholders of the post."""
+    schedule = create_schedule()
+    schedule.posts[0].submission_id = "id_1"
+    mock_substitute_navigation_links = Mock(return_value="links")
+
+    render_context = ScheduleRenderContext(
+        schedule=schedule,
+        navigation_placeholder="navigation_links",
+        substitute_navigation_links=mock_substitute_navigation_links,
+    )
+
+    assert dict(render_context.mapping(schedule.posts[1])) == {
+        "e01": "/id_1",
+        "e02": "*",
+        "e03": "-",
+        "navigation_links": "links",
+    }
+
+
+def test_navigation_links():
+    """
+    Test the Navigation Links of the posts.
+
+    The links are updated only for the posts adjacent to the submitted post.
+    """
+    schedule = create_schedule()
+    posts = schedule.posts
+    mock_substitute_navigation_links = Mock(return_value="links")
+
+    render_context = ScheduleRenderContext(
+        schedule=schedule,
+        navigation_placeholder="navigation_links",
+        substitute_navigation_links=mock_substitute_navigation_links,
+    )
+
+    assert mock_substitute_navigation_links.call_args_list == [
+        call(None, None),
+        call(None, None),
+        call(None, None),
+    ]
+
+    mock_substitute_navigation_links.reset_mock()
+    posts[0].submission_id = "id_1"
+    render_context.update_post(posts[0])
+
+    assert mock_substitute_navigation_links.call_args == call("id_1", None)
+    assert mock_substitute_navigation_links.call_count == 1
+
+    posts[1].submission_id = "id_2"
+    render_context.update_post(posts[1])
+
+    assert mock_substitute_navigation_links.call_args_list[1:] == [
+        call(None, "id_2"),
+        call("id_2", None),
+    ]
+
+    mock_substitute_navigation_links.reset_mock()
+    posts[2].submission_id = "id_3"
+    render_context.update_post(posts[2])
+
+    assert mock_substitute_navigation_links.call_args == call("id_1", "id_3")
+    assert render_context.navigation_texts == {
+        "e01": "/id_1",
+        "e02": "/id_2",
+        "e03": "/id_3",
+    }
+
+
+def create_schedule() -> Schedule:
+    """Create a Schedule with three posts."""
+    posts = [
+        Post(
+            name="e{0:02}".format(post),
+            submit_at=datetime(2018, 1, 6, 17, 0, 0),
+            subreddit="anime",
+            title="Slow Start - Episode {0} Discussion".format(post),
+            body_template="1:$e01|2:$e02|3:$e03",
+            navigation_scheduled="-",
+            navigation_submitted="$link",
+            navigation_current="*",
+        ) for post in range(1, 4)
+    ]
+
+    return Schedule(subreddit="anime", posts=posts)
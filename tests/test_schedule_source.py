@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+from ruamel.yaml import YAML  # type: ignore
+
+from slow_start_rewatch.schedule.schedule_source import (
+    ScheduleSource,
+    format_scalar,
+)
+
+SCHEDULE_DATA = """# The schedule of the rewatch
+subreddit: anime
+posts:
+  # Season 1
+  - name: episode_01
+    title: Slow Start - Episode 1 Discussion  # Keep the title short
+    submission_id: 7okphp
+  - name: episode_02
+    title: Slow Start - Episode 2 Discussion
+    body_template: |
+      Multi-line
+
+      body
+    submission_id:
+  - name: episode_03
+    title: Slow Start - Episode 3 Discussion
+    submission_id: ~
+  - name: episode_04
+    title: Slow Start - Episode 4 Discussion
+  # End of Season 1
+extra: data"""
+
+PATCHED_SCHEDULE_DATA = """# The schedule of the rewatch
+subreddit: anime
+posts:
+  # Season 1
+  - name: episode_01
+    title: Slow Start - Episode 1 Discussion  # Keep the title short
+    submission_id: cute_id_1
+  - name: episode_02
+    title: Slow Start - Episode 2 Discussion
+    body_template: |
+      Multi-line
+
+      body
+    submission_id: cute_id_2
+  - name: episode_03
+    title: Slow Start - Episode 3 Discussion
+    submission_id: '123'
+  - name: episode_04
+    title: Slow Start - Episode 4 Discussion
+    submission_id: cute_id_4
+  # End of Season 1
+extra: data
+"""
+
+POST_NAMES = ["episode_01", "episode_02", "episode_03", "episode_04"]
+
+
+def test_set_submission_id():
+    """
+    Test patching the submission IDs.
+
+    1. The existing value is replaced (including the empty and null values).
+
+    2. The item is inserted if it doesn't exist.
+
+    3. The comments and the formatting are kept.
+    """
+    schedule_source = ScheduleSource(SCHEDULE_DATA, POST_NAMES)
+
+    assert schedule_source.post_sources["episode_01"].submission_id == "7okphp"
+    assert schedule_source.post_sources["episode_02"].submission_id is None
+    assert schedule_source.post_sources["episode_03"].submission_id is None
+
+    schedule_source.set_submission_id("episode_01", "cute_id_1")
+    schedule_source.set_submission_id("episode_02", "cute_id_2")
+    schedule_source.set_submission_id("episode_03", "123")
+    schedule_source.set_submission_id("episode_04", "cute_id")
+    schedule_source.set_submission_id("episode_04", "cute_id_4")
+    schedule_source.set_submission_id("episode_04", "cute_id_4")
+    schedule_source.set_submission_id("episode_05", "cute_id_5")
+
+    assert str(schedule_source) == PATCHED_SCHEDULE_DATA
+
+    posts_data = YAML(typ="safe").load(str(schedule_source))["posts"]
+
+    assert [post_data["submission_id"] for post_data in posts_data] == [
+        "cute_id_1",
+        "cute_id_2",
+        "123",
+        "cute_id_4",
+    ]
+
+
+def test_crlf_line_endings():
+    """Test that the inserted items keep the CRLF line endings of the data."""
+    schedule_data = SCHEDULE_DATA.replace("\n", "\r\n")
+    schedule_source = ScheduleSource(schedule_data, POST_NAMES)
+
+    schedule_source.set_submission_id("episode_01", "cute_id_1")
+    schedule_source.set_submission_id("episode_02", "cute_id_2")
+    schedule_source.set_submission_id("episode_03", "123")
+    schedule_source.set_submission_id("episode_04", "cute_id_4")
+
+    assert str(schedule_source) == PATCHED_SCHEDULE_DATA.replace(
+        "\n",
+        "\r\n",
+    )
+
+
+def test_unpatched_source():
+    """Test that the data are not changed when nothing is patched."""
+    schedule_source = ScheduleSource("subreddit: anime\nposts: []\n", [])
+
+    assert str(schedule_source) == "subreddit: anime\nposts: []\n"
+
+
+@pytest.mark.parametrize(("schedule_data", "post_names"), [
+    ("subreddit: [anime", []),
+    ("- anime", []),
+    ("subreddit: anime", []),
+    ("posts: episode_01", []),
+    ("posts:\n- name: episode_01", []),
+    ("posts:\n- {name: episode_01}", ["episode_01"]),
+    ("posts:\n- name: episode_01\n  submission_id: [id]", ["episode_01"]),
+    ("posts:\n- name: episode_01\n  submission_id: 'a\n    b'", ["episode_01"]),
+    ("posts: [{name: episode_01}, name: episode_02]", ["e01", "e02"]),
+])
+def test_unsupported_data(schedule_data, post_names):
+    """Test that the unsupported structure of the data is refused."""
+    with pytest.raises(ValueError):
+        ScheduleSource(schedule_data, post_names)
+
+
+@pytest.mark.parametrize(("scalar_value", "expected_scalar"), [
+    ("7okphp", "7okphp"),
+    ("123", "'123'"),
+    ("true", "'true'"),
+    ("null", "'null'"),
+    ("it's", "it's"),
+    ("'quoted", "'''quoted'"),
+    ("a: b", "'a: b'"),
+    ("[", "'['"),
+])
+def test_format_scalar(scalar_value, expected_scalar):
+    """Test formatting the YAML scalars."""
+    assert format_scalar(scalar_value) == expected_scalar
@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+
+import json
+import os
+from datetime import datetime
+
+import pytest
+
+from slow_start_rewatch.exceptions import (
+    InvalidSchedule,
+    MissingPost,
+    MissingSchedule,
+)
+from slow_start_rewatch.schedule.schedule_sqlite_storage import (
+    ScheduleSqliteStorage,
+)
+from tests.conftest import MockConfig
+from tests.test_schedule_storage import POST_BODY, SCHEDULE_DATA
+
+SCHEDULE_FILENAME = "schedule.yml"
+DATABASE_FILENAME = "schedule.sqlite"
+
+
+def test_import_schedule(schedule_sqlite_storage, schedule_path):
+    """Test importing the Schedule file and loading it from the database."""
+    assert schedule_sqlite_storage.import_schedule(schedule_path) == 3
+
+    schedule = schedule_sqlite_storage.load()
+
+    assert schedule.subreddit == "anime"
+    assert [post.name for post in schedule.posts] == [
+        "episode_01",
+        "episode_02",
+        "episode_03",
+    ]
+    assert schedule.posts[0].submission_id == "7okphp"
+    assert schedule.posts[1].submit_at == datetime(2018, 1, 13, 12, 0, 0)
+    assert schedule.posts[1].navigation_current == "ep 2"
+    assert schedule.posts[1].body_template == POST_BODY.replace("0", "2", 1)
+    assert schedule.pending_positions == [1, 2]
+
+
+def test_save(schedule_sqlite_storage, schedule_path, tmpdir):
+    """Test saving the submission state of the posts to the rows."""
+    schedule_sqlite_storage.import_schedule(schedule_path)
+    schedule = schedule_sqlite_storage.load()
+    schedule.posts[1].submission_id = "cute_id"
+    schedule.posts[1].submitted_at = datetime(2018, 1, 13, 12, 0, 1)
+    schedule.posts[1].submit_latency = 120.5
+    schedule.posts[1].release_jitter = 0.25
+
+    schedule_sqlite_storage.save(schedule)
+
+    loaded_post = schedule_sqlite_storage.load().posts[1]
+
+    assert loaded_post.submission_id == "cute_id"
+    assert loaded_post.submitted_at == datetime(2018, 1, 13, 12, 0, 1)
+    assert loaded_post.submit_latency == 120.5
+    assert loaded_post.release_jitter == 0.25
+    assert json.loads(schedule_sqlite_storage.load_state_data())["posts"][
+        "episode_02"
+    ] == {
+        "submission_id": "cute_id",
+        "submitted_at": "2018-01-13T12:00:01.000000",
+        "submit_latency": 120.5,
+        "release_jitter": 0.25,
+    }
+    assert schedule_sqlite_storage.load().pending_positions == [2]
+
+
+def test_export_schedule(schedule_sqlite_storage, schedule_path, tmpdir):
+    """Test exporting the Schedule and the post templates to files."""
+    schedule_sqlite_storage.import_schedule(schedule_path)
+    export_path = str(tmpdir.join("export").join(SCHEDULE_FILENAME))
+    os.makedirs(os.path.dirname(export_path))
+
+    assert schedule_sqlite_storage.export_schedule(export_path) == 3
+
+    with open(export_path, encoding="utf-8") as schedule_file:
+        assert schedule_file.read() == (
+            schedule_sqlite_storage.load_schedule_data()
+        )
+
+    with open(
+        tmpdir.join("export").join("episode_03.md"),
+        encoding="utf-8",
+    ) as post_body_file:
+        assert post_body_file.read() == POST_BODY.replace("0", "3", 1)
+
+    exported_schedule = schedule_sqlite_storage.parse_schedule_document(
+        schedule_sqlite_storage.load_schedule_data(),
+    )
+
+    assert exported_schedule == schedule_sqlite_storage.parse_schedule_document(
+        SCHEDULE_DATA,
+    )
+
+
+def test_load_errors(schedule_sqlite_storage, schedule_path):
+    """
+    Test loading the Schedule and the post bodies missing in the database.
+
+    1. The database is empty.
+
+    2. The post template is missing.
+    """
+    with pytest.raises(MissingSchedule):
+        schedule_sqlite_storage.load()
+
+    schedule_sqlite_storage.import_schedule(schedule_path)
+
+    with pytest.raises(MissingPost):
+        schedule_sqlite_storage.load_post_body("episode_04.md")
+
+
+def test_import_errors(schedule_sqlite_storage, schedule_path, tmpdir):
+    """
+    Test importing the invalid Schedule.
+
+    1. The Schedule file is missing.
+
+    2. The Schedule file is incomplete.
+
+    3. The post file is missing.
+
+    4. The post has an invalid submission time.
+
+    5. The post names are not unique.
+
+    The stored Schedule is kept when the import fails.
+    """
+    with pytest.raises(MissingSchedule):
+        schedule_sqlite_storage.import_schedule(
+            str(tmpdir.join("missing.yml")),
+        )
+
+    incomplete_path = tmpdir.join("incomplete.yml")
+    incomplete_path.write("subreddit: anime\n")
+
+    with pytest.raises(InvalidSchedule):
+        schedule_sqlite_storage.import_schedule(str(incomplete_path))
+
+    os.remove(tmpdir.join("episode_03.md"))
+
+    with pytest.raises(MissingPost):
+        schedule_sqlite_storage.import_schedule(schedule_path)
+
+    schedule_sqlite_storage.save_schedule_data(SCHEDULE_DATA)
+
+    with pytest.raises(InvalidSchedule):
+        schedule_sqlite_storage.save_schedule_data(
+            SCHEDULE_DATA.replace("2018-01-13 12:00:00", "Saturday"),
+        )
+
+    with pytest.raises(InvalidSchedule):
+        schedule_sqlite_storage.save_schedule_data(
+            SCHEDULE_DATA.replace("episode_03", "episode_02"),
+        )
+
+    with schedule_sqlite_storage.connect() as connection:
+        pending_rows = connection.execute(
+            "SELECT name FROM posts WHERE submission_id IS NULL " +
+            "ORDER BY submit_at",
+        ).fetchall()
+
+    assert [row["name"] for row in pending_rows] == [
+        "episode_02",
+        "episode_03",
+    ]
+
+
+def test_invalid_config():
+    """Test initializing `ScheduleSqliteStorage` with invalid config."""
+    config = MockConfig({
+        "schedule_database": None,
+        "schedule_storage": {
+            "yaml_backend": "ruamel_c",
+            "body_workers": 4,
+            "lazy_bodies": False,
+        },
+    })
+
+    with pytest.raises(RuntimeError):
+        ScheduleSqliteStorage(config)
+
+
+@pytest.fixture()
+def schedule_path(tmpdir):
+    """Return the path to a valid Schedule file with the post files."""
+    schedule_file_path = tmpdir.join(SCHEDULE_FILENAME)
+    with open(schedule_file_path, "w", encoding="utf-8") as schedule_file:
+        schedule_file.write(SCHEDULE_DATA)
+
+    for episode in range(1, 4):
+        post_body_path = tmpdir.join("episode_0{0}.md".format(episode))
+        with open(post_body_path, "w", encoding="utf-8") as post_body_file:
+            post_body_file.write(POST_BODY.replace("0", str(episode), 1))
+
+    return str(schedule_file_path)
+
+
+@pytest.fixture()
+def schedule_sqlite_storage(tmpdir):
+    """Return `ScheduleSqliteStorage` with a database in a temporary dir."""
+    return ScheduleSqliteStorage(MockConfig({
+        "schedule_database": str(tmpdir.join("data").join(DATABASE_FILENAME)),
+        "schedule_storage": {
+            "yaml_backend": "ruamel_c",
+            "body_workers": 4,
+            "lazy_bodies": False,
+        },
+    }))
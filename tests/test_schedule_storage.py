@@ -1,17 +1,27 @@
 # -*- coding: utf-8 -*-
 
+import json
+import time
 from datetime import datetime
+from typing import Optional
 from unittest.mock import call, patch
 
 import pytest
 
-from slow_start_rewatch.exceptions import InvalidSchedule
-from slow_start_rewatch.post import Post
-from slow_start_rewatch.schedule.schedule import Schedule
-from slow_start_rewatch.schedule.schedule_storage import (
+from slow_start_rewatch.codec import (
     PostsData,
-    ScheduleStorage,
+    parse_yaml,
+    read_schedule_document,
+)
+from slow_start_rewatch.exceptions import (
+    InvalidSchedule,
+    MissingPost,
+    ScheduleConflict,
 )
+from slow_start_rewatch.post import Post
+from slow_start_rewatch.schedule.schedule import Schedule
+from slow_start_rewatch.schedule.schedule_cache import ScheduleCache
+from slow_start_rewatch.schedule.schedule_storage import ScheduleStorage
 
 SCHEDULE_DATA = """subreddit: anime
 posts:
@@ -83,6 +93,7 @@ class ScheduleDummyStorage(ScheduleStorage):
         self.test_missing_data = False
         self.test_invalid_yaml = False
         self.skip_update_submitted_posts = False
+        self.state_data: Optional[str] = None
 
     def load_schedule_data(self) -> str:
         """Load schedule data."""
@@ -99,6 +110,14 @@ class ScheduleDummyStorage(ScheduleStorage):
 
         return schedule_data
 
+    def load_state_data(self) -> Optional[str]:
+        """Load the submission state."""
+        return self.state_data
+
+    def save_state_data(self, state_data: str) -> None:
+        """Save the submission state."""
+        self.state_data = state_data
+
     def load_post_body(self, body_template_source: str) -> str:
         """Load a post body."""
         return POST_BODY.replace("Episode 0", "Episode {0}".format(
@@ -131,6 +150,12 @@ def test_load():
     assert schedule.posts[1].title == "Slow Start - Episode 2 Discussion"
     assert "*Slow Start*, Episode 3" in schedule.posts[2].body_template
 
+    assert schedule_storage.schedule_document
+    _, posts_data = read_schedule_document(schedule_storage.schedule_document)
+    posts = schedule_storage.load_posts(posts_data, "anime")
+
+    assert posts == schedule.posts
+
 
 def test_load_with_errors():
     """Test loading `Schedule` data with errors."""
@@ -156,6 +181,164 @@ def test_load_with_errors():
     assert "Failed to parse" in str(incomplete_error.value)  # noqa: WPS441
 
 
+@patch.object(ScheduleDummyStorage, "load_schedule_data")
+def test_load_invalid_structure(mock_load_schedule_data):
+    """Test loading the Schedule data which is not a mapping."""
+    mock_load_schedule_data.return_value = "- episode_01\n"
+    schedule_storage = ScheduleDummyStorage()
+
+    with pytest.raises(InvalidSchedule) as structure_error:
+        schedule_storage.load()
+
+    assert "must be a mapping" in str(structure_error.value)  # noqa: WPS441
+
+
+@patch.object(ScheduleDummyStorage, "load_post_body")
+def test_load_post_bodies(mock_load_post_body):
+    """
+    Test loading the post bodies concurrently.
+
+    1. The bodies are kept in the order of the posts and each source is
+       loaded only once.
+
+    2. The error of the first failing source is raised.
+    """
+    def load_post_body(body_source):  # noqa: WPS430
+        time.sleep(0.05 if body_source == "episode_01.md" else 0)
+
+        if body_source.startswith("missing"):
+            raise MissingPost(body_source)
+
+        return "Body of {0}".format(body_source)
+
+    mock_load_post_body.side_effect = load_post_body
+    schedule_storage = ScheduleDummyStorage()
+    schedule_storage.body_workers = 4
+
+    with patch.object(
+        ScheduleDummyStorage,
+        "load_schedule_data",
+        return_value=SCHEDULE_DATA.replace("episode_03.md", "episode_01.md"),
+    ):
+        schedule = schedule_storage.load()
+
+    assert [post.body_template for post in schedule.posts] == [
+        "Body of episode_01.md",
+        "Body of episode_02.md",
+        "Body of episode_01.md",
+    ]
+    assert mock_load_post_body.call_count == 2
+
+    with pytest.raises(MissingPost) as missing_post_error:
+        schedule_storage.load_post_bodies(
+            ["episode_01.md", "missing_01.md", "missing_02.md"],
+            {},
+        )
+
+    assert str(missing_post_error.value) == (  # noqa: WPS441
+        "missing_01.md"
+    )
+
+
+@patch.object(ScheduleDummyStorage, "load_post_body")
+def test_load_lazy(mock_load_post_body, tmpdir):
+    """
+    Test loading the Schedule with the deferred post bodies.
+
+    1. No post body is loaded and the cache is not used.
+
+    2. The deferred bodies are loaded on demand (each source only once).
+    """
+    mock_load_post_body.side_effect = (
+        lambda body_source: "Body of {0}".format(body_source)
+    )
+    schedule_storage = ScheduleDummyStorage()
+    schedule_storage.lazy_bodies = True
+    schedule_storage.body_workers = 4
+    schedule_storage.schedule_cache = ScheduleCache(str(tmpdir), 2)
+
+    with patch.object(
+        ScheduleDummyStorage,
+        "load_schedule_data",
+        return_value=SCHEDULE_DATA.replace("episode_03.md", "episode_01.md"),
+    ):
+        schedule = schedule_storage.load()
+
+    assert not mock_load_post_body.called
+    assert not tmpdir.listdir()
+
+    loaded_count = schedule_storage.load_deferred_bodies(schedule.posts[1:])
+
+    assert loaded_count == 2
+    assert mock_load_post_body.call_count == 2
+    assert schedule.posts[0].deferred_body is None
+    assert schedule.posts[0].body_template == "Body of episode_01.md"
+    assert schedule_storage.load_deferred_bodies(schedule.posts) == 0
+    assert mock_load_post_body.call_count == 2
+
+
+@patch.object(ScheduleDummyStorage, "load_post_body")
+def test_load_cached(mock_load_post_body, tmpdir):
+    """
+    Test loading the Schedule from the cache.
+
+    1. The parsed Schedule is stored in the cache after loading.
+
+    2. The Schedule is loaded from the cache without parsing.
+
+    3. The cached Schedule is not used when a post body has changed (the
+       post bodies are loaded only once).
+    """
+    mock_load_post_body.side_effect = (
+        lambda body_source: "Body of {0}".format(body_source)
+    )
+    schedule_storage = ScheduleDummyStorage()
+    schedule_storage.patch_in_place = True
+    schedule_storage.schedule_cache = ScheduleCache(str(tmpdir), 2)
+
+    schedule = schedule_storage.load()
+
+    assert mock_load_post_body.call_count == 3
+
+    with patch(
+        "slow_start_rewatch.schedule.schedule_storage.parse_schedule_format",
+    ) as mock_parse_schedule:
+        cached_schedule = schedule_storage.load()
+
+    assert mock_parse_schedule.call_count == 0
+    assert cached_schedule.posts == schedule.posts
+    assert cached_schedule.posts[0].submission_id == "7okphp"
+    assert schedule_storage.schedule_document
+    assert schedule_storage.schedule_document["subreddit"] == "anime"
+    assert schedule_storage.schedule_source
+    assert mock_load_post_body.call_count == 6
+
+    mock_load_post_body.side_effect = (
+        lambda body_source: "New body of {0}".format(body_source)
+    )
+    changed_schedule = schedule_storage.load()
+
+    assert changed_schedule.posts[0].body_template == (
+        "New body of episode_01.md"
+    )
+    assert mock_load_post_body.call_count == 9
+
+    reloaded_schedule = schedule_storage.load_cached_schedule(
+        SCHEDULE_DATA,
+        {},
+    )
+
+    assert reloaded_schedule
+    assert reloaded_schedule.posts[0].body_template == (
+        "New body of episode_01.md"
+    )
+
+    schedule_storage.schedule_cache = None
+    schedule_storage.cache_schedule(SCHEDULE_DATA, schedule, {})
+
+    assert schedule_storage.load_cached_schedule(SCHEDULE_DATA, {}) is None
+
+
 @patch.object(ScheduleDummyStorage, "save_schedule_data")
 def test_save(mock_save_schedule_data, schedule):
     """
@@ -173,6 +356,230 @@ def test_save(mock_save_schedule_data, schedule):
     assert mock_save_schedule_data.call_args == call(SCHEDULE_DATA)
 
 
+@patch.object(ScheduleDummyStorage, "save_schedule_data")
+@patch.object(ScheduleDummyStorage, "load_schedule_data")
+def test_save_loaded_document(
+    mock_load_schedule_data,
+    mock_save_schedule_data,
+):
+    """
+    Test saving the Schedule document kept after loading.
+
+    1. The Schedule data are not loaded again when saving.
+
+    2. The Schedule data are loaded again when the data have been modified
+       in the storage.
+    """
+    mock_load_schedule_data.return_value = SCHEDULE_DATA
+    schedule_storage = ScheduleDummyStorage()
+    schedule = schedule_storage.load()
+    schedule.posts[1].submission_id = "cute_id"
+
+    schedule_storage.save(schedule)
+
+    assert mock_load_schedule_data.call_count == 1
+    assert "submission_id: cute_id" in mock_save_schedule_data.call_args[0][0]
+
+    mock_save_schedule_data.side_effect = [
+        ScheduleConflict("The schedule has been modified."),
+        None,
+    ]
+    schedule_storage.save(schedule)
+
+    assert mock_load_schedule_data.call_count == 2
+    assert mock_save_schedule_data.call_count == 3
+
+
+@patch.object(ScheduleDummyStorage, "save_schedule_data")
+def test_save_patch_in_place(mock_save_schedule_data):
+    """
+    Test saving the Schedule by patching the Schedule data.
+
+    1. Only the `submission_id` item of the submitted post is inserted.
+
+    2. The whole document is dumped when the structure of the data is not
+       supported.
+    """
+    schedule_storage = ScheduleDummyStorage()
+    schedule_storage.patch_in_place = True
+    schedule = schedule_storage.load()
+    schedule.posts[1].submission_id = "cute_id"
+
+    schedule_storage.save(schedule)
+
+    assert mock_save_schedule_data.call_args == call(
+        SCHEDULE_DATA.replace(
+            "ep 2\n",
+            "ep 2\n  submission_id: cute_id\n",
+        ),
+    )
+
+    with patch.object(
+        ScheduleDummyStorage,
+        "load_schedule_data",
+        return_value="subreddit: anime\nposts: [{name: episode_01}]",
+    ):
+        schedule_storage.load_schedule_document()
+
+    assert schedule_storage.schedule_source is None
+
+    schedule_storage.save(schedule)
+
+    assert mock_save_schedule_data.call_args == call(
+        "subreddit: anime\nposts:\n" +
+        "- name: episode_01\n  submission_id: 7okphp\n",
+    )
+
+
+@patch.object(ScheduleDummyStorage, "save_schedule_data")
+@patch.object(ScheduleDummyStorage, "load_schedule_data")
+def test_save_json(mock_load_schedule_data, mock_save_schedule_data):
+    """Test that the Schedule loaded from JSON is saved as JSON."""
+    mock_load_schedule_data.return_value = json.dumps(
+        parse_yaml(SCHEDULE_DATA),
+        default=str,
+    )
+    schedule_storage = ScheduleDummyStorage()
+    schedule_storage.patch_in_place = True
+    schedule = schedule_storage.load()
+    schedule.posts[1].submission_id = "cute_id"
+
+    schedule_storage.save(schedule)
+
+    saved_data = json.loads(mock_save_schedule_data.call_args[0][0])
+
+    assert saved_data["posts"][1]["submission_id"] == "cute_id"
+    assert saved_data["posts"][1]["submit_at"] == "2018-01-13 12:00:00"
+
+
+@patch.object(ScheduleDummyStorage, "save_schedule_data")
+@patch.object(ScheduleDummyStorage, "load_schedule_data")
+def test_save_flow_mapping(mock_load_schedule_data, mock_save_schedule_data):
+    """Test that the Schedule loaded from a YAML flow mapping stays YAML."""
+    mock_load_schedule_data.return_value = (
+        "{subreddit: anime, posts: [{name: episode_01, " +
+        "submit_at: '2018-01-06 12:00:00', title: Cute, body_template: Cute}]}"
+    )
+    schedule_storage = ScheduleDummyStorage()
+    schedule = schedule_storage.load()
+    schedule.posts[0].submission_id = "cute_id"
+
+    schedule_storage.save(schedule)
+
+    assert not schedule_storage.schedule_json
+    assert "submission_id: cute_id\n" in mock_save_schedule_data.call_args[0][0]
+
+
+@patch.object(ScheduleDummyStorage, "save_state_data")
+def test_save_submission_state(mock_save_state_data, schedule):
+    """
+    Test saving the submission state instead of the Schedule data.
+
+    Only the submitted posts are included.
+    """
+    schedule_storage = ScheduleDummyStorage()
+    schedule_storage.submission_state = True
+    post = schedule.posts[0]
+    post.submitted_at = datetime(2018, 1, 6, 17, 0, 0, 250000)
+    post.submit_latency = 120.5
+    post.release_jitter = 0.25
+
+    schedule_storage.save(schedule)
+    state_data = mock_save_state_data.call_args[0][0]
+
+    assert json.loads(state_data) == {
+        "version": 1,
+        "posts": {
+            "episode_1": {
+                "submission_id": "cute_id",
+                "submitted_at": "2018-01-06T17:00:00.250000",
+                "submit_latency": 120.5,
+                "release_jitter": 0.25,
+            },
+        },
+    }
+    assert " " not in state_data
+
+
+@patch.object(ScheduleDummyStorage, "load_state_data")
+def test_load_submission_state(mock_load_state_data):
+    """
+    Test merging the submission state into the loaded Schedule.
+
+    1. The submission IDs in the Schedule data take precedence.
+
+    2. The Schedule is not modified when there's no submission state.
+
+    3. The invalid submission state is reported.
+    """
+    post_state = {
+        "submission_id": "cute_id",
+        "submitted_at": None,
+        "submit_latency": None,
+        "release_jitter": None,
+    }
+    mock_load_state_data.return_value = json.dumps({
+        "version": 1,
+        "posts": {
+            "episode_01": {
+                "submission_id": "moe_id",
+                "submitted_at": "2018-01-06T12:00:00.250000",
+                "submit_latency": 120.5,
+                "release_jitter": 0.25,
+            },
+            "episode_02": post_state,
+            "missing": post_state,
+        },
+    })
+    schedule_storage = ScheduleDummyStorage()
+    schedule_storage.submission_state = True
+
+    schedule = schedule_storage.load()
+
+    assert schedule.posts[0].submission_id == "7okphp"
+    assert schedule.posts[0].submitted_at == datetime(
+        2018, 1, 6, 12, 0, 0, 250000,
+    )
+    assert schedule.posts[0].submit_latency == 120.5
+    assert schedule.posts[1].submission_id == "cute_id"
+    assert schedule.pending_positions == [2]
+
+    mock_load_state_data.return_value = None
+    schedule = schedule_storage.load()
+
+    assert schedule.pending_positions == [1, 2]
+
+    mock_load_state_data.return_value = '{"posts": {"episode_02": {}}}'
+
+    with pytest.raises(InvalidSchedule):
+        schedule_storage.load()
+
+    post_state["submit_latency"] = "fast"
+    mock_load_state_data.return_value = json.dumps({
+        "posts": {"episode_02": post_state},
+    })
+
+    with pytest.raises(InvalidSchedule):
+        schedule_storage.load()
+
+
+def test_submission_state_round_trip():
+    """Test loading the saved submission state."""
+    schedule_storage = ScheduleDummyStorage()
+    schedule_storage.submission_state = True
+    schedule = schedule_storage.load()
+    schedule.posts[1].submission_id = "cute_id"
+    schedule.posts[1].submitted_at = datetime(2018, 1, 13, 12, 0, 1)
+
+    schedule_storage.save(schedule)
+    loaded_schedule = schedule_storage.load()
+
+    assert loaded_schedule.posts[1].submission_id == "cute_id"
+    assert loaded_schedule.posts[1].submitted_at == datetime(
+        2018, 1, 13, 12, 0, 1,
+    )
+
+
 def test_update_submitted_posts(schedule):
     """Test populating the Schedule data with IDs of submitted posts."""
     posts_data: PostsData = [
@@ -1,17 +1,25 @@
 # -*- coding: utf-8 -*-
 
+import textwrap
+import threading
 from pathlib import Path
-from unittest.mock import MagicMock, Mock, PropertyMock
+from unittest.mock import MagicMock, Mock, PropertyMock, call
 
 import pytest
 from praw.models.reddit.subreddit import SubredditWiki
-from prawcore.exceptions import Forbidden, NotFound, PrawcoreException
+from prawcore.exceptions import (
+    Conflict,
+    Forbidden,
+    NotFound,
+    PrawcoreException,
+)
 
 from slow_start_rewatch.exceptions import (
     InvalidWikiLink,
     MissingPost,
     MissingSchedule,
     RedditError,
+    ScheduleConflict,
 )
 from slow_start_rewatch.schedule.schedule_wiki_storage import (
     ScheduleWikiStorage,
@@ -24,6 +32,7 @@ wiki = SubredditWiki
 TEST_SCHEDULE_PATH = Path(TEST_ROOT_DIR).joinpath("test_schedule")
 SCHEDULE_FILENAME = "schedule.yml"
 POST_BODY_FILENAME = "episode_01.md"
+STATE_DATA = '{"version":1,"posts":{}}'
 
 
 def test_load_schedule_data(schedule_wiki_storage_config, reddit_with_wiki):
@@ -36,12 +45,35 @@ def test_load_schedule_data(schedule_wiki_storage_config, reddit_with_wiki):
     schedule_data = schedule_wiki_storage.load_schedule_data()
 
     assert schedule_data == SCHEDULE_DATA
+    assert schedule_wiki_storage.schedule_revision == "revision_1"
+
+    wiki_page = reddit_with_wiki.subreddit().wiki["slow-start-rewatch"]
+    wiki_page.content_md = textwrap.indent(SCHEDULE_DATA, prefix="    ")
+
+    assert schedule_wiki_storage.load_schedule_data() == SCHEDULE_DATA
 
 
 def test_load_schedule_data_not_found(reddit_with_wiki):
     """Test loading of the Schedule data from the nonexistent wiki."""
     config = MockConfig({
         "schedule_wiki_url": "/r/anime/wiki/not-found",
+        "schedule_storage": {
+            "patch_in_place": True,
+            "yaml_backend": "ruamel_c",
+            "body_workers": 4,
+            "lazy_bodies": False,
+            "submission_state": False,
+        },
+        "schedule_cache": {
+            "enabled": False,
+            "max_entries": 8,
+        },
+        "wiki_mirror": {
+            "enabled": False,
+            "revision_limit": 100,
+            "offline_fallback": False,
+            "fetch_deadline": 5000,
+        },
     })
 
     schedule_wiki_storage = ScheduleWikiStorage(config, reddit_with_wiki)
@@ -60,6 +92,23 @@ def test_load_schedule_data_forbidden(reddit_with_wiki):
     """Test loading of the Schedule data from the inaccessible wiki."""
     config = MockConfig({
         "schedule_wiki_url": "/r/anime/wiki/forbidden",
+        "schedule_storage": {
+            "patch_in_place": True,
+            "yaml_backend": "ruamel_c",
+            "body_workers": 4,
+            "lazy_bodies": False,
+            "submission_state": False,
+        },
+        "schedule_cache": {
+            "enabled": False,
+            "max_entries": 8,
+        },
+        "wiki_mirror": {
+            "enabled": False,
+            "revision_limit": 100,
+            "offline_fallback": False,
+            "fetch_deadline": 5000,
+        },
     })
 
     schedule_wiki_storage = ScheduleWikiStorage(config, reddit_with_wiki)
@@ -90,6 +139,23 @@ def test_load_post_body_not_found(reddit_with_wiki):
     """Test loading of the Post body from the nonexistent wiki."""
     config = MockConfig({
         "schedule_wiki_url": "/r/anime/wiki/not-found",
+        "schedule_storage": {
+            "patch_in_place": True,
+            "yaml_backend": "ruamel_c",
+            "body_workers": 4,
+            "lazy_bodies": False,
+            "submission_state": False,
+        },
+        "schedule_cache": {
+            "enabled": False,
+            "max_entries": 8,
+        },
+        "wiki_mirror": {
+            "enabled": False,
+            "revision_limit": 100,
+            "offline_fallback": False,
+            "fetch_deadline": 5000,
+        },
     })
 
     schedule_wiki_storage = ScheduleWikiStorage(config, reddit_with_wiki)
@@ -108,6 +174,23 @@ def test_load_post_body_forbidden(reddit_with_wiki):
     """Test loading of the Post body from the inaccessible wiki."""
     config = MockConfig({
         "schedule_wiki_url": "/r/anime/wiki/forbidden",
+        "schedule_storage": {
+            "patch_in_place": True,
+            "yaml_backend": "ruamel_c",
+            "body_workers": 4,
+            "lazy_bodies": False,
+            "submission_state": False,
+        },
+        "schedule_cache": {
+            "enabled": False,
+            "max_entries": 8,
+        },
+        "wiki_mirror": {
+            "enabled": False,
+            "revision_limit": 100,
+            "offline_fallback": False,
+            "fetch_deadline": 5000,
+        },
     })
 
     schedule_wiki_storage = ScheduleWikiStorage(config, reddit_with_wiki)
@@ -122,11 +205,151 @@ def test_load_post_body_forbidden(reddit_with_wiki):
     assert "/r/anime/wiki/forbidden/episode_01" in error_message
 
 
+def test_load_with_mirror(
+    schedule_wiki_storage_config,
+    reddit_with_wiki,
+    tmpdir,
+):
+    """
+    Test loading the wiki pages from the local mirror.
+
+    1. The pages are fetched and mirrored on the first load.
+
+    2. Only the wiki revisions are requested when the pages are unchanged.
+
+    3. The schedule page is fetched again after it has been saved.
+    """
+    schedule_wiki_storage_config["data_dir"] = str(tmpdir)
+    schedule_wiki_storage_config["wiki_mirror.enabled"] = True
+    wiki_pages = reddit_with_wiki.subreddit().wiki
+    wiki_pages["slow-start-rewatch/episode_01"].revision_id = "revision_0"
+    wiki = MagicMock()
+    wiki.__getitem__.side_effect = wiki_pages.__getitem__
+    wiki.revisions.return_value = []
+    reddit_with_wiki.subreddit().wiki = wiki
+
+    schedule_wiki_storage = ScheduleWikiStorage(
+        schedule_wiki_storage_config,
+        reddit_with_wiki,
+    )
+
+    assert schedule_wiki_storage.load_schedule_data() == SCHEDULE_DATA
+    assert schedule_wiki_storage.load_post_body("episode_01") == POST_BODY
+    assert wiki.__getitem__.call_count == 2
+
+    schedule_wiki_storage = ScheduleWikiStorage(
+        schedule_wiki_storage_config,
+        reddit_with_wiki,
+    )
+
+    assert schedule_wiki_storage.load_schedule_data() == SCHEDULE_DATA
+    assert schedule_wiki_storage.load_post_body("episode_01") == POST_BODY
+    assert schedule_wiki_storage.schedule_revision == "revision_1"
+    assert wiki.__getitem__.call_count == 2
+    assert wiki.revisions.call_count == 2
+
+    schedule_wiki_storage.save_schedule_data(SCHEDULE_DATA)
+    schedule_wiki_storage.load_schedule_data()
+    schedule_wiki_storage.load_post_body("episode_01")
+
+    assert wiki.__getitem__.call_count == 4
+
+
+def test_load_offline(  # noqa: WPS213
+    schedule_wiki_storage_config,
+    reddit_with_wiki,
+    tmpdir,
+):
+    """
+    Test loading the snapshots of the wiki pages when Reddit fails.
+
+    1. The snapshot is used when the fetch fails or exceeds the deadline.
+
+    2. The fetch is waited for when there's no snapshot.
+
+    3. The missing pages are not replaced by the snapshots.
+
+    4. The shutdown does not wait for the fetches exceeding the deadline.
+    """
+    schedule_wiki_storage_config["data_dir"] = str(tmpdir)
+    schedule_wiki_storage_config["wiki_mirror.enabled"] = True
+    schedule_wiki_storage_config["wiki_mirror.offline_fallback"] = True
+    schedule_wiki_storage_config["wiki_mirror.fetch_deadline"] = 10
+    wiki_pages = reddit_with_wiki.subreddit().wiki
+    wiki_page_schedule = wiki_pages["slow-start-rewatch"]
+    wiki_page_post_body = wiki_pages["slow-start-rewatch/episode_01"]
+    wiki_page_post_body.revision_id = "revision_0"
+    wiki = MagicMock()
+    wiki.__getitem__.side_effect = wiki_pages.__getitem__
+    wiki.revisions.return_value = []
+    reddit_with_wiki.subreddit().wiki = wiki
+
+    schedule_wiki_storage = ScheduleWikiStorage(
+        schedule_wiki_storage_config,
+        reddit_with_wiki,
+    )
+    schedule_wiki_storage.load_schedule_data()
+    schedule_wiki_storage.load_post_body("episode_01")
+
+    reddit_responds = threading.Event()
+
+    def wait_for_reddit(*args, **kwargs):  # noqa: WPS430
+        reddit_responds.wait()
+        return []
+
+    wiki.revisions.side_effect = wait_for_reddit
+    type(wiki_page_schedule).content_md = PropertyMock(
+        side_effect=PrawcoreException,
+    )
+    type(wiki_page_post_body).content_md = PropertyMock(
+        side_effect=wait_for_reddit,
+    )
+
+    assert schedule_wiki_storage.load_schedule_data() == SCHEDULE_DATA
+    assert schedule_wiki_storage.schedule_revision == "revision_1"
+    assert schedule_wiki_storage.load_post_body("episode_01") == POST_BODY
+
+    wiki_pages["slow-start-rewatch/episode_02"] = wiki_page_schedule
+
+    with pytest.raises(PrawcoreException):
+        schedule_wiki_storage.load_post_body("episode_02")
+
+    wiki_pages["slow-start-rewatch/episode_03"] = wiki_pages["not-found"]
+
+    with pytest.raises(MissingPost):
+        schedule_wiki_storage.load_post_body("episode_03")
+
+    schedule_wiki_storage.shutdown()
+
+    assert schedule_wiki_storage.fetch_executor
+
+    with pytest.raises(RuntimeError):
+        schedule_wiki_storage.fetch_executor.submit(wait_for_reddit)
+
+    reddit_responds.set()
+    schedule_wiki_storage.fetch_executor.shutdown(wait=True)
+
+
+def test_shutdown(schedule_wiki_storage_config, reddit_with_wiki):
+    """Test shutting down the storage without the offline fallback."""
+    schedule_wiki_storage = ScheduleWikiStorage(
+        schedule_wiki_storage_config,
+        reddit_with_wiki,
+    )
+
+    schedule_wiki_storage.shutdown()
+
+    assert not schedule_wiki_storage.fetch_executor
+
+
 def test_save_schedule_data(schedule_wiki_storage_config, reddit_with_wiki):
     """
     Test saving of the Schedule data to the wiki.
 
-    Check that the content is indented by 4 spaces.
+    1. Check that the content is indented by 4 spaces.
+
+    2. Check that the edit is based on the loaded revision and the revision
+       is updated after the edit.
     """
     schedule_wiki_storage = ScheduleWikiStorage(
         schedule_wiki_storage_config,
@@ -135,16 +358,81 @@ def test_save_schedule_data(schedule_wiki_storage_config, reddit_with_wiki):
 
     schedule_wiki_storage.save_schedule_data(SCHEDULE_DATA)
 
-    wiki_edit = reddit_with_wiki.subreddit().wiki["slow-start-rewatch"].edit
+    wiki_page = reddit_with_wiki.subreddit().wiki["slow-start-rewatch"]
+    wiki_edit = wiki_page.edit
 
     assert "anime\n    posts:" in wiki_edit.call_args[1]["content"]
     assert wiki_edit.call_args[1]["reason"] == "Rewatch Update"
+    assert "previous" not in wiki_edit.call_args[1]
+    assert schedule_wiki_storage.schedule_revision == "revision_2"
+
+    schedule_wiki_storage.schedule_revision = "revision_1"
+    schedule_wiki_storage.save_schedule_data(SCHEDULE_DATA)
+
+    assert wiki_edit.call_args[1]["previous"] == "revision_1"
+
+
+@pytest.mark.parametrize("revisions_settings", [
+    {"return_value": []},
+    {"side_effect": PrawcoreException},
+])
+def test_save_schedule_data_without_revision(
+    revisions_settings,
+    schedule_wiki_storage_config,
+    reddit_with_wiki,
+):
+    """Test saving of the Schedule data when the revision is unavailable."""
+    schedule_wiki_storage = ScheduleWikiStorage(
+        schedule_wiki_storage_config,
+        reddit_with_wiki,
+    )
+    wiki_page = reddit_with_wiki.subreddit().wiki["slow-start-rewatch"]
+    wiki_page.revisions.configure_mock(**revisions_settings)
+
+    schedule_wiki_storage.schedule_revision = "revision_1"
+    schedule_wiki_storage.save_schedule_data(SCHEDULE_DATA)
+
+    assert wiki_page.edit.call_args[1]["previous"] == "revision_1"
+    assert schedule_wiki_storage.schedule_revision is None
+
+
+def test_save_schedule_data_conflict(
+    schedule_wiki_storage_config,
+    reddit_with_wiki,
+):
+    """Test saving of the Schedule data modified by someone else."""
+    schedule_wiki_storage = ScheduleWikiStorage(
+        schedule_wiki_storage_config,
+        reddit_with_wiki,
+    )
+    wiki_page = reddit_with_wiki.subreddit().wiki["slow-start-rewatch"]
+    wiki_page.edit.side_effect = Conflict(response=MagicMock())
+
+    with pytest.raises(ScheduleConflict):
+        schedule_wiki_storage.save_schedule_data(SCHEDULE_DATA)
 
 
 def test_save_schedule_data_error(reddit_with_wiki):
     """Test saving of the Schedule data to the wiki with en error."""
     config = MockConfig({
         "schedule_wiki_url": "/r/anime/wiki/not-found",
+        "schedule_storage": {
+            "patch_in_place": True,
+            "yaml_backend": "ruamel_c",
+            "body_workers": 4,
+            "lazy_bodies": False,
+            "submission_state": False,
+        },
+        "schedule_cache": {
+            "enabled": False,
+            "max_entries": 8,
+        },
+        "wiki_mirror": {
+            "enabled": False,
+            "revision_limit": 100,
+            "offline_fallback": False,
+            "fetch_deadline": 5000,
+        },
     })
 
     schedule_wiki_storage = ScheduleWikiStorage(config, reddit_with_wiki)
@@ -159,9 +447,100 @@ def test_save_schedule_data_error(reddit_with_wiki):
     assert "/r/anime/wiki/not-found" in error_message
 
 
+def test_submission_state(schedule_wiki_storage_config, reddit_with_wiki):
+    """
+    Test loading and saving the submission state in the wiki.
+
+    The content is indented by 4 spaces and the mirrored page is marked as
+    stale after the edit.
+    """
+    schedule_wiki_storage = ScheduleWikiStorage(
+        schedule_wiki_storage_config,
+        reddit_with_wiki,
+    )
+    schedule_wiki_storage.wiki_mirror = Mock()
+    schedule_wiki_storage.wiki_mirror.get_page.return_value = None
+    wiki_page = reddit_with_wiki.subreddit().wiki[
+        "slow-start-rewatch_submission_state"
+    ]
+
+    assert schedule_wiki_storage.load_state_data() == STATE_DATA
+
+    schedule_wiki_storage.save_state_data(STATE_DATA)
+
+    assert wiki_page.edit.call_args == call(
+        content="    {0}".format(STATE_DATA),
+        reason="Rewatch Update",
+    )
+    assert schedule_wiki_storage.wiki_mirror.mark_stale.call_args == call(
+        "slow-start-rewatch_submission_state",
+    )
+
+    schedule_wiki_storage.wiki_mirror = None
+    schedule_wiki_storage.save_state_data(STATE_DATA)
+
+    assert wiki_page.edit.call_count == 2
+
+
+def test_submission_state_errors(
+    schedule_wiki_storage_config,
+    reddit_with_wiki,
+):
+    """
+    Test the submission state errors.
+
+    1. The missing page is not an error when loading.
+
+    2. The missing permissions and the failed edit are reported.
+    """
+    wiki_url = "/r/anime/wiki/{0}"
+    schedule_wiki_storage_config["schedule_wiki_url"] = wiki_url.format(
+        "not-found",
+    )
+    schedule_wiki_storage = ScheduleWikiStorage(
+        schedule_wiki_storage_config,
+        reddit_with_wiki,
+    )
+
+    assert schedule_wiki_storage.load_state_data() is None
+
+    with pytest.raises(RedditError):
+        schedule_wiki_storage.save_state_data(STATE_DATA)
+
+    schedule_wiki_storage_config["schedule_wiki_url"] = wiki_url.format(
+        "forbidden",
+    )
+    schedule_wiki_storage = ScheduleWikiStorage(
+        schedule_wiki_storage_config,
+        reddit_with_wiki,
+    )
+
+    with pytest.raises(MissingSchedule):
+        schedule_wiki_storage.load_state_data()
+
+
 def test_invalid_config(reddit_with_wiki):
     """Test initializing `ScheduleWikiStorage` with invalid config."""
-    config = MockConfig({"schedule_wiki_url": None})
+    config = MockConfig({
+        "schedule_wiki_url": None,
+        "schedule_storage": {
+            "patch_in_place": True,
+            "yaml_backend": "ruamel_c",
+            "body_workers": 4,
+            "lazy_bodies": False,
+            "submission_state": False,
+        },
+        "schedule_cache": {
+            "enabled": False,
+            "max_entries": 8,
+        },
+        "wiki_mirror": {
+            "enabled": False,
+            "revision_limit": 100,
+            "offline_fallback": False,
+            "fetch_deadline": 5000,
+        },
+    })
 
     with pytest.raises(RuntimeError):
         ScheduleWikiStorage(config, reddit_with_wiki)
@@ -184,6 +563,23 @@ def schedule_wiki_storage_config(tmpdir):
     """Return mock Config contaning a wiki URL."""
     return MockConfig({
         "schedule_wiki_url": "/r/anime/wiki/slow-start-rewatch",
+        "schedule_storage": {
+            "patch_in_place": True,
+            "yaml_backend": "ruamel_c",
+            "body_workers": 4,
+            "lazy_bodies": False,
+            "submission_state": False,
+        },
+        "schedule_cache": {
+            "enabled": False,
+            "max_entries": 8,
+        },
+        "wiki_mirror": {
+            "enabled": False,
+            "revision_limit": 100,
+            "offline_fallback": False,
+            "fetch_deadline": 5000,
+        },
     })
 
 
@@ -194,10 +590,15 @@ def reddit_with_wiki():
 
     wiki_page_schedule = Mock()
     wiki_page_schedule.content_md = SCHEDULE_DATA
+    wiki_page_schedule.revision_id = "revision_1"
+    wiki_page_schedule.revisions.return_value = [{"id": "revision_2"}]
 
     wiki_page_post_body = Mock()
     wiki_page_post_body.content_md = POST_BODY
 
+    wiki_page_state = Mock()
+    wiki_page_state.content_md = "    {0}".format(STATE_DATA)
+
     wiki_page_not_found = Mock()
     type(wiki_page_not_found).content_md = PropertyMock(
         side_effect=NotFound(response=MagicMock()),
@@ -214,10 +615,13 @@ def reddit_with_wiki():
     reddit.subreddit().wiki = {
         "slow-start-rewatch": wiki_page_schedule,
         "slow-start-rewatch/episode_01": wiki_page_post_body,
+        "slow-start-rewatch_submission_state": wiki_page_state,
         "not-found": wiki_page_not_found,
         "not-found/episode_01": wiki_page_not_found,
+        "not-found_submission_state": wiki_page_not_found,
         "forbidden": wiki_page_forbidden,
         "forbidden/episode_01": wiki_page_forbidden,
+        "forbidden_submission_state": wiki_page_forbidden,
     }
 
     return reddit
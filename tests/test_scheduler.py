@@ -1,23 +1,37 @@
 # -*- coding: utf-8 -*-
 
+import threading
+from concurrent import futures
+from concurrent.futures import Future
 from datetime import datetime
-from unittest.mock import Mock, patch
+from unittest.mock import Mock, call, patch
 
 import pytest
 
-from slow_start_rewatch.exceptions import MissingSchedule
+from slow_start_rewatch.exceptions import (
+    ConfigError,
+    MissingSchedule,
+    RedditError,
+)
 from slow_start_rewatch.post import Post
 from slow_start_rewatch.schedule.schedule import Schedule
-from slow_start_rewatch.schedule.scheduler import Scheduler
+from slow_start_rewatch.schedule.scheduler import PreparedPost, Scheduler
+from slow_start_rewatch.schedule.submission_journal import (
+    STEP_FINISH,
+    STEP_SAVE,
+    STEP_SUBMIT,
+)
 from tests.conftest import MockConfig
 
 
 @patch("slow_start_rewatch.schedule.scheduler.ScheduleFileStorage")
+@patch("slow_start_rewatch.schedule.scheduler.ScheduleSqliteStorage")
 @patch("slow_start_rewatch.schedule.scheduler.ScheduleWikiStorage")
 @patch("slow_start_rewatch.schedule.scheduler.PostHelper")
 def test_load(
     mock_post_helper,
     mock_schedule_wiki_storage,
+    mock_schedule_sqlite_storage,
     mock_schedule_file_storage,
     scheduler_config,
     reddit,
@@ -26,6 +40,9 @@ def test_load(
     mock_schedule_wiki_storage.return_value.load.return_value = Mock(
         subreddit="WikiSource",
     )
+    mock_schedule_sqlite_storage.return_value.load.return_value = Mock(
+        subreddit="DatabaseSource",
+    )
     mock_schedule_file_storage.return_value.load.return_value = Mock(
         subreddit="FileSource",
     )
@@ -35,6 +52,9 @@ def test_load(
     scheduler.load()
     assert scheduler.schedule
     assert scheduler.schedule.subreddit == "WikiSource"
+    assert mock_post_helper.return_value.get_render_context.call_args == (
+        call(scheduler.schedule)
+    )
 
     # Clear the wiki url
     scheduler_config["schedule_wiki_url"] = None
@@ -45,6 +65,15 @@ def test_load(
     assert scheduler.schedule
     assert scheduler.schedule.subreddit == "FileSource"
 
+    # Set the database (takes precedence over the file)
+    scheduler_config["schedule_database"] = "schedule.sqlite"
+    scheduler = Scheduler(scheduler_config, reddit)
+
+    scheduler.load()
+    assert scheduler.schedule
+    assert scheduler.schedule.subreddit == "DatabaseSource"
+    scheduler_config["schedule_database"] = None
+
     # Clear the file name
     scheduler_config["schedule_file"] = None
     with pytest.raises(MissingSchedule):
@@ -89,27 +118,329 @@ def test_get_next_post_not_submitted(mock_datetime, scheduler, schedule):
     assert post.submit_at == datetime(2018, 1, 6 + 7, 17, 0, 0)
 
 
+@patch("slow_start_rewatch.schedule.scheduler.datetime")
+def test_get_next_post_lookahead(mock_datetime, scheduler, schedule):
+    """
+    Test that the upcoming posts are prepared in the background.
+
+    The first post is prepared right away, the other posts are prepared by the
+    workers and their results are reused.
+    """
+    mock_datetime.utcnow.return_value = datetime(2018, 1, 6, 16, 50, 0)
+    scheduler.schedule = schedule
+
+    post = scheduler.get_next_post()
+
+    assert post == schedule.posts[0]
+    assert set(scheduler.prepared_posts) == {"episode_2", "episode_3"}
+
+    for future in scheduler.prepared_posts.values():
+        future.result()
+
+    prepare_post = scheduler.post_helper.prepare_post
+
+    for schedule_post in schedule.posts:
+        assert call(
+            post=schedule_post,
+            schedule=schedule,
+            prepare_thumbnail=True,
+        ) in prepare_post.call_args_list
+
+    schedule.posts[0].submission_id = "cute_id"
+    prepare_post.reset_mock()
+
+    post = scheduler.get_next_post()
+
+    assert post == schedule.posts[1]
+    assert prepare_post.call_args == call(schedule.posts[1], schedule)
+    assert "episode_2" not in scheduler.prepared_posts
+    assert "episode_3" in scheduler.prepared_posts
+
+    scheduler.shutdown()
+
+    assert not scheduler.prepared_posts
+
+
+def test_pause_preparation(scheduler, schedule):
+    """
+    Test pausing the background preparations.
+
+    1. The pause waits for the running preparation.
+
+    2. The preparation scheduled during the pause starts after the resume.
+    """
+    scheduler.schedule = schedule
+    preparation_started = threading.Event()
+    preparation_finished = threading.Event()
+
+    def prepare_post(**kwargs):
+        preparation_started.set()
+        preparation_finished.wait(timeout=1)
+
+    scheduler.post_helper.prepare_post.side_effect = prepare_post
+    scheduler.schedule_preparation(schedule.posts[1])
+    preparation_started.wait(timeout=1)
+
+    pause_thread = threading.Thread(target=scheduler.pause_preparation)
+    pause_thread.start()
+    pause_thread.join(timeout=0.05)
+
+    assert pause_thread.is_alive()
+
+    preparation_finished.set()
+    pause_thread.join(timeout=1)
+
+    assert not pause_thread.is_alive()
+
+    scheduler.schedule_preparation(schedule.posts[2])
+    future = scheduler.prepared_posts["episode_3"]
+
+    with pytest.raises(futures.TimeoutError):
+        future.result(timeout=0.05)
+
+    scheduler.resume_preparation()
+
+    assert future.result(timeout=1)
+
+    scheduler.shutdown()
+
+
+@patch("slow_start_rewatch.schedule.scheduler.time")
+def test_finish_preparation(mock_time, scheduler, schedule):
+    """
+    Test finishing the preparation of posts prepared in the background.
+
+    1. The post body has changed since the background preparation.
+
+    2. The prepared data are too old.
+
+    3. The background preparation failed.
+    """
+    scheduler.schedule = schedule
+    post = schedule.posts[1]
+    prepare_post = scheduler.post_helper.prepare_post
+    full_preparation = call(
+        post=post,
+        schedule=schedule,
+        prepare_thumbnail=True,
+    )
+
+    def render_post(*args, **kwargs):
+        post.body_md = "new body"
+
+    prepare_post.side_effect = render_post
+    mock_time.monotonic.return_value = 10000
+    scheduler.prepared_posts[post.name] = finished_future(("old body", 9999.5))
+
+    scheduler.finish_preparation(post)
+
+    assert prepare_post.call_args == full_preparation
+
+    prepare_post.reset_mock()
+    scheduler.prepared_posts[post.name] = finished_future(("new body", 10))
+
+    scheduler.finish_preparation(post)
+
+    assert prepare_post.call_count == 2
+    assert prepare_post.call_args == full_preparation
+
+    prepare_post.reset_mock()
+    failed_future: "Future[PreparedPost]" = Future()
+    failed_future.set_exception(RedditError("Conversion failed."))
+    scheduler.prepared_posts[post.name] = failed_future
+
+    scheduler.finish_preparation(post)
+
+    assert prepare_post.call_args_list == [full_preparation]
+
+
+def finished_future(prepared_post: PreparedPost) -> "Future[PreparedPost]":
+    """Return a finished `Future` with the result."""
+    future: "Future[PreparedPost]" = Future()
+    future.set_result(prepared_post)
+
+    return future
+
+
 def test_get_submitted_posts(scheduler, schedule):
-    """Test getting submitted posts."""
+    """
+    Test getting submitted posts.
+
+    1. All the submitted posts are rendered for the first time.
+
+    2. Only the posts depending on the skipped post are rendered and only the
+       changed posts are returned.
+
+    3. The changed post is returned again until its new body is stored (i.e.
+       until the Submission is edited).
+    """
     scheduler.schedule = schedule
+    scheduler.schedule_storage.load_deferred_bodies.return_value = 0
+    scheduler.dependents = {
+        "episode_1": {"episode_2"},
+        "episode_2": {"episode_1", "episode_3"},
+        "episode_3": {"episode_2"},
+    }
+    body_versions = {"episode_1": 1, "episode_2": 1, "episode_3": 1}
+
+    def render_post(post, render_schedule):
+        return "{0} v{1}".format(post.name, body_versions[post.name])
+
+    render_post_body = scheduler.post_helper.render_post_body
+    render_post_body.side_effect = render_post
 
     schedule.posts[0].submission_id = "cute_id_1"
     schedule.posts[1].submission_id = "cute_id_2"
+    post_updates = scheduler.get_submitted_posts()
+
+    assert len(post_updates) == 2
+    assert schedule.posts[0].body_md is None
+
+    for post, body_md in post_updates:
+        post.body_md = body_md
+
+    render_post_body.reset_mock()
+
+    assert not scheduler.get_submitted_posts(skip_post=schedule.posts[1])
+    assert render_post_body.call_args_list == [
+        call(schedule.posts[0], schedule),
+    ]
+
+    body_versions["episode_1"] = 2
+    post_updates = scheduler.get_submitted_posts(skip_post=schedule.posts[1])
+
+    assert post_updates == [(schedule.posts[0], "episode_1 v2")]
+
+    post_updates = scheduler.get_submitted_posts(skip_post=schedule.posts[1])
+
+    assert post_updates == [(schedule.posts[0], "episode_1 v2")]
 
-    assert len(scheduler.get_submitted_posts()) == 2
+    render_post_body.reset_mock()
+    post_updates = scheduler.get_submitted_posts(skip_post=schedule.posts[0])
 
-    posts = scheduler.get_submitted_posts(skip_post=schedule.posts[0])
+    assert not post_updates
+    assert render_post_body.call_args_list == [
+        call(schedule.posts[1], schedule),
+    ]
+
+
+def test_register_submission(scheduler, schedule):
+    """Test that the state derived from the Schedule is updated."""
+    scheduler.schedule = schedule
+    post = schedule.posts[0]
+    post.submission_id = "cute_id"
+
+    scheduler.register_submission(post)
 
-    assert posts[0] == schedule.posts[1]
+    assert scheduler.post_helper.update_render_context.call_args == call(post)
+    assert schedule.pending_positions == [1, 2]
 
 
 def test_save_schedule(scheduler, schedule):
-    """Test saving the schedule."""
+    """
+    Test saving the schedule.
+
+    The schedule is saved in the background and the pending save is flushed
+    on shutdown.
+    """
     scheduler.schedule = schedule
+    scheduler.schedule_persister.coalesce_window = 60000
 
     scheduler.save_schedule()
 
-    assert scheduler.schedule_storage.save.called
+    assert not scheduler.schedule_storage.save.called
+
+    scheduler.shutdown()
+
+    assert scheduler.schedule_storage.save.call_args == call(schedule)
+    assert scheduler.schedule_storage.shutdown.call_count == 1
+
+
+def test_recover_submissions(scheduler, schedule):
+    """Test recovering the submissions which haven't been saved."""
+    scheduler.schedule = schedule
+    post = schedule.posts[0]
+    post.submission_id = "cute_id"
+    scheduler.schedule_persister.pause()
+    scheduler.register_submission(post)
+    scheduler.save_schedule()
+
+    post.submission_id = None
+    scheduler.schedule_storage.load.return_value = Schedule(
+        subreddit="anime",
+        posts=schedule.posts,
+    )
+
+    scheduler.load()
+
+    assert post.submission_id == "cute_id"
+    assert scheduler.schedule.pending_positions == [1, 2]
+
+
+def test_get_interrupted_posts(scheduler, schedule):
+    """
+    Test resuming the posts with the interrupted pipeline.
+
+    1. The missing submission is registered.
+
+    2. The post modified since the submission is skipped.
+    """
+    scheduler.record_saved_posts(["episode_1"])
+    scheduler.schedule = schedule
+    post, modified_post = schedule.posts[:2]
+    post.submission_id = "cute_id"
+    modified_post.submission_id = "moe_id"
+    scheduler.register_submission(post)
+    scheduler.register_submission(modified_post)
+    scheduler.record_saved_posts(["episode_1", "missing"])
+    scheduler.record_step(post, STEP_FINISH)
+    submitted_post = schedule.posts[2]
+    submitted_post.submission_id = "kyun_id"
+    scheduler.register_submission(submitted_post)
+
+    post.submission_id = None
+    modified_post.title = "Slow Start - Episode 2 Rewatch"
+    scheduler.schedule = Schedule(subreddit="anime", posts=schedule.posts)
+
+    assert scheduler.get_interrupted_posts() == [
+        (post, {STEP_SUBMIT, STEP_FINISH, STEP_SAVE}),
+        (submitted_post, {STEP_SUBMIT}),
+    ]
+    assert post.submission_id == "cute_id"
+    assert not scheduler.schedule.pending_positions
+    assert scheduler.post_helper.prepare_post.call_args_list == [
+        call(post, scheduler.schedule),
+        call(submitted_post, scheduler.schedule),
+    ]
+
+
+@patch("slow_start_rewatch.schedule.scheduler.datetime")
+def test_load_body_window(mock_datetime, scheduler, schedule):
+    """
+    Test loading the deferred bodies of the upcoming posts.
+
+    The dependency graph is rebuilt only when any body has been loaded.
+    """
+    mock_datetime.utcnow.return_value = datetime(2018, 1, 6, 16, 50, 0)
+    scheduler.prepare_lookahead = 0
+    scheduler.schedule_storage.load.return_value = schedule
+    load_deferred_bodies = scheduler.schedule_storage.load_deferred_bodies
+    build_dependents = scheduler.post_helper.build_dependents
+
+    scheduler.load()
+
+    assert load_deferred_bodies.call_args == call(schedule.posts[:2])
+    assert build_dependents.call_count == 1
+
+    load_deferred_bodies.return_value = 0
+    scheduler.get_next_post()
+
+    assert build_dependents.call_count == 1
+
+    load_deferred_bodies.return_value = 1
+    scheduler.get_next_post()
+
+    assert build_dependents.call_count == 2
 
 
 def test_scheduler_errors(scheduler: Scheduler):
@@ -123,6 +454,88 @@ def test_scheduler_errors(scheduler: Scheduler):
     with pytest.raises(RuntimeError):
         scheduler.save_schedule()
 
+    with pytest.raises(RuntimeError):
+        scheduler.prepare_in_background(Mock())
+
+    with pytest.raises(RuntimeError):
+        scheduler.finish_preparation(Mock())
+
+    with pytest.raises(RuntimeError):
+        scheduler.register_submission(Mock())
+
+    with pytest.raises(RuntimeError):
+        scheduler.load_body_window([])
+
+    with pytest.raises(RuntimeError):
+        scheduler.get_interrupted_posts()
+
+
+def test_get_submitted_posts_deferred(scheduler, schedule):
+    """
+    Test that the deferred bodies of the submitted posts are loaded.
+
+    The dependency graph is rebuilt so that the submitted posts depending on
+    the new submission are rendered.
+    """
+    scheduler.schedule = schedule
+    scheduler.dependents = {"episode_1": set(), "episode_2": set()}
+    schedule.posts[0].submission_id = "cute_id_1"
+    schedule.posts[1].submission_id = "cute_id_2"
+    load_deferred_bodies = scheduler.schedule_storage.load_deferred_bodies
+    load_deferred_bodies.return_value = 1
+    build_dependents = scheduler.post_helper.build_dependents
+    build_dependents.return_value = {"episode_2": {"episode_1"}}
+
+    render_post_body = scheduler.post_helper.render_post_body
+    render_post_body.return_value = "episode_1 v2"
+
+    post_updates = scheduler.get_submitted_posts(skip_post=schedule.posts[1])
+
+    assert load_deferred_bodies.call_args == call(schedule.posts[:2])
+    assert build_dependents.call_args == call(schedule)
+    assert post_updates == [(schedule.posts[0], "episode_1 v2")]
+
+    scheduler.schedule = None
+
+    with pytest.raises(RuntimeError):
+        scheduler.load_submitted_bodies()
+
+
+@patch("slow_start_rewatch.schedule.scheduler.datetime")
+def test_warm_assets(mock_datetime, scheduler, schedule):
+    """
+    Test preparing the upcoming posts within the validity of the assets.
+
+    The submitted posts and the posts without thumbnail are skipped.
+    """
+    mock_datetime.utcnow.return_value = datetime(2018, 1, 6, 16, 50, 0)
+    asset_registry = scheduler.post_helper.post_converter.asset_registry
+    asset_registry.validity = 14 * 24 * 3600 * 1000
+    schedule.posts[0].submission_id = "cute_id"
+    schedule.posts[2].submit_with_thumbnail = False
+    scheduler.schedule = schedule
+
+    assert scheduler.warm_assets() == [schedule.posts[1]]
+    assert scheduler.post_helper.prepare_post.call_args == call(
+        post=schedule.posts[1],
+        schedule=schedule,
+        prepare_thumbnail=True,
+    )
+
+    asset_registry.validity = 1000
+
+    assert not scheduler.warm_assets()
+
+    scheduler.post_helper.post_converter.asset_registry = None
+
+    with pytest.raises(ConfigError):
+        scheduler.warm_assets()
+
+    scheduler.schedule = None
+
+    with pytest.raises(RuntimeError):
+        scheduler.warm_assets()
+
 
 @pytest.fixture()
 @patch("slow_start_rewatch.schedule.scheduler.ScheduleWikiStorage")
@@ -153,9 +566,23 @@ def schedule():
 
 
 @pytest.fixture()
-def scheduler_config():
+def scheduler_config(tmpdir):
     """Return mock Config with the wiki storage configured."""
     return MockConfig({
+        "data_dir": str(tmpdir),
         "schedule_wiki_url": "/r/anime/wiki/slow-start-rewatch",
+        "schedule_database": None,
         "schedule_file": None,
+        "schedule_persister": {
+            "coalesce_window": 0,
+            "retry_delay": 0,
+            "max_retries": 1,
+            "flush_timeout": 5000,
+        },
+        "scheduler": {
+            "prepare_lookahead": 2,
+            "prepare_workers": 2,
+            "prepare_max_age": 3600000,
+            "body_window": 1,
+        },
     })
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+
+import os
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+
+from slow_start_rewatch.post import Post
+from slow_start_rewatch.schedule.submission_journal import (
+    JOURNAL_DIRECTORY,
+    STEP_FINISH,
+    STEP_SAVE,
+    STEP_SUBMIT,
+    STEP_UPDATE,
+    SubmissionJournal,
+    create_submission_journal,
+    hash_post,
+)
+from tests.conftest import MockConfig
+
+
+def test_load_interrupted(submission_journal, post):
+    """
+    Test loading the posts with the interrupted pipeline.
+
+    The records of the completed pipelines are removed from the journal.
+    """
+    other_post = Post(
+        name="episode_2",
+        submit_at=datetime(2018, 1, 13, 17, 0, 0),
+        subreddit="anime",
+        title="Slow Start - Episode 2 Discussion",
+        body_template="*Slow Start*, Episode 2",
+    )
+    other_post.submission_id = "moe_id"
+
+    for step in (STEP_SUBMIT, STEP_FINISH, STEP_SAVE, STEP_UPDATE):
+        submission_journal.record_step(post, step)
+
+    submission_journal.record_step(other_post, STEP_SUBMIT)
+    submission_journal.record_step(other_post, STEP_SAVE)
+
+    interrupted_entries = submission_journal.load_interrupted()
+
+    assert len(interrupted_entries) == 1
+    assert interrupted_entries[0].name == "episode_2"
+    assert interrupted_entries[0].post_hash == hash_post(other_post)
+    assert interrupted_entries[0].submission_id == "moe_id"
+    assert interrupted_entries[0].steps == {STEP_SUBMIT, STEP_SAVE}
+
+    submission_journal.record_step(other_post, STEP_FINISH)
+    submission_journal.record_step(other_post, STEP_UPDATE)
+
+    assert not submission_journal.load_interrupted()
+    assert not os.path.exists(submission_journal.journal_file)
+
+
+def test_rescheduled_post(submission_journal, post):
+    """Test that the steps of the rescheduled post are kept separately."""
+    submission_journal.record_step(post, STEP_SUBMIT)
+    post.submit_at = datetime(2018, 1, 7, 17, 0, 0)
+    submission_journal.record_step(post, STEP_SAVE)
+
+    interrupted_entries = submission_journal.load_interrupted()
+
+    assert [entry.steps for entry in interrupted_entries] == [
+        {STEP_SUBMIT},
+        {STEP_SAVE},
+    ]
+    assert interrupted_entries[1].post_hash == hash_post(post)
+
+
+def test_journal_errors(tmpdir, submission_journal, post):
+    """Test that failing to read or write the journal is not fatal."""
+    assert not submission_journal.load_interrupted()
+
+    os.makedirs(os.path.dirname(submission_journal.journal_file))
+    with open(submission_journal.journal_file, "w") as journal:
+        journal.write("Not a journal\n")
+
+    assert not submission_journal.load_interrupted()
+
+    tmpdir.join("journal").write("Not a directory")
+    submission_journal.journal_file = str(
+        tmpdir.join("journal").join("journal.jsonl"),
+    )
+    submission_journal.record_step(post, STEP_SUBMIT)
+
+    submission_journal.journal_file = str(tmpdir.join("journal.jsonl"))
+    submission_journal.record_step(post, STEP_SUBMIT)
+
+    with patch(
+        "slow_start_rewatch.schedule.submission_journal.write_records",
+        side_effect=IOError,
+    ):
+        assert submission_journal.load_interrupted()
+
+
+def test_create_submission_journal(tmpdir):
+    """Test creating the journal for each schedule."""
+    config = MockConfig({
+        "data_dir": str(tmpdir),
+        "schedule_wiki_url": "/r/anime/wiki/slow-start-rewatch",
+        "schedule_database": None,
+        "schedule_file": None,
+    })
+
+    wiki_journal = create_submission_journal(config)
+
+    config["schedule_wiki_url"] = None
+    config["schedule_file"] = "schedule.yml"
+
+    file_journal = create_submission_journal(config)
+
+    assert os.path.dirname(wiki_journal.journal_file) == str(
+        tmpdir.join(JOURNAL_DIRECTORY),
+    )
+    assert wiki_journal.journal_file != file_journal.journal_file
+
+
+@pytest.fixture()
+def submission_journal(tmpdir):
+    """Return `SubmissionJournal` stored in a temporary directory."""
+    return SubmissionJournal(
+        str(tmpdir.join(JOURNAL_DIRECTORY).join("journal.jsonl")),
+    )
+
+
+@pytest.fixture()
+def post():
+    """Return the submitted `Post`."""
+    submitted_post = Post(
+        name="episode_1",
+        submit_at=datetime(2018, 1, 6, 17, 0, 0),
+        subreddit="anime",
+        title="Slow Start - Episode 1 Discussion",
+        body_template="*Slow Start*, Episode 1",
+    )
+    submitted_post.submission_id = "cute_id"
+
+    return submitted_post
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+
+from functools import partial
+from typing import List
+
+from slow_start_rewatch.exceptions import RedditError
+from slow_start_rewatch.task_queue import (
+    PRIORITY_HIGH,
+    PRIORITY_LOW,
+    PRIORITY_NORMAL,
+    TaskQueue,
+)
+
+
+def test_priority():
+    """
+    Test that the tasks are executed by the priority.
+
+    The tasks are added while the queue is paused. The tasks with the same
+    priority are executed in the order of addition.
+    """
+    executed_tasks: List[str] = []
+    task_queue = TaskQueue()
+
+    task_queue.pause()
+
+    for name, priority in (
+        ("navigation", PRIORITY_LOW),
+        ("schedule", PRIORITY_NORMAL),
+        ("update_1", PRIORITY_HIGH),
+        ("update_2", PRIORITY_HIGH),
+    ):
+        task_queue.add(
+            name,
+            partial(executed_tasks.append, name),
+            priority=priority,
+        )
+
+    task_queue.join()
+
+    assert executed_tasks == ["update_1", "update_2", "schedule", "navigation"]
+
+    task_queue.stop()
+
+
+def test_failed_task(capsys):
+    """Test that a failed task doesn't stop the execution of other tasks."""
+    executed_tasks: List[str] = []
+    task_queue = TaskQueue()
+
+    def fail():
+        raise RedditError("Failed to update the post.")
+
+    task_queue.add("fail", fail)
+    task_queue.add("succeed", partial(executed_tasks.append, "succeed"))
+    task_queue.join()
+
+    captured = capsys.readouterr()
+
+    assert task_queue.failed_tasks == ["fail"]
+    assert executed_tasks == ["succeed"]
+    assert "The background task 'fail' failed" in captured.err
+
+
+def test_stop():
+    """Test stopping the worker."""
+    task_queue = TaskQueue()
+
+    task_queue.stop()
+
+    assert task_queue.queue.empty()
+
+    task_queue.add("nothing", lambda: None)
+    task_queue.start()
+    task_queue.join()
+    task_queue.stop()
+
+    worker = task_queue._worker  # noqa: WPS437
+
+    assert worker
+
+    worker.join(timeout=5)
+
+    assert not worker.is_alive()
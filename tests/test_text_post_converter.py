@@ -8,7 +8,11 @@ from unittest.mock import call, patch
 import pytest
 from requests.exceptions import HTTPError
 
-from slow_start_rewatch.exceptions import ImageNotFound, PostConversionError
+from slow_start_rewatch.exceptions import (
+    ImageNotFound,
+    PostConversionError,
+    RedditError,
+)
 from slow_start_rewatch.reddit.post_image import PostImage
 from slow_start_rewatch.reddit.text_post_converter import TextPostConverter
 from tests.conftest import TEST_IMAGE_URL, TEST_ROOT_DIR, MockConfig
@@ -39,6 +43,8 @@ def test_convert_to_rtjson(
     mock_parse_markdown.return_value = ("Fluffy Markdown", downloaded_image)
     helper = mock_reddit_helper.return_value
     helper.convert_to_rtjson.return_value = [{"c": [{"t": "Fluffy Markdown"}]}]
+    helper.upload_image.return_value = "adorable_id"
+    image_content = downloaded_image.image_content
 
     converter = TextPostConverter(text_post_converter_config, reddit)
     converter.convert_to_rtjson("**Fluffy Markdown**")
@@ -49,12 +55,23 @@ def test_convert_to_rtjson(
     assert helper.upload_image.call_args == call(
         filename=downloaded_image.filename,
         mime_type=downloaded_image.mime_type,
-        image_content=downloaded_image.image_content,
+        image_content=image_content,
     )
     assert mock_replace_image.call_args == call(
         [{"c": [{"t": "Fluffy Markdown"}]}],
         downloaded_image,
     )
+    assert downloaded_image.reddit_asset_id == "adorable_id"
+    assert image_content.closed
+
+    helper.upload_image.side_effect = RedditError("Reddit is sleepy.")
+    downloaded_image.image_content = io.BytesIO(b"GIF89a")
+    image_content = downloaded_image.image_content
+
+    with pytest.raises(RedditError):
+        converter.convert_to_rtjson("**Fluffy Markdown**")
+
+    assert image_content.closed
 
 
 def test_parse_markdown(
@@ -94,10 +111,12 @@ def test_download_image(
 
     1. Test handling an exception and ensure that the `post_image` is empty.
 
-    2. Test successful download.
+    2. Test successful download (streamed in chunks).
+
+    3. Test rejecting the image exceeding the size limit.
     """
-    mock_get.return_value.content = b"GIF89a"  # noqa: WPS110
-    mock_get.return_value.raise_for_status.side_effect = [HTTPError, None]
+    mock_get.return_value.iter_content.return_value = [b"GIF8", b"9a"]
+    mock_get.return_value.raise_for_status.side_effect = [HTTPError, None, None]
 
     converter = TextPostConverter(text_post_converter_config, reddit)
 
@@ -112,8 +131,106 @@ def test_download_image(
 
     converter.download_image(post_image)
 
-    assert post_image.image_content.getvalue() == b"GIF89a"
+    assert post_image.image_content.read() == b"GIF89a"
+    assert post_image.content_hash == (
+        "610f5ae4d76e332636a17bd357fd6ce99029316a99d320280d4d77a746bf29e8"
+    )
     assert post_image.mime_type == "image/gif"
+    assert mock_get.call_args == call(TEST_IMAGE_URL, headers=None, stream=True)
+    assert mock_get.return_value.iter_content.call_args == call(chunk_size=4)
+    assert mock_get.return_value.close.call_count == 2
+
+    converter.max_image_size = 5
+
+    with pytest.raises(PostConversionError) as size_error:
+        converter.download_image(post_image)
+
+    assert "exceeds the size limit" in str(size_error.value)  # noqa: WPS441
+
+
+@patch("requests.get")
+def test_download_cached_image(
+    mock_get,
+    text_post_converter_config,
+    reddit,
+    post_image: PostImage,
+    tmpdir,
+):
+    """
+    Test downloading the image through the image cache.
+
+    1. The image is downloaded and stored in the cache.
+
+    2. The fresh image is reused without a request.
+
+    3. The older image is revalidated by a conditional request.
+    """
+    text_post_converter_config["data_dir"] = str(tmpdir)
+    text_post_converter_config["image_cache"]["enabled"] = True
+    mock_get.return_value.status_code = 200
+    mock_get.return_value.iter_content.return_value = [b"GIF89a"]
+    mock_get.return_value.headers = {"ETag": '"cute_etag"'}
+
+    converter = TextPostConverter(text_post_converter_config, reddit)
+
+    assert converter.image_cache
+
+    converter.download_image(post_image)
+
+    assert post_image.image_content.read() == b"GIF89a"
+
+    converter.download_image(post_image)
+
+    assert post_image.image_content.read() == b"GIF89a"
+    assert mock_get.call_count == 1
+
+    converter.image_cache.max_age = 0
+    mock_get.return_value.status_code = 304
+    mock_get.return_value.iter_content.return_value = []
+    converter.download_image(post_image)
+
+    assert mock_get.call_args == call(
+        TEST_IMAGE_URL,
+        headers={"If-None-Match": '"cute_etag"'},
+        stream=True,
+    )
+    assert post_image.image_content.read() == b"GIF89a"
+    post_image.release_content()
+    assert converter.image_cache.metrics == {
+        "hits": 1,
+        "revalidations": 1,
+        "misses": 1,
+    }
+
+
+@patch("slow_start_rewatch.reddit.text_post_converter.RedditHelper")
+def test_upload_image(
+    mock_reddit_helper,
+    text_post_converter_config,
+    reddit,
+    downloaded_image: PostImage,
+    tmpdir,
+):
+    """
+    Test reusing the uploaded image with the same content.
+
+    The image without the content hash is always uploaded.
+    """
+    text_post_converter_config["data_dir"] = str(tmpdir)
+    text_post_converter_config["asset_registry"]["enabled"] = True
+    upload_image = mock_reddit_helper.return_value.upload_image
+    upload_image.return_value = "cute_id"
+
+    converter = TextPostConverter(text_post_converter_config, reddit)
+
+    assert converter.upload_image(downloaded_image) == "cute_id"
+    assert upload_image.call_count == 1
+
+    downloaded_image.content_hash = "cute_hash"
+
+    assert converter.upload_image(downloaded_image) == "cute_id"
+    assert converter.upload_image(downloaded_image) == "cute_id"
+    assert upload_image.call_count == 2
 
 
 def test_replace_image(
@@ -145,6 +262,20 @@ def text_post_converter_config():
     return MockConfig({
         "reddit": {"user_agent": "Slow Start Rewatch Client"},
         "post_image_mime_types": {"gif": "image/gif"},
+        "image_cache": {
+            "enabled": False,
+            "max_size": 1024,
+            "max_age": 600000,
+        },
+        "asset_registry": {
+            "enabled": False,
+            "validity": 3600000,
+        },
+        "image_download": {
+            "max_size": 1024,
+            "spool_size": 16,
+            "chunk_size": 4,
+        },
     })
 
 
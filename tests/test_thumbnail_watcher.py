@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+
+from unittest.mock import PropertyMock, call, patch
+
+import pytest
+from prawcore.exceptions import PrawcoreException
+
+from slow_start_rewatch.reddit.thumbnail_watcher import (
+    HISTORY_FILENAME,
+    ThumbnailWatcher,
+)
+from tests.conftest import MockConfig
+
+
+class FakeMonotonicClock(object):
+    """Simulate the monotonic clock advanced only by sleeping."""
+
+    def __init__(self) -> None:
+        """Initialize FakeMonotonicClock."""
+        self.current_time = 0.0
+
+    def monotonic(self) -> float:
+        """Return the current time."""
+        return self.current_time
+
+    def sleep(self, seconds: float) -> None:
+        """Advance the clock."""
+        self.current_time += seconds
+
+
+@patch.object(ThumbnailWatcher, "is_ready")
+@patch("slow_start_rewatch.reddit.thumbnail_watcher.time")
+def test_wait_until_ready(
+    mock_time,
+    mock_is_ready,
+    thumbnail_watcher_config,
+    reddit,
+    tmpdir,
+):
+    """
+    Test waiting for the thumbnail.
+
+    1. Without history the polling starts with the initial interval and the
+       interval grows exponentially. The readiness time is recorded.
+
+    2. The first poll of the next submission is delayed by a fraction of the
+       typical readiness time so that the earlier readiness is recorded.
+
+    3. The polling backs off from the first delay if the thumbnail isn't
+       ready yet.
+    """
+    clock = FakeMonotonicClock()
+    mock_time.monotonic.side_effect = clock.monotonic
+    mock_time.sleep.side_effect = clock.sleep
+    mock_is_ready.side_effect = [False, False, True, True, False, True]
+
+    thumbnail_watcher = ThumbnailWatcher(thumbnail_watcher_config, reddit)
+
+    assert thumbnail_watcher.wait_until_ready("anime", "cute_id", 120000)
+    assert mock_time.sleep.call_args_list == [call(2), call(2), call(4)]
+    assert thumbnail_watcher.typical_readiness("anime") == 8000
+    assert tmpdir.join(HISTORY_FILENAME).check()
+
+    mock_time.sleep.reset_mock()
+    thumbnail_watcher = ThumbnailWatcher(thumbnail_watcher_config, reddit)
+
+    assert thumbnail_watcher.wait_until_ready("anime", "cute_id", 120000)
+    assert mock_time.sleep.call_args_list == [call(4)]
+    assert thumbnail_watcher.history["anime"] == [8000, 4000]
+
+    mock_time.sleep.reset_mock()
+    clock.current_time = 0
+
+    assert thumbnail_watcher.wait_until_ready("anime", "cute_id", 120000)
+    assert mock_time.sleep.call_args_list == [call(3), call(2)]
+    assert thumbnail_watcher.history["anime"] == [8000, 4000, 5000]
+
+
+@patch.object(ThumbnailWatcher, "is_ready")
+@patch("slow_start_rewatch.reddit.thumbnail_watcher.time")
+def test_wait_until_ready_timeout(
+    mock_time,
+    mock_is_ready,
+    thumbnail_watcher_config,
+    reddit,
+):
+    """Test that the polling stops after the timeout."""
+    clock = FakeMonotonicClock()
+    mock_time.monotonic.side_effect = clock.monotonic
+    mock_time.sleep.side_effect = clock.sleep
+    mock_is_ready.return_value = False
+
+    thumbnail_watcher = ThumbnailWatcher(thumbnail_watcher_config, reddit)
+
+    assert not thumbnail_watcher.wait_until_ready("anime", "cute_id", 10000)
+    assert mock_time.sleep.call_args_list == [
+        call(2), call(2), call(4), call(2),
+    ]
+    assert not thumbnail_watcher.history
+
+
+def test_is_ready(thumbnail_watcher_config, reddit):
+    """
+    Test checking the thumbnail of the submission.
+
+    1. The thumbnail is not ready.
+
+    2. The thumbnail is ready.
+
+    3. The preview is ready.
+
+    4. An error is raised by `PRAW`.
+    """
+    submission = reddit.submission.return_value
+    submission.thumbnail = "self"
+    submission.preview = None
+
+    thumbnail_watcher = ThumbnailWatcher(thumbnail_watcher_config, reddit)
+
+    assert not thumbnail_watcher.is_ready("cute_id")
+    assert reddit.submission.call_args == call("cute_id")
+
+    submission.thumbnail = "https://b.thumbs.redditmedia.com/cute.jpg"
+
+    assert thumbnail_watcher.is_ready("cute_id")
+
+    submission.thumbnail = "self"
+    submission.preview = {"images": []}
+
+    assert thumbnail_watcher.is_ready("cute_id")
+
+    type(submission).thumbnail = PropertyMock(side_effect=PrawcoreException)
+
+    assert not thumbnail_watcher.is_ready("cute_id")
+
+
+def test_record_readiness(thumbnail_watcher_config, reddit):
+    """Test that only the latest readiness times are kept."""
+    thumbnail_watcher = ThumbnailWatcher(thumbnail_watcher_config, reddit)
+
+    for readiness in range(1, 6):
+        thumbnail_watcher.record_readiness("anime", readiness * 1000)
+
+    assert thumbnail_watcher.history["anime"] == [3000, 4000, 5000]
+    assert thumbnail_watcher.typical_readiness("anime") == 4000
+    assert thumbnail_watcher.typical_readiness("manga") is None
+
+
+@pytest.mark.parametrize("history_content", [
+    "anime: [1000, 2000",
+    "- 1000",
+])
+def test_load_invalid_history(
+    history_content,
+    thumbnail_watcher_config,
+    reddit,
+    tmpdir,
+):
+    """Test that an invalid history file is ignored."""
+    tmpdir.join(HISTORY_FILENAME).write(history_content)
+
+    thumbnail_watcher = ThumbnailWatcher(thumbnail_watcher_config, reddit)
+
+    assert thumbnail_watcher.history == {}
+
+
+def test_save_history_error(reddit, tmpdir):
+    """Test that an error when saving the history is not fatal."""
+    data_dir = tmpdir.join("data_dir")
+    data_dir.write("Not a directory")
+    config = MockConfig({
+        "thumbnail_watcher": {
+            "initial_interval": 2000,
+            "max_interval": 20000,
+            "backoff_factor": 2,
+            "early_fraction": 0.5,
+            "history_size": 3,
+        },
+        "data_dir": str(data_dir),
+    })
+
+    thumbnail_watcher = ThumbnailWatcher(config, reddit)
+    thumbnail_watcher.record_readiness("anime", 1000)
+
+    assert thumbnail_watcher.history == {"anime": [1000]}
+
+
+@pytest.fixture()
+def thumbnail_watcher_config(tmpdir):
+    """Return mock Config for testing the `ThumbnailWatcher`."""
+    return MockConfig({
+        "thumbnail_watcher": {
+            "initial_interval": 2000,
+            "max_interval": 4000,
+            "backoff_factor": 2,
+            "early_fraction": 0.5,
+            "history_size": 3,
+        },
+        "data_dir": str(tmpdir),
+    })
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
-from datetime import datetime
+from datetime import datetime, timedelta
+from typing import List
 from unittest.mock import call, patch
 
 import pytest
@@ -31,6 +32,7 @@ def test_countdown(mock_datetime, mock_time, timer_config):
         datetime(2018, 1, 6, 16, 59, 59, 805 * 1000),
         datetime(2018, 1, 6, 16, 59, 59, 810 * 1000),
         datetime(2018, 1, 6, 17, 0, 0, 100 * 1000),
+        datetime(2018, 1, 6, 17, 0, 0, 120 * 1000),
     ]
 
     timer.wait(datetime(2018, 1, 6, 17, 0, 0))
@@ -39,6 +41,122 @@ def test_countdown(mock_datetime, mock_time, timer_config):
     expected_calls = [call(0.19) for index in range(2)]
 
     assert list(mock_time.sleep.call_args_list) == expected_calls
+    assert timer.release_jitter == 120
+
+
+class FakeClock(object):
+    """
+    Simulate the wall clock and the monotonic clock.
+
+    Both clocks advance during a sleep. Each reading of the monotonic clock
+    advances the clocks by 50 microseconds to simulate the busy waiting.
+    """
+
+    def __init__(self, start_time: datetime) -> None:
+        """Initialize FakeClock."""
+        self.start_time = start_time
+        self.elapsed_ns = 0
+        self.wall_offset = timedelta()
+        self.sleeps: List[float] = []
+
+    def utcnow(self) -> datetime:
+        """Return the wall clock time."""
+        elapsed = timedelta(microseconds=self.elapsed_ns // 1000)
+
+        return self.start_time + elapsed + self.wall_offset
+
+    def monotonic_ns(self) -> int:
+        """Return the monotonic clock time."""
+        self.elapsed_ns += 50 * 1000
+
+        return self.elapsed_ns
+
+    def perf_counter(self) -> float:
+        """Return the monotonic clock time in seconds."""
+        return self.monotonic_ns() / 1000000000
+
+    def sleep(self, seconds: float) -> None:
+        """Advance the clocks."""
+        self.sleeps.append(seconds)
+        self.elapsed_ns += round(seconds * 1000000000)
+
+
+@patch("slow_start_rewatch.timer.time")
+@patch("slow_start_rewatch.timer.datetime")
+def test_countdown_precision_mode(mock_datetime, mock_time, timer_config):
+    """
+    Test the countdown in the precision mode.
+
+    Check that the sleeps of the final approach shrink and that the release
+    happens within a millisecond after the target time.
+    """
+    timer_config["timer.precision_mode"] = True
+    timer = Timer(timer_config)
+
+    clock = FakeClock(datetime(2018, 1, 6, 16, 59, 59, 10 * 1000))
+    mock_datetime.utcnow.side_effect = clock.utcnow
+    mock_time.sleep.side_effect = clock.sleep
+    mock_time.perf_counter.side_effect = clock.perf_counter
+
+    timer.wait(datetime(2018, 1, 6, 17, 0, 0))
+
+    final_approach_sleeps = clock.sleeps[-5:]
+
+    assert final_approach_sleeps == sorted(final_approach_sleeps, reverse=True)
+    assert clock.utcnow() >= datetime(2018, 1, 6, 17, 0, 0)
+    assert timer.release_jitter is not None
+    assert 0 <= timer.release_jitter < 1
+
+
+@patch("slow_start_rewatch.timer.time")
+@patch("slow_start_rewatch.timer.datetime")
+def test_remaining_ns_resync(mock_datetime, mock_time, timer_config):
+    """
+    Test that the monotonic clock is re-synced after the wall clock step.
+
+    1. A small drift of the wall clock is ignored.
+
+    2. A wall clock step larger than the resync threshold re-anchors the
+       monotonic clock.
+    """
+    timer = Timer(timer_config)
+
+    clock = FakeClock(datetime(2018, 1, 6, 16, 59, 50))
+    mock_datetime.utcnow.side_effect = clock.utcnow
+    mock_time.perf_counter.side_effect = clock.perf_counter
+
+    target_timestamp = datetime(2018, 1, 6, 17, 0, 0).timestamp() * 1000
+
+    remaining_ns = timer.remaining_ns(target_timestamp)
+
+    assert remaining_ns == pytest.approx(10 * 1000000000, abs=1000)
+
+    clock.wall_offset = timedelta(milliseconds=10)
+    remaining_ns = timer.remaining_ns(target_timestamp)
+
+    assert remaining_ns == pytest.approx(
+        10 * 1000000000 - 50 * 1000,
+        abs=1000,
+    )
+
+    clock.wall_offset = timedelta(seconds=5)
+    remaining_ns = timer.remaining_ns(target_timestamp)
+
+    assert remaining_ns == pytest.approx(
+        5 * 1000000000 - 100 * 1000,
+        abs=1000,
+    )
+
+
+def test_precision_errors(timer_config):
+    """Test the precision methods without required attributes."""
+    timer = Timer(timer_config)
+
+    with pytest.raises(AttributeError):
+        timer.final_approach()
+
+    with pytest.raises(AttributeError):
+        timer.report_release()
 
 
 @patch("slow_start_rewatch.timer.datetime")
@@ -130,4 +248,11 @@ def test_time_left_invalid_call(timer_config):
 @pytest.fixture()
 def timer_config():
     """Return mock Config for testing the `Timer`."""
-    return MockConfig({"timer": {"refresh_interval": 200}})
+    return MockConfig({
+        "timer": {
+            "refresh_interval": 200,
+            "precision_mode": False,
+            "spin_threshold": 2,
+            "resync_threshold": 50,
+        },
+    })
@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+
+import os
+from typing import Dict
+from unittest.mock import Mock, patch
+
+import pytest
+from prawcore.exceptions import PrawcoreException
+
+from slow_start_rewatch.schedule.wiki_mirror import (
+    INDEX_FILENAME,
+    MIRROR_DIRECTORY,
+    WikiMirror,
+    create_wiki_mirror,
+)
+from tests.conftest import MockConfig
+
+
+def test_put_and_get_page(wiki_mirror, wiki):
+    """
+    Test storing and reading the mirrored pages.
+
+    The pages are available only after the synchronization.
+    """
+    wiki_mirror.put_page("Schedule", "Cute\r\nschedule", "revision_1")
+    wiki_mirror.put_page("schedule/episode_01", "Cute post", None)
+
+    assert wiki_mirror.get_page("schedule") is None
+
+    wiki_mirror.sync(wiki)
+
+    assert wiki_mirror.get_page("schedule") == (
+        "Cute\r\nschedule",
+        "revision_1",
+    )
+    assert wiki_mirror.get_page("schedule/episode_01") is None
+
+    os.remove(wiki_mirror.get_page_file("schedule"))
+
+    assert wiki_mirror.get_page("schedule") is None
+
+
+def test_sync(wiki_mirror, wiki):
+    """
+    Test dropping the pages modified since the last synchronization.
+
+    1. Only the pages with a newer revision are dropped.
+
+    2. Only the revisions newer than the latest known revision are checked.
+    """
+    wiki_mirror.revision_limit = 3
+    wiki_mirror.put_page("schedule", "Cute schedule", "revision_1")
+    wiki_mirror.put_page("schedule/episode_01", "Cute post", "revision_2")
+    wiki_mirror.put_page("schedule/episode_02", "Moe post", "revision_3")
+    wiki.revisions.return_value = [
+        create_revision("revision_4", "schedule/episode_01"),
+        create_revision("revision_3", "schedule/episode_02"),
+        create_revision("revision_2", "schedule/episode_01"),
+    ]
+
+    wiki_mirror.sync(wiki)
+
+    assert wiki_mirror.get_page("schedule") is None
+    assert wiki_mirror.get_page("schedule/episode_01") is None
+    assert wiki_mirror.get_page("schedule/episode_02")
+
+    wiki_mirror.put_page("schedule/episode_01", "Kyun post", "revision_4")
+    wiki.revisions.return_value = [
+        create_revision("revision_5", "other_page"),
+        create_revision("revision_4", "schedule/episode_01"),
+        create_revision("revision_3", "schedule/episode_02"),
+    ]
+
+    wiki_mirror.sync(wiki)
+
+    assert wiki_mirror.get_page("schedule/episode_01") == (
+        "Kyun post",
+        "revision_4",
+    )
+    assert wiki_mirror.get_page("schedule/episode_02")
+
+
+def test_sync_error(wiki_mirror, wiki):
+    """Test that the mirror is not used when the sync fails."""
+    wiki_mirror.put_page("schedule", "Cute schedule", "revision_1")
+    wiki_mirror.sync(wiki)
+    wiki.revisions.side_effect = PrawcoreException
+
+    wiki_mirror.sync(wiki)
+
+    assert wiki_mirror.get_page("schedule") is None
+
+
+def test_mark_stale(wiki_mirror, wiki):
+    """
+    Test marking the page as stale.
+
+    The stale page is kept as the snapshot.
+    """
+    wiki_mirror.put_page("schedule", "Cute schedule", "revision_1")
+    wiki_mirror.sync(wiki)
+
+    wiki_mirror.mark_stale("Schedule")
+    wiki_mirror.mark_stale("missing")
+
+    assert wiki_mirror.get_page("schedule") is None
+
+    snapshot = wiki_mirror.get_snapshot("schedule")
+
+    assert snapshot
+
+    content_md, revision_id, snapshot_age = snapshot
+
+    assert (content_md, revision_id) == ("Cute schedule", "revision_1")
+    assert 0 <= snapshot_age < 60
+    assert wiki_mirror.get_snapshot("missing") is None
+
+    wiki_mirror.put_page("schedule", "Moe schedule", "revision_2", False)
+
+    assert wiki_mirror.get_page("schedule") is None
+
+    reloaded_snapshot = WikiMirror(wiki_mirror.mirror_dir, 100).get_snapshot(
+        "schedule",
+    )
+
+    assert reloaded_snapshot
+    assert reloaded_snapshot[:2] == ("Moe schedule", "revision_2")
+
+
+def test_invalid_index(tmpdir):
+    """Test that the invalid index of the mirror is ignored."""
+    tmpdir.join(INDEX_FILENAME).write('{"pages": {"schedule": {}}}')
+    wiki_mirror = WikiMirror(str(tmpdir), revision_limit=100)
+
+    assert wiki_mirror.get_snapshot("schedule") is None
+
+
+def test_write_errors(tmpdir, wiki):
+    """Test that failing to write the mirror is not fatal."""
+    mirror_dir = tmpdir.join("mirror")
+    mirror_dir.write("Not a directory")
+    wiki_mirror = WikiMirror(str(mirror_dir), revision_limit=100)
+
+    wiki_mirror.put_page("schedule", "Cute schedule", "revision_1")
+    wiki_mirror.sync(wiki)
+
+    assert wiki_mirror.get_page("schedule") is None
+
+    with patch(
+        "slow_start_rewatch.schedule.wiki_mirror.write_file",
+        side_effect=[None, IOError],
+    ):
+        tmpdir_mirror = WikiMirror(str(tmpdir), revision_limit=100)
+        tmpdir_mirror.put_page("schedule", "Cute schedule", "revision_1")
+
+
+def test_create_wiki_mirror(tmpdir):
+    """Test creating the mirror from the config."""
+    config = MockConfig({
+        "data_dir": str(tmpdir),
+        "wiki_mirror": {
+            "enabled": True,
+            "revision_limit": 50,
+            "offline_fallback": True,
+            "fetch_deadline": 5000,
+        },
+    })
+
+    wiki_mirror = create_wiki_mirror(config, "Anime")
+
+    assert wiki_mirror
+    assert wiki_mirror.mirror_dir == str(
+        tmpdir.join(MIRROR_DIRECTORY).join("anime"),
+    )
+    assert wiki_mirror.revision_limit == 50
+
+    config["wiki_mirror.enabled"] = False
+
+    assert create_wiki_mirror(config, "anime") is None
+
+
+def create_revision(revision_id: str, page_name: str) -> Dict[str, object]:
+    """Return the revision of a wiki page."""
+    wiki_page = Mock()
+    wiki_page.name = page_name
+
+    return {"id": revision_id, "page": wiki_page}
+
+
+@pytest.fixture()
+def wiki_mirror(tmpdir):
+    """Return `WikiMirror` stored in a temporary directory."""
+    return WikiMirror(str(tmpdir), revision_limit=100)
+
+
+@pytest.fixture()
+def wiki():
+    """Return mock `SubredditWiki` without any revisions."""
+    subreddit_wiki = Mock()
+    subreddit_wiki.revisions.return_value = []
+
+    return subreddit_wiki